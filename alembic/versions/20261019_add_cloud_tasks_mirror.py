@@ -0,0 +1,68 @@
+"""add_cloud_tasks_mirror
+
+Creates cloud_tasks table: local mirror of Bambu Cloud print tasks for job matching
+and the tasks UI (indexed by task_id, device serial + start time, normalized title).
+
+Revision ID: 20261019_add_cloud_tasks_mirror
+Revises: 20260406_02_add_missing_bambu_cloud_columns
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '20261019_add_cloud_tasks_mirror'
+down_revision: Union[str, Sequence[str], None] = '20260406_02_add_missing_bambu_cloud_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'cloud_tasks' not in inspector.get_table_names():
+        op.create_table(
+            'cloud_tasks',
+            sa.Column('task_id', sa.String(), primary_key=True),
+            sa.Column('title', sa.String(), nullable=False, server_default=''),
+            sa.Column('title_normalized', sa.String(), nullable=False, server_default=''),
+            sa.Column('device_id', sa.String(), nullable=False, server_default=''),
+            sa.Column('device_name', sa.String(), nullable=True),
+            sa.Column('status', sa.String(), nullable=False, server_default='unknown'),
+            sa.Column('weight_g', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('length_mm', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('cost_time_seconds', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('plate_index', sa.Integer(), nullable=False, server_default='1'),
+            sa.Column('ams_mapping_json', sa.Text(), nullable=True),
+            sa.Column('start_time', sa.String(), nullable=True),
+            sa.Column('end_time', sa.String(), nullable=True),
+            sa.Column('start_at', sa.DateTime(), nullable=True),
+            sa.Column('end_at', sa.DateTime(), nullable=True),
+            sa.Column('cover_url', sa.String(), nullable=True),
+            sa.Column('thumbnail_url', sa.String(), nullable=True),
+            sa.Column('fingerprint', sa.String(), nullable=True),
+            sa.Column('first_seen_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+        print("[MIGRATION] Created cloud_tasks")
+
+    existing_indexes = {idx['name'] for idx in inspector.get_indexes('cloud_tasks')} if 'cloud_tasks' in inspector.get_table_names() else set()
+    indices = [
+        ('idx_cloud_tasks_device_start', ['device_id', 'start_at']),
+        ('idx_cloud_tasks_title_norm', ['title_normalized']),
+        ('idx_cloud_tasks_start_at', ['start_at']),
+    ]
+    for idx_name, columns in indices:
+        if idx_name not in existing_indexes:
+            op.create_index(idx_name, 'cloud_tasks', columns)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_cloud_tasks_start_at', table_name='cloud_tasks')
+    op.drop_index('idx_cloud_tasks_title_norm', table_name='cloud_tasks')
+    op.drop_index('idx_cloud_tasks_device_start', table_name='cloud_tasks')
+    op.drop_table('cloud_tasks')
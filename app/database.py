@@ -1,7 +1,9 @@
+import hashlib
+import json
 import logging
 import os
 import sys
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional, Tuple
 from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, Session, create_engine
 
@@ -9,6 +11,12 @@ DB_PATH = os.environ.get("FILAMENTHUB_DB_PATH", "data/filamenthub.db")
 engine = create_engine(f"sqlite:///{DB_PATH}", echo=False)
 logger = logging.getLogger("database")
 
+# SQL-/Commit-Zeit waehrend MQTT-Nachrichten als Ingest-Stufen db/db_commit erfassen
+from app.monitoring.ingest_metrics import ingest_metrics  # noqa: E402
+from app.monitoring.startup_profile import startup_profile  # noqa: E402
+
+ingest_metrics.install_db_hooks(engine)
+
 
 def verify_schema_or_exit(engine, required_schema: dict | None = None) -> None:
     """
@@ -177,6 +185,136 @@ def run_migrations() -> None:
         raise
 
 
+# -----------------------------------------------------
+# STARTUP-CACHE (Schnellstart ohne Alembic)
+# -----------------------------------------------------
+STARTUP_CACHE_KEY = "startup.schema_cache"
+STARTUP_CACHE_VERSION = 1
+
+
+def _base_dir() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _migration_scripts_fingerprint() -> str:
+    """Name/Groesse/mtime aller Revisionsdateien - aendert sich mit jeder neuen Migration."""
+    versions_dir = os.path.join(_base_dir(), "alembic", "versions")
+    entries = []
+    try:
+        with os.scandir(versions_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".py") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    except OSError:
+        return ""
+    return hashlib.sha1("\n".join(sorted(entries)).encode("utf-8")).hexdigest()
+
+
+def _app_version() -> str:
+    try:
+        with open(os.path.join(_base_dir(), "VERSION"), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _schema_fingerprint(conn) -> str:
+    """DDL aller Tabellen/Indizes aus sqlite_master (eine Query statt Inspector)."""
+    rows = conn.exec_driver_sql(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master "
+        "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    ).fetchall()
+    raw = "\n".join("|".join(str(col) for col in row) for row in rows)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _current_startup_state(conn) -> Dict[str, object]:
+    try:
+        revisions = sorted(
+            row[0] for row in conn.exec_driver_sql("SELECT version_num FROM alembic_version").fetchall() if row[0]
+        )
+    except Exception:
+        revisions = []
+    return {
+        "version": STARTUP_CACHE_VERSION,
+        "app_version": _app_version(),
+        "scripts": _migration_scripts_fingerprint(),
+        "revisions": revisions,
+        "schema": _schema_fingerprint(conn),
+    }
+
+
+def _read_startup_cache(conn) -> Optional[Dict[str, object]]:
+    try:
+        row = conn.exec_driver_sql("SELECT value FROM setting WHERE key = ?", (STARTUP_CACHE_KEY,)).fetchone()
+    except Exception:
+        return None  # frische DB: setting-Tabelle existiert noch nicht
+    if not row or not row[0]:
+        return None
+    try:
+        return json.loads(row[0])
+    except ValueError:
+        return None
+
+
+def check_startup_cache() -> Tuple[bool, str]:
+    """
+    Schnellstart-Pruefung: Stimmen Revisionsdateien, alembic_version, Schema-DDL und
+    App-Version mit dem Stand nach der letzten erfolgreichen Migration/Validierung ueberein,
+    sind Alembic-Lauf und Schema-Pruefung ueberfluessig.
+
+    FILAMENTHUB_FULL_STARTUP=1 erzwingt den vollstaendigen Weg.
+    """
+    if os.environ.get("FILAMENTHUB_FULL_STARTUP", "").lower() in ("1", "true", "yes"):
+        return False, "FILAMENTHUB_FULL_STARTUP gesetzt"
+    try:
+        with engine.connect() as conn:
+            cached = _read_startup_cache(conn)
+            if cached is None:
+                return False, "kein Startup-Cache"
+            current = _current_startup_state(conn)
+    except Exception as exc:
+        return False, f"Startup-Cache nicht lesbar: {exc}"
+    if not current["revisions"]:
+        return False, "keine alembic_version"
+    for key in ("version", "app_version", "scripts", "revisions", "schema"):
+        if cached.get(key) != current[key]:
+            return False, f"{key} geaendert"
+    return True, "unveraendert"
+
+
+def write_startup_cache() -> None:
+    """Nach erfolgreicher Migration + Schema-Pruefung den aktuellen Stand merken."""
+    try:
+        with engine.begin() as conn:
+            state = _current_startup_state(conn)
+            conn.exec_driver_sql(
+                "INSERT INTO setting (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (STARTUP_CACHE_KEY, json.dumps(state, sort_keys=True)),
+            )
+    except Exception:
+        logger.warning("[DB] Startup-Cache konnte nicht geschrieben werden", exc_info=True)
+
+
+def _print_ready_banner() -> None:
+    # Unmittelbar sichtbare, stdout-basierte Abschlussmeldungen (erscheinen nur bei Erfolg)
+    print("")
+    print("[DB] [OK] Migrationen abgeschlossen")
+    print("[DB] [OK] Schema validiert")
+    print("[STARTUP] [READY] FilamentHub ist bereit - Server laeuft")
+    print("")
+
+    # Optionales, visuelles Startup-Banner (zusätzliche Klarheit für Betreiber)
+    print("==============================================")
+    print("   FILAMENTHUB STARTUP ERFOLGREICH")
+    print("   Datenbank: OK")
+    print("   Migrationen: OK")
+    print("   Status: RUNNING")
+    print("==============================================")
+
+
 def init_db() -> None:
     """
     Setzt SQLite-Constraints und führt Migrationen aus.
@@ -200,6 +338,16 @@ def init_db() -> None:
         logger.info("[DB] Datenbank existiert nicht – erstelle leere SQLite-Datei.")
         open(DB_PATH, "a").close()
 
+    # Schnellstart: nichts geaendert seit letztem erfolgreichen Start -> kein Alembic, kein Inspector
+    with startup_profile.phase("init_db.fingerprint"):
+        fast, reason = check_startup_cache()
+    startup_profile.note("db_startup", "fast" if fast else f"full ({reason})")
+    if fast:
+        logger.info("[DB] Schnellstart: Migrationen und Schema unveraendert - Alembic/Schema-Pruefung uebersprungen")
+        _print_ready_banner()
+        return
+    logger.info("[DB] Vollstaendige Initialisierung: %s", reason)
+
     # Visual loading indicator
     print("")
     print("=" * 50)
@@ -224,7 +372,8 @@ def init_db() -> None:
     spinner_thread.start()
 
     try:
-        run_migrations()
+        with startup_profile.phase("init_db.migrations"):
+            run_migrations()
     except Exception:
         stop_spinner.set()
         spinner_thread.join(timeout=0.5)
@@ -238,7 +387,8 @@ def init_db() -> None:
     # Nach Migrationen das Schema verifizieren (kritische Tabellen/Spalten)
     print("[INIT] Schema-Validierung...")
     try:
-        verify_schema_or_exit(engine)
+        with startup_profile.phase("init_db.verify_schema"):
+            verify_schema_or_exit(engine)
         print("[INIT] Schema-Validierung... [OK]")
     except SystemExit:
         # bereits geloggt in verify_schema_or_exit
@@ -258,20 +408,9 @@ def init_db() -> None:
     # Kompaktes, eindeutiges Startup-Summary
     logger.info("[STARTUP] Datenbank bereit | Migrationen OK | Schema OK | FilamentHub kann starten")
 
-    # Unmittelbar sichtbare, stdout-basierte Abschlussmeldungen (erscheinen nur bei Erfolg)
-    print("")
-    print("[DB] [OK] Migrationen abgeschlossen")
-    print("[DB] [OK] Schema validiert")
-    print("[STARTUP] [READY] FilamentHub ist bereit - Server laeuft")
-    print("")
-
-    # Optionales, visuelles Startup-Banner (zusätzliche Klarheit für Betreiber)
-    print("==============================================")
-    print("   FILAMENTHUB STARTUP ERFOLGREICH")
-    print("   Datenbank: OK")
-    print("   Migrationen: OK")
-    print("   Status: RUNNING")
-    print("==============================================")
+    with startup_profile.phase("init_db.cache_write"):
+        write_startup_cache()
+    _print_ready_banner()
 
 
 def get_session():
@@ -0,0 +1,130 @@
+"""DB-Arbeit aus async-Routen auf einem eigenen, begrenzten Thread-Pool ausfuehren.
+
+Synchrone SQLModel-Sessions blockieren den Event-Loop (und damit WebSocket-Broadcasts), wenn sie
+direkt in ``async def`` benutzt werden. Statt dessen:
+
+    @router.get("/overview")
+    async def get_overview():
+        return await run_in_session(_build_overview)     # _build_overview(session) -> Antwort
+
+Der Pool ist getrennt von Starlettes Default-Threadpool (sync Routen, run_in_threadpool), damit
+langsame Queries keine anderen sync Routen verdraengen und umgekehrt. SQLite serialisiert Writer
+ohnehin; mehr als eine Handvoll Worker bringt nichts.
+
+Groesse: FILAMENTHUB_DB_WORKERS (Standard 4). Wartezeit in der Queue und Laufzeit werden als
+Histogramme erfasst (stats(), /api/performance/db-executor).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from sqlmodel import Session
+
+from app.database import engine
+from app.monitoring.ingest_metrics import Histogram
+
+T = TypeVar("T")
+
+DB_WORKERS = max(1, int(os.environ.get("FILAMENTHUB_DB_WORKERS", "4") or 4))
+DB_THREAD_PREFIX = "db-worker"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_queue_time = Histogram()
+_run_time = Histogram()
+_counters: Dict[str, int] = {"submitted": 0, "completed": 0, "failed": 0, "queued": 0, "running": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix=DB_THREAD_PREFIX)
+    return _executor
+
+
+def is_db_worker_thread() -> bool:
+    return threading.current_thread().name.startswith(DB_THREAD_PREFIX)
+
+
+def _run_measured(submitted_ns: int, fn: Callable[[], T]) -> T:
+    started_ns = time.perf_counter_ns()
+    with _stats_lock:
+        _queue_time.add(started_ns - submitted_ns)
+        _counters["queued"] -= 1
+        _counters["running"] += 1
+    ok = False
+    try:
+        result = fn()
+        ok = True
+        return result
+    finally:
+        with _stats_lock:
+            _run_time.add(time.perf_counter_ns() - started_ns)
+            _counters["running"] -= 1
+            _counters["completed" if ok else "failed"] += 1
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Beliebige blockierende DB-Funktion (oeffnet ihre Session selbst) im DB-Pool ausfuehren."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    ctx = contextvars.copy_context()
+    with _stats_lock:
+        _counters["submitted"] += 1
+        _counters["queued"] += 1
+    submitted_ns = time.perf_counter_ns()
+    return await loop.run_in_executor(_get_executor(), ctx.run, _run_measured, submitted_ns, call)
+
+
+async def run_in_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """``fn(session, *args, **kwargs)`` mit eigener Session im DB-Pool ausfuehren.
+
+    Die Session wird im Worker geoeffnet und geschlossen; ORM-Objekte im Ergebnis sind danach
+    detached - Antworten daher im Worker fertig bauen (Dicts/Modelle mit geladenen Feldern).
+    """
+
+    def _with_session() -> T:
+        with Session(engine) as session:
+            return fn(session, *args, **kwargs)
+
+    return await run_db(_with_session)
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        counters = dict(_counters)
+        queue = _queue_time.summary()
+        run = _run_time.summary()
+    return {
+        "workers": DB_WORKERS,
+        **counters,
+        "queue_wait": queue,
+        "run": run,
+    }
+
+
+def reset_stats() -> None:
+    global _queue_time, _run_time
+    with _stats_lock:
+        _queue_time = Histogram()
+        _run_time = Histogram()
+        for key in ("submitted", "completed", "failed"):
+            _counters[key] = 0
+
+
+def shutdown(wait: bool = False) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
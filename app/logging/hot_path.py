@@ -0,0 +1,119 @@
+"""Logging fuer den MQTT-Ingest-Pfad (pro Nachricht).
+
+Im Hot-Path wird nichts mehr auf stdout geschrieben und kein String gebaut,
+solange der Ziel-Level nicht aktiv ist:
+
+- `lazy(fn, *args)` verschiebt teure Formatierung (Previews, json.dumps) bis
+  der Logger den Record tatsaechlich ausgibt.
+- `ingest_trace` ist ein globaler Schalter fuer detailliertes Tracing pro
+  Nachricht, mit Sampling pro Drucker (jede N-te Nachricht) und optionalem
+  Drucker-Filter. Ausgeschaltet kostet ein Trace genau einen Attribut-Check.
+
+Verwendung in on_message:
+
+    sampled = ingest_trace.sample(serial)
+    ...
+    if sampled:
+        ingest_trace.log("set_connected serial=%s", serial)
+
+Kosten im echten on_message-Pfad (mit/ohne Trace):
+    python -m benchmarks.mqtt_ingest --paths local [--ingest-trace 1]
+"""
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger("mqtt")
+
+
+class _Lazy:
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple) -> None:
+        self.fn = fn
+        self.args = args
+
+    def __str__(self) -> str:
+        try:
+            return str(self.fn(*self.args))
+        except Exception as exc:  # Formatierung darf nie den Ingest-Pfad brechen
+            return f"<lazy format failed: {exc}>"
+
+    __repr__ = __str__
+
+
+def lazy(fn: Callable[..., Any], *args: Any) -> _Lazy:
+    """Argument fuer %-Formatierung, das erst beim Ausgeben berechnet wird."""
+    return _Lazy(fn, args)
+
+
+class IngestTrace:
+    """Globaler, gesampelter Trace-Schalter fuer den Ingest-Pfad."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.sample_every = 1
+        self.printers: Optional[Set[str]] = None
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.emitted = 0
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        sample_every: Optional[int] = None,
+        printers: Optional[Iterable[str]] = None,
+        clear_printers: bool = False,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            if sample_every is not None:
+                self.sample_every = max(1, int(sample_every))
+            if clear_printers:
+                self.printers = None
+            elif printers is not None:
+                self.printers = {str(p) for p in printers if p} or None
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            self._counters.clear()
+        return self.status()
+
+    def configure_from(self, cfg: Optional[Dict[str, Any]]) -> None:
+        """Konfiguration aus config.yaml (logging.ingest_trace) + FILAMENTHUB_INGEST_TRACE."""
+        cfg = cfg or {}
+        enabled = bool(cfg.get("enabled", False))
+        env = os.environ.get("FILAMENTHUB_INGEST_TRACE")
+        if env is not None:
+            enabled = env.strip().lower() in ("1", "true", "yes", "on")
+        self.configure(
+            enabled=enabled,
+            sample_every=cfg.get("sample_every", 1),
+            printers=cfg.get("printers"),
+            clear_printers=not cfg.get("printers"),
+        )
+
+    def sample(self, printer: Optional[str]) -> bool:
+        """Entscheidet einmal pro Nachricht, ob sie getraced wird."""
+        if not self.enabled:
+            return False
+        key = printer or "-"
+        if self.printers is not None and key not in self.printers:
+            return False
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        return count % self.sample_every == 0
+
+    def log(self, msg: str, *args: Any) -> None:
+        self.emitted += 1
+        logger.info("[INGEST TRACE] " + msg, *args)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "printers": sorted(self.printers) if self.printers else None,
+            "emitted": self.emitted,
+        }
+
+
+ingest_trace = IngestTrace()
@@ -1,12 +1,26 @@
+import atexit
+import copy
 import logging
+import queue
+import threading
+import time
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
 LOGGERS = ("app", "mqtt", "bambu", "services", "database", "errors")
 
+# Log-Records werden nicht mehr im aufrufenden Thread (z.B. paho-Callback) auf
+# die Platte geschrieben, sondern in eine begrenzte Queue gelegt. Ein
+# Hintergrund-Thread schreibt sie gebuendelt (ein flush pro Batch und Datei).
+# Ist die Queue voll, wird der Record verworfen und gezaehlt.
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+
+_STOP = object()
+
 
 def _get_level(level_str: str) -> int:
     level = (level_str or "").upper()
@@ -17,15 +31,192 @@ def _ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def _build_handler(path: Path, level: int, max_size_mb: int, backup_count: int) -> RotatingFileHandler:
-    handler = RotatingFileHandler(
+class _BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, der waehrend eines Batches nicht pro Record flusht."""
+
+    _batching = False
+
+    def flush(self) -> None:
+        if self._batching:
+            return
+        super().flush()
+
+
+class _LogWriter:
+    """Begrenzte Queue + Writer-Thread fuer alle verwalteten Datei-Handler."""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self.batch_size = max(1, batch_size)
+        self.handlers: List[logging.Handler] = []
+        self._exc_formatter = logging.Formatter()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._stopped = False
+        self.started_at = time.time()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.max_depth = 0
+        self.write_time_s = 0.0
+        self._rate_ts = time.monotonic()
+        self._rate_written = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def enqueue(self, target: logging.Handler, record: logging.LogRecord) -> None:
+        if self._stopped:
+            # Nach dem Shutdown direkt schreiben (z.B. Logs aus atexit-Hooks)
+            target.handle(record)
+            return
+        # Nachricht im aufrufenden Thread zusammenfuehren, damit sich Args/Tracebacks
+        # bis zum Schreiben nicht mehr aendern koennen. Auf einer Kopie wie
+        # QueueHandler.prepare(): der Record geht danach noch an weitere Handler
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self.queue.put_nowait((target, record))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[logging.Handler, logging.LogRecord]]) -> None:
+        start = time.perf_counter()
+        touched: Set[logging.Handler] = set()
+        for target, record in batch:
+            if target not in touched:
+                touched.add(target)
+                setattr(target, "_batching", True)
+            try:
+                target.handle(record)
+            except Exception:
+                target.handleError(record)
+        for target in touched:
+            setattr(target, "_batching", False)
+            try:
+                target.flush()
+            except Exception:
+                pass
+        self.written += len(batch)
+        self.batches += 1
+        if len(batch) > self.max_batch:
+            self.max_batch = len(batch)
+        self.write_time_s += time.perf_counter() - start
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Restliche Records schreiben, Thread beenden, Dateien schliessen."""
+        if self._stopped:
+            return
+        if self._thread.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self._stopped = True
+        # Falls der Thread nicht mehr lief: Rest synchron schreiben
+        leftovers = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            self._write(leftovers)
+        for handler in self.handlers:
+            try:
+                handler.flush()
+                handler.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        elapsed = now - self._rate_ts
+        recent = (self.written - self._rate_written) / elapsed if elapsed > 0 else 0.0
+        self._rate_ts = now
+        self._rate_written = self.written
+        uptime = max(1e-6, time.time() - self.started_at)
+        return {
+            "running": self._thread.is_alive(),
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0,
+            "records_per_s": round(recent, 1),
+            "records_per_s_avg": round(self.written / uptime, 1),
+            "write_time_ms": round(self.write_time_s * 1000.0, 1),
+        }
+
+
+class _QueueingHandler(logging.Handler):
+    """Stellvertreter am Logger: legt Records fuer `target` in die Writer-Queue."""
+
+    def __init__(self, target: logging.Handler, writer: _LogWriter) -> None:
+        super().__init__(target.level)
+        self.target = target
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.writer.enqueue(self.target, record)
+        except Exception:
+            self.handleError(record)
+
+
+_writer: Optional[_LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _build_handler(path: Path, level: int, max_size_mb: int, backup_count: int, writer: _LogWriter) -> logging.Handler:
+    target = _BatchedRotatingFileHandler(
         path,
         maxBytes=max_size_mb * 1024 * 1024,
         backupCount=backup_count,
         encoding="utf-8",
     )
-    handler.setLevel(level)
-    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    target.setLevel(level)
+    target.setFormatter(logging.Formatter(LOG_FORMAT))
+    writer.handlers.append(target)
+    handler = _QueueingHandler(target, writer)
     handler._fh_managed = True
     return handler
 
@@ -43,12 +234,30 @@ def _clear_managed_handlers(logger: logging.Logger) -> None:
     logger.handlers = keep
 
 
+def shutdown_logging(timeout: float = 5.0) -> None:
+    """Flusht die Log-Queue und beendet den Writer-Thread (Lifespan-Shutdown / atexit)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop(timeout)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    writer = _writer
+    if writer is None:
+        return {"running": False}
+    return writer.stats()
+
+
 def configure_logging(logging_config: Dict) -> Dict[str, bool]:
+    global _writer
     enabled = bool(logging_config.get("enabled", True))
     level = _get_level(logging_config.get("level", "INFO"))
     max_size_mb = max(1, int(logging_config.get("max_size_mb", 10)))
     backup_count = max(1, int(logging_config.get("backup_count", 3)))
     modules_cfg = logging_config.get("modules", {})
+    queue_size = int(logging_config.get("queue_size", DEFAULT_QUEUE_SIZE) or DEFAULT_QUEUE_SIZE)
 
     logs_root = Path(logging_config.get("paths", {}).get("logs", "logs"))
     app_log = logs_root / "app" / "app.log"
@@ -74,10 +283,17 @@ def configure_logging(logging_config: Dict) -> Dict[str, bool]:
         logger_obj.propagate = True
         statuses[logger_name] = final_enabled
 
+    # Alten Writer (vorherige Konfiguration) leeren und schliessen
+    shutdown_logging()
+
     if enabled:
-        app_handler = _build_handler(app_log, level, max_size_mb, backup_count)
-        mqtt_handler = _build_handler(mqtt_log, level, max_size_mb, backup_count)
-        errors_handler = _build_handler(errors_log, logging.ERROR, max_size_mb, backup_count)
+        writer = _LogWriter(queue_size=queue_size)
+        app_handler = _build_handler(app_log, level, max_size_mb, backup_count, writer)
+        mqtt_handler = _build_handler(mqtt_log, level, max_size_mb, backup_count, writer)
+        errors_handler = _build_handler(errors_log, logging.ERROR, max_size_mb, backup_count, writer)
+        writer.start()
+        with _writer_lock:
+            _writer = writer
         logging.getLogger("app").addHandler(app_handler)
         logging.getLogger("bambu").addHandler(app_handler)
         logging.getLogger("services").addHandler(app_handler)
@@ -85,4 +301,11 @@ def configure_logging(logging_config: Dict) -> Dict[str, bool]:
         logging.getLogger("mqtt").addHandler(mqtt_handler)
         root_logger.addHandler(errors_handler)
 
+    # Ingest-Trace (gesampeltes Tracing pro MQTT-Nachricht), siehe app/logging/hot_path.py
+    from app.logging.hot_path import ingest_trace
+    ingest_trace.configure_from(logging_config.get("ingest_trace"))
+
     return statuses
+
+
+atexit.register(shutdown_logging)
@@ -1,3 +1,6 @@
+import time as _time
+_IMPORT_STARTED = _time.perf_counter()  # Importzeit von app.main (Startup-Profil)
+
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, WebSocket
 import logging
@@ -43,6 +46,7 @@ def get_logging_config():
         "max_size_mb": logging_cfg.get("max_size_mb", 10),
         "backup_count": logging_cfg.get("backup_count", 3),
         "modules": logging_cfg.get("modules", {}),
+        "ingest_trace": logging_cfg.get("ingest_trace", {}),
     }
 
 from app.admin import enable_admin
@@ -65,13 +69,15 @@ def init_admin():
 
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from app.services.static_assets import AssetStaticFiles, asset_manifest, configure_templates
 from services.printer_service import initialize_printer_service
 from app.services.ams_sync import mark_printer_service_started
 from app.services.ams_sync_state import set_ams_sync_state
 from app.services.ams_normalizer import global_has_ams_lite
 from app.services import mqtt_runtime
-from app.monitoring.runtime_monitor import record_request
+from app.monitoring.request_metrics import request_metrics, route_key
+from app.monitoring.startup_profile import startup_profile
+from app.services.response_compression import CompressionMiddleware
 import time
 
 # -----------------------------------------------------
@@ -79,50 +85,12 @@ import time
 # -----------------------------------------------------
 from app.database import init_db
 
-from app.routes.hello import router as hello_router
-from app.routes.materials import router as materials_router
-from app.routes.spools import router as spools_router
-from app.routes.spool_numbers import router as spool_numbers_router  # NEU: Spulen-Nummern-System
-from app.routes.log_routes import router as log_router
-from app.routes.system_routes import router as system_router
-from app.routes.debug_routes import router as debug_router
-from app.routes.service_routes import router as service_router
-from app.routes.database_routes import router as database_router
-from app.routes.backup_routes import router as backup_router
-from app.routes.scanner_routes import router as scanner_router, debug_printer_router
-from app.routes.mqtt_routes import router as mqtt_router
-from app.routes.performance_routes import router as performance_router
-from app.routes.printers import router as printers_router
-from app.routes.jobs import router as jobs_router
-from app.routes.statistics_routes import router as statistics_router
-
-from app.routes.bambu_routes import router as bambu_router
-from app.routes.admin_routes import router as admin_router
-from app.routes.admin_coverage_routes import router as admin_coverage_router
-from app.routes.settings_routes import router as settings_router
-from app.routes.debug_ams_routes import router as debug_ams_router
-from app.routes.debug_system_routes import router as debug_system_router
-from app.routes.debug_performance_routes import router as debug_performance_router
-from app.routes.debug_network_routes import router as debug_network_router
-from app.routes.notification_routes import router as notification_router
-from app.routes.config_routes import router as config_router
-from app.routes import debug_log_routes
-from app.routes import mqtt_runtime_routes
-from app.routes.live_state_routes import router as live_state_router
-from app.routes.ams_routes import router as ams_router
-from app.routes.ams_conflicts import router as ams_conflicts_router
-from app.routes.lexikon_routes import router as lexikon_router
-from app.routes.externe_spule_routes import router as externe_spule_router
-from app.routes.weight_management_routes import router as weight_management_router
-from app.routes.spool_assignment_routes import router as spool_assignment_router
-from app.routes.monitoring_routes import router as monitoring_router
-from app.routes.bambu_cloud_routes import router as bambu_cloud_router
-from app.routes.mmu_routes import router as mmu_router  # Happy Hare MMU
-from app.routes.version_routes import router as version_router  # Update-Check
+from app.routes.registry import router_registry
 
 from app.websocket.log_stream import stream_log
 from sqlmodel import Session, select
 from app.database import engine
+from app.db.executor import run_in_session
 from app.models.printer import Printer
 from app.models.material import Material
 
@@ -205,20 +173,41 @@ def seed_default_materials():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    log_settings = get_logging_config()
-    configure_logging(log_settings)
-    init_admin()
-    init_db()
-    seed_default_materials()  # Erstelle Standard-Materialien bei frischer DB
+    with startup_profile.phase("logging"):
+        log_settings = get_logging_config()
+        configure_logging(log_settings)
+    with startup_profile.phase("init_admin"):
+        init_admin()
+    with startup_profile.phase("init_db"):
+        init_db()
+    with startup_profile.phase("seed_default_materials"):
+        seed_default_materials()  # Erstelle Standard-Materialien bei frischer DB
+    with startup_profile.phase("static_assets"):
+        try:
+            asset_manifest.warm()  # Content-Hashes fuer die Asset-URLs der Templates
+        except Exception:
+            logging.getLogger("app").warning("Static-Asset-Manifest konnte nicht vorbereitet werden", exc_info=True)
     set_ams_sync_state("pending")
-    app.state.printer_service = initialize_printer_service()
+    with startup_profile.phase("printer_service"):
+        app.state.printer_service = initialize_printer_service()
     mark_printer_service_started(time.time())
 
     # FIX Bug #9: Speichere Event-Loop für Thread-safe Broadcasting
     import asyncio
     app.state.event_loop = asyncio.get_running_loop()
+    from app.websocket.broadcaster import attach_event_loop
+    attach_event_loop(app.state.event_loop)
+    from app.services.live_delta import attach_loop as attach_live_delta_loop
+    attach_live_delta_loop(app.state.event_loop)
 
     logger = logging.getLogger("app")
+    # MQTT-Capture (Rohdaten-Aufzeichnung fuer Replay), falls in config.yaml aktiviert
+    try:
+        from app.services.mqtt_capture import start_from_config as start_mqtt_capture
+        start_mqtt_capture()
+    except Exception:
+        logger.exception("Failed to start MQTT capture")
+
     logger.info("[APP] Startup abgeschlossen - FilamentHub ist bereit")
 
     # Netzwerk-Modus prüfen: Bridge-Modus verhindert Drucker-Scanner
@@ -241,131 +230,33 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
     
-    # Starte Bambu Cloud Scheduler
-    try:
-        from app.services.bambu_cloud_scheduler import start_scheduler
-        start_scheduler()
-        logger.info("[APP] Bambu Cloud Scheduler gestartet")
-    except Exception as e:
-        logger.warning(f"[APP] Bambu Cloud Scheduler konnte nicht gestartet werden: {e}")
-    
-    print("[DEBUG] Auto-connect starting...")  # DEBUG: Direct terminal output
-    
-    # Background-Task für kontinuierliches Auto-Reconnect
-    auto_reconnect_task = None
-    _shutdown_reconnect = asyncio.Event()
-    
-    async def auto_reconnect_loop():
-        """Background-Task: Versucht alle 30 Sekunden nicht verbundene Drucker zu verbinden."""
-        reconnect_interval = 30  # Sekunden zwischen Verbindungsversuchen
-        logger.info(f"[AUTO-RECONNECT] Background-Task gestartet (Intervall: {reconnect_interval}s)")
-        
-        while not _shutdown_reconnect.is_set():
-            try:
-                # Warte auf nächsten Versuch oder Shutdown
-                try:
-                    await asyncio.wait_for(_shutdown_reconnect.wait(), timeout=reconnect_interval)
-                    break  # Shutdown signalisiert
-                except asyncio.TimeoutError:
-                    pass  # Normal - Zeit für nächsten Versuch
-                
-                # Lade alle Drucker mit auto_connect=True
-                try:
-                    with Session(engine) as session:
-                        printers = session.exec(select(Printer)).all()
-                except Exception as exc:
-                    logger.warning(f"[AUTO-RECONNECT] Konnte Drucker nicht laden: {exc}")
-                    continue
-                
-                # Prüfe welche nicht verbunden sind
-                from app.routes.mqtt_routes import mqtt_clients, startup_connect_printer
-                from services.printer_service import get_printer_service
-                
-                try:
-                    printer_service = get_printer_service()
-                except RuntimeError:
-                    printer_service = None
-                
-                for printer in printers:
-                    if not getattr(printer, "auto_connect", False):
-                        continue
-                    # Klipper-Drucker verwenden HTTP-Polling (klipper_polling_service) – kein MQTT-Reconnect nötig
-                    if getattr(printer, "printer_type", None) == "klipper":
-                        continue
-
-                    # Prüfe ob bereits verbunden
-                    is_connected = False
-                    connection_id = f"{printer.ip_address}:8883_{printer.id}"
-                    
-                    # Methode 1: Prüfe mqtt_clients dict
-                    if connection_id in mqtt_clients:
-                        client = mqtt_clients[connection_id]
-                        if client and client.is_connected():
-                            is_connected = True
-                    
-                    # Methode 2: Prüfe PrinterService
-                    if not is_connected and printer_service and printer.cloud_serial:
-                        status = printer_service.get_status(printer.cloud_serial)
-                        is_connected = bool(status.get("connected", False))
-                    
-                    if is_connected:
-                        continue  # Bereits verbunden, nichts zu tun
-                    
-                    # Nicht verbunden → Versuch zu verbinden
-                    logger.info(f"[AUTO-RECONNECT] Versuche {printer.name} zu verbinden...")
-                    try:
-                        success = startup_connect_printer(printer)
-                        if success:
-                            logger.info(f"[AUTO-RECONNECT] [OK] {printer.name} erfolgreich verbunden")
-                        else:
-                            logger.debug(f"[AUTO-RECONNECT] [FAIL] {printer.name} nicht erreichbar")
-                    except Exception as e:
-                        logger.debug(f"[AUTO-RECONNECT] [FAIL] {printer.name} Fehler: {e}")
-                        
-            except Exception as e:
-                logger.exception(f"[AUTO-RECONNECT] Unerwarteter Fehler: {e}")
-                await asyncio.sleep(5)  # Kurze Pause bei Fehler
-        
-        logger.info("[AUTO-RECONNECT] Background-Task beendet")
+    # Starte Bambu Cloud Scheduler (nur mit Feature bambu_cloud; APScheduler wird erst hier geladen)
+    if router_registry.enabled("bambu_cloud"):
+        try:
+            from app.services.bambu_cloud_scheduler import start_scheduler
+            with startup_profile.phase("cloud_scheduler"):
+                start_scheduler()
+            logger.info("[APP] Bambu Cloud Scheduler gestartet")
+        except Exception as e:
+            logger.warning(f"[APP] Bambu Cloud Scheduler konnte nicht gestartet werden: {e}")
     
+    # Auto-Connect: Drucker parallel im Hintergrund verbinden (Connect-Pool, Backoff pro Drucker);
+    # der Server ist sofort bereit, Phasen pro Drucker unter /ready
+    from app.services.printer_connections import connection_manager
     try:
-        with Session(engine) as session:
-            printers = session.exec(select(Printer)).all()
-            print(f"[DEBUG] Found {len(printers)} printers in database")  # DEBUG
-    except Exception as exc:
-        logger.exception("Failed to load printers for auto-connect startup: %s", exc)
-        print(f"[DEBUG] Exception loading printers: {exc}")  # DEBUG
-        printers = []
-    
-    # Multi-Printer Support: Verwende mqtt_routes für Multi-Client-Verbindungen
-    print("[DEBUG] Starting auto-connect loop...")  # DEBUG
-    for printer in printers:
-        print(f"[DEBUG] Checking printer {printer.name}: auto_connect={getattr(printer, 'auto_connect', None)}")  # DEBUG
-        if getattr(printer, "auto_connect", False):
-            print(f"[DEBUG] Auto-connect TRUE for {printer.name}")  # DEBUG
-            print(f"[DEBUG] Attempting import of startup_connect_printer...")  # DEBUG
-            logger.info("Auto-connect: Drucker %s (%s) wird verbunden", printer.name, printer.id)
-            try:
-                from app.routes.mqtt_routes import startup_connect_printer
-                print(f"[DEBUG] Import successful, calling function...")  # DEBUG
-                success = startup_connect_printer(printer)
-                print(f"[DEBUG] Function returned: {success}")  # DEBUG
-                if success:
-                    logger.info(f"[OK] Auto-connect erfolgreich: {printer.name}")
-                    print(f"[DEBUG] [OK] {printer.name} connected successfully")  # DEBUG
-                else:
-                    logger.error(f"[FAIL] Auto-connect fehlgeschlagen: {printer.name}")
-                    print(f"[DEBUG] [FAIL] {printer.name} connection failed")  # DEBUG
-            except Exception as e:
-                logger.exception("Auto-connect startup failed for printer %s", printer.id)
-                print(f"[DEBUG] Exception in startup_connect_printer: {e}")  # DEBUG
-                import traceback
-                print(f"[DEBUG] Traceback: {traceback.format_exc()}")  # DEBUG
-    print("[DEBUG] Auto-connect loop completed")  # DEBUG
-    
-    # Starte Background-Task für kontinuierliches Auto-Reconnect
-    auto_reconnect_task = asyncio.create_task(auto_reconnect_loop())
-    logger.info("[APP] Auto-Reconnect Background-Task gestartet")
+        with startup_profile.phase("printer_connections"):
+            await connection_manager.start()
+        logger.info("[APP] Printer Connection Manager gestartet")
+    except Exception:
+        logger.exception("[APP] Printer Connection Manager konnte nicht gestartet werden")
+
+    # Passive Drucker-Discovery: SSDP (Bambu) / mDNS (Moonraker) im Hintergrund mithoeren
+    try:
+        from app.services.printer_discovery import start_from_config as start_printer_discovery
+        with startup_profile.phase("printer_discovery"):
+            await start_printer_discovery()
+    except Exception:
+        logger.exception("[APP] Printer-Discovery konnte nicht gestartet werden")
 
     # [BETA] Klipper-Support: Klipper Polling-Task starten (1s HTTP-Poll gegen Moonraker)
     klipper_poller_task = None
@@ -378,6 +269,23 @@ async def lifespan(app: FastAPI):
     except Exception:
         logger.exception("[APP] Klipper Poller konnte nicht gestartet werden")
 
+    # Event-Loop-Watchdog: Lag messen, Blockaden mit Stack der Aufrufstelle zuordnen
+    try:
+        from app.monitoring.loop_watchdog import start_from_config as start_loop_watchdog
+        start_loop_watchdog()
+    except Exception:
+        logger.exception("[APP] Loop-Watchdog konnte nicht gestartet werden")
+
+    # System-Sampler: CPU/RAM/Disk/Prozess/Loop-Lag/SQLite alle 5s, Historie persistiert
+    try:
+        from app.monitoring.system_sampler import system_sampler
+        system_sampler.start()
+        logger.info("[APP] System-Sampler gestartet")
+    except Exception:
+        logger.exception("[APP] System-Sampler konnte nicht gestartet werden")
+
+    startup_profile.mark_ready()
+
     try:
         yield
     finally:
@@ -400,27 +308,25 @@ async def lifespan(app: FastAPI):
         except Exception:
             logger.exception("[APP] Klipper Poller Shutdown Fehler")
 
-        # Stoppe Auto-Reconnect Background-Task
-        _shutdown_reconnect.set()
-        if auto_reconnect_task and not auto_reconnect_task.done():
-            auto_reconnect_task.cancel()
-            try:
-                await auto_reconnect_task
-            except asyncio.CancelledError:
-                pass
-            logger.info("[APP] Auto-Reconnect Task gestoppt")
+        # Stoppe Connection Manager (Supervisor + laufende Verbindungsversuche)
+        try:
+            await connection_manager.stop()
+            logger.info("[APP] Printer Connection Manager gestoppt")
+        except Exception:
+            logger.exception("[APP] Printer Connection Manager Shutdown Fehler")
         
         # 0. KRITISCH: Global Flag sofort setzen - verhindert dass neue MQTT-Clients während Reload initialisiert werden
         set_app_shutdown_flag()
         logger.info("[APP] Global shutdown flag set - no new MQTT clients will be created")
         
         # Stoppe Bambu Cloud Scheduler
-        try:
-            from app.services.bambu_cloud_scheduler import stop_scheduler
-            stop_scheduler()
-            logger.info("[APP] Bambu Cloud Scheduler gestoppt")
-        except Exception as e:
-            logger.warning(f"[APP] Bambu Cloud Scheduler konnte nicht gestoppt werden: {e}")
+        if router_registry.enabled("bambu_cloud"):
+            try:
+                from app.services.bambu_cloud_scheduler import stop_scheduler
+                stop_scheduler()
+                logger.info("[APP] Bambu Cloud Scheduler gestoppt")
+            except Exception as e:
+                logger.warning(f"[APP] Bambu Cloud Scheduler konnte nicht gestoppt werden: {e}")
         
         # 1. KRITISCH: Flag auch an mqtt_routes setzen um on_message() zu stoppen
         try:
@@ -512,6 +418,53 @@ async def lifespan(app: FastAPI):
             logger.info("[APP] Shutdown signal set for background tasks")
         except Exception:
             logger.exception("Failed to set shutdown event")
+
+        # MQTT-Capture: laufendes Segment sauber abschliessen
+        try:
+            from app.services.mqtt_capture import mqtt_capture
+            mqtt_capture.stop()
+        except Exception:
+            logger.exception("Failed to stop MQTT capture")
+
+        try:
+            from app.services.printer_discovery import printer_discovery
+            await printer_discovery.stop()
+        except Exception:
+            logger.exception("Failed to stop printer discovery")
+
+        try:
+            from app.monitoring.loop_watchdog import loop_watchdog
+            await loop_watchdog.stop()
+        except Exception:
+            logger.exception("Failed to stop loop watchdog")
+
+        # System-Sampler stoppen (schreibt Historie ein letztes Mal)
+        try:
+            from app.monitoring.system_sampler import system_sampler
+            await system_sampler.stop()
+        except Exception:
+            logger.exception("Failed to stop system sampler")
+
+        # Geteilte HTTP-Clients (Bambu Cloud, Moonraker, GitHub) schliessen
+        try:
+            from app.services.http_clients import http_clients
+            await http_clients.aclose()
+        except Exception:
+            logger.exception("Failed to close HTTP clients")
+
+        # DB-Pool der async Routen: laufende Queries nicht abwarten, Queue verwerfen
+        try:
+            from app.db import executor as db_executor
+            db_executor.shutdown(wait=False)
+        except Exception:
+            logger.exception("Failed to stop DB executor")
+
+        # Log-Tailer (WebSocket-Log-Streams) stoppen
+        try:
+            from app.services.log_tail import log_tail_service
+            log_tail_service.stop_all()
+        except Exception:
+            logger.exception("Failed to stop log tailers")
         
         # 4. Stoppe mqtt_runtime Client
         try:
@@ -522,6 +475,13 @@ async def lifespan(app: FastAPI):
         
         logger.info("[APP] Shutdown completed - FilamentHub stopped")
 
+        # Log-Queue leeren: alle noch gepufferten Records auf die Platte schreiben
+        try:
+            from app.logging_setup import shutdown_logging
+            shutdown_logging()
+        except Exception:
+            pass
+
 
 app = FastAPI(
     title="FilamentHub",
@@ -531,45 +491,37 @@ app = FastAPI(
     # Note: redirect_slashes=True (default) causes 307 redirects but ensures both
     # /api/spools and /api/spools/ work correctly. Overhead is minimal (~5-10ms).
 )
+# -----------------------------------------------------
+# MIDDLEWARE: KOMPRESSION (gzip/brotli ab 1 KB, ohne WebSocket/SSE/Streams)
+# -----------------------------------------------------
+# Vor dem Metrik-Middleware registriert = innen: die Request-Dauer enthaelt die Kompression
+app.add_middleware(CompressionMiddleware)
+
 # -----------------------------------------------------
 # MIDDLEWARE: RUNTIME / REQUEST MONITORING
 # -----------------------------------------------------
 @app.middleware("http")
 async def runtime_metrics_middleware(request: Request, call_next):
+    # Ein Eintrag pro Request im gemeinsamen Metrik-Kern (Route-Template statt Pfad, O(1))
     start = time.perf_counter()
-
-    # PERFORMANCE DEBUG: Messe Zeit VOR und NACH Route-Handler
-    before_route = time.perf_counter()
-    logger = logging.getLogger("performance")
-    logger.debug(f"[PERF] Request START: {request.method} {request.url.path}")
-
-    response = await call_next(request)
-
-    after_route = time.perf_counter()
-    duration_ms = (after_route - start) * 1000.0
-
-    # Log Performance-Details
-    logger.debug(f"[PERF] Request END: {request.method} {request.url.path} - {duration_ms:.1f}ms")
-
-    try:
-        record_request(duration_ms)
-    except Exception:
-        logging.getLogger("errors").exception("Failed to record request duration")
-
-    # Record in Performance Monitor for alerting & dashboards
+    request_metrics.in_flight += 1
+    status_code = 500
     try:
-        from app.services.performance_monitoring import get_performance_monitor
-        monitor = get_performance_monitor()
-        monitor.record_request(
-            endpoint=request.url.path,
-            method=request.method,
-            duration_ms=duration_ms,
-            status_code=response.status_code
-        )
-    except Exception:
-        logging.getLogger("errors").exception("Failed to record request in performance monitor")
-
-    return response
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        request_metrics.in_flight -= 1
+        try:
+            request_metrics.record(
+                request.method,
+                route_key(request),
+                request.url.path,
+                (time.perf_counter() - start) * 1000.0,
+                status_code,
+            )
+        except Exception:
+            logging.getLogger("errors").exception("Failed to record request metrics")
 
 # -----------------------------------------------------
 # TESTENDPUNKT & HEALTH CHECK
@@ -589,6 +541,12 @@ async def health():
         "server": "running",
     }
 
+@app.get('/ready')
+async def ready():
+    """Readiness: Server laeuft sofort; Verbindungsphase pro auto_connect-Drucker."""
+    from app.services.printer_connections import connection_manager
+    return connection_manager.readiness()
+
 
 
 # -----------------------------------------------------
@@ -620,77 +578,26 @@ def _read_current_version_label() -> str:
     resolved_version = normalized.group(1) if normalized else version
     return f"{channel} {resolved_version} - FilamentHub"
 
-class NoCacheStaticFiles(StaticFiles):
-    """StaticFiles ohne Browser-Caching — stellt sicher dass JS/CSS-Änderungen sofort aktiv sind."""
-    async def get_response(self, path: str, scope):
-        response = await super().get_response(path, scope)
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        return response
-
-app.mount("/static", NoCacheStaticFiles(directory=os.path.join(BASE_DIR, "app", "static")), name="static")
-app.mount("/frontend", NoCacheStaticFiles(directory=os.path.join(FRONTEND_DIR, "static")), name="frontend_static")
-templates = Jinja2Templates(directory=os.path.join(FRONTEND_DIR, "templates"))
+# Statische Dateien: Hash-URLs aus den Templates werden immutable gecacht, alte Pfade per
+# ETag/Last-Modified revalidiert, gzip/brotli vorkomprimiert (app/services/static_assets.py)
+app.mount("/static", AssetStaticFiles(directory=os.path.join(BASE_DIR, "app", "static")), name="static")
+app.mount("/frontend", AssetStaticFiles(directory=os.path.join(FRONTEND_DIR, "static")), name="frontend_static")
+templates = configure_templates(Jinja2Templates(directory=os.path.join(FRONTEND_DIR, "templates")))
 templates.env.globals["app_version"] = os.environ.get("APP_VERSION", "Stable 1.6 - FilamentHub").replace("Beta v1.6 · FilamentHub", "Stable 1.6 - FilamentHub").replace("Beta 1.6 - FilamentHub", "Stable 1.6 - FilamentHub")
 templates.env.globals["app_version"] = _read_current_version_label()
 templates.env.globals["design_version"] = os.environ.get("DESIGN_VERSION", "Design 1.0").replace("Design Beta-1.0", "Design 1.0")
 import time as _time
-templates.env.globals["build_ts"] = int(_time.time())  # Cache-Buster für JS/CSS
+templates.env.globals["build_ts"] = int(_time.time())  # Alt-Cache-Buster; Assets tragen jetzt ihren Content-Hash (url_for)
 
 
 
 # -----------------------------------------------------
 # ROUTES - API
 # -----------------------------------------------------
-app.include_router(hello_router)
-app.include_router(materials_router)
-app.include_router(spools_router)
-app.include_router(spool_numbers_router)  # NEU: Spulen-Nummern-System
-app.include_router(log_router)
-app.include_router(system_router)
-app.include_router(debug_router)
-app.include_router(service_router)
-# SECURITY FIX (Bug #3): Database-Router deaktiviert wegen kritischer SQL-Injection Schwachstellen
-# Die Routes /api/database/query und /api/database/editor erlaubten ungeschützten SQL-Zugriff
-# app.include_router(database_router)  # ← DEAKTIVIERT
-app.include_router(backup_router)
-app.include_router(scanner_router)
-app.include_router(mqtt_router)
-app.include_router(performance_router)
-app.include_router(printers_router)
-
-app.include_router(jobs_router)
-app.include_router(statistics_router)
-
-app.include_router(bambu_router)
-app.include_router(admin_router)
-app.include_router(admin_coverage_router, prefix="/api/admin")
-app.include_router(settings_router)
-app.include_router(weight_management_router)  # Weight Management & History
-app.include_router(spool_assignment_router)  # Spool Assignment (AMS → Lager-Spule zuordnen)
-app.include_router(debug_ams_router)
-app.include_router(debug_system_router)
-app.include_router(debug_performance_router)
-app.include_router(debug_network_router)
-app.include_router(debug_printer_router)
-app.include_router(notification_router)
-app.include_router(config_router)
-app.include_router(debug_log_routes.router, prefix="/api/debug", tags=["debug"])
-
-# Runtime MQTT control endpoints (separate from legacy mqtt_routes to avoid collisions)
-app.include_router(mqtt_runtime_routes.router, prefix="/api/mqtt/runtime", tags=["mqtt"])
-
-# Live state endpoints for real-time device data
-app.include_router(live_state_router)
-app.include_router(ams_router)
-app.include_router(ams_conflicts_router)
-app.include_router(monitoring_router)  # Performance Monitoring & Alerts
-app.include_router(lexikon_router)
-app.include_router(externe_spule_router)
-app.include_router(bambu_cloud_router)  # Bambu Cloud Integration
-app.include_router(mmu_router)          # Happy Hare MMU Integration
-app.include_router(version_router)      # Update-Check
+# Router werden erst hier importiert - nur die Features, die in config.yaml aktiv sind
+# (siehe app/routes/registry.py: debug, service, coverage, bambu_cloud, mmu)
+with startup_profile.phase("include_routers"):
+    router_registry.include_routers(app)
 
 
 # -----------------------------------------------------
@@ -719,7 +626,7 @@ async def api_help_page(request: Request):
     for r in routes:
         unique[r['path']] = r
     api_routes = sorted(unique.values(), key=lambda x: x['path'])
-    help_templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "app", "templates"))
+    help_templates = configure_templates(Jinja2Templates(directory=os.path.join(BASE_DIR, "app", "templates")))
     return help_templates.TemplateResponse(
         "help.html",
         {"request": request, "api_routes": api_routes, "title": "API Hilfeseite"}
@@ -917,7 +824,7 @@ async def monitoring_page(request: Request):
 @app.get('/logs', response_class=HTMLResponse)
 async def logs_page(request: Request):
     # logs.html bleibt in app/templates
-    logs_templates = Jinja2Templates(directory='app/templates')
+    logs_templates = configure_templates(Jinja2Templates(directory='app/templates'))
     return logs_templates.TemplateResponse(
         'logs.html',
         {'request': request},
@@ -928,14 +835,18 @@ async def logs_page(request: Request):
 async def debug_page(request: Request):
     from app.routes.settings_routes import get_setting, DEFAULTS
 
-    debug_templates = Jinja2Templates(directory='app/templates')
+    debug_templates = configure_templates(Jinja2Templates(directory='app/templates'))
     printers = []
     debug_center_mode = "lite"
 
+    def _load(session: Session):
+        return (
+            session.exec(select(Printer)).all(),
+            get_setting(session, "debug_center_mode", DEFAULTS.get("debug_center_mode", "lite")) or "lite",
+        )
+
     try:
-        with Session(engine) as session:
-            printers = session.exec(select(Printer)).all()
-            debug_center_mode = get_setting(session, "debug_center_mode", DEFAULTS.get("debug_center_mode", "lite")) or "lite"
+        printers, debug_center_mode = await run_in_session(_load)
     except Exception:
         printers = []
 
@@ -954,17 +865,11 @@ async def debug_page(request: Request):
 @app.get('/ams-help', response_class=HTMLResponse)
 async def ams_help_page(request: Request):
     """Simple helper page to visualize AMS slots from the latest report message."""
-    help_templates = Jinja2Templates(directory='app/templates')
+    help_templates = configure_templates(Jinja2Templates(directory='app/templates'))
     return help_templates.TemplateResponse(
         'ams_help.html',
         {'request': request, 'title': 'AMS Helper'},
     )
 
 
-
-
-
-
-
-
-
+startup_profile.record_import("app.main", _IMPORT_STARTED)
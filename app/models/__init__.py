@@ -19,6 +19,7 @@ from app.models.cloud_conflict import (
     CloudConflictRead,
     CloudConflictResolve,
 )
+from app.models.cloud_task import CloudTask
 
 __all__ = [
     "Spool",
@@ -41,4 +42,5 @@ __all__ = [
     "CloudConflictCreate",
     "CloudConflictRead",
     "CloudConflictResolve",
+    "CloudTask",
 ]
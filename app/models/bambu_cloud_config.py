@@ -142,3 +142,5 @@ class BambuCloudSyncStatus(BaseModel):
     last_error_message: Optional[str] = None      # z.B. "Token-Fehler: Ungültiger Token..."
     # Token-Ablaufzeit für UI-Warnungen (ISO-String UTC)
     token_expires_at: Optional[str] = None
+    # Letzter Sync: Modus, Phasen-Zeiten (ms) und Mengen (siehe bambu_cloud_sync)
+    last_sync_report: Optional[dict] = None
@@ -0,0 +1,48 @@
+"""
+CloudTask Model - Lokaler Spiegel der Bambu Cloud Druck-Tasks (my/tasks)
+
+Wird vom Cloud-Sync inkrementell befüllt (app.services.cloud_task_cache) und von Job-Matching
+und Tasks-UI zuerst abgefragt; die Cloud wird nur noch bei Fehltreffern gefragt.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class CloudTask(SQLModel, table=True):
+    """Ein Cloud-Task (Primärschlüssel = Task-ID der Bambu Cloud)"""
+    __tablename__ = "cloud_tasks"
+    __table_args__ = (
+        Index("idx_cloud_tasks_device_start", "device_id", "start_at"),
+        Index("idx_cloud_tasks_title_norm", "title_normalized"),
+        Index("idx_cloud_tasks_start_at", "start_at"),
+    )
+
+    task_id: str = Field(primary_key=True)
+    title: str = ""
+    title_normalized: str = ""  # siehe cloud_task_cache.normalize_title
+    device_id: str = ""  # Drucker-Serial
+    device_name: Optional[str] = None
+    status: str = "unknown"
+
+    # Verbrauch / Dauer
+    weight_g: float = 0.0
+    length_mm: float = 0.0
+    cost_time_seconds: int = 0
+    plate_index: int = 1
+    ams_mapping_json: Optional[str] = None  # amsDetailMapping als JSON
+
+    # Zeiten: Original-String der Cloud + geparst (UTC) für Index-Abfragen
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+
+    cover_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+
+    fingerprint: Optional[str] = None
+    first_seen_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,452 @@
+"""Latenz-Histogramme pro Stufe der MQTT-Ingest-Pipeline.
+
+Stufen (mqtt_routes.on_message): parse, log (Message-Log + Text-Forward), printer_lookup,
+map, ams_sync, job_tracking, state (Journal + Delta-Snapshot), broadcast, total.
+Cloud-MQTT (CloudMQTTClient) meldet parse, map, service, job_tracking, callback, total
+mit source="cloud".
+Zusaetzlich (ueberlappend, nicht additiv): db (SQL-Statements) und db_commit waehrend
+einer Nachricht, ueber SQLAlchemy-Events bzw. den Commit des Dialekts.
+
+Histogramme haben feste, log-lineare Buckets (4 Unter-Buckets pro Zweierpotenz in
+Mikrosekunden, max. ~25 % Bucket-Breite), Perzentile werden aus den Buckets geschaetzt.
+
+Schreiben ist lock-frei: jeder Thread zaehlt in seinen eigenen Shard (ein Schreiber pro
+Shard), gelesen wird durch Zusammenfuehren aller Shards. Shards beendeter Threads werden
+beim Lesen in einen Sammel-Shard uebernommen.
+
+Verwendung im Hot-Path (ohne Einruecken bestehender Bloecke):
+
+    t = ingest_metrics.clock()
+    ... Stufe ...
+    t = ingest_metrics.lap("parse", t)     # misst und startet die naechste Stufe
+
+oder
+
+    with ingest_metrics.stage("ams_sync"):
+        ...
+
+    @ingest_metrics.timed("map")
+    def ...
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_now = time.perf_counter_ns
+
+SUB_BITS = 2
+SUB_COUNT = 1 << SUB_BITS
+MAX_EXPONENT = 31  # ~35 min in us
+BUCKETS = SUB_COUNT + (MAX_EXPONENT - SUB_BITS + 1) * SUB_COUNT
+
+STAGE_ORDER = (
+    "parse",
+    "log",
+    "printer_lookup",
+    "map",
+    "service",
+    "ams_sync",
+    "job_tracking",
+    "state",
+    "broadcast",
+    "callback",
+    "total",
+    "db",
+    "db_commit",
+)
+OVERLAY_STAGES = ("db", "db_commit")
+NO_PRINTER = "-"
+
+
+def bucket_index(micros: int) -> int:
+    if micros < SUB_COUNT:
+        return micros if micros > 0 else 0
+    exponent = micros.bit_length() - 1
+    if exponent > MAX_EXPONENT:
+        return BUCKETS - 1
+    sub = (micros >> (exponent - SUB_BITS)) & (SUB_COUNT - 1)
+    return SUB_COUNT + (exponent - SUB_BITS) * SUB_COUNT + sub
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """[untere, obere) Grenze eines Buckets in Mikrosekunden."""
+    if index < SUB_COUNT:
+        return index, index + 1
+    exponent = (index - SUB_COUNT) // SUB_COUNT + SUB_BITS
+    sub = (index - SUB_COUNT) % SUB_COUNT
+    shift = exponent - SUB_BITS
+    return (SUB_COUNT + sub) << shift, (SUB_COUNT + sub + 1) << shift
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+
+    def add(self, duration_ns: int) -> None:
+        self.counts[bucket_index(duration_ns // 1000)] += 1
+        self.count += 1
+        self.sum_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def merge(self, other: "Histogram") -> None:
+        counts = self.counts
+        for i, value in enumerate(other.counts):
+            if value:
+                counts[i] += value
+        self.count += other.count
+        self.sum_ns += other.sum_ns
+        if other.max_ns > self.max_ns:
+            self.max_ns = other.max_ns
+
+    def percentile_us(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, value in enumerate(self.counts):
+            if not value:
+                continue
+            if seen + value >= rank:
+                low, high = bucket_bounds(i)
+                # linear innerhalb des Buckets interpolieren
+                fraction = (rank - seen) / value
+                return min(low + (high - low) * fraction, self.max_ns / 1000.0)
+            seen += value
+        return self.max_ns / 1000.0
+
+    def summary(self, include_buckets: bool = False) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        data: Dict[str, Any] = {
+            "count": self.count,
+            "mean_ms": round(self.sum_ns / self.count / 1e6, 4),
+            "p50_ms": round(self.percentile_us(50) / 1000.0, 4),
+            "p90_ms": round(self.percentile_us(90) / 1000.0, 4),
+            "p99_ms": round(self.percentile_us(99) / 1000.0, 4),
+            "max_ms": round(self.max_ns / 1e6, 4),
+            "total_ms": round(self.sum_ns / 1e6, 2),
+        }
+        if include_buckets:
+            data["buckets"] = [
+                {"le_us": bucket_bounds(i)[1], "count": value} for i, value in enumerate(self.counts) if value
+            ]
+        return data
+
+
+class _Shard:
+    """Zaehler eines Threads: (source, stage, printer) -> Histogram. Nur der eigene Thread schreibt."""
+
+    __slots__ = ("histograms", "thread_ref", "__weakref__")
+
+    def __init__(self, thread: Optional[threading.Thread]) -> None:
+        self.histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self.thread_ref = weakref.ref(thread) if thread is not None else None
+
+    def alive(self) -> bool:
+        thread = self.thread_ref() if self.thread_ref is not None else None
+        return thread is not None and thread.is_alive()
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "IngestMetrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0
+
+    def __enter__(self) -> "_StageTimer":
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.observe(self.stage, _now() - self.start)
+
+
+class _MessageScope:
+    """Klammert eine Nachricht: setzt Drucker/Quelle fuer die Stufen und misst 'total'."""
+
+    __slots__ = ("metrics", "printer", "source", "start", "previous")
+
+    def __init__(self, metrics: "IngestMetrics", printer: Optional[str], source: str) -> None:
+        self.metrics = metrics
+        self.printer = printer or NO_PRINTER
+        self.source = source
+        self.start = 0
+        self.previous: Optional[Tuple[str, str]] = None
+
+    def __enter__(self) -> "_MessageScope":
+        local = self.metrics._local
+        self.previous = getattr(local, "context", None)
+        local.context = (self.source, self.printer)
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.observe("total", _now() - self.start)
+        self.metrics._local.context = self.previous
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullScope":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL = _NullScope()
+
+
+class IngestMetrics:
+    def __init__(self) -> None:
+        self.enabled = True
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)
+        self.started_at = time.time()
+
+    # --- Schreiben (Hot-Path) ---
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            self._local.shard = shard
+            with self._registry_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, stage: str, duration_ns: int, printer: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        context = getattr(self._local, "context", None)
+        if context is None:
+            source, ctx_printer = "local", NO_PRINTER
+        else:
+            source, ctx_printer = context
+        key = (source, stage, printer or ctx_printer)
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram()
+        histogram.add(duration_ns)
+
+    def clock(self) -> int:
+        return _now() if self.enabled else 0
+
+    def lap(self, stage: str, start: int) -> int:
+        """Misst seit `start` fuer `stage` und liefert den neuen Startzeitpunkt."""
+        if not self.enabled or not start:
+            return self.clock()
+        now = _now()
+        self.observe(stage, now - start)
+        return now
+
+    def stage(self, stage: str) -> Any:
+        return _StageTimer(self, stage) if self.enabled else _NULL
+
+    def message(self, printer: Optional[str], source: str = "local") -> Any:
+        return _MessageScope(self, printer, source) if self.enabled else _NULL
+
+    def in_message(self) -> bool:
+        return getattr(self._local, "context", None) is not None
+
+    def timed(self, stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = _now()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(stage, _now() - start)
+
+            return wrapper
+
+        return decorator
+
+    # --- DB-Hooks ---
+    def install_db_hooks(self, engine: Any) -> None:
+        """SQL-Ausfuehrungszeit und Commits waehrend einer Nachricht als Stufen db/db_commit erfassen."""
+        from sqlalchemy import event
+
+        if getattr(engine, "_fh_ingest_hooks", False):
+            return
+        local = self._local
+
+        def before(conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, executemany: Any) -> None:
+            if getattr(local, "context", None) is not None:
+                local.db_start = _now()
+
+        def after(conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, executemany: Any) -> None:
+            start = getattr(local, "db_start", 0)
+            if start:
+                local.db_start = 0
+                self.observe("db", _now() - start)
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+
+        dialect = engine.dialect
+        original_commit = dialect.do_commit
+
+        def do_commit(dbapi_connection: Any) -> None:
+            if getattr(local, "context", None) is None or not self.enabled:
+                return original_commit(dbapi_connection)
+            start = _now()
+            try:
+                return original_commit(dbapi_connection)
+            finally:
+                self.observe("db_commit", _now() - start)
+
+        dialect.do_commit = do_commit
+        engine._fh_ingest_hooks = True
+
+    # --- Lesen ---
+    def _merged(self) -> Dict[Tuple[str, str, str], Histogram]:
+        with self._registry_lock:
+            live = []
+            for shard in self._shards:
+                if shard.alive():
+                    live.append(shard)
+                else:
+                    self._merge_into(self._retired.histograms, shard.histograms)
+            self._shards = live
+            shards = [self._retired] + live
+        merged: Dict[Tuple[str, str, str], Histogram] = {}
+        for shard in shards:
+            # list(): Schreiber koennen parallel neue Schluessel anlegen
+            self._merge_into(merged, dict(list(shard.histograms.items())))
+        return merged
+
+    @staticmethod
+    def _merge_into(target: Dict[Tuple[str, str, str], Histogram], source: Dict[Tuple[str, str, str], Histogram]) -> None:
+        for key, histogram in list(source.items()):
+            existing = target.get(key)
+            if existing is None:
+                existing = target[key] = Histogram()
+            existing.merge(histogram)
+
+    def snapshot(
+        self,
+        printer: Optional[str] = None,
+        source: Optional[str] = None,
+        per_printer: bool = True,
+        include_buckets: bool = False,
+    ) -> Dict[str, Any]:
+        merged = self._merged()
+        by_stage: Dict[Tuple[str, str], Histogram] = {}
+        by_printer: Dict[str, Dict[str, Histogram]] = {}
+        for (src, stage, prn), histogram in merged.items():
+            if source is not None and src != source:
+                continue
+            if printer is not None and prn != printer:
+                continue
+            stage_hist = by_stage.get((src, stage))
+            if stage_hist is None:
+                stage_hist = by_stage[(src, stage)] = Histogram()
+            stage_hist.merge(histogram)
+            if per_printer:
+                printer_hist = by_printer.setdefault(prn, {}).get(stage)
+                if printer_hist is None:
+                    printer_hist = by_printer[prn][stage] = Histogram()
+                printer_hist.merge(histogram)
+
+        def order(name: str) -> int:
+            return STAGE_ORDER.index(name) if name in STAGE_ORDER else len(STAGE_ORDER)
+
+        sources: Dict[str, Dict[str, Any]] = {}
+        for (src, stage) in sorted(by_stage, key=lambda k: (k[0], order(k[1]))):
+            sources.setdefault(src, {})[stage] = by_stage[(src, stage)].summary(include_buckets)
+        for src, stages in sources.items():
+            total = stages.get("total", {}).get("total_ms") or 0.0
+            for name, data in stages.items():
+                if name != "total" and total and name not in OVERLAY_STAGES:
+                    data["share"] = round((data.get("total_ms") or 0.0) / total, 4)
+
+        result: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "since": self.started_at,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "overlay_stages": list(OVERLAY_STAGES),
+            "sources": sources,
+        }
+        if per_printer:
+            result["printers"] = {
+                prn: {
+                    stage: hist.summary()
+                    for stage, hist in sorted(stages.items(), key=lambda item: order(item[0]))
+                }
+                for prn, stages in sorted(by_printer.items())
+            }
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Kompakte Form fuer das Performance-Panel: Gesamtlatenz und langsamste Stufe je Quelle."""
+        snap = self.snapshot(per_printer=False)
+        result: Dict[str, Any] = {"enabled": self.enabled}
+        messages = 0
+        for src, stages in snap["sources"].items():
+            total = stages.get("total") or {}
+            messages += total.get("count", 0)
+            slowest = None
+            for name, data in stages.items():
+                if name == "total" or name in OVERLAY_STAGES or not data.get("count"):
+                    continue
+                if slowest is None or data.get("total_ms", 0) > stages[slowest].get("total_ms", 0):
+                    slowest = name
+            result[src] = {
+                "messages": total.get("count", 0),
+                "p50_ms": total.get("p50_ms"),
+                "p99_ms": total.get("p99_ms"),
+                "slowest_stage": slowest,
+                "slowest_share": stages[slowest].get("share") if slowest else None,
+            }
+        result["messages"] = messages
+        result["messages_per_s"] = round(messages / max(1.0, time.time() - self.started_at), 2)
+        return result
+
+    def reset(self) -> None:
+        with self._registry_lock:
+            # Shards bleiben den Threads zugeordnet, nur die Inhalte werden geleert
+            for shard in self._shards:
+                shard.histograms = {}
+            self._retired = _Shard(None)
+            self.started_at = time.time()
+
+
+ingest_metrics = IngestMetrics()
+
+
+def _benchmark(iterations: int = 200_000) -> None:
+    """Overhead pro Nachricht (9 Stufen + total), zum Vergleich mit ~3-6 ms pro Nachricht."""
+    metrics = IngestMetrics()
+    start = _now()
+    for _ in range(iterations):
+        with metrics.message("01P000000000001"):
+            t = metrics.clock()
+            for stage in ("parse", "printer_lookup", "map", "ams_sync", "job_tracking", "state", "broadcast", "db"):
+                t = metrics.lap(stage, t)
+    per_message_us = (_now() - start) / iterations / 1000.0
+    print(f"instrumentation overhead: {per_message_us:.2f} us/message")
+    snap = metrics.snapshot(per_printer=False)
+    print({k: v.get("p50_ms") for k, v in snap["sources"]["local"].items()})
+
+
+if __name__ == "__main__":
+    _benchmark()
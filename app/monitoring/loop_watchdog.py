@@ -0,0 +1,312 @@
+"""Event-Loop-Watchdog: misst den Loop-Lag laufend und ordnet Blockaden einer Code-Stelle zu.
+
+- Heartbeat-Task im Loop: schlaeft HEARTBEAT_S und misst, wie viel spaeter er aufwacht (Lag-Histogramm).
+- Watcher-Thread: sieht er laenger als threshold_ms keinen Heartbeat, wird der Stack des
+  Loop-Threads (sys._current_frames) erfasst. Die innerste Frame aus app/ oder services/ gilt als
+  Verursacher; nach dem Ende der Blockade wird die gemessene Dauer dort verbucht.
+- DB-Debug-Modus (optional): SQLAlchemy-Events auf der App-Engine melden jedes SQL-Statement,
+  das auf dem Loop-Thread ausgefuehrt wird (synchrone Session in async def), mit Aufrufstelle
+  und Dauer. Kostet einen Stack-Walk pro Statement auf dem Loop, daher standardmaessig aus.
+
+Konfiguration (config.yaml):
+
+    performance:
+      loop_watchdog:
+        enabled: true
+        threshold_ms: 100
+        db_on_loop_debug: false   # auch via FILAMENTHUB_LOOP_DB_DEBUG=1
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from app.monitoring.ingest_metrics import Histogram
+
+logger = logging.getLogger("performance")
+
+HEARTBEAT_S = 0.05
+DEFAULT_THRESHOLD_MS = 100.0
+MAX_OFFENDERS = 200
+STACK_DEPTH = 12
+
+_ROOT = Path(__file__).resolve().parents[2]
+_PROJECT_DIRS = tuple(str(_ROOT / name) + os.sep for name in ("app", "services"))
+# Frames, die nie "Verursacher" sind (Infrastruktur um den eigentlichen Aufruf herum)
+_SKIP_FILES = (
+    str(Path(__file__).resolve()),
+    str(_ROOT / "app" / "database.py"),
+    str(_ROOT / "app" / "main.py"),
+)
+
+
+_LIBRARY_DIRS = tuple(
+    {os.path.realpath(sysconfig.get_paths()[key]) + os.sep for key in ("stdlib", "purelib", "platlib")}
+)
+
+
+def _call_site(frames: List[traceback.FrameSummary]) -> Tuple[str, int, str]:
+    """Innerste Projekt-Frame (ausser Infrastruktur), sonst innerste Frame ausserhalb von Bibliotheken."""
+    for frame in reversed(frames):
+        filename = frame.filename
+        if filename.startswith(_PROJECT_DIRS) and filename not in _SKIP_FILES:
+            return os.path.relpath(filename, _ROOT), frame.lineno or 0, frame.name
+    for frame in reversed(frames):
+        filename = frame.filename
+        if filename not in _SKIP_FILES and not os.path.realpath(filename).startswith(_LIBRARY_DIRS):
+            return filename, frame.lineno or 0, frame.name
+    if frames:
+        frame = frames[-1]
+        return frame.filename, frame.lineno or 0, frame.name
+    return "<unknown>", 0, "<unknown>"
+
+
+def _loop_idle(frames: List[traceback.FrameSummary]) -> bool:
+    """Loop wartet im Selector (z.B. angehalten/gedrosselt), blockiert also nicht."""
+    return bool(frames) and frames[-1].filename.endswith("selectors.py") and frames[-1].name in ("select", "poll")
+
+
+def _format_stack(frames: List[traceback.FrameSummary]) -> List[str]:
+    lines = []
+    for frame in frames[-STACK_DEPTH:]:
+        filename = frame.filename
+        if filename.startswith(str(_ROOT)):
+            filename = os.path.relpath(filename, _ROOT)
+        lines.append(f"{filename}:{frame.lineno} in {frame.name}: {(frame.line or '').strip()}")
+    return lines
+
+
+class _Offenders:
+    """Aufrufstelle -> Anzahl, Summe/Max in ms, Beispiel-Stack. Begrenzte Anzahl Eintraege."""
+
+    def __init__(self) -> None:
+        self.items: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def add(self, site: Tuple[str, int, str], duration_ms: float, stack: List[str], detail: Optional[str] = None) -> None:
+        with self.lock:
+            entry = self.items.get(site)
+            if entry is None:
+                if len(self.items) >= MAX_OFFENDERS:
+                    # kleinsten Eintrag verdraengen
+                    weakest = min(self.items, key=lambda key: self.items[key]["total_ms"])
+                    if self.items[weakest]["total_ms"] > duration_ms:
+                        return
+                    del self.items[weakest]
+                entry = self.items[site] = {
+                    "file": site[0],
+                    "line": site[1],
+                    "function": site[2],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "stack": stack,
+                    "detail": detail,
+                    "last_seen": 0.0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["last_seen"] = time.time()
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["stack"] = stack
+                if detail:
+                    entry["detail"] = detail
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            items = [dict(entry) for entry in self.items.values()]
+        items.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        for entry in items:
+            entry["total_ms"] = round(entry["total_ms"], 2)
+            entry["max_ms"] = round(entry["max_ms"], 2)
+        return items[:limit]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items.clear()
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS) -> None:
+        self.threshold_ms = threshold_ms
+        self.loop_thread_id: Optional[int] = None
+        self.lag = Histogram()
+        self.stalls = _Offenders()
+        self.db_on_loop = _Offenders()
+        self.stall_count = 0
+        self.db_debug = False
+        self._last_beat = 0.0
+        self._pending: Optional[Tuple[Tuple[str, int, str], List[str]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._db_hooks = False
+        self._db_local = threading.local()
+        self.started_at = time.time()
+
+    # --- Lebenszyklus ---
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            await asyncio.to_thread(thread.join, 1.0)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + HEARTBEAT_S
+            await asyncio.sleep(HEARTBEAT_S)
+            lag_ns = max(0, int((loop.time() - expected) * 1e9))
+            self._last_beat = time.monotonic()
+            self.lag.add(lag_ns)
+            pending, self._pending = self._pending, None
+            if pending is not None:
+                site, stack = pending
+                lag_ms = lag_ns / 1e6
+                self.stalls.add(site, lag_ms, stack)
+                logger.warning("[LOOP] Event-Loop %.0f ms blockiert in %s:%s (%s)", lag_ms, site[0], site[1], site[2])
+
+    def _watch(self) -> None:
+        threshold_s = self.threshold_ms / 1000.0
+        poll = min(threshold_s / 2.0, 0.05)
+        captured_beat = None
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            if beat == captured_beat or time.monotonic() - beat < threshold_s + HEARTBEAT_S:
+                continue
+            # Blockade: Stack des Loop-Threads genau jetzt festhalten (einmal pro Blockade)
+            captured_beat = beat
+            frame = sys._current_frames().get(self.loop_thread_id) if self.loop_thread_id else None
+            if frame is None:
+                continue
+            frames = traceback.extract_stack(frame)
+            if _loop_idle(frames):
+                continue
+            self.stall_count += 1
+            self._pending = (_call_site(frames), _format_stack(frames))
+
+    # --- DB-auf-dem-Loop-Erkennung ---
+    def set_db_debug(self, enabled: bool) -> None:
+        self.db_debug = bool(enabled)
+        if self.db_debug and not self._db_hooks:
+            self._install_db_hooks()
+
+    def _install_db_hooks(self) -> None:
+        from sqlalchemy import event
+
+        from app.database import engine
+
+        local = self._db_local
+
+        def before(conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, executemany: Any) -> None:
+            if self.db_debug and threading.get_ident() == self.loop_thread_id:
+                local.start = time.perf_counter()
+
+        def after(conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, executemany: Any) -> None:
+            start = getattr(local, "start", None)
+            if start is None:
+                return
+            local.start = None
+            duration_ms = (time.perf_counter() - start) * 1000.0
+            frames = traceback.extract_stack()
+            site = _call_site(frames)
+            self.db_on_loop.add(site, duration_ms, _format_stack(frames), detail=str(statement)[:200])
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+        self._db_hooks = True
+
+    # --- Lesen ---
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        lag = self.lag.summary()
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold_ms,
+            "heartbeat_ms": HEARTBEAT_S * 1000.0,
+            "lag": lag,
+            "stalls": self.stall_count,
+            "stall_offenders": self.stalls.top(limit),
+            "db_debug": self.db_debug,
+            "db_on_loop": self.db_on_loop.top(limit),
+            "since": self.started_at,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        lag = self.lag.summary()
+        worst = self.stalls.top(1)
+        db_worst = self.db_on_loop.top(1)
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold_ms,
+            "lag_p99_ms": lag.get("p99_ms"),
+            "lag_max_ms": lag.get("max_ms"),
+            "stalls": self.stall_count,
+            "worst": f"{worst[0]['file']}:{worst[0]['line']} ({worst[0]['function']})" if worst else None,
+            "db_debug": self.db_debug,
+            "db_on_loop_worst": f"{db_worst[0]['file']}:{db_worst[0]['line']}" if db_worst else None,
+        }
+
+    def reset(self) -> None:
+        self.lag = Histogram()
+        self.stalls.clear()
+        self.db_on_loop.clear()
+        self.stall_count = 0
+        self.started_at = time.time()
+
+
+def load_watchdog_config() -> Dict[str, Any]:
+    try:
+        with open(_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return (config.get("performance") or {}).get("loop_watchdog") or {}
+    except Exception:
+        logger.debug("performance.loop_watchdog config not available; using defaults", exc_info=True)
+        return {}
+
+
+def start_from_config() -> None:
+    """Beim App-Start (im Loop): Watchdog gemaess config.yaml starten."""
+    cfg = load_watchdog_config()
+    if not cfg.get("enabled", True):
+        return
+    loop_watchdog.threshold_ms = float(cfg.get("threshold_ms") or DEFAULT_THRESHOLD_MS)
+    loop_watchdog.start()
+    env_debug = os.environ.get("FILAMENTHUB_LOOP_DB_DEBUG", "").lower() in ("1", "true", "yes", "on")
+    if cfg.get("db_on_loop_debug", False) or env_debug:
+        loop_watchdog.set_db_debug(True)
+
+
+loop_watchdog = LoopWatchdog()
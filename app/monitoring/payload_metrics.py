@@ -0,0 +1,98 @@
+"""Payload-Metriken pro Route: Groesse (roh/uebertragen), Kompression und Serialisierungszeit.
+
+Geschrieben wird aus zwei Stellen:
+- ``FastJSONResponse.render`` (app/routes/fast_json.py): Serialisierungszeit + Rohgroesse
+- ``CompressionMiddleware`` (app/services/response_compression.py): Rohgroesse, uebertragene
+  Groesse und Encoding jeder Antwort
+
+Abruf: /api/performance/payloads. Schreiber laufen auf dem Event-Loop oder im Threadpool
+(sync Endpunkte rendern dort), deshalb ein Lock pro Eintrag-Update - pro Request genau einer.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.monitoring.ingest_metrics import Histogram
+
+MAX_ROUTES = 300
+OTHER_ROUTE = "<other>"
+
+
+class _RouteStats:
+    __slots__ = ("responses", "raw_bytes", "sent_bytes", "max_raw_bytes", "encodings", "serialize", "fields_requests")
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.max_raw_bytes = 0
+        self.encodings: Dict[str, int] = {}
+        self.serialize = Histogram()
+        self.fields_requests = 0
+
+
+class PayloadMetrics:
+    def __init__(self, max_routes: int = MAX_ROUTES) -> None:
+        self.max_routes = max_routes
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.routes: Dict[str, _RouteStats] = {}
+
+    def _stats(self, route: str) -> _RouteStats:
+        stats = self.routes.get(route)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                route = OTHER_ROUTE
+                stats = self.routes.get(route)
+                if stats is not None:
+                    return stats
+            stats = _RouteStats()
+            self.routes[route] = stats
+        return stats
+
+    def record_serialize(self, route: str, size: int, duration_ns: int, sparse: bool = False) -> None:
+        with self._lock:
+            stats = self._stats(route)
+            stats.serialize.add(duration_ns)
+            if sparse:
+                stats.fields_requests += 1
+
+    def record_transfer(self, route: str, raw_size: int, sent_size: int, encoding: Optional[str]) -> None:
+        with self._lock:
+            stats = self._stats(route)
+            stats.responses += 1
+            stats.raw_bytes += raw_size
+            stats.sent_bytes += sent_size
+            if raw_size > stats.max_raw_bytes:
+                stats.max_raw_bytes = raw_size
+            key = encoding or "identity"
+            stats.encodings[key] = stats.encodings.get(key, 0) + 1
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self.routes.items())
+            result = []
+            for route, stats in items:
+                responses = stats.responses
+                serialize = stats.serialize.summary()
+                result.append({
+                    "route": route,
+                    "responses": responses,
+                    "avg_raw_bytes": round(stats.raw_bytes / responses) if responses else 0,
+                    "avg_sent_bytes": round(stats.sent_bytes / responses) if responses else 0,
+                    "max_raw_bytes": stats.max_raw_bytes,
+                    "total_raw_bytes": stats.raw_bytes,
+                    "total_sent_bytes": stats.sent_bytes,
+                    "compression_ratio": round(stats.sent_bytes / stats.raw_bytes, 3) if stats.raw_bytes else 1.0,
+                    "encodings": dict(stats.encodings),
+                    "fields_requests": stats.fields_requests,
+                    "serialize": serialize,
+                })
+        result.sort(key=lambda item: item["total_raw_bytes"], reverse=True)
+        return result[:limit] if limit else result
+
+
+payload_metrics = PayloadMetrics()
@@ -0,0 +1,289 @@
+"""HTTP-Request-Metriken: ein Kern fuer Middleware, Runtime-Anzeige, Monitoring-API und Prometheus.
+
+- Schluessel ist das Route-Template ("GET /api/jobs/{job_id}"), nicht der rohe Pfad;
+  Mounts (z.B. /static) werden zu "<mount>/*", unbekannte Pfade zu "<unmatched>".
+  Die Anzahl Schluessel ist begrenzt (MAX_ROUTES), der Rest landet in "<other>".
+- Zeitfenster ueber Ringe mit festen Slots (60 x Sekunde, 60 x Minute):
+  record und Lesen sind O(1) bzw. O(Slots), unabhaengig von der Request-Rate.
+- Pro Route kumulierte Zaehler plus feste Latenz-Buckets (Prometheus-Histogramm).
+
+Geschrieben wird nur aus der HTTP-Middleware, also vom Event-Loop-Thread: ein Schreiber,
+keine Locks. Leser (auch aus dem Threadpool) sehen hoechstens einen halb aktualisierten
+Datensatz eines einzelnen Requests.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("performance")
+
+MAX_ROUTES = 300
+OTHER_ROUTE = "<other>"
+UNMATCHED_ROUTE = "<unmatched>"
+RECENT_SIZE = 1000
+SLOW_REQUEST_MS = 500.0
+
+# obere Grenzen in ms (Prometheus: le in Sekunden), letzter Bucket = +Inf
+LATENCY_BUCKETS_MS = (5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+# Felder einer Routen-Statistik (Liste statt Objekt: ein Eintrag pro Route, keine Allokation pro Request)
+_COUNT, _ERRORS_4XX, _ERRORS_5XX, _SUM_MS, _MIN_MS, _MAX_MS, _LAST_TS, _BUCKETS = range(8)
+
+
+def route_key(request: Any) -> str:
+    """Route-Template aus dem ASGI-Scope (von FastAPI nach dem Routing gesetzt)."""
+    return route_key_from_scope(request.scope)
+
+
+def route_key_from_scope(scope: Dict[str, Any]) -> str:
+    """Wie route_key, fuer reine ASGI-Middleware ohne Request-Objekt."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    if scope.get("endpoint") is not None:
+        root = scope.get("root_path") or ""
+        return f"{root}/*" if root else "<mount>/*"
+    return UNMATCHED_ROUTE
+
+
+class _Ring:
+    """Feste Zeit-Slots [slot_id, count, errors, sum_ms, max_ms]; alte Slots werden beim Schreiben recycelt."""
+
+    __slots__ = ("width", "slots")
+
+    def __init__(self, size: int, width: int) -> None:
+        self.width = width
+        self.slots = [[-1, 0, 0, 0.0, 0.0] for _ in range(size)]
+
+    def add(self, now: float, duration_ms: float, error: bool) -> None:
+        slot_id = int(now) // self.width
+        slot = self.slots[slot_id % len(self.slots)]
+        if slot[0] != slot_id:
+            slot[0] = slot_id
+            slot[1] = 0
+            slot[2] = 0
+            slot[3] = 0.0
+            slot[4] = 0.0
+        slot[1] += 1
+        if error:
+            slot[2] += 1
+        slot[3] += duration_ms
+        if duration_ms > slot[4]:
+            slot[4] = duration_ms
+
+    def window(self, now: float, seconds: float) -> Dict[str, float]:
+        current = int(now) // self.width
+        oldest = current - max(1, int(seconds // self.width)) + 1
+        count = errors = 0
+        total = peak = 0.0
+        for slot_id, c, e, s, m in self.slots:
+            if oldest <= slot_id <= current:
+                count += c
+                errors += e
+                total += s
+                if m > peak:
+                    peak = m
+        return {"count": count, "errors": errors, "sum_ms": total, "max_ms": peak}
+
+    def series(self, now: float) -> List[Dict[str, float]]:
+        current = int(now) // self.width
+        size = len(self.slots)
+        result = []
+        for slot_id in range(current - size + 1, current + 1):
+            slot = self.slots[slot_id % size]
+            if slot[0] == slot_id:
+                result.append({"t": slot_id * self.width, "count": slot[1], "errors": slot[2],
+                               "avg_ms": round(slot[3] / slot[1], 2) if slot[1] else 0.0})
+            else:
+                result.append({"t": slot_id * self.width, "count": 0, "errors": 0, "avg_ms": 0.0})
+        return result
+
+
+class RequestMetrics:
+    def __init__(self, max_routes: int = MAX_ROUTES, slow_ms: float = SLOW_REQUEST_MS) -> None:
+        self.max_routes = max_routes
+        self.slow_ms = slow_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self.routes: Dict[Tuple[str, str], List[Any]] = {}
+        self.seconds = _Ring(60, 1)
+        self.minutes = _Ring(60, 60)
+        # (ts, method, route, path, duration_ms, status) - Tupel, ein Eintrag pro Request
+        self.recent: Deque[Tuple[float, str, str, str, float, int]] = deque(maxlen=RECENT_SIZE)
+        self.total = 0
+        self.errors_4xx = 0
+        self.errors_5xx = 0
+        self.in_flight = 0
+        self.dropped_routes = 0
+        self.started_at = time.time()
+
+    # --- Schreiben ---
+    def _stats(self, method: str, route: str) -> List[Any]:
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                self.dropped_routes += 1
+                key = (method, OTHER_ROUTE)
+                stats = self.routes.get(key)
+                if stats is not None:
+                    return stats
+            stats = [0, 0, 0, 0.0, float("inf"), 0.0, 0.0, [0] * (len(LATENCY_BUCKETS_MS) + 1)]
+            self.routes[key] = stats
+        return stats
+
+    def record(self, method: str, route: str, path: str, duration_ms: float, status_code: int) -> None:
+        now = time.time()
+        stats = self._stats(method, route)
+        stats[_COUNT] += 1
+        stats[_SUM_MS] += duration_ms
+        if duration_ms < stats[_MIN_MS]:
+            stats[_MIN_MS] = duration_ms
+        if duration_ms > stats[_MAX_MS]:
+            stats[_MAX_MS] = duration_ms
+        stats[_LAST_TS] = now
+        buckets = stats[_BUCKETS]
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+
+        error = status_code >= 400
+        if error:
+            if status_code >= 500:
+                stats[_ERRORS_5XX] += 1
+                self.errors_5xx += 1
+            else:
+                stats[_ERRORS_4XX] += 1
+                self.errors_4xx += 1
+        self.total += 1
+        self.seconds.add(now, duration_ms, error)
+        self.minutes.add(now, duration_ms, error)
+        self.recent.append((now, method, route, path, duration_ms, status_code))
+
+        if duration_ms > self.slow_ms:
+            logger.warning("[PERF-ALERT] Slow request: %s %s took %.1fms (threshold: %sms)",
+                           method, path, duration_ms, self.slow_ms)
+        if status_code >= 500:
+            logger.error("[PERF-ALERT] Server error: %s %s returned %s", method, path, status_code)
+
+    # --- Lesen ---
+    def window(self, seconds: float = 60.0) -> Dict[str, float]:
+        """Summen der letzten `seconds` (bis 60 s sekundengenau, bis 60 min minutengenau)."""
+        now = time.time()
+        ring = self.seconds if seconds <= 60 else self.minutes
+        data = ring.window(now, seconds)
+        count = data["count"]
+        data["avg_ms"] = round(data["sum_ms"] / count, 2) if count else 0.0
+        data["per_minute"] = round(count / seconds * 60.0, 2) if seconds > 0 else 0.0
+        return data
+
+    def route_stats(self) -> List[Dict[str, Any]]:
+        result = []
+        for (method, route), stats in list(self.routes.items()):
+            count = stats[_COUNT]
+            result.append({
+                "method": method,
+                "route": route,
+                "count": count,
+                "errors_4xx": stats[_ERRORS_4XX],
+                "errors_5xx": stats[_ERRORS_5XX],
+                "sum_ms": stats[_SUM_MS],
+                "avg_ms": stats[_SUM_MS] / count if count else 0.0,
+                "min_ms": stats[_MIN_MS] if count else 0.0,
+                "max_ms": stats[_MAX_MS],
+                "last_ts": stats[_LAST_TS],
+                "buckets": list(stats[_BUCKETS]),
+            })
+        return result
+
+    def recent_requests(self, seconds: Optional[float] = None, limit: Optional[int] = None,
+                        min_duration_ms: Optional[float] = None) -> List[Tuple[float, str, str, str, float, int]]:
+        items = list(self.recent)
+        if seconds:
+            cutoff = time.time() - seconds
+            items = [r for r in items if r[0] >= cutoff]
+        if min_duration_ms is not None:
+            items = [r for r in items if r[4] >= min_duration_ms]
+        if limit:
+            items = items[-limit:]
+        return items
+
+    def prometheus(self) -> str:
+        """Prometheus-Textformat (0.0.4)."""
+        lines = [
+            "# HELP filamenthub_http_requests_total HTTP requests by route template and status class.",
+            "# TYPE filamenthub_http_requests_total counter",
+        ]
+        routes = self.route_stats()
+        for item in routes:
+            labels = f'method="{item["method"]}",route="{_escape(item["route"])}"'
+            errors = item["errors_4xx"] + item["errors_5xx"]
+            if item["count"] > errors or not errors:
+                lines.append(f'filamenthub_http_requests_total{{{labels},status="ok"}} {item["count"] - errors}')
+            if item["errors_4xx"]:
+                lines.append(f'filamenthub_http_requests_total{{{labels},status="4xx"}} {item["errors_4xx"]}')
+            if item["errors_5xx"]:
+                lines.append(f'filamenthub_http_requests_total{{{labels},status="5xx"}} {item["errors_5xx"]}')
+        lines += [
+            "# HELP filamenthub_http_request_duration_seconds HTTP request latency by route template.",
+            "# TYPE filamenthub_http_request_duration_seconds histogram",
+        ]
+        for item in routes:
+            labels = f'method="{item["method"]}",route="{_escape(item["route"])}"'
+            cumulative = 0
+            for bound, value in zip(LATENCY_BUCKETS_MS, item["buckets"]):
+                cumulative += value
+                lines.append(f'filamenthub_http_request_duration_seconds_bucket{{{labels},le="{bound / 1000.0:g}"}} {cumulative}')
+            lines.append(f'filamenthub_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {item["count"]}')
+            lines.append(f'filamenthub_http_request_duration_seconds_sum{{{labels}}} {item["sum_ms"] / 1000.0:.6f}')
+            lines.append(f'filamenthub_http_request_duration_seconds_count{{{labels}}} {item["count"]}')
+        lines += [
+            "# HELP filamenthub_http_requests_in_flight HTTP requests currently being processed.",
+            "# TYPE filamenthub_http_requests_in_flight gauge",
+            f"filamenthub_http_requests_in_flight {self.in_flight}",
+            "# HELP filamenthub_http_route_overflow_total Requests of routes beyond the route limit (counted as <other>).",
+            "# TYPE filamenthub_http_route_overflow_total counter",
+            f"filamenthub_http_route_overflow_total {self.dropped_routes}",
+        ]
+        lines += _ingest_lines()
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _ingest_lines() -> List[str]:
+    """Ingest-Stufen (app.monitoring.ingest_metrics) als Prometheus-Summary."""
+    try:
+        from app.monitoring.ingest_metrics import ingest_metrics
+
+        sources = ingest_metrics.snapshot(per_printer=False)["sources"]
+    except Exception:
+        logger.debug("Ingest metrics not available for prometheus export", exc_info=True)
+        return []
+    lines = [
+        "# HELP filamenthub_ingest_stage_seconds MQTT ingest latency per pipeline stage.",
+        "# TYPE filamenthub_ingest_stage_seconds summary",
+    ]
+    for source, stages in sources.items():
+        for stage, data in stages.items():
+            if not data.get("count"):
+                continue
+            labels = f'source="{_escape(source)}",stage="{_escape(stage)}"'
+            for quantile, field in (("0.5", "p50_ms"), ("0.9", "p90_ms"), ("0.99", "p99_ms")):
+                lines.append(f'filamenthub_ingest_stage_seconds{{{labels},quantile="{quantile}"}} {data[field] / 1000.0:.6f}')
+            lines.append(f'filamenthub_ingest_stage_seconds_sum{{{labels}}} {data["total_ms"] / 1000.0:.6f}')
+            lines.append(f'filamenthub_ingest_stage_seconds_count{{{labels}}} {data["count"]}')
+    return lines
+
+
+request_metrics = RequestMetrics()
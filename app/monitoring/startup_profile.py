@@ -0,0 +1,198 @@
+"""Startup-Profil: Importzeit und Dauer der einzelnen Startphasen.
+
+Phasen werden immer gemessen (ein perf_counter-Paar pro Phase) und unter
+/api/performance/startup ausgegeben:
+
+    with startup_profile.phase("init_db.migrations"):
+        run_migrations()
+
+Mit ``python run.py --profile-startup`` (setzt FILAMENTHUB_PROFILE_STARTUP=1) wird zusaetzlich
+jeder Modul-Import gemessen (eigene Zeit ohne Untermodule, wie ``python -X importtime``) und
+nach dem Start ein Report auf stdout sowie nach logs/startup_profile.json geschrieben - so
+fallen Regressionen beim Kaltstart sofort auf.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("app")
+
+PROFILE_ENV = "FILAMENTHUB_PROFILE_STARTUP"
+REPORT_PATH = Path("logs") / "startup_profile.json"
+TOP_IMPORTS = 25
+
+
+def _process_age_s() -> Optional[float]:
+    """Sekunden seit Prozessstart (inkl. Interpreter-Start), falls psutil verfuegbar."""
+    try:
+        import psutil  # type: ignore
+
+        return max(0.0, time.time() - psutil.Process().create_time())
+    except Exception:
+        return None
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, profiler: "_ImportProfiler", name: str, loader: Any) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._loader = loader
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        self._profiler.enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(self._name)
+
+    def __getattr__(self, item: str) -> Any:  # get_resource_reader, is_package, ...
+        return getattr(self._loader, item)
+
+
+class _ImportProfiler(importlib.abc.MetaPathFinder):
+    """Misst exec_module jedes Imports; Untermodule werden von der eigenen Zeit abgezogen."""
+
+    def __init__(self) -> None:
+        self.modules: Dict[str, Tuple[float, float]] = {}  # name -> (self_ms, cumulative_ms)
+        self._stack: List[List[float]] = []  # [start, child_ms]
+        self._local = threading.local()
+        self._owner = threading.get_ident()
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        if threading.get_ident() != self._owner or getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.busy = False
+        if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return None
+        spec.loader = _TimedLoader(self, fullname, spec.loader)
+        return spec
+
+    def enter(self, name: str) -> None:
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def leave(self, name: str) -> None:
+        start, child_ms = self._stack.pop()
+        total_ms = (time.perf_counter() - start) * 1000.0
+        self.modules[name] = (total_ms - child_ms, total_ms)
+        if self._stack:
+            self._stack[-1][1] += total_ms
+
+    def top(self, limit: int = TOP_IMPORTS) -> List[Dict[str, Any]]:
+        ranked = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [{"module": name, "self_ms": round(own, 2), "cumulative_ms": round(cum, 2)} for name, (own, cum) in ranked]
+
+
+class StartupProfile:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+        self.phases: List[Dict[str, Any]] = []
+        self.imports: Dict[str, float] = {}
+        self.notes: Dict[str, Any] = {}
+        self.ready_at: Optional[float] = None
+        self._created = time.perf_counter()
+        self._import_profiler: Optional[_ImportProfiler] = None
+
+    # --- Importe ---
+    def install_import_profiler(self) -> None:
+        """Vor dem Import von app.main aufrufen (run.py --profile-startup)."""
+        self.enabled = True
+        if self._import_profiler is None:
+            self._import_profiler = _ImportProfiler()
+            sys.meta_path.insert(0, self._import_profiler)
+
+    def uninstall_import_profiler(self) -> None:
+        if self._import_profiler is not None and self._import_profiler in sys.meta_path:
+            sys.meta_path.remove(self._import_profiler)
+
+    def record_import(self, module: str, started: float) -> None:
+        self.imports[module] = round((time.perf_counter() - started) * 1000.0, 2)
+
+    # --- Phasen ---
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.phases.append({
+                "phase": name,
+                "ms": round((time.perf_counter() - started) * 1000.0, 2),
+                "offset_ms": round((started - self._created) * 1000.0, 2),
+                "ok": ok,
+            })
+
+    def note(self, key: str, value: Any) -> None:
+        self.notes[key] = value
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        age = _process_age_s()
+        if age is not None:
+            self.notes["process_age_at_ready_s"] = round(age, 2)
+        self.uninstall_import_profiler()
+        if self.enabled:
+            self.write_report()
+
+    # --- Report ---
+    def report(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "since_profile_start_ms": round(((self.ready_at or time.perf_counter()) - self._created) * 1000.0, 2),
+            "ready": self.ready_at is not None,
+            "imports_ms": dict(self.imports),
+            "phases": list(self.phases),
+            "notes": dict(self.notes),
+        }
+        if self._import_profiler is not None:
+            data["slowest_imports"] = self._import_profiler.top()
+        return data
+
+    def write_report(self) -> None:
+        report = self.report()
+        lines = ["", "=" * 60, "[STARTUP PROFILE]"]
+        for name, ms in report["imports_ms"].items():
+            lines.append(f"  import {name:<34} {ms:>9.1f} ms")
+        for item in report["phases"]:
+            flag = "" if item["ok"] else "  (FEHLER)"
+            lines.append(f"  {item['phase']:<41} {item['ms']:>9.1f} ms{flag}")
+        for key, value in report["notes"].items():
+            lines.append(f"  {key}: {value}")
+        if report.get("slowest_imports"):
+            lines.append("  langsamste Importe (eigene Zeit / kumulativ):")
+            for item in report["slowest_imports"]:
+                lines.append(f"    {item['module']:<46} {item['self_ms']:>8.1f} {item['cumulative_ms']:>9.1f} ms")
+        lines.append("=" * 60)
+        print("\n".join(lines), flush=True)
+        try:
+            REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+            REPORT_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        except OSError:
+            logger.warning("Startup-Profil konnte nicht geschrieben werden", exc_info=True)
+
+
+startup_profile = StartupProfile()
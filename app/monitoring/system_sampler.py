@@ -0,0 +1,310 @@
+"""Hintergrund-Sampler fuer System-/Prozessmetriken.
+
+Ein asyncio-Task sammelt alle INTERVAL_S Sekunden CPU, RAM, Disk, Prozess-RSS/-CPU, Threads,
+offene FDs/Handles, Event-Loop-Lag sowie Groesse von SQLite-Datei und WAL. Die psutil-Aufrufe
+laufen in einem Worker-Thread; Request-Handler lesen nur noch den letzten Sample bzw. die Ringe.
+
+Historie:
+    fine    1 h  in 5-s-Schritten    (720 Samples)
+    coarse  7 d  in 5-min-Schritten  (2016 Aggregate: Mittelwert, *_max fuer CPU/RAM/Lag)
+
+Beide Ringe werden beim Abschluss jedes 5-min-Buckets und beim Stop nach
+data/performance_history.json geschrieben (atomar) und beim Start wieder geladen.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+try:
+    import psutil  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+logger = logging.getLogger("app")
+
+INTERVAL_S = 5.0
+FINE_SIZE = 720
+COARSE_STEP_S = 300
+COARSE_SIZE = 7 * 24 * 12
+HISTORY_VERSION = 1
+
+# numerische Felder, die im 5-min-Aggregat gemittelt werden; fuer PEAK_FIELDS zusaetzlich *_max
+AGGREGATE_FIELDS = (
+    "cpu_percent",
+    "ram_percent",
+    "ram_used_mb",
+    "disk_percent",
+    "disk_used_gb",
+    "process_rss_mb",
+    "process_cpu_percent",
+    "threads",
+    "open_fds",
+    "loop_lag_ms",
+    "db_size_mb",
+    "wal_size_mb",
+)
+PEAK_FIELDS = ("cpu_percent", "ram_percent", "process_rss_mb", "loop_lag_ms")
+
+
+def _disk_path() -> str:
+    drive, _ = os.path.splitdrive(os.getcwd())
+    return drive + os.sep if drive else "/"
+
+
+def _file_mb(path: Path) -> Optional[float]:
+    try:
+        return round(path.stat().st_size / 1048576, 3)
+    except OSError:
+        return None
+
+
+class SystemSampler:
+    def __init__(self, interval: float = INTERVAL_S, history_file: Optional[Path] = None) -> None:
+        self.interval = interval
+        self.history_file = history_file
+        self.fine: Deque[Dict[str, Any]] = deque(maxlen=FINE_SIZE)
+        self.coarse: Deque[Dict[str, Any]] = deque(maxlen=COARSE_SIZE)
+        self.latest: Optional[Dict[str, Any]] = None
+        self.recording_since = datetime.now()
+        self._bucket: List[Dict[str, Any]] = []
+        self._bucket_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._process = None
+        self._persist_lock = threading.Lock()
+        self.samples = 0
+        self.errors = 0
+
+    # --- Lebenszyklus ---
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        if self.history_file is None:
+            from app.database import DB_PATH
+
+            self.history_file = Path(DB_PATH).resolve().parent / "performance_history.json"
+        self._load()
+        if psutil is not None:
+            self._process = psutil.Process()
+            try:
+                # erster Aufruf liefert 0.0 und setzt nur den Referenzpunkt
+                psutil.cpu_percent(interval=None)
+                self._process.cpu_percent(interval=None)
+            except Exception:
+                logger.debug("psutil cpu_percent priming failed", exc_info=True)
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="system-sampler")
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._bucket:
+            self._close_bucket()
+        await asyncio.to_thread(self._persist)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        lag_ms = 0.0
+        while True:
+            try:
+                sample = await asyncio.to_thread(self._collect)
+                sample["loop_lag_ms"] = round(lag_ms, 2)
+                self._add(sample)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("System sampler failed")
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000.0)
+
+    # --- Sammeln ---
+    def _collect(self) -> Dict[str, Any]:
+        now = time.time()
+        sample: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "ts": now,
+        }
+        if psutil is not None:
+            try:
+                sample["cpu_percent"] = round(psutil.cpu_percent(interval=None), 1)
+                vm = psutil.virtual_memory()
+                sample["ram_percent"] = round(vm.percent, 1)
+                sample["ram_used_mb"] = round(vm.used / 1048576, 1)
+                sample["ram_total_mb"] = round(vm.total / 1048576, 1)
+                sample["ram_available_mb"] = round(vm.available / 1048576, 1)
+            except Exception:
+                logger.debug("CPU/RAM sample failed", exc_info=True)
+            try:
+                disk = psutil.disk_usage(_disk_path())
+                sample["disk_percent"] = round(disk.percent, 1)
+                sample["disk_used_gb"] = round(disk.used / 1073741824, 2)
+                sample["disk_total_gb"] = round(disk.total / 1073741824, 2)
+                sample["disk_free_gb"] = round(disk.free / 1073741824, 2)
+            except Exception:
+                logger.debug("Disk sample failed", exc_info=True)
+            process = self._process
+            if process is not None:
+                try:
+                    with process.oneshot():
+                        sample["process_rss_mb"] = round(process.memory_info().rss / 1048576, 2)
+                        sample["process_cpu_percent"] = round(process.cpu_percent(interval=None), 1)
+                        sample["threads"] = process.num_threads()
+                        if hasattr(process, "num_fds"):
+                            sample["open_fds"] = process.num_fds()
+                        elif hasattr(process, "num_handles"):
+                            sample["open_fds"] = process.num_handles()
+                except Exception:
+                    logger.debug("Process sample failed", exc_info=True)
+        else:
+            sample["threads"] = threading.active_count()
+
+        try:
+            from app.database import DB_PATH
+
+            db_file = Path(DB_PATH)
+            sample["db_size_mb"] = _file_mb(db_file)
+            sample["wal_size_mb"] = _file_mb(db_file.with_name(db_file.name + "-wal")) or 0.0
+        except Exception:
+            logger.debug("SQLite size sample failed", exc_info=True)
+        return sample
+
+    # --- Ringe / Downsampling ---
+    def _add(self, sample: Dict[str, Any]) -> None:
+        self.latest = sample
+        self.fine.append(sample)
+        self.samples += 1
+        bucket_id = int(sample["ts"]) // COARSE_STEP_S
+        if self._bucket_id is not None and bucket_id != self._bucket_id and self._bucket:
+            self._close_bucket()
+            # Persistieren ausserhalb des Loops (JSON ~ 1 MB bei voller Historie)
+            threading.Thread(target=self._persist, name="perf-history-writer", daemon=True).start()
+        self._bucket_id = bucket_id
+        self._bucket.append(sample)
+
+    def _close_bucket(self) -> None:
+        samples, self._bucket = self._bucket, []
+        bucket_start = (int(samples[0]["ts"]) // COARSE_STEP_S) * COARSE_STEP_S
+        aggregate: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(bucket_start).isoformat(),
+            "ts": bucket_start,
+            "samples": len(samples),
+        }
+        for field in AGGREGATE_FIELDS:
+            values = [s[field] for s in samples if isinstance(s.get(field), (int, float))]
+            if not values:
+                continue
+            aggregate[field] = round(sum(values) / len(values), 2)
+            if field in PEAK_FIELDS:
+                aggregate[f"{field}_max"] = round(max(values), 2)
+        self.coarse.append(aggregate)
+
+    # --- Persistenz ---
+    def _persist(self) -> None:
+        path = self.history_file
+        if path is None:
+            return
+        with self._persist_lock:
+            data = {
+                "version": HISTORY_VERSION,
+                "interval_s": self.interval,
+                "coarse_step_s": COARSE_STEP_S,
+                "saved_at": time.time(),
+                "fine": list(self.fine),
+                "coarse": list(self.coarse),
+            }
+            tmp_path = None
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    mode="w", dir=str(path.parent), delete=False, encoding="utf-8", suffix=".tmp"
+                ) as tf:
+                    tmp_path = tf.name
+                    json.dump(data, tf, separators=(",", ":"))
+                os.replace(tmp_path, str(path))
+            except Exception:
+                logger.exception("Failed to persist performance history to %s", path)
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+    def _load(self) -> None:
+        path = self.history_file
+        if path is None or not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            logger.warning("Performance history %s unreadable - starting empty", path, exc_info=True)
+            return
+        if not isinstance(data, dict) or data.get("version") != HISTORY_VERSION:
+            return
+        now = time.time()
+        fine_cutoff = now - FINE_SIZE * self.interval
+        coarse_cutoff = now - COARSE_SIZE * COARSE_STEP_S
+        self.fine.extend(s for s in data.get("fine") or [] if isinstance(s, dict) and s.get("ts", 0) >= fine_cutoff)
+        self.coarse.extend(s for s in data.get("coarse") or [] if isinstance(s, dict) and s.get("ts", 0) >= coarse_cutoff)
+        if self.fine:
+            self.latest = self.fine[-1]
+        oldest = self.coarse[0] if self.coarse else (self.fine[0] if self.fine else None)
+        if oldest:
+            self.recording_since = datetime.fromtimestamp(oldest["ts"])
+        logger.info("Performance history loaded: %s fine / %s coarse samples", len(self.fine), len(self.coarse))
+
+    # --- Lesen ---
+    def current(self) -> Dict[str, Any]:
+        """Letzter Sample; vor dem ersten Lauf einmalig synchron (ohne Blockieren auf CPU-Intervall)."""
+        if self.latest is None:
+            self.latest = self._collect()
+        return self.latest
+
+    def history(self, limit: int = 0) -> List[Dict[str, Any]]:
+        items = list(self.fine)
+        return items[-limit:] if limit > 0 else items
+
+    def long_history(self, hours: float = 24.0) -> List[Dict[str, Any]]:
+        cutoff = time.time() - hours * 3600.0
+        return [item for item in list(self.coarse) if item.get("ts", 0) >= cutoff]
+
+    def clear(self) -> None:
+        self.fine.clear()
+        self.coarse.clear()
+        self._bucket = []
+        self.recording_since = datetime.now()
+        threading.Thread(target=self._persist, name="perf-history-writer", daemon=True).start()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "errors": self.errors,
+            "fine": len(self.fine),
+            "coarse": len(self.coarse),
+            "history_file": str(self.history_file) if self.history_file else None,
+        }
+
+
+system_sampler = SystemSampler()
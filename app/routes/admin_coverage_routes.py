@@ -13,11 +13,12 @@ import logging
 
 from app.routes.admin_routes import audit, client_ip
 from fastapi.templating import Jinja2Templates
+from app.services.static_assets import configure_templates
 from fastapi import Depends
 
 router = APIRouter()
 
-templates = Jinja2Templates(directory="frontend/templates")
+templates = configure_templates(Jinja2Templates(directory="frontend/templates"))
 _error_logger = logging.getLogger("errors")
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from app.services.static_assets import configure_templates
 from starlette.datastructures import UploadFile
 from starlette.status import HTTP_401_UNAUTHORIZED
 from sqlmodel import Session, select
@@ -15,7 +16,6 @@ import subprocess
 import secrets
 import time
 from datetime import datetime
-import bcrypt
 from typing import Dict, Optional, Tuple, Union
 
 router = APIRouter()
@@ -26,7 +26,7 @@ def admin_panel_page(request: Request):
     audit("admin_access", {"path": "/admin", "ip": client_ip(request)})
     return templates.TemplateResponse("admin_panel.html", {"request": request})
 
-templates = Jinja2Templates(directory="frontend/templates")
+templates = configure_templates(Jinja2Templates(directory="frontend/templates"))
 
 # --- SECURITY CONFIG ---
 
@@ -88,6 +88,8 @@ def verify_admin_password(password: str) -> bool:
     try:
         if not password:
             return False
+        import bcrypt  # erst beim Login laden (Importzeit)
+
         return bool(bcrypt.checkpw(password.encode("utf-8"), ADMIN_PASSWORD_HASH))
     except Exception:
         # don't leak errors or secrets
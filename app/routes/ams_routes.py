@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Any, Optional
+from fastapi import APIRouter, HTTPException
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
+from typing import Any, Iterable, Optional, Tuple
+from collections import defaultdict
 import logging
 
 import app.services.live_state as live_state_module
@@ -12,17 +14,23 @@ from app.services.ams_normalizer import (
 from app.services.ams_parser import parse_ams
 from app.services.ams_sync import sync_ams_slots
 from typing import List, Dict
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlmodel import Session, col, or_, select
+from app.db.executor import run_in_session
 from app.models.spool import Spool
 from app.models.printer import Printer
 from app.models.material import Material
 from app.services.filament_weights import compute_spool_remaining
 from app.services.ams_sync_state import get_ams_sync_state
+from app.services import table_versions
 
-router = APIRouter(prefix="/api/ams", tags=["AMS"])
+router = APIRouter(prefix="/api/ams", tags=["AMS"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 logger = logging.getLogger("app")
 
+# Drucker-Stammdaten (cloud_serial, name, model, id) - invalidiert bei Aenderungen an der printer-Tabelle
+_printer_rows_cache: Dict[str, Any] = {"key": None, "rows": []}
+# Fertige /overview-Antwort - gueltig bis sich Live-State, Spulen, Materialien oder Drucker aendern
+_overview_cache: Dict[str, Any] = {"key": None, "value": None}
+
 
 def _compute_spool_totals(spool: Spool, material: Optional[Material]) -> tuple[Optional[float], Optional[float], Optional[float]]:
     remaining, total, percent = compute_spool_remaining(spool, material)
@@ -55,13 +63,60 @@ def _resolve_spool(session: Session, tag_uid: Optional[str], tray_uuid: Optional
     return spools[0]
 
 
+def _resolve_spools_bulk(
+    session: Session,
+    identities: Iterable[Tuple[Optional[str], Optional[str]]],
+) -> Dict[Tuple[Optional[str], Optional[str]], Optional[Spool]]:
+    """Bulk-Variante von `_resolve_spool()`: eine Query fuer alle Trays statt einer pro Tray.
+
+    Gleiche Semantik: eine Spule wird nur zugeordnet, wenn genau eine Spule
+    ueber tag_uid ODER tray_uuid passt.
+    """
+    wanted = {(tag_uid, tray_uuid) for tag_uid, tray_uuid in identities if tag_uid or tray_uuid}
+    if not wanted:
+        return {}
+
+    tag_uids = {tag_uid for tag_uid, _ in wanted if tag_uid}
+    tray_uuids = {tray_uuid for _, tray_uuid in wanted if tray_uuid}
+    conditions = []
+    if tag_uids:
+        conditions.append(col(Spool.tag_uid).in_(tag_uids))
+    if tray_uuids:
+        conditions.append(col(Spool.tray_uuid).in_(tray_uuids))
+
+    by_tag: Dict[str, List[Spool]] = defaultdict(list)
+    by_uuid: Dict[str, List[Spool]] = defaultdict(list)
+    for spool in session.exec(select(Spool).where(or_(*conditions))).all():
+        if spool.tag_uid in tag_uids:
+            by_tag[spool.tag_uid].append(spool)
+        if spool.tray_uuid in tray_uuids:
+            by_uuid[spool.tray_uuid].append(spool)
+
+    resolved: Dict[Tuple[Optional[str], Optional[str]], Optional[Spool]] = {}
+    for tag_uid, tray_uuid in wanted:
+        matches: Dict[str, Spool] = {}
+        for spool in (by_tag.get(tag_uid, []) if tag_uid else []):
+            matches[spool.id] = spool
+        for spool in (by_uuid.get(tray_uuid, []) if tray_uuid else []):
+            matches[spool.id] = spool
+        resolved[(tag_uid, tray_uuid)] = next(iter(matches.values())) if len(matches) == 1 else None
+    return resolved
+
+
+def _get_printer_rows(session: Session) -> List[Tuple[str, Optional[str], Optional[str], str]]:
+    """(cloud_serial, name, model, id) aller Drucker mit cloud_serial, gecacht bis zur naechsten Aenderung."""
+    key = table_versions.get_version("printer")
+    if _printer_rows_cache["key"] != key:
+        printers = session.exec(select(Printer)).all()
+        rows = [(p.cloud_serial, p.name, p.model, p.id) for p in printers if p.cloud_serial]
+        _printer_rows_cache.update({"key": key, "rows": rows})
+    return _printer_rows_cache["rows"]
+
+
 def _get_printer_name_map(session: Session) -> Dict[str, str]:
-    printers = session.exec(select(Printer)).all()
     name_map: Dict[str, str] = {}
-    for printer in printers:
-        if not printer.cloud_serial:
-            continue
-        name_map[printer.cloud_serial] = printer.name or printer.cloud_serial
+    for cloud_serial, name, _model, _printer_id in _get_printer_rows(session):
+        name_map[cloud_serial] = name or cloud_serial
     return name_map
 
 
@@ -71,12 +126,11 @@ def _get_printer_model_map(session: Session) -> Dict[str, str]:
     First try DB, then fallback to live_state printer_name
     """
     # Try DB first
-    printers = session.exec(select(Printer)).all()
     model_map: Dict[str, str] = {}
-    for printer in printers:
-        if not printer.cloud_serial or not printer.model:
+    for cloud_serial, _name, model, _printer_id in _get_printer_rows(session):
+        if not model:
             continue
-        model_map[printer.cloud_serial] = printer.model
+        model_map[cloud_serial] = model
     
     # Fallback: Extract from live_state printer_name (e.g., "A1 Mini" -> "A1MINI")
     if not model_map:  # Only if DB didn't have data
@@ -104,34 +158,33 @@ def _get_printer_model_map(session: Session) -> Dict[str, str]:
     return model_map
 
 
+def _load_printer_maps(session: Session) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """(name_map, model_map, id_map) in einem DB-Pool-Aufruf."""
+    return _get_printer_name_map(session), _get_printer_model_map(session), _get_printer_id_map(session)
+
+
 def _get_printer_id_map(session: Session) -> Dict[str, str]:
     """Get mapping of cloud_serial to printer ID"""
-    printers = session.exec(select(Printer)).all()
     id_map: Dict[str, str] = {}
-    for printer in printers:
-        if not printer.cloud_serial:
-            continue
-        id_map[printer.cloud_serial] = printer.id
+    for cloud_serial, _name, _model, printer_id in _get_printer_rows(session):
+        id_map[cloud_serial] = printer_id
     return id_map
 
 
 @router.get("/")
-async def list_ams(session: Session = Depends(get_session)) -> Any:
+async def list_ams() -> Any:
     logger.debug("Listing normalized AMS live state")
     live = live_state_module.get_all_live_state()
-    printer_name_map = _get_printer_name_map(session)
-    printer_model_map = _get_printer_model_map(session)
+    printer_name_map, printer_model_map, _printer_id_map = await run_in_session(_load_printer_maps)
     return normalize_live_state(live, printer_name_by_serial=printer_name_map, printer_model_by_serial=printer_model_map)
 
 
 @router.get("/regular")
-async def list_regular_ams(session: Session = Depends(get_session)) -> Any:
+async def list_regular_ams() -> Any:
     """Get only regular AMS (not AMS Lite)"""
     logger.debug("Listing regular AMS (non-Lite)")
     live = live_state_module.get_all_live_state()
-    printer_name_map = _get_printer_name_map(session)
-    printer_model_map = _get_printer_model_map(session)
-    printer_id_map = _get_printer_id_map(session)
+    printer_name_map, printer_model_map, printer_id_map = await run_in_session(_load_printer_maps)
     normalized = normalize_live_state(
         live,
         printer_name_by_serial=printer_name_map,
@@ -156,13 +209,11 @@ async def list_regular_ams(session: Session = Depends(get_session)) -> Any:
 
 
 @router.get("/lite")
-async def list_ams_lite(session: Session = Depends(get_session)) -> Any:
+async def list_ams_lite() -> Any:
     """Get only AMS Lite units"""
     logger.debug("Listing AMS Lite units")
     live = live_state_module.get_all_live_state()
-    printer_name_map = _get_printer_name_map(session)
-    printer_model_map = _get_printer_model_map(session)
-    printer_id_map = _get_printer_id_map(session)
+    printer_name_map, printer_model_map, printer_id_map = await run_in_session(_load_printer_maps)
     normalized = normalize_live_state(live, printer_name_by_serial=printer_name_map, printer_model_by_serial=printer_model_map, printer_id_by_serial=printer_id_map)
     
     # Filter: keep only devices with AMS Lite (is_ams_lite = true)
@@ -187,11 +238,15 @@ async def get_ams_sync_status() -> Any:
 
 
 @router.post("/sync/{printer_id}")
-async def trigger_ams_sync(printer_id: str, session: Session = Depends(get_session)) -> Any:
+async def trigger_ams_sync(printer_id: str) -> Any:
     """Manually trigger AMS sync for a printer using data from live-state.
     
     This is useful when AMS data arrived but sync wasn't triggered automatically.
     """
+    return await run_in_session(_trigger_ams_sync, printer_id)
+
+
+def _trigger_ams_sync(session: Session, printer_id: str) -> Any:
     printer = session.get(Printer, printer_id)
     if not printer:
         raise HTTPException(status_code=404, detail="Printer not found")
@@ -238,14 +293,27 @@ async def trigger_ams_sync(printer_id: str, session: Session = Depends(get_sessi
 
 
 @router.get("/overview")
-async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
+async def get_ams_overview() -> Any:
     """UI-friendly AMS overview aggregating normalized live-state.
 
     - Uses only `normalize_live_state()` output
     - Filters OUT AMS Lite units (only show regular AMS)
-    - DB is used only for spool enrichment
+    - DB is used only for spool enrichment (one bulk query for all trays)
+    - Cached until live-state, spool, material or printer tables change
+    - Built on the DB executor (not on the event loop) when the cache is stale
     - Always returns JSON; on error returns safe empty structure
     """
+    cache_key = (
+        live_state_module.get_live_state_global_version(),
+        table_versions.get_version("spool", "material", "printer"),
+    )
+    if _overview_cache["key"] == cache_key:
+        return _overview_cache["value"]
+
+    return await run_in_session(_build_ams_overview, cache_key)
+
+
+def _build_ams_overview(session: Session, cache_key: Any) -> Any:
     try:
         printer_name_map = _get_printer_name_map(session)
         printer_model_map = _get_printer_model_map(session)
@@ -281,7 +349,20 @@ async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
 
         total_remaining_grams = 0.0
 
+        spool_by_identity = _resolve_spools_bulk(
+            session,
+            (
+                (tray.get("tag_uid"), tray.get("tray_uuid"))
+                for device in devices
+                for unit in (device.get("ams_units") or [])
+                for tray in (unit.get("trays") or [])
+            ),
+        )
+        material_ids = {spool.material_id for spool in spool_by_identity.values() if spool and spool.material_id}
         material_cache: Dict[str, Material] = {}
+        if material_ids:
+            for material in session.exec(select(Material).where(col(Material.id).in_(material_ids))).all():
+                material_cache[material.id] = material
 
         for device in devices:
             device_online = bool(device.get("online"))
@@ -303,7 +384,7 @@ async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
                     remaining_grams = _to_float(tray.get("remaining_grams"))
                     state = calc_slot_state(remaining_percent)
 
-                    spool = _resolve_spool(session, tag_uid, tray_uuid)
+                    spool = spool_by_identity.get((tag_uid, tray_uuid))
                     spool_total = None
                     spool_percent = None
 
@@ -314,10 +395,6 @@ async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
                         material_vendor = spool.vendor
                         if (material_name is None or material_vendor is None) and spool.material_id:
                             material = material_cache.get(spool.material_id)
-                            if material is None:
-                                material = session.get(Material, spool.material_id)
-                                if material:
-                                    material_cache[spool.material_id] = material
                             if material:
                                 if material_name is None:
                                     material_name = material.name
@@ -407,7 +484,7 @@ async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
                 })
 
         has_ams = len(ams_units) > 0
-        return {
+        overview = {
             "has_ams": bool(has_ams),
             "printer": {
                 "online": printer_online,
@@ -421,6 +498,8 @@ async def get_ams_overview(session: Session = Depends(get_session)) -> Any:
             },
             "ams_units": ams_units,
         }
+        _overview_cache.update({"key": cache_key, "value": overview})
+        return overview
 
     except Exception:
         logger.exception("Failed to build AMS overview")
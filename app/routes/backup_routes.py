@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, UploadFile, File
 from fastapi.responses import FileResponse
 
 from app import database as app_database
+from app.services import table_versions
 
 router = APIRouter(prefix="/api/database/backups", tags=["Backups"])
 logger = logging.getLogger("database")
@@ -174,6 +175,7 @@ def restore_backup(filename: str):
             logger.info("Safety backup created at %s", safety_path)
 
         shutil.copy2(backup_path, DB_PATH)
+        table_versions.invalidate_all()
         logger.info("Database restored from %s", backup_path)
         _cleanup_old_backups()
         return {
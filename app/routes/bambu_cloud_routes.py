@@ -14,6 +14,9 @@ from datetime import datetime, timedelta
 import logging
 
 from app.database import get_session
+from app.db.executor import run_in_session
+from app.services import cloud_task_cache
+from app.services.bambu_cloud_sync import cloud_sync_state
 from app.models.bambu_cloud_config import (
     BambuCloudConfig,
     BambuCloudConfigCreate,
@@ -31,6 +34,7 @@ from app.services.bambu_cloud_service import (
     BambuCloudAuthError,
     BambuCloudAPIError,
     BambuCloudNetworkError,
+    BambuCloudTask,
 )
 from services.cloud_mqtt_client import (
     CloudMQTTClient,
@@ -625,23 +629,69 @@ async def bambu_cloud_verify_tfa(
 # TASKS / PRINT JOBS ENDPOINTS
 # ============================================================
 
+def _load_cloud_config(session: Session) -> Optional[BambuCloudConfig]:
+    return session.exec(select(BambuCloudConfig)).first()
+
+
+def _task_to_dict(t: BambuCloudTask) -> dict:
+    return {
+        "id": t.id,
+        "title": t.title,
+        "device_id": t.device_id,
+        "device_name": t.device_name,
+        "status": t.status,
+        "weight_g": t.weight,
+        "length_mm": t.length,
+        "cost_time_seconds": t.cost_time,
+        "cost_time_formatted": f"{t.cost_time // 3600}h {(t.cost_time % 3600) // 60}m" if t.cost_time else "-",
+        "start_time": t.start_time,
+        "end_time": t.end_time,
+        "cover_url": t.cover_url,
+        "thumbnail_url": t.thumbnail_url,
+        "plate_index": t.plate_index,
+        "ams_mapping": t.ams_mapping,
+    }
+
+
+@router.get("/tasks/cache")
+async def get_cloud_task_cache_status():
+    """Status des lokalen Task-Spiegels (Anzahl, Zeitraum, Treffer/Fehltreffer)."""
+    return await run_in_session(cloud_task_cache.summary)
+
+
 @router.get("/tasks")
 async def get_cloud_tasks(
     device_id: Optional[str] = None,
     limit: int = 20,
-    session: Session = Depends(get_session)
+    refresh: bool = False,
 ):
     """
-    Ruft Druck-Jobs/Tasks aus der Bambu Cloud ab.
+    Ruft Druck-Jobs/Tasks ab - zuerst aus dem lokalen Spiegel (cloud_tasks).
+
+    Die Cloud wird nur gefragt, wenn der Spiegel für den Filter leer ist oder refresh=true;
+    das Ergebnis landet dann ebenfalls im Spiegel.
 
     Args:
         device_id: Optional - nur Jobs von diesem Drucker
         limit: Maximale Anzahl (default: 20)
+        refresh: Spiegel umgehen und direkt aus der Cloud laden
 
     Returns:
         Liste von Tasks mit Filament-Verbrauch, Druckzeit, etc.
     """
-    config = session.exec(select(BambuCloudConfig)).first()
+    if not refresh:
+        cached = await run_in_session(cloud_task_cache.list_tasks, device_id, limit)
+        if cached:
+            cloud_task_cache.stats.count("list_hits")
+            return {
+                "status": "ok",
+                "source": "cache",
+                "count": len(cached),
+                "tasks": [_task_to_dict(t) for t in cached],
+            }
+        cloud_task_cache.stats.count("list_misses")
+
+    config = await run_in_session(_load_cloud_config)
 
     if not config or not config.access_token_encrypted:
         raise HTTPException(
@@ -657,32 +707,14 @@ async def get_cloud_tasks(
         )
 
         try:
-            tasks = await service.get_tasks(device_id=device_id, limit=limit)
+            tasks = await cloud_task_cache.fetch_and_store(service, device_id=device_id, limit=limit)
 
             # Konvertiere zu Dict für JSON Response
-            tasks_data = [
-                {
-                    "id": t.id,
-                    "title": t.title,
-                    "device_id": t.device_id,
-                    "device_name": t.device_name,
-                    "status": t.status,
-                    "weight_g": t.weight,
-                    "length_mm": t.length,
-                    "cost_time_seconds": t.cost_time,
-                    "cost_time_formatted": f"{t.cost_time // 3600}h {(t.cost_time % 3600) // 60}m" if t.cost_time else "-",
-                    "start_time": t.start_time,
-                    "end_time": t.end_time,
-                    "cover_url": t.cover_url,
-                    "thumbnail_url": t.thumbnail_url,
-                    "plate_index": t.plate_index,
-                    "ams_mapping": t.ams_mapping,
-                }
-                for t in tasks
-            ]
+            tasks_data = [_task_to_dict(t) for t in tasks]
 
             return {
                 "status": "ok",
+                "source": "cloud",
                 "count": len(tasks_data),
                 "tasks": tasks_data
             }
@@ -707,11 +739,73 @@ async def get_cloud_tasks(
 # CLOUD JOB MATCHING ENDPOINT
 # ============================================================
 
+def _load_match_context(session: Session, job_id: str):
+    from app.models.job import Job
+    from app.models.printer import Printer
+
+    job = session.get(Job, job_id)
+    printer = session.get(Printer, job.printer_id) if job and job.printer_id else None
+    config = session.exec(select(BambuCloudConfig)).first()
+    return job, printer, config
+
+
+def _find_matching_task(tasks, job, printer, printer_serial: str, job_start) -> Optional[BambuCloudTask]:
+    """Erster Task mit Name + (Drucker ODER Zeit) - siehe match_cloud_task_for_job."""
+    for task in tasks:
+        # 1. Name-Matching (case-insensitive, partial match)
+        task_title = task.title.lower() if task.title else ""
+        job_name = job.name.lower() if job.name else ""
+
+        name_match = (
+            task_title == job_name or
+            task_title in job_name or
+            job_name in task_title
+        )
+
+        # 2. Drucker-Matching (device_id, device_name, cloud_serial, bambu_device_id)
+        device_match = False
+        # Cloud device_id könnte Serial oder bambu_device_id sein
+        if task.device_id and printer_serial:
+            device_match = task.device_id == printer_serial
+        # Cloud device_name könnte Drucker-Name sein (z.B. "3DP-00M-070")
+        if not device_match and task.device_name and printer.name:
+            device_match = (
+                task.device_name.lower() == printer.name.lower() or
+                task.device_name.lower() in printer.name.lower() or
+                printer.name.lower() in task.device_name.lower()
+            )
+
+        # 3. Zeit-Matching (±24h Fenster)
+        time_match = False
+        if task.start_time and job_start:
+            try:
+                # Parse Cloud-Zeit (Format: 2026-01-30T16:06:49Z)
+                task_time_str = task.start_time.replace('Z', '')
+                task_start = datetime.fromisoformat(task_time_str)
+
+                # Job-Zeit ohne Timezone für Vergleich
+                job_start_cmp = job_start
+                if hasattr(job_start, 'tzinfo') and job_start.tzinfo:
+                    job_start_cmp = job_start.replace(tzinfo=None)
+
+                time_diff = abs((task_start - job_start_cmp).total_seconds())
+                time_match = time_diff < 86400  # 24 Stunden
+                logger.debug(f"[CLOUD MATCH] Time diff: {time_diff}s ({time_diff/3600:.1f}h)")
+            except Exception as e:
+                logger.debug(f"[CLOUD MATCH] Time compare error: {e}")
+
+        # Debug: Zeige Matching-Ergebnis für ersten paar Tasks
+        logger.debug(f"[CLOUD MATCH] Task '{task.title}': name={name_match}, device={device_match}, time={time_match}")
+
+        # Mindestens Name + (Drucker ODER Zeit) müssen matchen
+        if name_match and (device_match or time_match):
+            logger.info(f"Cloud-Task Match gefunden: {task.id} für Job {job.name}")
+            return task
+    return None
+
+
 @router.get("/tasks/match/{job_id}")
-async def match_cloud_task_for_job(
-    job_id: str,
-    session: Session = Depends(get_session)
-):
+async def match_cloud_task_for_job(job_id: str):
     """
     Sucht einen passenden Cloud-Task für einen lokalen Job.
 
@@ -720,176 +814,129 @@ async def match_cloud_task_for_job(
     2. Drucker-ID (deviceId) muss übereinstimmen
     3. Zeitfenster: Cloud-Task innerhalb ±24h des Job-Starts
 
+    Gesucht wird zuerst im lokalen Task-Spiegel (cloud_tasks, Drucker + Zeitfenster bzw.
+    normalisierter Titel); nur ohne Treffer werden die letzten 50 Tasks aus der Cloud geholt.
+
     Returns:
         Cloud-Task mit amsDetailMapping für Filament-Verbrauch pro Spule
     """
-    from app.models.job import Job
-    from app.models.printer import Printer
-
-    # Hole den lokalen Job
-    job = session.get(Job, job_id)
+    # Hole den lokalen Job + Drucker + Cloud-Konfiguration
+    job, printer, config = await run_in_session(_load_match_context, job_id)
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job nicht gefunden"
         )
 
-    # Hole den Drucker
-    printer = session.get(Printer, job.printer_id) if job.printer_id else None
     if not printer:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Job hat keinen zugewiesenen Drucker"
         )
 
-    # Cloud-Konfiguration prüfen
-    config = session.exec(select(BambuCloudConfig)).first()
-    if not config or not config.access_token_encrypted:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Kein Bambu Cloud Token konfiguriert"
-        )
-
-    try:
-        access_token = decrypt_token(config.access_token_encrypted)
-        service = BambuCloudService(
-            access_token=access_token,
-            region=config.region
-        )
+    # Job-Startzeit robust parsen
+    job_start = None
+    if job.started_at:
+        if isinstance(job.started_at, str):
+            try:
+                job_start = datetime.fromisoformat(job.started_at.replace('Z', '+00:00'))
+            except:
+                pass
+        else:
+            job_start = job.started_at
+
+    # Printer-Felder: cloud_serial, bambu_device_id, name
+    printer_serial = printer.cloud_serial or printer.bambu_device_id or ""
+    logger.debug(f"[CLOUD MATCH] Job: {job.name}, Printer: {printer.name}, Serial: {printer_serial}, Start: {job_start}")
+
+    # 1. Lokaler Spiegel
+    candidates = await run_in_session(
+        cloud_task_cache.find_candidates,
+        device_ids=[printer_serial],
+        around=job_start,
+        title=job.name,
+    )
+    matched_task = _find_matching_task(candidates, job, printer, printer_serial, job_start)
+    source = "cache"
+    cloud_task_cache.stats.count("match_hits" if matched_task else "match_misses")
+
+    # 2. Fehltreffer: Cloud fragen
+    if not matched_task:
+        # Cloud-Konfiguration prüfen
+        if not config or not config.access_token_encrypted:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kein Bambu Cloud Token konfiguriert"
+            )
 
         try:
-            # Hole Cloud-Tasks (mehr als default für besseres Matching)
-            tasks = await service.get_tasks(limit=50)
-
-            print(f"[CLOUD MATCH] Found {len(tasks)} cloud tasks for matching")
-
-            # Finde passenden Task
-            matched_task = None
-
-            # Job-Startzeit robust parsen
-            job_start = None
-            if job.started_at:
-                if isinstance(job.started_at, str):
-                    try:
-                        job_start = datetime.fromisoformat(job.started_at.replace('Z', '+00:00'))
-                    except:
-                        pass
-                else:
-                    job_start = job.started_at
-
-            # Printer-Felder: cloud_serial, bambu_device_id, name
-            printer_serial = printer.cloud_serial or printer.bambu_device_id or ""
-            print(f"[CLOUD MATCH] Job: {job.name}, Printer: {printer.name}, Serial: {printer_serial}, Start: {job_start}")
-
-            for task in tasks:
-                # 1. Name-Matching (case-insensitive, partial match)
-                task_title = task.title.lower() if task.title else ""
-                job_name = job.name.lower() if job.name else ""
-
-                name_match = (
-                    task_title == job_name or
-                    task_title in job_name or
-                    job_name in task_title
-                )
-
-                # 2. Drucker-Matching (device_id, device_name, cloud_serial, bambu_device_id)
-                device_match = False
-                # Cloud device_id könnte Serial oder bambu_device_id sein
-                if task.device_id and printer_serial:
-                    device_match = task.device_id == printer_serial
-                # Cloud device_name könnte Drucker-Name sein (z.B. "3DP-00M-070")
-                if not device_match and task.device_name and printer.name:
-                    device_match = (
-                        task.device_name.lower() == printer.name.lower() or
-                        task.device_name.lower() in printer.name.lower() or
-                        printer.name.lower() in task.device_name.lower()
-                    )
-
-                # 3. Zeit-Matching (±24h Fenster)
-                time_match = False
-                if task.start_time and job_start:
-                    try:
-                        # Parse Cloud-Zeit (Format: 2026-01-30T16:06:49Z)
-                        task_time_str = task.start_time.replace('Z', '')
-                        task_start = datetime.fromisoformat(task_time_str)
-
-                        # Job-Zeit ohne Timezone für Vergleich
-                        job_start_cmp = job_start
-                        if hasattr(job_start, 'tzinfo') and job_start.tzinfo:
-                            job_start_cmp = job_start.replace(tzinfo=None)
-
-                        time_diff = abs((task_start - job_start_cmp).total_seconds())
-                        time_match = time_diff < 86400  # 24 Stunden
-                        print(f"[CLOUD MATCH] Time diff: {time_diff}s ({time_diff/3600:.1f}h)")
-                    except Exception as e:
-                        print(f"[CLOUD MATCH] Time compare error: {e}")
-
-                # Debug: Zeige Matching-Ergebnis für ersten paar Tasks
-                print(f"[CLOUD MATCH] Task '{task.title}': name={name_match}, device={device_match}, time={time_match}")
-
-                # Mindestens Name + (Drucker ODER Zeit) müssen matchen
-                if name_match and (device_match or time_match):
-                    matched_task = task
-                    logger.info(f"Cloud-Task Match gefunden: {task.id} für Job {job.name}")
-                    print(f"[CLOUD MATCH] ✅ MATCH FOUND: Task {task.id}")
-                    break
-
-            if not matched_task:
-                return {
-                    "status": "no_match",
-                    "message": f"Kein passender Cloud-Task für '{job.name}' gefunden",
-                    "job_name": job.name,
-                    "printer_serial": printer_serial
-                }
+            access_token = decrypt_token(config.access_token_encrypted)
+            service = BambuCloudService(
+                access_token=access_token,
+                region=config.region
+            )
 
-            # Extrahiere Filament-Daten aus amsDetailMapping
-            filament_data = []
-            if matched_task.ams_mapping:
-                for mapping in matched_task.ams_mapping:
-                    filament_data.append({
-                        "ams_slot": mapping.get("ams", 0),
-                        "slot_id": mapping.get("slotId", 0),
-                        "filament_type": mapping.get("filamentType", ""),
-                        "filament_id": mapping.get("filamentId", ""),
-                        "color": mapping.get("sourceColor", mapping.get("targetColor", "")),
-                        "weight_g": float(mapping.get("weight", 0) or 0),
-                    })
+            try:
+                # Hole Cloud-Tasks (mehr als default für besseres Matching)
+                tasks = await cloud_task_cache.fetch_and_store(service, limit=50)
+                logger.debug(f"[CLOUD MATCH] Found {len(tasks)} cloud tasks for matching")
+                matched_task = _find_matching_task(tasks, job, printer, printer_serial, job_start)
+                source = "cloud"
+            finally:
+                await service.close()
+
+        except BambuCloudAuthError as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Cloud-Authentifizierung fehlgeschlagen: {e}"
+            )
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            logger.error(f"Cloud-Task Matching Fehler: {e}\n{error_details}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Fehler beim Cloud-Abgleich: {e}"
+            )
 
-            return {
-                "status": "matched",
-                "cloud_task": {
-                    "id": matched_task.id,
-                    "title": matched_task.title,
-                    "device_id": matched_task.device_id,
-                    "device_name": matched_task.device_name,
-                    "start_time": matched_task.start_time,
-                    "end_time": matched_task.end_time,
-                    "total_weight_g": matched_task.weight,
-                    "total_length_mm": matched_task.length,
-                    "cost_time_seconds": matched_task.cost_time,
-                },
-                "filament_usage": filament_data,
-                "total_weight_g": sum(f["weight_g"] for f in filament_data),
-            }
+    if not matched_task:
+        return {
+            "status": "no_match",
+            "message": f"Kein passender Cloud-Task für '{job.name}' gefunden",
+            "job_name": job.name,
+            "printer_serial": printer_serial
+        }
 
-        finally:
-            await service.close()
+    # Extrahiere Filament-Daten aus amsDetailMapping
+    filament_data = []
+    if matched_task.ams_mapping:
+        for mapping in matched_task.ams_mapping:
+            filament_data.append({
+                "ams_slot": mapping.get("ams", 0),
+                "slot_id": mapping.get("slotId", 0),
+                "filament_type": mapping.get("filamentType", ""),
+                "filament_id": mapping.get("filamentId", ""),
+                "color": mapping.get("sourceColor", mapping.get("targetColor", "")),
+                "weight_g": float(mapping.get("weight", 0) or 0),
+            })
 
-    except BambuCloudAuthError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Cloud-Authentifizierung fehlgeschlagen: {e}"
-        )
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        logger.error(f"Cloud-Task Matching Fehler: {e}\n{error_details}")
-        print(f"[CLOUD MATCH] ❌ ERROR: {e}")
-        print(f"[CLOUD MATCH] Traceback:\n{error_details}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Fehler beim Cloud-Abgleich: {e}"
-        )
+    return {
+        "status": "matched",
+        "source": source,
+        "cloud_task": {
+            "id": matched_task.id,
+            "title": matched_task.title,
+            "device_id": matched_task.device_id,
+            "device_name": matched_task.device_name,
+            "start_time": matched_task.start_time,
+            "end_time": matched_task.end_time,
+            "total_weight_g": matched_task.weight,
+            "total_length_mm": matched_task.length,
+            "cost_time_seconds": matched_task.cost_time,
+        },
+        "filament_usage": filament_data,
+        "total_weight_g": sum(f["weight_g"] for f in filament_data),
+    }
 
 
 # ============================================================
@@ -938,9 +985,10 @@ def get_sync_status(session: Session = Depends(get_session)):
 
     is_paused = config.sync_paused if config else False
     is_dry_run = config.dry_run_mode if config else False
+    cloud_sync_state.load()
 
     return BambuCloudSyncStatus(
-        is_syncing=False,  # TODO: Echten Sync-Status tracken
+        is_syncing=cloud_sync_state.is_syncing,
         is_connected=is_connected,
         is_paused=is_paused,
         is_dry_run=is_dry_run,
@@ -956,14 +1004,18 @@ def get_sync_status(session: Session = Depends(get_session)):
         connection_status=connection_status,
         last_error_message=config.last_error_message if config else None,
         token_expires_at=config.token_expires_at if config else None,
+        last_sync_report=cloud_sync_state.last_report,
     )
 
 
 @router.post("/sync/trigger")
-async def trigger_sync(session: Session = Depends(get_session)):
+async def trigger_sync(full: bool = False, session: Session = Depends(get_session)):
     """
     Löst einen manuellen Sync mit der Bambu Cloud aus.
     Beachtet Pause- und Dry-Run-Modus.
+
+    Standard ist der inkrementelle Sync; `?full=true` verwirft Cursor/Fingerprints und
+    vergleicht alles neu.
     """
     config = session.exec(select(BambuCloudConfig)).first()
 
@@ -991,11 +1043,16 @@ async def trigger_sync(session: Session = Depends(get_session)):
         )
         
         try:
-            # Vollständigen Sync durchführen
             sync_result = await service.perform_full_sync(
-                session=session,
-                conflict_resolution_mode=config.conflict_resolution_mode
+                conflict_resolution_mode=config.conflict_resolution_mode,
+                incremental=not full
             )
+            if sync_result.get("status") == "already_running":
+                # Auto-Sync (Scheduler) oder ein anderer manueller Sync laeuft gerade
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Bambu Cloud Sync läuft bereits"
+                )
             
             # Config aktualisieren
             config.last_sync_at = datetime.now().isoformat()
@@ -1056,6 +1113,9 @@ async def trigger_sync(session: Session = Depends(get_session)):
             detail=f"Sync-Fehler: {e}"
         )
         
+    except HTTPException:
+        raise
+
     except Exception as e:
         logger.error(f"Bambu Cloud Sync unerwarteter Fehler: {e}", exc_info=True)
         raise HTTPException(
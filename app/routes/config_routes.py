@@ -5,6 +5,7 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from app.database import get_session
+from app.db.executor import run_in_session
 from app.logging_setup import configure_logging
 from app.models.settings import Setting
 
@@ -492,17 +493,17 @@ def _load_config(session: Session | None = None) -> dict:
 
 
 @router.get("/api/config/current")
-async def get_current_config(session: Session = Depends(get_session)):
+async def get_current_config():
     """
     Read-only config export for the Config Manager (Pro).
     """
-    return _load_config(session)
+    return await run_in_session(_load_config)
 
 
 # GET alias for /api/config (same payload as /current)
 @router.get("/api/config")
-async def get_config_alias(session: Session = Depends(get_session)):
-    return await get_current_config(session)
+async def get_config_alias():
+    return await get_current_config()
 
 
 def _validate_payload(payload: dict) -> dict:
@@ -17,6 +17,7 @@ import sqlite3
 from app.db.session import session_scope
 from app.database import engine
 from app import database as app_database
+from app.services import table_versions
 
 
 router = APIRouter(prefix="/api/database", tags=["Database"])
@@ -265,6 +266,7 @@ def execute_editor_query(payload: SQLEditorRequest, _: None = Depends(admin_requ
                             print("Editor SQL rewritten to:", sql_up)
             session.exec(text(sql_up))
             session.commit()
+        table_versions.invalidate_all()
         return {"success": True, "message": "Befehl erfolgreich ausgeführt"}
     except Exception as exc:
         logger.error("Editor query failed: %s", exc, exc_info=True)
@@ -376,6 +378,7 @@ def restore_backup(filename: str, _: None = Depends(admin_required)):
             logger.info("Safety backup created at %s", safety_path)
 
         shutil.copy2(backup_path, DB_PATH)
+        table_versions.invalidate_all()
         logger.info("Database restored from %s", backup_path)
         _cleanup_old_backups()
         return {
@@ -443,6 +446,7 @@ def delete_row(table: str, id: str, _: None = Depends(admin_required)):
         affected = cur.rowcount
         conn.commit()
         conn.close()
+        table_versions.invalidate_all()
 
         if affected == 0:
             raise HTTPException(status_code=404, detail="Kein Eintrag mit dieser ID gefunden")
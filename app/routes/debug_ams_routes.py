@@ -1,13 +1,14 @@
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from app.services.static_assets import configure_templates
 from fastapi import Request
 
 from app.services.ams_parser import parse_ams
 from app.services.universal_mapper import UniversalMapper
 
 router = APIRouter()
-templates = Jinja2Templates(directory="frontend/templates")
+templates = configure_templates(Jinja2Templates(directory="frontend/templates"))
 
 
 def _stub_raw_payload():
@@ -51,7 +52,7 @@ async def debug_ams_page(request: Request):
 
 
 @router.get("/api/debug/ams")
-async def debug_ams_api():
+def debug_ams_api():
     raw = _stub_raw_payload()
     parsed = parse_ams(raw)
     mapper = UniversalMapper()
@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query, Request
 from app.services import log_reader
 
@@ -34,6 +35,10 @@ async def debug_logs(
     offset: int = Query(0, ge=0),
     level: str | None = Query(None, description="off/basic/verbose filter, optional"),
     search: str | None = Query(None, description="Freitext-Suche, optional"),
+    since: datetime | None = Query(None, description="Zeitbereich ab (ISO), optional"),
+    until: datetime | None = Query(None, description="Zeitbereich bis (ISO), optional"),
+    tail: bool = Query(False, description="Letzte `limit` Treffer statt ab Dateianfang"),
+    rotated: bool = Query(False, description="Rotierte Dateien (x.log.1, ...) einbeziehen"),
 ):
     try:
         allow_admin = _is_admin(request)
@@ -44,6 +49,11 @@ async def debug_logs(
             level=level,
             search=search,
             allow_admin=allow_admin,
+            # Log-Zeitstempel sind lokale Zeit ohne Zone
+            since=since.astimezone().replace(tzinfo=None) if since else None,
+            until=until.astimezone().replace(tzinfo=None) if until else None,
+            tail=tail,
+            rotated=rotated,
         )
         return result
     except log_reader.LogAccessError as exc:
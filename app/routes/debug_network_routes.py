@@ -3,7 +3,6 @@ import socket
 from typing import Optional
 import logging
 
-import psutil
 from fastapi import APIRouter
 
 router = APIRouter(
@@ -15,6 +14,8 @@ logger = logging.getLogger("app")
 
 def _private_ipv4_from_psutil() -> Optional[str]:
     try:
+        import psutil
+
         for addrs in psutil.net_if_addrs().values():
             for addr in addrs:
                 if addr.family == socket.AF_INET:
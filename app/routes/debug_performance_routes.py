@@ -1,5 +1,4 @@
 import logging
-import os
 import time
 from fastapi import APIRouter
 
@@ -8,6 +7,9 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
   psutil = None
 
+from app.monitoring.loop_watchdog import loop_watchdog
+from app.monitoring.system_sampler import system_sampler
+
 router = APIRouter(prefix="/api/debug", tags=["Debug Performance"])
 logger = logging.getLogger("app")
 
@@ -15,14 +17,6 @@ logger = logging.getLogger("app")
 app_start_ts = time.time()
 
 
-def get_disk_path():
-  cwd = os.getcwd()
-  drive, _ = os.path.splitdrive(cwd)
-  if drive:
-    return drive + os.sep
-  return "/"
-
-
 @router.get("/performance")
 async def debug_performance():
   data = {
@@ -36,31 +30,74 @@ async def debug_performance():
     "note": None,
   }
 
-  if psutil is None:
-    data["note"] = "psutil not installed"
-    return data
+  try:
+    from app.websocket.broadcaster import get_broadcast_stats
+    data["broadcast"] = get_broadcast_stats()
+  except Exception:
+    logger.exception("Broadcast stats read failed")
 
   try:
-    data["cpu_percent"] = round(psutil.cpu_percent(interval=None), 1)
+    from app.logging_setup import get_logging_stats
+    data["logging"] = get_logging_stats()
   except Exception:
-    logger.exception("CPU usage read failed")
-    data["note"] = "cpu read failed"
+    logger.exception("Logging stats read failed")
 
   try:
-    vm = psutil.virtual_memory()
-    data["ram_used_mb"] = int(vm.used / 1024 / 1024)
-    data["ram_total_mb"] = int(vm.total / 1024 / 1024)
+    from app.monitoring.ingest_metrics import ingest_metrics
+    data["ingest"] = ingest_metrics.summary()
   except Exception:
-    logger.exception("RAM usage read failed")
-    data["note"] = (data["note"] or "ram read failed")
+    logger.exception("Ingest metrics read failed")
 
   try:
-    disk_path = get_disk_path()
-    disk = psutil.disk_usage(disk_path)
-    data["disk_used_gb"] = round(disk.used / 1024 / 1024 / 1024, 2)
-    data["disk_total_gb"] = round(disk.total / 1024 / 1024 / 1024, 2)
+    data["loop"] = loop_watchdog.summary()
   except Exception:
-    logger.exception("Disk usage read failed")
-    data["note"] = (data["note"] or "disk read failed")
+    logger.exception("Loop watchdog read failed")
+
+  if psutil is None:
+    data["note"] = "psutil not installed"
+    return data
+
+  # Werte vom Hintergrund-Sampler (app.monitoring.system_sampler), keine psutil-Aufrufe im Request
+  try:
+    sample = system_sampler.current()
+    data["cpu_percent"] = sample.get("cpu_percent")
+    ram_used = sample.get("ram_used_mb")
+    ram_total = sample.get("ram_total_mb")
+    data["ram_used_mb"] = int(ram_used) if ram_used is not None else None
+    data["ram_total_mb"] = int(ram_total) if ram_total is not None else None
+    data["disk_used_gb"] = sample.get("disk_used_gb")
+    data["disk_total_gb"] = sample.get("disk_total_gb")
+    data["process"] = {
+      "rss_mb": sample.get("process_rss_mb"),
+      "cpu_percent": sample.get("process_cpu_percent"),
+      "threads": sample.get("threads"),
+      "open_fds": sample.get("open_fds"),
+      "loop_lag_ms": sample.get("loop_lag_ms"),
+      "db_size_mb": sample.get("db_size_mb"),
+      "wal_size_mb": sample.get("wal_size_mb"),
+    }
+    data["sampled_at"] = sample.get("timestamp")
+  except Exception:
+    logger.exception("System sample read failed")
+    data["note"] = "system sample read failed"
 
   return data
+
+
+@router.get("/performance/loop")
+async def debug_loop_report(limit: int = 20):
+  """Event-Loop-Lag, Blockaden mit Aufrufstelle und (im DB-Debug-Modus) SQL auf dem Loop-Thread."""
+  return loop_watchdog.report(limit=max(1, min(limit, 100)))
+
+
+@router.post("/performance/loop/db-debug")
+async def debug_loop_db_debug(enabled: bool = True):
+  """DB-Debug-Modus umschalten: meldet synchrone SQL-Aufrufe auf dem Event-Loop."""
+  loop_watchdog.set_db_debug(enabled)
+  return {"ok": True, "db_debug": loop_watchdog.db_debug}
+
+
+@router.delete("/performance/loop")
+async def debug_loop_reset():
+  loop_watchdog.reset()
+  return {"ok": True}
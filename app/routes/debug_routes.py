@@ -16,7 +16,7 @@ from app.models.settings import Setting
 from app.models.material import Material
 from app.models.spool import Spool
 from app.services.spool_number_service import assign_spool_number
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 router = APIRouter(prefix="/api/debug", tags=["Debug & Config"])
@@ -606,14 +606,21 @@ async def apply_spoolman_import(
 
 
 @router.get("/logs")
-def get_logs(module: str = "app", limit: int = 100):
+def get_logs(module: str = "app", limit: int = 100, since: Optional[str] = None, until: Optional[str] = None):
     """
     Gibt Log-Eintraege zurueck.
-    Query-Parameter: module (app|mqtt|bambu|services|database|errors), limit (default: 100)
+    Query-Parameter: module (app|mqtt|bambu|services|database|errors), limit (default: 100),
+    since/until (optional, ISO-Zeitstempel fuer einen Zeitbereich).
+
+    Ohne Zeitbereich werden die letzten `limit` Eintraege rueckwaerts ab Dateiende gelesen,
+    mit Zeitbereich wird per Sparse-Index gesprungen und vorwaerts bis `limit` gelesen.
+    Rotierte Dateien (.1, .2, ...) werden dabei mit einbezogen.
     """
     import glob
     import re
     from datetime import datetime
+    from pathlib import Path
+    from app.services import log_reader
 
     requested_module = (module or "app").lower()
     module_map = {
@@ -664,54 +671,72 @@ def get_logs(module: str = "app", limit: int = 100):
 
     log_file = max(log_files, key=os.path.getmtime)
 
+    def _parse_ts(value: Optional[str]):
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "")).replace(tzinfo=None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Ungueltiger Zeitstempel: {value}")
+
+    since_ts = _parse_ts(since)
+    until_ts = _parse_ts(until)
+
+    log_pattern = re.compile(
+        r'^(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:,\d{3})?)\s+\[(\w+)\]\s+([\w\.]+)\s+[\u2013\u2014\-]?\s*(.+)$'
+    )
+
+    def _wanted(line: str) -> bool:
+        if not line.strip():
+            return False
+        if not module_filter:
+            return True
+        match = log_pattern.match(line.strip())
+        return bool(match and match.group(3) == module_filter)
+
     logs = []
     total_lines_read = 0
     try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            total_lines_read = len(lines)
-            # Wenn wir filtern, lesen wir die ganze Datei, sonst nur die letzten Zeilen
-            if not module_filter:
-                lines = lines[-limit:]
-
-            log_pattern = re.compile(
-                r'^(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:,\d{3})?)\s+\[(\w+)\]\s+([\w\.]+)\s+[\u2013\u2014\-]?\s*(.+)$'
-            )
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                match = log_pattern.match(line)
-                if match:
-                    timestamp, level, log_module, message = match.groups()
-                    if module_filter and log_module != module_filter:
-                        continue
-                    logs.append({
-                        "timestamp": timestamp,
-                        "module": log_module,
-                        "level": level,
-                        "message": message,
-                    })
+        if since_ts is None and until_ts is None:
+            lines = log_reader.tail_lines(Path(log_file), limit, _wanted)
+        else:
+            lines = []
+            for line in log_reader.iter_chain_forward(Path(log_file), since=since_ts, until=until_ts):
+                if _wanted(line):
+                    lines.append(line)
+                    if len(lines) >= limit:
+                        break
+        total_lines_read = len(lines)
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            match = log_pattern.match(line)
+            if match:
+                timestamp, level, log_module, message = match.groups()
+                logs.append({
+                    "timestamp": timestamp,
+                    "module": log_module,
+                    "level": level,
+                    "message": message,
+                })
+            else:
+                timestamp_match = re.match(r'^(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:,\d{3})?)', line)
+                if timestamp_match:
+                    timestamp = timestamp_match.group(1)
+                    message = line[len(timestamp):].strip()
                 else:
-                    timestamp_match = re.match(r'^(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:,\d{3})?)', line)
-                    if timestamp_match:
-                        timestamp = timestamp_match.group(1)
-                        message = line[len(timestamp):].strip()
-                    else:
-                        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        message = line
-
-                    if module_filter:
-                        continue
-
-                    logs.append({
-                        "timestamp": timestamp,
-                        "module": module_key,
-                        "level": "INFO",
-                        "message": message,
-                    })
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    message = line
+
+                logs.append({
+                    "timestamp": timestamp,
+                    "module": module_key,
+                    "level": "INFO",
+                    "message": message,
+                })
 
     except Exception as exc:
         logging.getLogger("errors").exception("Failed to read logs for module %s", requested_module)
@@ -723,10 +748,6 @@ def get_logs(module: str = "app", limit: int = 100):
             "file": log_file if "log_file" in locals() else None,
         }
 
-    # Limit anwenden NACH dem Filtern (wenn module_filter gesetzt ist)
-    if module_filter and len(logs) > limit:
-        logs = logs[-limit:]
-
     return {
         "logs": logs,
         "count": len(logs),
@@ -735,6 +756,7 @@ def get_logs(module: str = "app", limit: int = 100):
         "debug": {
             "total_lines_read": total_lines_read,
             "file_path": log_file,
+            "files": [str(p) for p in log_reader.log_file_chain(Path(log_file))],
             "limit": limit,
         },
     }
@@ -930,101 +952,206 @@ async def inject_mqtt_message(req: MqttInjectRequest):
     POST /api/debug/mqtt/inject
     Body: { "topic": "device/SERIAL/report", "payload": { "print": { ... } } }
     """
-    import json
+    try:
+        return await _inject_message(req.topic, req.payload)
+    except Exception as e:
+        logging.getLogger("debug").exception("[MQTT INJECT] Fehler beim Verarbeiten")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _inject_message(topic: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Verarbeitet eine Nachricht wie ein echter MQTT-Empfang (genutzt von inject und replay)."""
     logger = logging.getLogger("debug")
 
-    try:
-        from app.services.mqtt_payload_processor import process_mqtt_payload
-        from app.routes.mqtt_routes import printer_service_ref, broadcast_message
-        from app.services.job_tracking_service import job_tracking_service
-        from app.models.printer import Printer
-        from sqlmodel import select
+    from app.services.mqtt_payload_processor import process_mqtt_payload
+    from app.routes.mqtt_routes import printer_service_ref, broadcast_message
+    from app.services.job_tracking_service import job_tracking_service
+    from app.models.printer import Printer
+    from sqlmodel import select
+
+    payload_str = json.dumps(payload)
 
-        payload_str = json.dumps(req.payload)
+    # Verarbeite wie echter MQTT-Empfang
+    proc = process_mqtt_payload(topic, payload_str, printer_service_ref)
 
-        # Verarbeite wie echter MQTT-Empfang
-        proc = process_mqtt_payload(req.topic, payload_str, printer_service_ref)
+    ams_data = proc.get("ams") or []
+    job_data = proc.get("job") or {}
+    mapped_dict = proc.get("mapped_dict")
 
-        ams_data = proc.get("ams") or []
-        job_data = proc.get("job") or {}
-        mapped_dict = proc.get("mapped_dict")
+    # Serial aus Topic extrahieren (device/SERIAL/report)
+    serial = proc.get("serial") or ""
+    try:
+        parts = topic.split("/")
+        if len(parts) >= 2 and parts[0] == "device":
+            serial = parts[1]
+    except Exception:
+        pass
+
+    logger.info(f"[MQTT INJECT] topic={topic} serial={serial} state={job_data.get('gcode_state','?')}")
 
-        # Serial aus Topic extrahieren (device/SERIAL/report)
-        serial = proc.get("serial") or ""
+    # Printer-ID aus DB holen (für Job-Tracking nötig)
+    printer_id = None
+    if serial:
         try:
-            parts = req.topic.split("/")
-            if len(parts) >= 2 and parts[0] == "device":
-                serial = parts[1]
-        except Exception:
-            pass
+            with next(get_session()) as _sess:
+                p = _sess.exec(select(Printer).where(Printer.cloud_serial == serial)).first()
+                if p:
+                    printer_id = p.id
+        except Exception as pe:
+            logger.debug(f"[MQTT INJECT] Printer lookup failed: {pe}")
+
+    # ============================================================
+    # JOB-TRACKING (identisch zur normalen MQTT-Pipeline)
+    # Läuft im Thread-Pool um den async Event-Loop nicht zu blockieren
+    # ============================================================
+    job_tracking_result = None
+    if topic.endswith("/report") and serial:
+        try:
+            import asyncio
+            loop = asyncio.get_event_loop()
+            ams_list = [dict(u) for u in ams_data] if ams_data else None
+
+            def _run_job_tracking():
+                return job_tracking_service.process_message(
+                    cloud_serial=serial,
+                    parsed_payload=payload,
+                    printer_id=printer_id,
+                    ams_data=ams_list,
+                )
+
+            job_tracking_result = await loop.run_in_executor(None, _run_job_tracking)
+            if job_tracking_result:
+                logger.info(f"[MQTT INJECT] Job-Tracking: {job_tracking_result}")
+        except Exception as jt_err:
+            logger.exception(f"[MQTT INJECT] Job-Tracking fehlgeschlagen: {jt_err}")
+
+    # Broadcast an WebSocket-Clients (Dashboard-Updates)
+    try:
+        from types import SimpleNamespace
+        fake_msg = SimpleNamespace(topic=topic, payload_str=payload_str)
+        await broadcast_message(
+            fake_msg,
+            ams_data=ams_data,
+            job_data=job_data,
+            printer_data=mapped_dict,
+            raw_payload=payload_str
+        )
+    except Exception as bc_err:
+        logger.debug(f"[MQTT INJECT] broadcast failed (non-critical): {bc_err}")
 
-        logger.info(f"[MQTT INJECT] topic={req.topic} serial={serial} state={job_data.get('gcode_state','?')}")
+    return {
+        "success": True,
+        "serial": serial,
+        "printer_id": printer_id,
+        "gcode_state": job_data.get("gcode_state"),
+        "layer": job_data.get("layer_num"),
+        "total_layers": job_data.get("total_layer_num"),
+        "ams_slots": len(ams_data),
+        "job_tracking": job_tracking_result,
+    }
 
-        # Printer-ID aus DB holen (für Job-Tracking nötig)
-        printer_id = None
-        if serial:
-            try:
-                with next(get_session()) as _sess:
-                    p = _sess.exec(select(Printer).where(Printer.cloud_serial == serial)).first()
-                    if p:
-                        printer_id = p.id
-            except Exception as pe:
-                logger.debug(f"[MQTT INJECT] Printer lookup failed: {pe}")
-
-        # ============================================================
-        # JOB-TRACKING (identisch zur normalen MQTT-Pipeline)
-        # Läuft im Thread-Pool um den async Event-Loop nicht zu blockieren
-        # ============================================================
-        job_tracking_result = None
-        if req.topic.endswith("/report") and serial:
-            try:
-                import asyncio
-                loop = asyncio.get_event_loop()
-                ams_list = [dict(u) for u in ams_data] if ams_data else None
-
-                def _run_job_tracking():
-                    return job_tracking_service.process_message(
-                        cloud_serial=serial,
-                        parsed_payload=req.payload,
-                        printer_id=printer_id,
-                        ams_data=ams_list,
-                    )
-
-                job_tracking_result = await loop.run_in_executor(None, _run_job_tracking)
-                if job_tracking_result:
-                    logger.info(f"[MQTT INJECT] Job-Tracking: {job_tracking_result}")
-            except Exception as jt_err:
-                logger.exception(f"[MQTT INJECT] Job-Tracking fehlgeschlagen: {jt_err}")
-
-        # Broadcast an WebSocket-Clients (Dashboard-Updates)
+
+# ============================================================
+# MQTT CAPTURE + REPLAY (app/services/mqtt_capture.py, mqtt_replay.py)
+# ============================================================
+
+class MqttCaptureRequest(BaseModel):
+    enabled: bool
+    compression: Optional[str] = None
+    segment_max_mb: Optional[float] = None
+    segment_max_minutes: Optional[float] = None
+    retention_max_mb: Optional[float] = None
+    retention_days: Optional[float] = None
+
+
+class MqttReplayRequest(BaseModel):
+    segment: Optional[str] = None  # Dateiname im Capture-Verzeichnis; leer = alle Segmente
+    speed: Any = 1  # 1 = Originaltempo, N = N-fach, "max" = ohne Pausen
+    serial: Optional[str] = None
+    topic_contains: Optional[str] = None
+    limit: Optional[int] = None
+
+
+_replay_state: Dict[str, Any] = {"task": None, "stats": None, "stop": None}
+
+
+@router.get("/mqtt/capture")
+def get_mqtt_capture():
+    """Status der MQTT-Aufzeichnung inkl. vorhandener Segmente."""
+    from app.services.mqtt_capture import list_segments, mqtt_capture
+
+    segments = []
+    for path in list_segments(mqtt_capture.directory):
         try:
-            class FakeMsg:
-                topic = req.topic
-                payload_str = json.dumps(req.payload)
-            await broadcast_message(
-                FakeMsg(),
-                ams_data=ams_data,
-                job_data=job_data,
-                printer_data=mapped_dict,
-                raw_payload=payload_str
-            )
-        except Exception as bc_err:
-            logger.debug(f"[MQTT INJECT] broadcast failed (non-critical): {bc_err}")
+            st = path.stat()
+        except OSError:
+            continue
+        segments.append({"name": path.name, "bytes": st.st_size, "modified": datetime.fromtimestamp(st.st_mtime).isoformat()})
+    return {**mqtt_capture.status(), "files": segments}
 
-        return {
-            "success": True,
-            "serial": serial,
-            "printer_id": printer_id,
-            "gcode_state": job_data.get("gcode_state"),
-            "layer": job_data.get("layer_num"),
-            "total_layers": job_data.get("total_layer_num"),
-            "ams_slots": len(ams_data),
-            "job_tracking": job_tracking_result,
-        }
 
-    except Exception as e:
-        logger.exception("[MQTT INJECT] Fehler beim Verarbeiten")
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/mqtt/capture")
+def set_mqtt_capture(req: MqttCaptureRequest):
+    """Aufzeichnung zur Laufzeit starten/stoppen (Overrides gelten bis zum Neustart)."""
+    from app.services.mqtt_capture import load_capture_config, mqtt_capture
+
+    if not req.enabled:
+        return mqtt_capture.stop()
+    cfg = dict(load_capture_config())
+    overrides = req.model_dump(exclude_none=True, exclude={"enabled"})
+    cfg.update(overrides)
+    return mqtt_capture.start(cfg)
+
+
+@router.post("/mqtt/replay")
+async def start_mqtt_replay(req: MqttReplayRequest):
+    """Spielt eine Aufzeichnung im Hintergrund durch die Inject-Pipeline ab."""
+    import asyncio
+    from app.services.mqtt_capture import iter_capture, mqtt_capture
+    from app.services.mqtt_replay import ReplayStats, filter_records, parse_speed, replay
+
+    task = _replay_state.get("task")
+    if task is not None and not task.done():
+        raise HTTPException(status_code=409, detail="Replay läuft bereits")
+    try:
+        speed = parse_speed(req.speed)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Ungültige Geschwindigkeit")
+
+    directory = mqtt_capture.directory.resolve()
+    source = directory
+    if req.segment:
+        # Nur Dateien direkt im Capture-Verzeichnis erlauben
+        source = (directory / os.path.basename(req.segment)).resolve()
+        if source.parent != directory or not source.is_file():
+            raise HTTPException(status_code=404, detail="Segment nicht gefunden")
+    elif not directory.is_dir():
+        raise HTTPException(status_code=404, detail="Keine Aufzeichnungen vorhanden")
+
+    records = filter_records(iter_capture(source), serial=req.serial, topic_contains=req.topic_contains, limit=req.limit)
+    stats = ReplayStats(source=source.name, speed=speed)
+    stop_event = asyncio.Event()
+    _replay_state.update(
+        task=asyncio.create_task(replay(records, _inject_message, speed=speed, stats=stats, stop_event=stop_event)),
+        stats=stats,
+        stop=stop_event,
+    )
+    logging.getLogger("debug").info("[MQTT REPLAY] gestartet: %s speed=%s", source.name, req.speed)
+    return stats.as_dict()
+
+
+@router.get("/mqtt/replay")
+def get_mqtt_replay():
+    stats = _replay_state.get("stats")
+    return stats.as_dict() if stats is not None else {"running": False}
+
+
+@router.delete("/mqtt/replay")
+def stop_mqtt_replay():
+    stop_event = _replay_state.get("stop")
+    if stop_event is not None:
+        stop_event.set()
+    return get_mqtt_replay()
 
 
 
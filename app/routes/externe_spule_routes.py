@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from app.services.static_assets import configure_templates
 
 router = APIRouter(tags=["External Spool"])
 
-templates = Jinja2Templates(directory="frontend/templates")
+templates = configure_templates(Jinja2Templates(directory="frontend/templates"))
 
 @router.get("/externe-spule", response_class=HTMLResponse)
 async def externe_spule_page(request: Request):
@@ -0,0 +1,194 @@
+"""Schnelle JSON-Antworten fuer die grossen API-Endpunkte, mit optionalem ``?fields=``.
+
+Verwendung im Router::
+
+    router = APIRouter(prefix="/api/jobs", route_class=FastJSONRoute,
+                       default_response_class=FastJSONResponse)
+
+- ``FastJSONResponse`` serialisiert mit orjson (Fallback: json, falls orjson fehlt). datetime,
+  UUID, Enum und Dataclasses kann orjson direkt; alles andere (SQLModel-Objekte, Decimal, set)
+  laeuft pro Objekt ueber FastAPIs jsonable_encoder.
+- ``FastJSONRoute`` gibt bei Endpunkten ohne ``response_model`` den Rueckgabewert direkt an
+  FastJSONResponse weiter, statt ihn vorher komplett durch jsonable_encoder zu schicken.
+  Endpunkte mit ``Response``-Parameter (setzen eigene Header), eigener response_class oder
+  abweichendem Status bleiben beim normalen FastAPI-Weg.
+- ``?fields=id,name,status`` (sparse fieldsets): nur diese Schluessel pro Datensatz ausliefern.
+  Datensaetze sind die Elemente einer Liste, die Werte eines Dicts aus lauter Dicts
+  (z.B. Live-State pro Drucker) bzw. die Listen in einer Huelle wie ``{"messages": [...]}``.
+  Punkt-Pfade waehlen verschachtelte Schluessel (``fields=id,payload.gcode_state``).
+
+Serialisierungszeit und Groesse pro Route: app.monitoring.payload_metrics.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, get_args, get_origin
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.utils import get_typed_return_annotation
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.monitoring.payload_metrics import payload_metrics
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optionale Abhaengigkeit
+    orjson = None
+
+FIELDS_PARAM = "fields"
+MAX_FIELDS = 64
+
+# (route, fields) des laufenden Requests; von FastJSONRoute gesetzt, von render() gelesen.
+# Sync-Endpunkte rendern im Threadpool - anyio kopiert den Kontext dorthin.
+_request_ctx: ContextVar[Optional[Tuple[str, Optional[FrozenSet[str]]]]] = ContextVar("fast_json_request", default=None)
+
+
+def parse_fields(raw: Optional[str]) -> Optional[FrozenSet[str]]:
+    if not raw:
+        return None
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    return frozenset(names[:MAX_FIELDS]) or None
+
+
+def _pick(record: Dict[str, Any], fields: FrozenSet[str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    nested: Dict[str, set] = {}
+    for name in fields:
+        head, _, rest = name.partition(".")
+        if rest:
+            nested.setdefault(head, set()).add(rest)
+        elif head in record:
+            result[head] = record[head]
+    for head, rest in nested.items():
+        if head in result or head not in record:
+            continue
+        value = record[head]
+        result[head] = _pick(value, frozenset(rest)) if isinstance(value, dict) else value
+    return result
+
+
+def select_fields(payload: Any, fields: Optional[FrozenSet[str]]) -> Any:
+    """Sparse fieldset auf Datensaetze anwenden (siehe Moduldoku); sonst unveraendert."""
+    if not fields:
+        return payload
+    if isinstance(payload, list):
+        return [_pick(item, fields) if isinstance(item, dict) else item for item in payload]
+    if isinstance(payload, dict) and payload:
+        values = list(payload.values())
+        if all(isinstance(value, dict) for value in values):
+            return {key: _pick(value, fields) for key, value in payload.items()}
+        result = dict(payload)
+        for key, value in payload.items():
+            if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                result[key] = [_pick(item, fields) for item in value]
+        return result
+    return payload
+
+
+def _default(obj: Any) -> Any:
+    return jsonable_encoder(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:  # pragma: no cover
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter_ns()
+        ctx = _request_ctx.get()
+        fields = ctx[1] if ctx else None
+        body = dumps(select_fields(content, fields))
+        if ctx is not None:
+            payload_metrics.record_serialize(ctx[0], len(body), time.perf_counter_ns() - started, sparse=fields is not None)
+        return body
+
+
+def _takes_response(endpoint: Callable[..., Any]) -> bool:
+    try:
+        parameters = inspect.signature(endpoint).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(
+        inspect.isclass(param.annotation) and issubclass(param.annotation, Response)
+        for param in parameters
+    )
+
+
+def _plain_return(endpoint: Callable[..., Any]) -> bool:
+    """Nur Endpunkte ohne Modell-Rueckgabetyp umgehen die Validierung (-> Any, dict, list, ...)."""
+    try:
+        annotation = get_typed_return_annotation(endpoint)
+    except Exception:
+        return False
+    if annotation in (None, inspect.Signature.empty, Any):
+        return True
+    origin = get_origin(annotation) or annotation
+    if origin not in (dict, list):
+        return False
+    return not any(inspect.isclass(arg) and issubclass(arg, BaseModel) for arg in get_args(annotation))
+
+
+def _wrap_endpoint(endpoint: Callable[..., Any], status_code: int) -> Callable[..., Any]:
+    """Rueckgabewert ohne jsonable_encoder-Durchlauf direkt als FastJSONResponse ausliefern."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            result = await endpoint(*args, **kwargs)
+            return result if isinstance(result, Response) else FastJSONResponse(result, status_code=status_code)
+        async_wrapper.__fast_json__ = True  # type: ignore[attr-defined]
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = endpoint(*args, **kwargs)
+        return result if isinstance(result, Response) else FastJSONResponse(result, status_code=status_code)
+    sync_wrapper.__fast_json__ = True  # type: ignore[attr-defined]
+    return sync_wrapper
+
+
+class FastJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        response_class = kwargs.get("response_class")
+        actual_class = getattr(response_class, "value", response_class)
+        response_model = kwargs.get("response_model")
+        status_code = kwargs.get("status_code") or 200
+        if (
+            not getattr(endpoint, "__fast_json__", False)  # include_router legt die Route erneut an
+            and (response_model is None or (isinstance(response_model, DefaultPlaceholder) and _plain_return(endpoint)))
+            and actual_class is FastJSONResponse
+            and status_code == 200
+            and not _takes_response(endpoint)
+        ):
+            endpoint = _wrap_endpoint(endpoint, status_code)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def fast_json_route_handler(request: Request) -> Response:
+            token = _request_ctx.set((route, parse_fields(request.query_params.get(FIELDS_PARAM))))
+            try:
+                return await handler(request)
+            finally:
+                _request_ctx.reset(token)
+
+        return fast_json_route_handler
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
 from sqlmodel import Session, SQLModel, select, col
 from typing import List, Optional, Any
 from datetime import datetime
@@ -13,7 +14,7 @@ from app.services.eta import calculate_eta
 from app.services.eta.bambu_a_series_eta import estimate_remaining_time_from_layers
 import logging
 
-router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 logger = logging.getLogger("app")
 
 _NO_CACHE_HEADERS = {
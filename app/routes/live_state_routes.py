@@ -1,15 +1,16 @@
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
 
-from app.database import get_session
+from app.db.executor import run_in_session
 from sqlmodel import select
 from app.models.printer import Printer
 from app.services import mqtt_runtime
 from app.services.live_state import get_live_state, get_all_live_state
 
-router = APIRouter(prefix="/api/live-state", tags=["LiveState"])
+router = APIRouter(prefix="/api/live-state", tags=["LiveState"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 OFFLINE_TIMEOUT = 60  # Sekunden ohne MQTT-Nachricht bis "Offline" (vorher 15s, zu aggressiv)
 
@@ -104,14 +105,22 @@ def _build_live_entry(
     }
 
 
+def _load_printer_by_serial(session, device_id: str) -> Optional[Printer]:
+    return session.exec(select(Printer).where(Printer.cloud_serial == device_id)).first()
+
+
+def _load_printers(session) -> list:
+    return list(session.exec(select(Printer)).all())
+
+
 @router.get("/{device_id}")
-async def get_live_state_endpoint(device_id: str, request: Request, session=Depends(get_session)) -> Any:
+async def get_live_state_endpoint(device_id: str, request: Request) -> Any:
     live = get_live_state(device_id)
     printer_service = _get_printer_service(request)
     now = datetime.now(timezone.utc)
     runtime_status = mqtt_runtime.status()
 
-    printer = session.exec(select(Printer).where(Printer.cloud_serial == device_id)).first()
+    printer = await run_in_session(_load_printer_by_serial, device_id)
     if not printer:
         raise HTTPException(status_code=404, detail="Live state not found")
 
@@ -119,14 +128,14 @@ async def get_live_state_endpoint(device_id: str, request: Request, session=Depe
 
 
 @router.get("/")
-async def list_live_state(request: Request, session=Depends(get_session)) -> Any:
+async def list_live_state(request: Request) -> Any:
     live = get_all_live_state()
     printer_service = _get_printer_service(request)
     now = datetime.now(timezone.utc)
     runtime_status = mqtt_runtime.status()
 
     result: Dict[str, Any] = {}
-    printers = session.exec(select(Printer)).all()
+    printers = await run_in_session(_load_printers)
     for printer in printers:
         # [BETA] Klipper-Support: _get_live_key() statt cloud_serial,
         # damit Klipper-Drucker nicht mehr übersprungen werden
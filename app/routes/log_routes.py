@@ -2,7 +2,6 @@ from typing import Dict, List, TypedDict, Any
 
 from fastapi import APIRouter, Query
 
-from app.routes import debug_routes
 
 router = APIRouter(prefix="/api/logs", tags=["Logs"])
 
@@ -40,6 +39,8 @@ def _format_lines(logs: List[LogEntry]) -> List[str]:
 
 def _fetch_logs(module: str, limit: int = 200) -> LogFetchResult:
     normalized = _normalize_module(module)
+    from app.routes import debug_routes  # Log-Reader lebt im Debug-Modul; erst bei Bedarf laden
+
     data: Any = debug_routes.get_logs(module=normalized, limit=limit)
     if not isinstance(data, dict):
         return {"logs": [], "count": 0, "module": normalized}
@@ -25,7 +25,7 @@ Endpunkte:
 import logging
 from typing import Optional
 
-import httpx
+from app.services.http_clients import http_clients
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from sqlmodel import Session, select
@@ -200,12 +200,11 @@ async def send_mmu_gcode(printer_id: str, body: GcodeRequest):
     printer = _get_printer_or_404(printer_id)
     base_url = f"http://{printer.ip_address}:{printer.port or 7125}"
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{base_url}/printer/gcode/script",
-                json={"script": body.script},
-                timeout=5.0,
-            )
+        resp = await http_clients.get("moonraker").post(
+            f"{base_url}/printer/gcode/script",
+            json={"script": body.script},
+            timeout=5.0,
+        )
         if resp.status_code != 200:
             raise HTTPException(status_code=502, detail=f"Moonraker: HTTP {resp.status_code}")
         return {"ok": True}
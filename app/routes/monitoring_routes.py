@@ -3,7 +3,9 @@ Monitoring API Routes
 Real-time performance metrics and health monitoring
 """
 from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
 from typing import Optional
+from app.monitoring.request_metrics import request_metrics
 from app.services.performance_monitoring import get_performance_monitor
 
 router = APIRouter()
@@ -176,3 +178,38 @@ def get_performance_alerts():
         "alert_count": len(alerts),
         "alerts": alerts
     }
+
+
+@router.get("/api/monitoring/metrics", response_class=PlainTextResponse)
+def get_prometheus_metrics():
+    """
+    Prometheus scrape endpoint (text format 0.0.4)
+
+    Request counters and latency histograms per route template,
+    plus MQTT ingest stage latencies.
+    """
+    return PlainTextResponse(
+        request_metrics.prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/api/monitoring/throughput")
+def get_request_throughput(resolution: str = Query("second", pattern="^(second|minute)$")):
+    """
+    Request rate time series
+
+    Args:
+        resolution: "second" (last 60 s) or "minute" (last 60 min)
+
+    Returns:
+        Per-slot request count, error count and average latency
+    """
+    import time
+
+    ring = request_metrics.seconds if resolution == "second" else request_metrics.minutes
+    return {
+        "resolution": resolution,
+        "in_flight": request_metrics.in_flight,
+        "series": ring.series(time.time()),
+    }
@@ -1,11 +1,9 @@
 import asyncio
 
-import os
-
 import time
 import threading
 
-from collections import deque
+from pathlib import Path
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
 import json
@@ -17,6 +15,7 @@ from typing import Dict, Any, Optional, Sequence, Set, List, cast
 import paho.mqtt.client as mqtt
 from sqlmodel import select, Session
 from app.database import get_session
+from app.db.executor import run_in_session
 from services.printer_service import PrinterService
 
 import sqlalchemy as sa
@@ -25,6 +24,7 @@ from app.services import mqtt_runtime
  
 from pydantic import BaseModel
 from fastapi import Request
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
 
 from app.services.mqtt_payload_processor import process_mqtt_payload
 from app.services.ams_parser import parse_ams, _to_int
@@ -32,6 +32,15 @@ from app.services.job_parser import parse_job
 from app.services.universal_mapper import UniversalMapper
 from app.services.printer_auto_detector import PrinterAutoDetector
 from app.services.live_state import set_live_state
+from app.websocket.broadcaster import get_channel
+from app.websocket.delta_stream import DeltaStreamSession, parse_rate, raw_channel
+from app.services import live_delta
+from app.services.message_journal import journal as message_journal
+from app.services.mqtt_capture import mqtt_capture
+from app.monitoring.ingest_metrics import ingest_metrics
+from app.services import log_reader
+from app.services.log_tail import log_tail_service, make_line_filter
+from app.logging.hot_path import ingest_trace, lazy
 from app.services.ams_sync import sync_ams_slots
 from app.services.job_tracking_service import job_tracking_service
 
@@ -41,7 +50,7 @@ from services.mqtt_protocol_detector import MQTTProtocolDetector
 
 # ...existing code...
 
-router = APIRouter(prefix="/api/mqtt", tags=["MQTT"])
+router = APIRouter(prefix="/api/mqtt", tags=["MQTT"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 # === AUTO-CONNECT STARTUP HELPER (Multi-Printer Support) ===
 def startup_connect_printer(printer) -> bool:
@@ -89,6 +98,9 @@ def startup_connect_printer(printer) -> bool:
         def on_connect_startup(client, userdata, flags, rc_or_reason, properties=None):
             # rc_or_reason: bei v3.1.1 ist es int, bei v5 ist es ReasonCode object
             rc_value = rc_or_reason if isinstance(rc_or_reason, int) else rc_or_reason.value
+            # Fuer den Connection-Manager: abgelehnte Anmeldung von "nicht erreichbar" unterscheiden
+            if isinstance(userdata, dict):
+                userdata["connack_rc"] = rc_value
             if rc_value == 0:
                 logger.info(f"✓ Auto-connect: {printer.name} verbunden (protocol={'v5' if mqtt_protocol == mqtt.MQTTv5 else 'v3.1.1'})")
                 # Subscribe zum device topic
@@ -208,9 +220,11 @@ def set_shutdown_event(event: asyncio.Event):
 
 
 @router.websocket("/ws/logs/{module}")
-
 async def websocket_logs(websocket: WebSocket, module: str):
+    """Live-Log-Stream. Alle Viewer einer Datei teilen sich einen Watcher (app/services/log_tail.py).
 
+    Query-Parameter: tail=N (Historie), level=WARNING (Mindest-Level), search=text.
+    """
     await websocket.accept()
 
     log_file_map = {
@@ -218,70 +232,51 @@ async def websocket_logs(websocket: WebSocket, module: str):
         "bambu": "logs/bambu/bambu.log",
         "klipper": "logs/klipper/klipper.log",
         "errors": "logs/errors/errors.log",
-        "mqtt": "logs/mqtt/mqtt_messages.log",
+        "mqtt": "logs/mqtt/mqtt.log",
     }
 
     log_file = log_file_map.get(module)
+    if not log_file:
+        await websocket.close(code=1008)
+        return
 
+    params = websocket.query_params
+    level = params.get("level") or None
+    search = params.get("search") or None
+    tail_param = params.get("tail", "0")
     try:
-        # Optional: nur die letzten N Zeilen senden (tail). Default: 0 = keine Historie
-        tail_param = websocket.query_params.get("tail", "0") if hasattr(websocket, "query_params") else "0"
-        try:
-            tail = int(tail_param)
-        except Exception:
-            logging.getLogger("mqtt").exception("Invalid tail parameter for log websocket: %s", tail_param)
-            tail = 0
+        tail = max(0, min(int(tail_param), log_reader.MAX_LIMIT))
+    except Exception:
+        logging.getLogger("mqtt").exception("Invalid tail parameter for log websocket: %s", tail_param)
+        tail = 0
 
-        last_size = 0
-        if log_file and os.path.exists(log_file):
-            # Falls tail > 0 angefordert wurde, sende letzte N Zeilen; ansonsten überspringe Historie
-            if tail > 0:
-                try:
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        dq = deque(f, maxlen=tail)
-                    for line in dq:
-                        await websocket.send_text(line.strip())
-                except Exception:
-                    logging.getLogger("mqtt").exception("Failed to send initial log tail for module=%s", module)
-            # setze Startposition auf Dateiende, damit keine Historie erneut gesendet wird
+    client = None
+    try:
+        # Historie rueckwaerts vom Dateiende lesen (ohne die ganze Datei zu laden)
+        if tail > 0:
             try:
-                last_size = os.path.getsize(log_file)
+                history = await asyncio.to_thread(
+                    log_reader.tail_lines, Path(log_file), tail, make_line_filter(level, search)
+                )
+                for line in history:
+                    await websocket.send_text(line)
+            except WebSocketDisconnect:
+                raise
             except Exception:
-                logging.getLogger("mqtt").exception("Failed to get log file size for module=%s", module)
-                last_size = 0
+                logging.getLogger("mqtt").exception("Failed to send initial log tail for module=%s", module)
 
+        client = await log_tail_service.subscribe(
+            log_file, websocket.send_text, level=level, search=search, label=f"logs:{module}"
+        )
+        # Eingehende Nachrichten werden ignoriert; receive_text erkennt den Disconnect
         while True:
-
-            if log_file:
-
-                try:
-
-                    with open(log_file, "r", encoding="utf-8") as f:
-
-                        f.seek(last_size)
-
-                        new_lines = f.readlines()
-
-                        last_size = f.tell()
-
-                        for line in new_lines:
-
-                            await websocket.send_text(line.strip())
-
-                except FileNotFoundError:
-
-                    logging.getLogger("mqtt").exception("Log file not found for module=%s during websocket stream", module)
-
-            # ✅ Shutdown-Signal prüfen (beende Schleife bei Shutdown)
-            if _shutdown_event and _shutdown_event.is_set():
-                logging.getLogger("mqtt").info("Websocket logs shutdown signal received for module=%s", module)
-                break
-            
-            await asyncio.sleep(1)
+            await websocket.receive_text()
 
     except WebSocketDisconnect as exc:
         logging.getLogger("mqtt").info("Log websocket disconnected for module=%s: %s", module, exc)
-        return
+    finally:
+        if client is not None:
+            log_tail_service.unsubscribe(client)
 from app.models.job import Job, JobSpoolUsage
 
 from sqlmodel import select
@@ -372,13 +367,14 @@ mqtt_clients: Dict[str, mqtt.Client] = {}
 
 active_connections: Set[WebSocket] = set()
 
+# Fan-out fuer /api/mqtt/ws (JSON-Updates + Text-Log-Zeilen), siehe app/websocket/broadcaster.py
+mqtt_channel = get_channel("mqtt")
+
 active_ws_clients: int = 0
 
 last_ws_activity_ts: Optional[float] = None
 
-message_buffer: List[MQTTMessage] = []
-
-MAX_BUFFER_SIZE = 1000
+# Nachrichten-Puffer: gemeinsames Ring-Buffer-Journal (app/services/message_journal.py)
 
 # Default-Topic nicht mehr statisch hinterlegen; wird dynamisch aus client_id abgeleitet
 
@@ -538,11 +534,25 @@ def on_message(client, userdata, msg):
     except Exception:
         pass  # Don't let stats tracking break message processing
 
+    # Stufen-Latenzen (ingest_metrics) pro Drucker; Serial direkt aus dem Topic
+    topic_parts = (getattr(msg, "topic", "") or "").split("/")
+    topic_serial = topic_parts[1] if len(topic_parts) >= 2 and topic_parts[0] == "device" else None
+    with ingest_metrics.message(topic_serial):
+        _process_message(msg)
+
+
+def _process_message(msg):
+
+    """Verarbeitet eine MQTT-Nachricht (Parse, Mapping, AMS, Job-Tracking, Broadcast)."""
+
     try:
+        t_stage = ingest_metrics.clock()
         # Ensure variables are always defined for static analysis
         cloud_serial_from_topic = None
         printer_model_for_mapper = None
         printer_name_for_service = None
+        # Rohdaten aufzeichnen (nur wenn Capture aktiv, sonst ein Attribut-Check)
+        mqtt_capture.record(msg.topic, msg.payload, getattr(msg, "qos", 0))
         # raw payload text
         payload = msg.payload.decode('utf-8', errors='replace')
         # Delegate payload parsing and mapping to dedicated processor
@@ -586,8 +596,8 @@ def on_message(client, userdata, msg):
                 try:
                     if cloud_serial_from_topic:
                         set_live_state(cloud_serial_from_topic, parsed_json)
-                    else:
-                        print(f"[MQTT] WARNING: No cloud_serial_from_topic for {msg.topic}")
+                    elif mqtt_message_logger.isEnabledFor(logging.DEBUG):
+                        mqtt_message_logger.debug("No cloud_serial in topic %s; live state not updated", msg.topic)
                 except Exception:
                     logging.getLogger("mqtt").exception("set_live_state failed for topic=%s", msg.topic)
 
@@ -595,19 +605,20 @@ def on_message(client, userdata, msg):
             logging.getLogger("mqtt").exception("Failed to parse MQTT JSON payload for topic=%s", msg.topic)
             parsed_json = None
 
+        t_stage = ingest_metrics.lap("parse", t_stage)
+
 
 
                 # Schreibe die Nachricht in MQTT-Log (RotatingFileHandler ?bernimmt Rotation)
 
         try:
-            payload_len = len(payload) if payload is not None else 0
-            preview = _payload_preview(payload, limit=300)
-            mqtt_message_logger.info(
-                "Topic=%s | PayloadLen=%s | Preview=%s",
-                msg.topic,
-                payload_len,
-                preview,
-            )
+            if mqtt_message_logger.isEnabledFor(logging.INFO):
+                mqtt_message_logger.info(
+                    "Topic=%s | PayloadLen=%s | Preview=%s",
+                    msg.topic,
+                    len(payload) if payload is not None else 0,
+                    lazy(_payload_preview, payload, 300),
+                )
 
         except Exception as logerr:
             logging.getLogger("mqtt").exception("Failed to write MQTT message log for topic=%s", msg.topic)
@@ -616,20 +627,17 @@ def on_message(client, userdata, msg):
 
         # Sende empfangene MQTT-Nachricht an alle verbundenen WebSocket-Clients (Text-Log)
 
-        if event_loop:
-            for ws in list(mqtt_ws_clients):
-                try:
-                    payload_len = len(payload) if payload is not None else 0
-                    preview = _truncate_payload(payload, limit=1000)
-                    _safe_schedule(
-                        ws.send_text(
-                            f"{datetime.now().isoformat()} | Topic={msg.topic} | PayloadLen={payload_len} | Payload={preview}"
-                        ),
-                        event_loop,
-                    )
-                except Exception:
-                    logging.getLogger("mqtt").exception("Failed to forward MQTT message to websocket client")
+        if mqtt_channel.client_count:
+            try:
+                payload_len = len(payload) if payload is not None else 0
+                preview = _truncate_payload(payload, limit=1000)
+                mqtt_channel.publish_threadsafe(
+                    f"{datetime.now().isoformat()} | Topic={msg.topic} | PayloadLen={payload_len} | Payload={preview}"
+                )
+            except Exception:
+                logging.getLogger("mqtt").exception("Failed to forward MQTT message to websocket clients")
 
+        t_stage = ingest_metrics.lap("log", t_stage)
 
 
         message = MQTTMessage(
@@ -687,25 +695,31 @@ def on_message(client, userdata, msg):
                 logging.getLogger("mqtt").exception("Failed to load printer by cloud_serial=%s", cloud_serial_from_topic)
                 printer_id_for_ams = None
 
+        # Ingest-Trace: einmal pro Nachricht entscheiden (gesampelt pro Drucker, standardmaessig aus)
+        traced = ingest_trace.sample(cloud_serial_from_topic)
+
         if cloud_serial_from_topic and printer_service_ref:
             try:
                 ts = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
                 # Mark printer as connected when receiving MQTT messages
-                print(f"[DEBUG] Calling set_connected for {cloud_serial_from_topic}")
                 printer_service_ref.set_connected(cloud_serial_from_topic, True, ts)
                 printer_service_ref.mark_seen(cloud_serial_from_topic, ts)
-                print(f"[DEBUG] ✓ set_connected successful for {cloud_serial_from_topic}")
-            except Exception as e:
-                print(f"[DEBUG] ✗ set_connected failed: {e}")
+                if traced:
+                    ingest_trace.log("set_connected ok serial=%s topic=%s", cloud_serial_from_topic, msg.topic)
+            except Exception:
                 logging.getLogger("mqtt").exception(
                     "Failed to mark printer as seen/connected for serial=%s",
                     cloud_serial_from_topic,
                 )
-        else:
-            if not cloud_serial_from_topic:
-                print(f"[DEBUG] ✗ No cloud_serial_from_topic in message")
-            if not printer_service_ref:
-                print(f"[DEBUG] ✗ printer_service_ref is None in on_message")
+        elif traced:
+            ingest_trace.log(
+                "set_connected skipped topic=%s serial=%s printer_service=%s",
+                msg.topic,
+                cloud_serial_from_topic,
+                printer_service_ref is not None,
+            )
+
+        t_stage = ingest_metrics.lap("printer_lookup", t_stage)
 
         if parsed_json:
 
@@ -716,12 +730,14 @@ def on_message(client, userdata, msg):
                 # 2. Autoerkennung nur als Fallback
                 if printer_obj and printer_obj.model:
                     final_model = printer_obj.model.upper()
-                    print(f"[MQTT] Using model from DB: {final_model}")
+                    if traced:
+                        ingest_trace.log("model from DB serial=%s model=%s", cloud_serial_from_topic, final_model)
                 else:
                     # Fallback: Autoerkennung
                     detected_model = PrinterAutoDetector.detect_model_from_payload(parsed_json) or PrinterAutoDetector.detect_model_from_serial(getattr(printer_obj, "cloud_serial", None))
                     final_model = detected_model or printer_model_for_mapper or "UNKNOWN"
-                    print(f"[MQTT] Auto-detected model: {final_model}")
+                    if traced:
+                        ingest_trace.log("model auto-detected serial=%s model=%s", cloud_serial_from_topic, final_model)
 
                 # Update nur wenn sich Modell changed und Drucker noch registriert ist
                 if printer_obj and final_model != (printer_obj.model or "").upper():
@@ -763,8 +779,8 @@ def on_message(client, userdata, msg):
                         printer_service_ref.update_printer(cloud_serial_from_topic, mapped_obj)
                         if caps:
                             printer_service_ref.update_capabilities(cloud_serial_from_topic, caps)
-                    else:
-                        print("[MQTT] Received mapped data without cloud_serial; update skipped")
+                    elif traced:
+                        ingest_trace.log("mapped data without cloud_serial; update skipped topic=%s", msg.topic)
 
                 if caps and isinstance(mapped_dict, dict):
 
@@ -774,6 +790,8 @@ def on_message(client, userdata, msg):
                 logging.getLogger("mqtt").exception("Failed to map MQTT payload for serial=%s", cloud_serial_from_topic)
                 mapped_dict = None
 
+        t_stage = ingest_metrics.lap("map", t_stage)
+
         # AMS Sync vor Job-Tracking, damit Tag/Slot-Daten in DB stehen
 
         if not ams_data and mapped_dict and mapped_dict.get("ams") is not None:
@@ -784,13 +802,14 @@ def on_message(client, userdata, msg):
 
             try:
 
-                mqtt_message_logger.info(f"[AMS SYNC] printer_id={printer_id_for_ams} ams_count={len(ams_data) if isinstance(ams_data, list) else 0}")
+                mqtt_message_logger.info(
+                    "[AMS SYNC] printer_id=%s ams_count=%s",
+                    printer_id_for_ams,
+                    len(ams_data) if isinstance(ams_data, list) else 0,
+                )
 
-                # Debug: log raw ams_data for test visibility
-                try:
-                    mqtt_message_logger.info(f"[AMS SYNC] payload_preview={_preview_obj(ams_data, limit=300)}")
-                except Exception:
-                    logging.getLogger("mqtt").exception("Failed to log AMS payload for printer_id=%s", printer_id_for_ams)
+                # Debug: Vorschau der AMS-Daten (nur formatiert, wenn DEBUG aktiv ist)
+                mqtt_message_logger.debug("[AMS SYNC] payload_preview=%s", lazy(_preview_obj, ams_data, 300))
 
                 sync_ams_slots(
                     [dict(unit) for unit in ams_data] if isinstance(ams_data, list) else [],
@@ -798,7 +817,7 @@ def on_message(client, userdata, msg):
                     auto_create=True
                 ) if ams_data else None
 
-                mqtt_message_logger.info(f"[AMS SYNC] done printer_id={printer_id_for_ams}")
+                mqtt_message_logger.info("[AMS SYNC] done printer_id=%s", printer_id_for_ams)
 
             except Exception as sync_err:
 
@@ -868,6 +887,8 @@ def on_message(client, userdata, msg):
             except Exception:
                 logging.getLogger("mqtt").exception("Failed to run AMS fallback material/spool creation")
 
+        t_stage = ingest_metrics.lap("ams_sync", t_stage)
+
 
 
 
@@ -883,27 +904,56 @@ def on_message(client, userdata, msg):
                     ams_data=[dict(unit) for unit in ams_data] if ams_data else None
                 )
                 if result:
-                    mqtt_message_logger.info(f"[JOB TRACKING] {result}")
+                    mqtt_message_logger.info("[JOB TRACKING] %s", result)
             except Exception as job_err:
                 logging.getLogger("mqtt").exception("Job tracking failed for serial=%s", cloud_serial_from_topic)
-        # Add to buffer
 
-        message_buffer.append(message)
+        t_stage = ingest_metrics.lap("job_tracking", t_stage)
+        # Add to journal (Ring-Buffer, O(1) Verdraengung)
+
+        message_journal.append(
+            message.topic,
+            message.payload,
+            message.timestamp,
+            qos=message.qos,
+            source="mqtt",
+            printer=cloud_serial_from_topic,
+        )
+
+        # Delta-Modus: versionierten Snapshot pro Drucker fortschreiben (Clients mit ?mode=delta)
 
-        if len(message_buffer) > MAX_BUFFER_SIZE:
+        if cloud_serial_from_topic and mapped_dict:
+            live_delta.record_update(cloud_serial_from_topic, mapped_dict)
 
-            message_buffer.pop(0)
+        t_stage = ingest_metrics.lap("state", t_stage)
+
+        if parsed_json is not None and raw_channel.client_count:
+            raw_channel.publish_threadsafe(
+                {
+                    "type": "raw",
+                    "topic": msg.topic,
+                    "printer": cloud_serial_from_topic,
+                    "timestamp": message.timestamp,
+                    "payload": parsed_json,
+                },
+                key=msg.topic,
+            )
 
-        # Broadcast to all connected WebSocket clients
+        # Broadcast to all connected WebSocket clients (einmal serialisiert, Queue pro Client)
+
+        if mqtt_channel.client_count:
+            mqtt_channel.publish_threadsafe(
+                _build_broadcast_dict(
+                    message,
+                    ams_data=ams_data,
+                    job_data=job_data,
+                    printer_data=mapped_dict,
+                    raw_payload=parsed_json,
+                ),
+                key=msg.topic,
+            )
 
-        if event_loop:
-            _safe_schedule(broadcast_message(
-                message,
-                ams_data=ams_data,
-                job_data=job_data,
-                printer_data=mapped_dict,
-                raw_payload=parsed_json,
-            ), event_loop)
+        ingest_metrics.lap("broadcast", t_stage)
 
     except Exception as e:
 
@@ -921,53 +971,40 @@ def on_disconnect(client, userdata, rc, properties=None):
 
 
 
-async def broadcast_message(message: MQTTMessage, ams_data=None, job_data=None, printer_data=None, raw_payload=None):
-
-    """Send message to all connected WebSocket clients"""
-
-    disconnected = set()
-
+def _build_broadcast_dict(message, ams_data=None, job_data=None, printer_data=None, raw_payload=None) -> Dict[str, Any]:
     msg_dict = {
-
         "topic": message.topic,
-
-        "payload": message.payload,
-
-        "timestamp": message.timestamp,
-
-        "qos": message.qos,
-
+        "payload": getattr(message, "payload", None),
+        "timestamp": getattr(message, "timestamp", None) or datetime.now().isoformat(),
+        "qos": getattr(message, "qos", 0),
         "printer": printer_data,
-
         "raw": raw_payload,
-
     }
-
     if ams_data:
-
         msg_dict["ams"] = ams_data
-
     if job_data:
-
         msg_dict["job"] = job_data
+    return msg_dict
 
-    for websocket in active_connections:
 
-        try:
-
-            await websocket.send_json(msg_dict)
-
-        except Exception as e:
-
-            logging.getLogger("mqtt").exception("Failed to send MQTT update to websocket client")
-
-            disconnected.add(websocket)
+async def broadcast_message(message: MQTTMessage, ams_data=None, job_data=None, printer_data=None, raw_payload=None):
 
-    
+    """Send message to all connected WebSocket clients.
 
-    # Remove disconnected clients
+    Die Nachricht wird einmal serialisiert und in die Queue jedes Clients gelegt;
+    langsame Clients verlieren/fassen pro Topic Nachrichten zusammen statt alle zu bremsen.
+    """
 
-    active_connections.difference_update(disconnected)
+    mqtt_channel.publish(
+        _build_broadcast_dict(
+            message,
+            ams_data=ams_data,
+            job_data=job_data,
+            printer_data=printer_data,
+            raw_payload=raw_payload,
+        ),
+        key=message.topic,
+    )
 
 
 def _safe_schedule(coro, loop: Optional[asyncio.AbstractEventLoop]):
@@ -1230,7 +1267,7 @@ async def disconnect_mqtt(broker: str, port: int = 1883):
 
             subscribed_topics.clear()
 
-            message_buffer.clear()
+            message_journal.clear()
 
             try:
                 mqtt_runtime.clear_subscriptions()
@@ -1410,10 +1447,14 @@ async def get_mqtt_status():
 
         "subscribed_topics": list(subscribed_topics),
 
-        "message_buffer_size": len(message_buffer),
+        "message_buffer_size": len(message_journal),
+
+        "journal": message_journal.stats(),
 
         "websocket_clients": len(active_connections),
 
+        "broadcast": mqtt_channel.stats(),
+
         "connections": connections,
 
         "last_connect_error": last_connect_error
@@ -1422,27 +1463,62 @@ async def get_mqtt_status():
 
 
 
-@router.get("/messages")
+class IngestTraceConfig(BaseModel):
+    enabled: Optional[bool] = None
+    sample_every: Optional[int] = None
+    printers: Optional[List[str]] = None
 
-async def get_messages(limit: int = 100, topic_filter: Optional[str] = None):
 
-    """Get recent messages from buffer"""
+@router.get("/ingest-trace")
+async def get_ingest_trace():
+    """Status des Ingest-Trace (gesampeltes Tracing pro MQTT-Nachricht)"""
+    return ingest_trace.status()
 
-    messages = message_buffer[-limit:]
 
-    
+@router.post("/ingest-trace")
+async def set_ingest_trace(config: IngestTraceConfig):
+    """Ingest-Trace zur Laufzeit an-/ausschalten (printers=[] = alle Drucker)"""
+    return ingest_trace.configure(
+        enabled=config.enabled,
+        sample_every=config.sample_every,
+        printers=config.printers,
+        clear_printers=config.printers == [],
+    )
 
-    if topic_filter:
 
-        messages = [m for m in messages if topic_filter in m.topic]
 
-    
+@router.get("/messages")
+
+async def get_messages(
+    limit: int = 100,
+    topic_filter: Optional[str] = None,
+    topic: Optional[str] = None,
+    printer: Optional[str] = None,
+    after_seq: Optional[int] = None,
+):
+
+    """Get recent messages from the journal
+
+    topic_filter: Teilstring im Topic, topic: exaktes Topic (Index),
+    printer: Seriennummer (Index), after_seq: nur Nachrichten nach diesem Cursor.
+    """
+
+    messages = message_journal.query(
+        limit=limit,
+        after_seq=after_seq,
+        topic=topic,
+        printer=printer,
+        topic_contains=topic_filter,
+        source="mqtt",
+    )
 
     return {
 
-        "messages": [m.dict() for m in messages],
+        "messages": messages,
+
+        "total": len(messages),
 
-        "total": len(messages)
+        "cursor": messages[-1]["seq"] if messages else (after_seq if after_seq is not None else message_journal.last_seq)
 
     }
 
@@ -1454,21 +1530,38 @@ async def clear_message_buffer():
 
     """Clear message buffer"""
 
-    message_buffer.clear()
+    message_journal.clear()
 
     return {"success": True, "message": "Message buffer cleared"}
 
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for live message streaming"""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    mode: Optional[str] = None,
+    printers: Optional[str] = None,
+    topics: Optional[str] = None,
+    rate: Optional[str] = None,
+    raw: bool = False,
+):
+    """WebSocket endpoint for live message streaming
+
+    Standard: jede MQTT-Nachricht komplett (payload, raw, printer).
+    ?mode=delta: Snapshot + Deltas der gemappten Druckerdaten pro Drucker,
+    optional gefiltert (printers=A,B / topics=...), max. `rate` Updates/s pro Drucker;
+    Rohpayloads nur mit raw=1 (Debug-Ansicht). Siehe app/websocket/delta_stream.py.
+    """
+    if mode == "delta":
+        await _websocket_delta(websocket, printers, topics, rate, raw)
+        return
     await websocket.accept()
     active_connections.add(websocket)
     mqtt_ws_clients.add(websocket)
     global active_ws_clients, last_ws_activity_ts
     active_ws_clients = max(0, active_ws_clients + 1)
     last_ws_activity_ts = time.time()
+    client = None
     try:
         # Send initial status
         await websocket.send_json({
@@ -1476,20 +1569,53 @@ async def websocket_endpoint(websocket: WebSocket):
             "connected": len(mqtt_clients) > 0,
             "topics": list(subscribed_topics)
         })
+        client = mqtt_channel.subscribe(websocket.send_text, label="mqtt_ws")
         while True:
             data = await websocket.receive_text()
             last_ws_activity_ts = time.time()
             if data == "ping":
-                await websocket.send_text("pong")
+                # Ueber die Client-Queue, sonst schreiben zwei Tasks gleichzeitig auf den Socket
+                client.send("pong")
     except WebSocketDisconnect as exc:
         logging.getLogger("mqtt").info("MQTT websocket client disconnected: %s", exc)
-        active_connections.discard(websocket)
-        mqtt_ws_clients.discard(websocket)
     except Exception as e:
         logging.getLogger("mqtt").exception("MQTT websocket stream error")
+    finally:
+        if client is not None:
+            mqtt_channel.unsubscribe(client)
         active_connections.discard(websocket)
         mqtt_ws_clients.discard(websocket)
+        active_ws_clients = max(0, active_ws_clients - 1)
+
+async def _websocket_delta(websocket: WebSocket, printers, topics, rate, raw: bool):
+    global active_ws_clients, last_ws_activity_ts
+    await websocket.accept()
+    active_connections.add(websocket)
+    mqtt_ws_clients.add(websocket)
+    active_ws_clients = max(0, active_ws_clients + 1)
+    last_ws_activity_ts = time.time()
+    session = DeltaStreamSession(websocket, printers=printers, topics=topics, rate=parse_rate(rate), raw=raw)
+    try:
+        await websocket.send_json({
+            "type": "status",
+            "mode": "delta",
+            "connected": len(mqtt_clients) > 0,
+            "topics": list(subscribed_topics),
+            "rate": round(1.0 / session.interval, 2),
+        })
+        session.start()
+        while True:
+            data = await websocket.receive_text()
+            last_ws_activity_ts = time.time()
+            await session.handle(data)
+    except WebSocketDisconnect as exc:
+        logging.getLogger("mqtt").info("MQTT delta websocket client disconnected: %s", exc)
+    except Exception:
+        logging.getLogger("mqtt").exception("MQTT delta websocket stream error")
     finally:
+        session.close()
+        active_connections.discard(websocket)
+        mqtt_ws_clients.discard(websocket)
         active_ws_clients = max(0, active_ws_clients - 1)
 
 @router.post("/publish")
@@ -1546,13 +1672,8 @@ async def publish_message(topic: str, payload: str, qos: int = 0):
 
 
 
-@router.get("/topics/suggest")
-
-async def suggest_topics(session=Depends(get_session)):
-
-    """Get suggested topics for Bambu Lab printers with real serial numbers"""
-
-    bambu_serials = [
+def _load_bambu_serials(session: Session) -> List[str]:
+    return [
         p.cloud_serial
         for p in session.exec(
             select(Printer).where(
@@ -1561,6 +1682,15 @@ async def suggest_topics(session=Depends(get_session)):
             )
         ).all()
     ]
+
+
+@router.get("/topics/suggest")
+
+async def suggest_topics():
+
+    """Get suggested topics for Bambu Lab printers with real serial numbers"""
+
+    bambu_serials = await run_in_session(_load_bambu_serials)
     bambu_topics = []
 
     for serial in bambu_serials:
@@ -1,5 +1,4 @@
 import json
-import asyncio
 import logging
 from typing import Any, Dict, List, Set
 
@@ -8,6 +7,7 @@ from sqlmodel import Session, select
 
 from app.database import get_session, engine
 from app.models.settings import Setting
+from app.websocket.broadcaster import get_channel
 
 router = APIRouter()
 logger = logging.getLogger("app")
@@ -104,6 +104,7 @@ DEFAULT_NOTIFICATIONS: List[Dict[str, Any]] = [
 ]
 
 notification_ws_clients: Set[WebSocket] = set()
+notification_channel = get_channel("notifications")
 
 
 def _persist_config(session: Session, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -175,20 +176,7 @@ def _validate_notifications(raw: Any) -> List[Dict[str, Any]]:
 
 
 async def broadcast_notification(notification: Dict[str, Any]) -> None:
-    dead: Set[WebSocket] = set()
-    payload = {"event": "notification_trigger", "payload": notification}
-    for ws in list(notification_ws_clients):
-        try:
-            await ws.send_json(payload)
-        except Exception:
-            logger.exception("Failed to send notification to websocket client")
-            dead.add(ws)
-    for ws in dead:
-        try:
-            await ws.close()
-        except Exception:
-            logger.exception("Failed to close notification websocket client")
-        notification_ws_clients.discard(ws)
+    notification_channel.publish_threadsafe({"event": "notification_trigger", "payload": notification})
 
 
 @router.get("/api/notifications-config")
@@ -224,6 +212,7 @@ async def trigger_notification(payload: Dict[str, Any], session: Session = Depen
 async def notifications_websocket(websocket: WebSocket):
     await websocket.accept()
     notification_ws_clients.add(websocket)
+    client = notification_channel.subscribe(websocket.send_text, label="notifications_ws")
     try:
         while True:
             await websocket.receive_text()
@@ -231,6 +220,7 @@ async def notifications_websocket(websocket: WebSocket):
         # Normal client disconnect (1000/1001/1012); no stacktrace needed
         logger.info("Notification websocket disconnected: %s", exc)
     finally:
+        notification_channel.unsubscribe(client)
         notification_ws_clients.discard(websocket)
 
 
@@ -274,27 +264,9 @@ def trigger_notification_sync(notification_id: str, **context) -> None:
                 "context": context
             }
 
-            # Broadcast async (fire and forget)
+            # Broadcast (fire and forget) - thread-safe, auch aus dem MQTT-Thread
             try:
-                # Python 3.13+: get_event_loop() wirft RuntimeError wenn kein Loop läuft
-                # Wir müssen prüfen ob ein Loop existiert und ggf. einen neuen Thread starten
-                try:
-                    loop = asyncio.get_running_loop()
-                    # Loop läuft bereits (z.B. FastAPI Request Handler)
-                    asyncio.create_task(broadcast_notification(notif_payload))
-                except RuntimeError:
-                    # Kein laufender Loop (z.B. MQTT Service Thread)
-                    # Starte Broadcast in separatem Thread mit eigenem Event Loop
-                    import threading
-                    def _run_in_thread():
-                        try:
-                            asyncio.run(broadcast_notification(notif_payload))
-                        except Exception as e:
-                            logger.error(f"[NOTIFICATION] Fehler beim Broadcast in Thread: {e}")
-
-                    thread = threading.Thread(target=_run_in_thread, daemon=True)
-                    thread.start()
-                    logger.debug(f"[NOTIFICATION] Broadcast in separatem Thread gestartet für id={notification_id}")
+                notification_channel.publish_threadsafe({"event": "notification_trigger", "payload": notif_payload})
             except Exception as e:
                 # Fallback: Logge aber breche nicht ab
                 logger.exception("Fehler beim Starten des Notification-Broadcasts für id=%s", notification_id)
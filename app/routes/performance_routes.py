@@ -3,38 +3,31 @@ Performance Monitoring Routes
 Historische System-Performance Daten
 """
 from fastapi import APIRouter
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
-import psutil
-from collections import deque
 from fastapi import HTTPException
 
+from app.logging_setup import get_logging_stats
+from app.monitoring.system_sampler import COARSE_STEP_S, FINE_SIZE, system_sampler
+from app.monitoring.ingest_metrics import ingest_metrics
+from app.monitoring.startup_profile import startup_profile
+from app.monitoring.payload_metrics import payload_metrics
+from app.db import executor as db_executor
+from app.services.http_clients import http_clients
+
 router = APIRouter(prefix="/api/performance", tags=["Performance"])
 
-# === IN-MEMORY STORAGE ===
-# Speichert die letzten 720 Datenpunkte (1 Stunde bei 5s Intervall)
-MAX_HISTORY = 720
-performance_history: deque = deque(maxlen=MAX_HISTORY)
-recording_start = datetime.now()
+# === DATENQUELLE ===
+# Samples kommen vom Hintergrund-Sampler (5s-Intervall, 1h fein + 7d in 5-min-Schritten, persistiert)
+MAX_HISTORY = FINE_SIZE
+
 
-# === DATA COLLECTION ===
 def collect_performance_data():
-    """Sammelt aktuelle Performance-Daten"""
-    cpu_percent = psutil.cpu_percent(interval=0.1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
-    
-    data_point = {
-        "timestamp": datetime.now().isoformat(),
-        "cpu_percent": round(cpu_percent, 1),
-        "ram_percent": round(memory.percent, 1),
-        "ram_used_mb": round(memory.used / 1024 / 1024, 1),
-        "disk_percent": round(disk.percent, 1),
-        "disk_used_gb": round(disk.used / 1024 / 1024 / 1024, 1)
-    }
-    
-    performance_history.append(data_point)
-    
+    """Liefert den letzten Sample des System-Samplers plus Alerts (blockiert nicht)"""
+    data_point = system_sampler.current()
+    cpu_percent = data_point.get("cpu_percent") or 0.0
+    memory_percent = data_point.get("ram_percent") or 0.0
+
     # Check for alerts
     alerts = []
     if cpu_percent > 90:
@@ -50,16 +43,16 @@ def collect_performance_data():
             "timestamp": data_point["timestamp"]
         })
     
-    if memory.percent > 90:
+    if memory_percent > 90:
         alerts.append({
             "level": "critical",
-            "message": f"RAM Usage kritisch: {memory.percent}%",
+            "message": f"RAM Usage kritisch: {memory_percent}%",
             "timestamp": data_point["timestamp"]
         })
-    elif memory.percent > 75:
+    elif memory_percent > 75:
         alerts.append({
             "level": "warning",
-            "message": f"RAM Usage hoch: {memory.percent}%",
+            "message": f"RAM Usage hoch: {memory_percent}%",
             "timestamp": data_point["timestamp"]
         })
     
@@ -78,16 +71,12 @@ def get_current_performance():
 @router.get("/history")
 def get_performance_history(limit: int = 60):
     """Gibt Performance-Historie zurück (Standard: letzte 60 Punkte = 5 Minuten)"""
-    history_list = list(performance_history)
-    
-    # Limit anwenden
-    if limit > 0:
-        history_list = history_list[-limit:]
+    history_list = system_sampler.history(limit)
     
     # Statistiken berechnen
     if len(history_list) > 0:
-        cpu_values = [p["cpu_percent"] for p in history_list]
-        ram_values = [p["ram_percent"] for p in history_list]
+        cpu_values = [p.get("cpu_percent") or 0 for p in history_list]
+        ram_values = [p.get("ram_percent") or 0 for p in history_list]
         
         stats = {
             "avg_cpu": round(sum(cpu_values) / len(cpu_values), 1),
@@ -112,30 +101,47 @@ def get_performance_history(limit: int = 60):
     return {
         "history": history_list,
         "stats": stats,
-        "recording_since": recording_start.isoformat(),
-        "total_data_points": len(performance_history)
+        "recording_since": system_sampler.recording_since.isoformat(),
+        "total_data_points": len(system_sampler.fine)
+    }
+
+
+@router.get("/history/long")
+def get_long_performance_history(hours: float = 24.0):
+    """Langzeit-Historie in 5-Minuten-Aggregaten (Mittelwert + Maxima), bis zu 7 Tage"""
+    hours = max(0.1, min(hours, 7 * 24.0))
+    return {
+        "step_seconds": COARSE_STEP_S,
+        "hours": hours,
+        "items": system_sampler.long_history(hours),
+        "recording_since": system_sampler.recording_since.isoformat(),
     }
 
+
+@router.get("/sampler")
+def get_sampler_status():
+    """Status des Hintergrund-Samplers"""
+    return system_sampler.status()
+
 @router.post("/clear")
 def clear_performance_history():
     """Löscht die Performance-Historie"""
-    global recording_start
-    performance_history.clear()
-    recording_start = datetime.now()
+    system_sampler.clear()
     
     return {
         "success": True,
         "message": "Performance-Historie gelöscht",
-        "recording_since": recording_start.isoformat()
+        "recording_since": system_sampler.recording_since.isoformat()
     }
 
 @router.get("/export")
 def export_performance_data():
     """Exportiert alle Performance-Daten als JSON"""
     return {
-        "recording_since": recording_start.isoformat(),
-        "total_data_points": len(performance_history),
-        "data": list(performance_history)
+        "recording_since": system_sampler.recording_since.isoformat(),
+        "total_data_points": len(system_sampler.fine),
+        "data": system_sampler.history(),
+        "long_term": list(system_sampler.coarse),
     }
 
 
@@ -160,9 +166,7 @@ def performance_panel(limit: int = 12):
         alerts = [{"level": "error", "message": f"Performance read failed: {exc}", "timestamp": current["timestamp"]}]
 
     # Historie defensiv aufbereiten
-    history_list = list(performance_history)
-    if limit > 0:
-        history_list = history_list[-limit:]
+    history_list = system_sampler.history(limit)
 
     if history_list:
         cpu_values = [p.get("cpu_percent") or 0 for p in history_list]
@@ -195,11 +199,67 @@ def performance_panel(limit: int = 12):
         "history": {
             "items": history_list,
             "stats": stats,
-            "total": len(performance_history),
-            "recording_since": recording_start.isoformat(),
+            "total": len(system_sampler.fine),
+            "recording_since": system_sampler.recording_since.isoformat(),
         },
+        "logging": get_logging_stats(),
+        "ingest": ingest_metrics.summary(),
         "meta": {
-            "interval_hint_seconds": 5,
+            "interval_hint_seconds": system_sampler.interval,
             "limit": limit,
         },
     }
+
+
+@router.get("/ingest")
+def get_ingest_metrics(printer: Optional[str] = None, source: Optional[str] = None, buckets: bool = False):
+    """Latenz pro Stufe der MQTT-Ingest-Pipeline (p50/p90/p99/max in ms), gesamt und pro Drucker."""
+    return ingest_metrics.snapshot(printer=printer, source=source, include_buckets=buckets)
+
+
+@router.delete("/ingest")
+def reset_ingest_metrics():
+    """Setzt die Ingest-Histogramme zurück"""
+    ingest_metrics.reset()
+    return {"success": True}
+
+
+@router.get("/db-executor")
+def get_db_executor_stats():
+    """DB-Pool der async Routen: Worker, Queue-Wartezeit und Laufzeit (p50/p99 in ms)."""
+    return db_executor.stats()
+
+
+@router.delete("/db-executor")
+def reset_db_executor_stats():
+    """Setzt die Histogramme des DB-Pools zurück"""
+    db_executor.reset_stats()
+    return {"success": True}
+
+
+@router.get("/http-clients")
+def get_http_client_stats():
+    """Geteilte HTTP-Clients: pro Host Requests, Reuse-Quote, offene Verbindungen, Latenz."""
+    return http_clients.stats()
+
+
+@router.delete("/http-clients")
+def reset_http_client_stats():
+    """Setzt die HTTP-Client-Statistik zurück (Verbindungen bleiben offen)"""
+    http_clients.reset_stats()
+    return {"success": True}
+
+
+@router.get("/startup")
+def get_startup_profile():
+    """Importzeit von app.main und Dauer der Startphasen (Schnellstart ja/nein, siehe notes)"""
+    return startup_profile.report()
+
+
+@router.get("/payloads")
+def get_payload_metrics(limit: int = 50, reset: bool = False):
+    """Antwortgroesse (roh/uebertragen), Kompression und Serialisierungszeit pro Route"""
+    routes = payload_metrics.snapshot(limit=limit)
+    if reset:
+        payload_metrics.reset()
+    return {"routes": routes}
@@ -4,7 +4,7 @@ from typing import List, Dict, Any
 import logging
 import os
 import socket
-import httpx
+from app.services.http_clients import http_clients
 from app.database import get_session
 from app.models.printer import Printer, PrinterCreate, PrinterRead
 from app.models.spool import Spool
@@ -99,7 +99,7 @@ def get_global_has_real_ams(session: Session = Depends(get_session)):
 
     try:
         from app.services import live_state as live_state_module
-        from app.services.ams_normalizer import has_real_ams_from_payload
+        from app.services.ams_normalizer import entry_has_real_ams
         
         # Get all printers from DB with their cloud_serials and names
         printers = session.exec(select(Printer)).all()
@@ -131,8 +131,7 @@ def get_global_has_real_ams(session: Session = Depends(get_session)):
                     printer_model = "X1C"
             
             # Check if this device has real AMS (not AMS Lite)
-            payload = entry.get("payload") or {}
-            if has_real_ams_from_payload(payload, printer_model=printer_model):
+            if entry_has_real_ams(device_id, entry, printer_model=printer_model):
                 _ams_cache.update({"value": True, "ts": _time.monotonic()})
                 return {"value": True}
 
@@ -495,24 +494,23 @@ async def test_printer_connection(printer_id: str, session: Session = Depends(ge
             port = printer.port or 7125
             url = f"http://{printer.ip_address}:{port}/server/info"
             
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    klippy_state = data.get("result", {}).get("klippy_state", "unknown")
-                    return {
-                        "status": "success",
-                        "message": f"Klipper Drucker erreichbar - Status: {klippy_state}",
-                        "online": True,
-                        "klippy_state": klippy_state
-                    }
-                else:
-                    return {
-                        "status": "warning",
-                        "message": f"Klipper API antwortet mit Status {response.status_code}",
-                        "online": False
-                    }
+            response = await http_clients.get("moonraker").get(url, timeout=3.0)
+            
+            if response.status_code == 200:
+                data = response.json()
+                klippy_state = data.get("result", {}).get("klippy_state", "unknown")
+                return {
+                    "status": "success",
+                    "message": f"Klipper Drucker erreichbar - Status: {klippy_state}",
+                    "online": True,
+                    "klippy_state": klippy_state
+                }
+            else:
+                return {
+                    "status": "warning",
+                    "message": f"Klipper API antwortet mit Status {response.status_code}",
+                    "online": False
+                }
         
         return {
             "status": "error",
@@ -0,0 +1,159 @@
+"""Router-Registry: welche API-Router die App einbindet - und welche nicht.
+
+Jeder Router ist ein ``RouterSpec`` (Modulpfad + Attribut). Das Modul wird erst in
+``include_routers`` per importlib geladen, und nur wenn sein Feature aktiv ist. Abgeschaltete
+Subsysteme (Debug-Center, Service-/Coverage-Tools, Bambu Cloud, Happy-Hare-MMU) kosten damit
+weder Importzeit noch ihre Abhaengigkeiten.
+
+Steuerung ueber config.yaml::
+
+    features:
+      debug: true         # Debug-Center APIs (/api/debug/...)
+      service: true       # Service-Tools (Tests, Docker, Dependencies)
+      coverage: false     # Coverage-Reports im Admin-Bereich
+      bambu_cloud: true   # Bambu Cloud Integration + Sync-Scheduler
+      mmu: true           # Happy Hare MMU (Klipper)
+
+Fehlende Eintraege gelten als aktiv (alte config.yaml bleibt gueltig). Zusaetzlich schaltet
+die Umgebungsvariable ``FILAMENTHUB_DISABLE_FEATURES=debug,coverage`` Features ab (Docker).
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger("app")
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+FEATURES = ("debug", "service", "coverage", "bambu_cloud", "mmu")
+DISABLE_ENV = "FILAMENTHUB_DISABLE_FEATURES"
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    module: str
+    attr: str = "router"
+    prefix: str = ""
+    tags: Tuple[str, ...] = ()
+    feature: Optional[str] = None  # None = immer eingebunden
+
+
+# Reihenfolge = Reihenfolge der include_router-Aufrufe (relevant bei ueberlappenden Pfaden)
+ROUTERS: Tuple[RouterSpec, ...] = (
+    RouterSpec("app.routes.hello"),
+    RouterSpec("app.routes.materials"),
+    RouterSpec("app.routes.spools"),
+    RouterSpec("app.routes.spool_numbers"),  # NEU: Spulen-Nummern-System
+    RouterSpec("app.routes.log_routes"),
+    RouterSpec("app.routes.system_routes"),
+    RouterSpec("app.routes.debug_routes", feature="debug"),
+    RouterSpec("app.routes.service_routes", feature="service"),
+    # SECURITY FIX (Bug #3): Database-Router deaktiviert wegen kritischer SQL-Injection Schwachstellen
+    # Die Routes /api/database/query und /api/database/editor erlaubten ungeschützten SQL-Zugriff
+    # RouterSpec("app.routes.database_routes"),  # ← DEAKTIVIERT
+    RouterSpec("app.routes.backup_routes"),
+    RouterSpec("app.routes.scanner_routes"),
+    RouterSpec("app.routes.mqtt_routes"),
+    RouterSpec("app.routes.performance_routes"),
+    RouterSpec("app.routes.printers"),
+    RouterSpec("app.routes.jobs"),
+    RouterSpec("app.routes.statistics_routes"),
+    RouterSpec("app.routes.bambu_routes"),
+    RouterSpec("app.routes.admin_routes"),
+    RouterSpec("app.routes.admin_coverage_routes", prefix="/api/admin", feature="coverage"),
+    RouterSpec("app.routes.settings_routes"),
+    RouterSpec("app.routes.weight_management_routes"),  # Weight Management & History
+    RouterSpec("app.routes.spool_assignment_routes"),  # Spool Assignment (AMS → Lager-Spule zuordnen)
+    RouterSpec("app.routes.debug_ams_routes", feature="debug"),
+    RouterSpec("app.routes.debug_system_routes", feature="debug"),
+    RouterSpec("app.routes.debug_performance_routes", feature="debug"),
+    RouterSpec("app.routes.debug_network_routes", feature="debug"),
+    RouterSpec("app.routes.scanner_routes", attr="debug_printer_router", feature="debug"),
+    RouterSpec("app.routes.notification_routes"),
+    RouterSpec("app.routes.config_routes"),
+    RouterSpec("app.routes.debug_log_routes", prefix="/api/debug", tags=("debug",), feature="debug"),
+    # Runtime MQTT control endpoints (separate from legacy mqtt_routes to avoid collisions)
+    RouterSpec("app.routes.mqtt_runtime_routes", prefix="/api/mqtt/runtime", tags=("mqtt",)),
+    # Live state endpoints for real-time device data
+    RouterSpec("app.routes.live_state_routes"),
+    RouterSpec("app.routes.ams_routes"),
+    RouterSpec("app.routes.ams_conflicts"),
+    RouterSpec("app.routes.monitoring_routes"),  # Performance Monitoring & Alerts
+    RouterSpec("app.routes.lexikon_routes"),
+    RouterSpec("app.routes.externe_spule_routes"),
+    RouterSpec("app.routes.bambu_cloud_routes", feature="bambu_cloud"),  # Bambu Cloud Integration
+    RouterSpec("app.routes.mmu_routes", feature="mmu"),  # Happy Hare MMU Integration
+    RouterSpec("app.routes.version_routes"),  # Update-Check
+)
+
+
+def load_feature_flags() -> Dict[str, bool]:
+    """Feature-Schalter aus config.yaml (+ FILAMENTHUB_DISABLE_FEATURES)."""
+    flags = {name: True for name in FEATURES}
+    try:
+        with open(_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        for name, value in (config.get("features") or {}).items():
+            if name in flags:
+                flags[name] = bool(value)
+            else:
+                logger.warning("config.yaml: unbekanntes Feature '%s' ignoriert", name)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning("features aus config.yaml nicht lesbar; alle Features aktiv", exc_info=True)
+    for name in os.environ.get(DISABLE_ENV, "").split(","):
+        name = name.strip()
+        if name in flags:
+            flags[name] = False
+    return flags
+
+
+class _Registry:
+    def __init__(self) -> None:
+        self.flags: Dict[str, bool] = {name: True for name in FEATURES}
+        self.loaded: List[Dict[str, Any]] = []
+        self.skipped: List[str] = []
+
+    def enabled(self, feature: Optional[str]) -> bool:
+        return feature is None or self.flags.get(feature, True)
+
+    def include_routers(self, app: Any, flags: Optional[Dict[str, bool]] = None) -> None:
+        """Aktive Router importieren und einbinden; Importzeit pro Modul wird festgehalten."""
+        self.flags = dict(flags) if flags is not None else load_feature_flags()
+        self.loaded, self.skipped = [], []
+        for spec in ROUTERS:
+            if not self.enabled(spec.feature):
+                self.skipped.append(f"{spec.module}:{spec.attr}")
+                continue
+            started = time.perf_counter()
+            module = importlib.import_module(spec.module)
+            kwargs: Dict[str, Any] = {}
+            if spec.prefix:
+                kwargs["prefix"] = spec.prefix
+            if spec.tags:
+                kwargs["tags"] = list(spec.tags)
+            app.include_router(getattr(module, spec.attr), **kwargs)
+            self.loaded.append({
+                "module": spec.module,
+                "attr": spec.attr,
+                "feature": spec.feature,
+                "ms": round((time.perf_counter() - started) * 1000.0, 2),
+            })
+        if self.skipped:
+            disabled = sorted(name for name, on in self.flags.items() if not on)
+            logger.info("Router-Registry: %d Router uebersprungen (Features aus: %s)", len(self.skipped), ", ".join(disabled))
+
+    def status(self) -> Dict[str, Any]:
+        return {"features": dict(self.flags), "loaded": list(self.loaded), "skipped": list(self.skipped)}
+
+
+router_registry = _Registry()
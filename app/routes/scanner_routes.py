@@ -6,14 +6,22 @@ import socket
 import asyncio
 import time
 import logging
-from typing import List, Dict, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Dict, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import ipaddress
 import json
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models.settings import Setting
+from app.services.network_scanner import (
+    HostResult,
+    local_ipv4,
+    local_subnet_hosts,
+    network_scanner,
+)
+from app.services.printer_discovery import DiscoveredDevice, printer_discovery
 
 router = APIRouter(prefix="/api/scanner", tags=["Printer Scanner"])
 debug_printer_router = APIRouter(prefix="/api/debug/printer", tags=["Debug Printer"])
@@ -70,71 +78,91 @@ def _validate_ipv4(ip: str) -> str:
 # -----------------------------
 # NETWORK UTILITIES
 # -----------------------------
-async def check_port(ip: str, port: int, timeout: float = 0.3) -> bool:
+# Probes laufen ueber app.services.network_scanner (asyncio, Fan-out pro Host, globale
+# Limits, Reverse-DNS-Cache). check_port/get_hostname bleiben als duenne Huellen erhalten.
+async def check_port(ip: str, port: int, timeout: float = 0.3, use_cache: bool = False) -> bool:
     """Prüft ob ein Port offen ist (async)"""
-    try:
-        # Run in executor um nicht zu blockieren
-        loop = asyncio.get_event_loop()
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = await loop.run_in_executor(None, sock.connect_ex, (ip, port))
-        sock.close()
-        return result == 0
-    except Exception as exc:
-        log.exception("check_port failed for %s:%s -> %s", ip, port, exc)
-        return False
+    return await network_scanner.probe(ip, port, timeout, use_cache=use_cache) is not None
 
 
-def get_hostname(ip: str) -> Optional[str]:
-    """Versucht den Hostname aufzulösen"""
-    try:
-        return socket.gethostbyaddr(ip)[0]
-    except Exception as exc:
-        log.exception("get_hostname failed for %s: %s", ip, exc)
-        return None
+async def get_hostname(ip: str) -> Optional[str]:
+    """Versucht den Hostname aufzulösen (async, gecacht)"""
+    return await network_scanner.dns.lookup(ip)
+
+
+def _to_printer_info(result: HostResult, timeout: float) -> PrinterInfo:
+    latency_ms = result.latency_ms
+    return PrinterInfo(
+        ip=result.ip,
+        hostname=result.hostname,
+        type=result.type or "unknown",
+        port=result.port or 0,
+        accessible=True,
+        response_time=round(latency_ms / 1000, 4) if latency_ms is not None else timeout,
+    )
+
+
+def _to_lite(result: HostResult) -> Dict:
+    detected_type = result.type or "generic"
+    if detected_type == "klipper":
+        detected_type = "klipper (Moonraker detected)"
+    return {
+        "ip": result.ip,
+        "port": result.port,
+        "type": detected_type,
+        "status": "idle"
+    }
+
+
+def _discovered_lite(device: DiscoveredDevice) -> Dict:
+    """Inventar-Eintrag (SSDP/mDNS) im Format der Scan-Ergebnisse, plus Seriennummer/Modell."""
+    detected_type = "klipper (Moonraker detected)" if device.kind == "klipper" else device.kind
+    return {
+        "ip": device.ip,
+        "port": device.port,
+        "type": detected_type,
+        "status": "idle",
+        "hostname": device.name,
+        "serial": device.serial,
+        "model": device.model,
+        "source": device.source
+    }
+
+
+def _remember(results: List[HostResult]) -> None:
+    """Probe-Treffer ins Discovery-Inventar uebernehmen."""
+    for result in results:
+        if result.type in ("bambu", "klipper") and result.port:
+            printer_discovery.record_probe(result.type, result.ip, result.port)
 
 
 async def scan_host(ip: str, ports: List[int], timeout: float = 0.5) -> Optional[PrinterInfo]:
     """Scannt einen Host auf offene Ports - priorisiert Drucker-Ports"""
-    
-    # Priorisiere Drucker-Ports (6000 für Bambu, 7125 für Klipper)
-    priority_ports = [6000, 7125]
-    other_ports = [p for p in ports if p not in priority_ports]
-    scan_order = priority_ports + other_ports
-    
-    for port in scan_order:
-        if port not in ports:
-            continue
-            
-        if await check_port(ip, port, timeout):
-            # Erkenne Drucker-Typ anhand des Ports
-            printer_type = "unknown"
-            
-            if port in [990, 8883, 322, 6000]:
-                printer_type = "bambu"
-            elif port == 7125:
-                printer_type = "klipper"
-            elif port == 80:
-                # Port 80 könnte Klipper oder Router sein - prüfe ob andere Drucker-Ports auch offen
-                if await check_port(ip, 7125, timeout):
-                    printer_type = "klipper"
-                    port = 7125
-                else:
-                    # Wahrscheinlich kein Drucker (Router/FritzBox)
-                    continue
-            
-            hostname = get_hostname(ip)
-            
-            return PrinterInfo(
-                ip=ip,
-                hostname=hostname,
-                type=printer_type,
-                port=port,
-                accessible=True,
-                response_time=timeout
-            )
-    
-    return None
+    result = await network_scanner.scan_host(ip, ports, timeout)
+    return _to_printer_info(result, timeout) if result.found else None
+
+
+def _parse_hosts(ip_range: str) -> List[str]:
+    try:
+        network = ipaddress.ip_network(ip_range, strict=False)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiger IP-Bereich")
+    # Limit: Max 254 IPs scannen
+    if network.num_addresses > 256:
+        raise HTTPException(
+            status_code=400,
+            detail="IP Range zu groß. Max 254 Hosts erlaubt."
+        )
+    return [str(h) for h in network.hosts()]
+
+
+def _local_ranges() -> List[str]:
+    local_ip = local_ipv4()
+    if local_ip:
+        subnet_parts = local_ip.split('.')
+        return [f"{subnet_parts[0]}.{subnet_parts[1]}.{subnet_parts[2]}.0/24"]
+    log.warning("Failed to determine local IP for printer detection, using fallback ranges")
+    return ["192.168.0.0/24", "192.168.1.0/24", "192.168.178.0/24"]
 
 
 # -----------------------------
@@ -148,76 +176,37 @@ async def scan_network(request: ScanRequest):
     - Bambu Lab: 6000 (MQTT)
     - Klipper/Moonraker: 7125 (API)
     """
-    
+
     # Default Ports wenn nicht angegeben
     ports: List[int] = request.ports or [6000, 7125, 80]
-    
-    try:
-        # IP Range parsen
-        network = ipaddress.ip_network(request.ip_range, strict=False)
-        
-        # Limit: Max 254 IPs scannen
-        hosts = [str(h) for h in list(network.hosts())]
-        if len(hosts) > 254:
-            raise HTTPException(
-                status_code=400,
-                detail="IP Range zu groß. Max 254 Hosts erlaubt."
-            )
-        
-        # Parallel scannen, aber mit Limit um das Event-Loop nicht zu blockieren
-        sem = asyncio.Semaphore(50)
+    hosts = _parse_hosts(request.ip_range)
 
-        async def limited_scan(ip: str):
-            async with sem:
-                return await scan_host(ip, ports, request.timeout)
-
-        tasks = [limited_scan(ip) for ip in hosts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        results = await network_scanner.scan_all(hosts, ports, request.timeout)
+        _remember(results)
+        found_printers = [_to_printer_info(r, request.timeout) for r in results]
 
-        found_printers = [r for r in results if isinstance(r, PrinterInfo)]
-        
         return {
             "success": True,
             "scanned_hosts": len(hosts),
             "found_printers": len(found_printers),
             "printers": found_printers
         }
-        
+
     except Exception as e:
         log.exception("Network scan failed for ip_range=%s", request.ip_range)
         raise HTTPException(status_code=500, detail=f"Scan Fehler: {str(e)}")
 
 
-@router.get("/scan/quick")
-async def quick_scan():
-    """
-    Schneller Scan des lokalen Netzwerks.
-    Nutzt haeufige IPs, erweitert um einen begrenzten /24-Sweep als Fallback.
-    """
-    common_ips = []
-    subnet_base = None
-
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
+QUICK_SCAN_PORTS = [990, 8883, 7125, 322, 6000]
 
-        subnet_parts = local_ip.split('.')
-        subnet_base = f"{subnet_parts[0]}.{subnet_parts[1]}.{subnet_parts[2]}"
-
-        host_numbers = [1, 2, 10, 20, 30, 40, 41, 42, 50, 100, 110, 120, 150, 200, 250, 254]
-        own_host = int(subnet_parts[3])
-        for offset in range(-5, 6):
-            nearby_host = own_host + offset
-            if 1 <= nearby_host <= 254 and nearby_host not in host_numbers:
-                host_numbers.append(nearby_host)
 
-        for host in sorted(set(host_numbers)):
-            common_ips.append(f"{subnet_base}.{host}")
-    except Exception as exc:
-        log.exception("Failed to build quick scan IP list from local subnet: %s", exc)
+def _quick_scan_hosts() -> Tuple[List[str], List[str]]:
+    """(haeufige Adressen, restliches /24) des lokalen Netzes."""
+    local_ip = local_ipv4()
+    if not local_ip:
         # Breites Fallback: 192.168.x.x (Heimnetz), 10.x.x.x (Unraid/TrueNAS), 172.16.x.x (NAS-Bridges)
+        common_ips = []
         for prefix in [
             "192.168.0", "192.168.1", "192.168.2", "192.168.178",
             "10.0.0", "10.0.1", "10.1.0",
@@ -230,39 +219,41 @@ async def quick_scan():
                 f"{prefix}.100",
                 f"{prefix}.200",
             ])
+        return common_ips, []
+    return local_subnet_hosts(local_ip)
 
-    ports = [990, 8883, 7125, 322, 6000]
 
-    tasks = [scan_host(ip, ports, timeout=0.3) for ip in common_ips]
-    results = asyncio.gather(*tasks, return_exceptions=True)
-    results = await results
+@router.get("/scan/quick")
+async def quick_scan(probe: bool = False):
+    """
+    Schneller Scan des lokalen Netzwerks.
+    Liefert sofort das Discovery-Inventar (SSDP/mDNS); nur wenn das leer ist oder
+    ``probe=true`` gesetzt ist: haeufige IPs, erweitert um einen /24-Sweep als Fallback.
+    """
+    if not probe:
+        discovered = printer_discovery.devices()
+        if discovered:
+            return {
+                "success": True,
+                "source": "discovery",
+                "scanned_hosts": 0,
+                "found_printers": len(discovered),
+                "printers": [_discovered_lite(d) for d in discovered]
+            }
 
-    def to_lite(printer: PrinterInfo):
-        detected_type = printer.type or "generic"
-        if detected_type == "klipper":
-            detected_type = "klipper (Moonraker detected)"
-        return {
-            "ip": printer.ip,
-            "port": printer.port,
-            "type": detected_type,
-            "status": "idle"
-        }
+    common_ips, sweep_hosts = _quick_scan_hosts()
 
-    found_printers = []
-    for result in results:
-        if isinstance(result, PrinterInfo):
-            found_printers.append(to_lite(result))
-
-    if not found_printers and subnet_base:
-        sweep_hosts = [f"{subnet_base}.{i}" for i in range(1, 255)]
-        sweep_hosts = sweep_hosts[:120]
-        tasks = [scan_host(ip, ports, timeout=0.25) for ip in sweep_hosts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        for result in results:
-            if isinstance(result, PrinterInfo):
-                found_printers.append(to_lite(result))
+    results = await network_scanner.scan_all(common_ips, QUICK_SCAN_PORTS, 0.3)
+    _remember(results)
+    found_printers = [_to_lite(r) for r in results]
+
+    if not found_printers and sweep_hosts:
+        results = await network_scanner.scan_all(sweep_hosts, QUICK_SCAN_PORTS, 0.25)
+        _remember(results)
+        found_printers.extend(_to_lite(r) for r in results)
         return {
             "success": True,
+            "source": "probe",
             "scanned_hosts": len(common_ips) + len(sweep_hosts),
             "found_printers": len(found_printers),
             "printers": found_printers
@@ -270,20 +261,136 @@ async def quick_scan():
 
     return {
         "success": True,
+        "source": "probe",
         "scanned_hosts": len(common_ips),
         "found_printers": len(found_printers),
         "printers": found_printers
     }
 
+
+@router.get("/discovered")
+def discovered_printers(kind: Optional[str] = Query(None, pattern="^(bambu|klipper)$")):
+    """Passiv gefundene Drucker (SSDP/mDNS-Inventar, plus Treffer aktiver Scans) - ohne Netzwerkzugriff"""
+    devices = printer_discovery.devices(kind)
+    return {
+        "running": printer_discovery.running,
+        "count": len(devices),
+        "devices": [d.to_dict() for d in devices]
+    }
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/scan/stream")
+async def scan_stream(
+    ip_range: Optional[str] = None,
+    ports: Optional[str] = None,
+    timeout: float = Query(0.3, ge=0.05, le=5.0),
+    probe: bool = True,
+):
+    """
+    Scan als Server-Sent Events: jeder gefundene Drucker wird sofort gemeldet.
+
+    Zuerst kommen die passiv bekannten Drucker aus dem Discovery-Inventar, danach (ausser
+    bei ``probe=false``) der aktive Scan fuer die restlichen Adressen.
+    Ohne ``ip_range`` wird das lokale /24 gescannt (haeufige Adressen zuerst).
+    Events: ``start`` {hosts, ports}, ``printer`` {ip, port, type, status, hostname,
+    latency_ms}, ``progress`` {scanned, total, found}, ``done`` {scanned_hosts,
+    found_printers, duration_ms}, ``error`` {message}.
+    """
+    port_list = _parse_port_param(ports) if ports else list(QUICK_SCAN_PORTS)
+    if ip_range:
+        hosts = _parse_hosts(ip_range)
+    else:
+        common_ips, sweep_hosts = _quick_scan_hosts()
+        hosts = common_ips + sweep_hosts
+
+    async def event_generator():
+        started = time.perf_counter()
+        scanned = 0
+        found = 0
+        discovered = printer_discovery.devices()
+        if ip_range:
+            in_range = set(hosts)
+            discovered = [d for d in discovered if d.ip in in_range]
+        known = {d.ip for d in discovered}
+        probe_hosts = [h for h in hosts if h not in known] if probe else []
+        yield _sse("start", {"hosts": len(probe_hosts), "ports": port_list, "discovered": len(discovered)})
+        for device in discovered:
+            found += 1
+            yield _sse("printer", _discovered_lite(device))
+        try:
+            async for result in network_scanner.scan(probe_hosts, port_list, timeout):
+                scanned += 1
+                if result.found:
+                    _remember([result])
+                    found += 1
+                    printer = _to_lite(result)
+                    printer["hostname"] = result.hostname
+                    printer["latency_ms"] = result.latency_ms
+                    printer["source"] = "probe"
+                    yield _sse("printer", printer)
+                if scanned % 16 == 0:
+                    yield _sse("progress", {"scanned": scanned, "total": len(probe_hosts), "found": found})
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log.exception("Streaming scan failed")
+            yield _sse("error", {"message": str(exc)[:200]})
+        yield _sse("done", {
+            "success": True,
+            "scanned_hosts": scanned,
+            "found_printers": found,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _parse_port_param(raw: str) -> List[int]:
+    ports: List[int] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            port = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Ungültiger Port: {part}")
+        if not (1 <= port <= 65535):
+            raise HTTPException(status_code=400, detail="port must be between 1 and 65535")
+        ports.append(port)
+    if not ports or len(ports) > 16:
+        raise HTTPException(status_code=400, detail="1 bis 16 Ports erlaubt")
+    return ports
+
+
+@router.get("/status")
+def scanner_status():
+    """Limits, Probe-/DNS-Cache und letzter Scan des Netzwerk-Scanners, Status der Discovery"""
+    status = network_scanner.status()
+    status["discovery"] = printer_discovery.status()
+    return status
+
+
 @router.get("/test/connection")
 async def test_connection(ip: str, port: int = 6000):
     """Testet die Verbindung zu einem spezifischen Drucker"""
-    
-    import time
+
     start = time.time()
     is_open = await check_port(ip, port, timeout=2.0)
     response_time = time.time() - start
-    
+
     if not is_open:
         return {
             "success": False,
@@ -292,11 +399,11 @@ async def test_connection(ip: str, port: int = 6000):
             "port": port,
             "response_time": response_time
         }
-    
+
     # Erkenne Typ
     printer_type = "unknown"
     message = f"Port {port} ist erreichbar"
-    
+
     if port == 6000:
         printer_type = "bambu"
         message = "✓ Bambu Lab MQTT Port erreichbar (Port 6000 offen, MQTT Login erforderlich)"
@@ -309,9 +416,9 @@ async def test_connection(ip: str, port: int = 6000):
     elif port in [7125, 80]:
         printer_type = "klipper"
         message = f"✓ Klipper API erreichbar (Port {port})"
-    
-    hostname = get_hostname(ip)
-    
+
+    hostname = await get_hostname(ip)
+
     return {
         "success": True,
         "message": message,
@@ -323,112 +430,64 @@ async def test_connection(ip: str, port: int = 6000):
     }
 
 
+async def _detect(ports: List[int], printer_type: str, probe: bool) -> Dict:
+    """Discovery-Inventar; ohne Eintrag (oder mit ``probe``) Sweep ueber die lokalen /24-Netze."""
+    if not probe:
+        discovered = printer_discovery.devices(printer_type)
+        if discovered:
+            return {
+                "found": len(discovered),
+                "printers": [
+                    {
+                        "ip": d.ip,
+                        "port": d.port,
+                        "type": printer_type,
+                        "hostname": d.name,
+                        "serial": d.serial,
+                        "model": d.model,
+                        "source": d.source
+                    }
+                    for d in discovered
+                ]
+            }
+    found_printers = []
+    for range_str in _local_ranges():
+        network = ipaddress.ip_network(range_str, strict=False)
+        hosts = [str(ip) for ip in network.hosts()]
+        results = await network_scanner.scan_all(hosts, ports, 0.3)
+        _remember(results)
+        for result in results:
+            if result.type != printer_type:
+                continue
+            found_printers.append({
+                "ip": result.ip,
+                "port": result.port,
+                "type": printer_type,
+                "hostname": result.hostname
+            })
+    return {
+        "found": len(found_printers),
+        "printers": found_printers
+    }
+
+
 @router.get("/detect/bambu")
-async def detect_bambu_printers():
+async def detect_bambu_printers(probe: bool = False):
     """Schnelle Erkennung von Bambu Lab Druckern im lokalen Netzwerk
-    
+
     Bambu Lab Ports:
     - 990: FTP (File Transfer)
     - 8883: MQTT over SSL
     - 322: FTP Data
     - 50000-50100: FTP Passive Mode Range
     """
-    
-    # Lokales Subnetz ermitteln
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-        
-        # Subnetz extrahieren
-        subnet_parts = local_ip.split('.')
-        local_subnet = f"{subnet_parts[0]}.{subnet_parts[1]}.{subnet_parts[2]}.0/24"
-        network_ranges = [local_subnet]
-    except Exception as exc:
-        log.exception("Failed to determine local IP for detect_bambu_printers (fallback): %s", exc)
-        # Fallback
-        network_ranges = ["192.168.0.0/24", "192.168.1.0/24", "192.168.178.0/24"]
-    
-    # Bambu Lab Ports (in Priorität)
-    bambu_ports = [990, 8883, 322, 6000]
-    found_printers = []
-    
-    async def check_bambu_host(ip_str: str):
-        for port in bambu_ports:
-            if await check_port(ip_str, port, timeout=0.3):
-                return {
-                    "ip": ip_str,
-                    "port": port,
-                    "type": "bambu",
-                    "hostname": get_hostname(ip_str)
-                }
-        return None
-    
-    for range_str in network_ranges:
-        network = ipaddress.ip_network(range_str, strict=False)
-        hosts = [str(ip) for ip in list(network.hosts())[:50]]  # Nur erste 50 IPs
-        
-        # Scanne parallel
-        tasks = [check_bambu_host(ip) for ip in hosts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if result and not isinstance(result, Exception):
-                found_printers.append(result)
-    
-    return {
-        "found": len(found_printers),
-        "printers": found_printers
-    }
+    return await _detect([990, 8883, 322, 6000], "bambu", probe)
 
 
 @router.get("/detect/klipper")
-async def detect_klipper_printers():
+async def detect_klipper_printers(probe: bool = False):
     """Schnelle Erkennung von Klipper/Moonraker (Port 7125) im lokalen Netzwerk"""
-    
-    # Lokales Subnetz ermitteln
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-        
-        subnet_parts = local_ip.split('.')
-        local_subnet = f"{subnet_parts[0]}.{subnet_parts[1]}.{subnet_parts[2]}.0/24"
-        network_ranges = [local_subnet]
-    except Exception as exc:
-        log.exception("Failed to determine local IP for detect_klipper_printers: %s", exc)
-        network_ranges = ["192.168.0.0/24", "192.168.1.0/24", "192.168.178.0/24"]
-    
-    found_printers = []
-    
-    async def check_klipper_host(ip_str: str):
-        if await check_port(ip_str, 7125, timeout=0.3):
-            return {
-                "ip": ip_str,
-                "port": 7125,
-                "type": "klipper",
-                "hostname": get_hostname(ip_str)
-            }
-        return None
-    
-    for range_str in network_ranges:
-        network = ipaddress.ip_network(range_str, strict=False)
-        hosts = [str(ip) for ip in list(network.hosts())[:50]]  # Erste 50 IPs
-        
-        # Scanne parallel
-        tasks = [check_klipper_host(ip) for ip in hosts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if result and not isinstance(result, Exception):
-                found_printers.append(result)
-    
-    return {
-        "found": len(found_printers),
-        "printers": found_printers
-    }
+    return await _detect([7125], "klipper", probe)
 
 
 # -----------------------------
@@ -845,8 +904,11 @@ async def fingerprint_printer(payload: FingerprintRequest, session: Session = De
 
     results = {}
     results_list = []
-    for p in ports_to_check:
-        res = _fingerprint_port(host, p, timeout_s)
+    # Blockierende Connects parallel im Threadpool statt nacheinander auf dem Event-Loop
+    port_results = await asyncio.gather(
+        *(asyncio.to_thread(_fingerprint_port, host, p, timeout_s) for p in ports_to_check)
+    )
+    for p, res in zip(ports_to_check, port_results):
         results[str(p)] = res
         results_list.append(
             {
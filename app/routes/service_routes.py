@@ -6,7 +6,6 @@ import os
 import sys
 import subprocess
 import logging
-import psutil
 import zipfile
 from datetime import datetime
 import tempfile
@@ -16,6 +15,7 @@ from typing import Optional
 from sqlmodel import Session
 
 from app.database import get_session
+from app.monitoring.system_sampler import system_sampler
 from app.models.printer import Printer
 
 router = APIRouter(prefix="/api/services", tags=["Service Control"])
@@ -162,16 +162,21 @@ def _sort_files(files: list[dict]) -> list[dict]:
 @router.get("/process/info")
 def get_process_info():
     """Gibt Informationen über den aktuellen Prozess zurück"""
+    import psutil
+
     process = psutil.Process()
+    # CPU/RSS/Threads vom Hintergrund-Sampler (kein 100-ms-Messintervall im Request)
+    sample = system_sampler.current()
     
     return {
         "pid": process.pid,
         "name": process.name(),
         "status": process.status(),
         "create_time": process.create_time(),
-        "cpu_percent": process.cpu_percent(interval=0.1),
-        "memory_mb": round(process.memory_info().rss / 1024 / 1024, 2),
-        "num_threads": process.num_threads(),
+        "cpu_percent": sample.get("process_cpu_percent"),
+        "memory_mb": sample.get("process_rss_mb"),
+        "num_threads": sample.get("threads"),
+        "open_fds": sample.get("open_fds"),
         "python_executable": get_python_executable(),
         "python_version": sys.version
     }
@@ -180,6 +185,8 @@ def get_process_info():
 @router.get("/process/list")
 def list_python_processes():
     """Listet alle Python-Prozesse auf"""
+    import psutil
+
     processes = []
     for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'memory_info']):
         try:
@@ -807,10 +814,12 @@ def get_server_stats():
     """Gibt Server-Statistiken zurück"""
     import time
     from datetime import datetime
+    import psutil
     from app.routes.system_routes import START_TIME
     
     uptime = time.time() - START_TIME
     process = psutil.Process()
+    sample = system_sampler.current()
     
     # Network connections (wie viele aktive Verbindungen)
     try:
@@ -836,8 +845,8 @@ def get_server_stats():
         "hostname": hostname,
         "port": 8080,  # aus config laden später
         "active_connections": connections,
-        "threads": process.num_threads(),
-        "memory_mb": round(process.memory_info().rss / 1024 / 1024, 2)
+        "threads": sample.get("threads"),
+        "memory_mb": sample.get("process_rss_mb")
     }
 
 
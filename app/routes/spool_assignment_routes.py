@@ -13,7 +13,6 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlmodel import Session, select, col
 import asyncio
-import json
 import time
 import logging
 
@@ -22,6 +21,7 @@ from app.models.spool import Spool
 from app.models.material import Material
 from app.models.printer import Printer
 from app.services.spool_number_service import assign_spool_number
+from app.websocket.broadcaster import get_channel
 
 logger = logging.getLogger("services")
 
@@ -30,7 +30,7 @@ router = APIRouter(prefix="/api/spools", tags=["spool-assignment"])
 # ========================================
 # Global Pub/Sub for New Spool Detection
 # ========================================
-connected_clients: set = set()
+new_spool_channel = get_channel("new_spools")
 
 # Cooldown: Don't re-broadcast same tray_uuid within 60 seconds
 # (war 300s/5min – zu lang: wenn Benutzer Dialog verpasst, muss er 5min warten)
@@ -58,18 +58,8 @@ async def broadcast_new_spool(spool_data: dict):
     if tray_uuid:
         _broadcast_cooldown[tray_uuid] = time.time()
 
-    logger.info(f"[SPOOL ASSIGN] Broadcasting new spool to {len(connected_clients)} clients")
-
-    disconnected = set()
-    for client_queue in connected_clients:
-        try:
-            client_queue.put_nowait(spool_data)
-        except Exception as e:
-            logger.debug(f"[SPOOL ASSIGN] Failed to send to client: {e}")
-            disconnected.add(client_queue)
-
-    for q in disconnected:
-        connected_clients.discard(q)
+    logger.info(f"[SPOOL ASSIGN] Broadcasting new spool to {new_spool_channel.client_count} clients")
+    new_spool_channel.publish_threadsafe(spool_data)
 
 
 # ========================================
@@ -125,22 +115,21 @@ async def new_spool_stream():
     SSE endpoint for real-time new spool detection notifications.
     Frontend connects to receive alerts when unknown spools appear in AMS.
     """
-    client_queue = asyncio.Queue()
-    connected_clients.add(client_queue)
-    logger.info(f"[SPOOL ASSIGN SSE] Client connected. Total: {len(connected_clients)}")
+    client = new_spool_channel.subscribe(label="new_spool_sse")
+    logger.info(f"[SPOOL ASSIGN SSE] Client connected. Total: {new_spool_channel.client_count}")
 
     async def event_generator():
         from app.main import is_app_shutting_down
         try:
             while not is_app_shutting_down():
                 try:
-                    spool_data = await asyncio.wait_for(
-                        client_queue.get(),
-                        timeout=30.0
-                    )
-                    yield f"data: {json.dumps(spool_data)}\n\n"
-                except asyncio.TimeoutError:
-                    yield f": heartbeat\n\n"
+                    spool_json = await client.get(timeout=30.0)
+                    if spool_json is None:
+                        if client.closed:
+                            break
+                        yield f": heartbeat\n\n"
+                        continue
+                    yield f"data: {spool_json}\n\n"
                 except asyncio.CancelledError:
                     break
                 except Exception as e:
@@ -148,8 +137,8 @@ async def new_spool_stream():
                     yield f"data: {{\"error\": \"stream_error\"}}\n\n"
                     await asyncio.sleep(1)
         finally:
-            connected_clients.discard(client_queue)
-            logger.info(f"[SPOOL ASSIGN SSE] Client disconnected. Total: {len(connected_clients)}")
+            new_spool_channel.unsubscribe(client)
+            logger.info(f"[SPOOL ASSIGN SSE] Client disconnected. Total: {new_spool_channel.client_count}")
 
     return StreamingResponse(
         event_generator(),
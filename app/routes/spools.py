@@ -1,5 +1,6 @@
 ﻿from fastapi import APIRouter, Depends, HTTPException, status, Body
 from fastapi.responses import Response
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
 from sqlmodel import select, Session, col
 from typing import List
 from pydantic import BaseModel
@@ -22,7 +23,7 @@ from app.services.filament_weights import compute_fill_state, compute_spool_rema
 class LoadExternalRequest(BaseModel):
     printer_id: str
 
-router = APIRouter(prefix="/api/spools", tags=["Spools"])
+router = APIRouter(prefix="/api/spools", tags=["Spools"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 _NO_CACHE_HEADERS = {
     "Cache-Control": "no-store, no-cache, max-age=0, must-revalidate",
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 from fastapi import APIRouter, Depends
+from app.routes.fast_json import FastJSONResponse, FastJSONRoute
 from sqlmodel import Session, select
 
 from app.database import get_session
@@ -11,7 +12,7 @@ from app.models.spool import Spool
 from app.models.material import Material
 from app.models.settings import Setting
 
-router = APIRouter(prefix="/api/statistics", tags=["statistics"])
+router = APIRouter(prefix="/api/statistics", tags=["statistics"], route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 
 DEFAULT_POWER_KW = 0.30  # fallback when printer has no power_consumption_kw
@@ -1,16 +1,15 @@
 import time
 import time
 import os
-import psutil
 import yaml
 import logging
 import inspect
 import platform
-import shutil
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.database import get_session
 from app.routes.config_routes import _load_config
+from app.monitoring.system_sampler import system_sampler
 
 router = APIRouter(prefix="/api/system", tags=["System Status"])
 logger = logging.getLogger("app")
@@ -100,21 +99,22 @@ def system_status():
             name: cfg.get("enabled", False) for name, cfg in cfg_yaml.get("logging", {}).get("modules", {}).items()
         }
 
-    # SYSTEM BLOCK (CPU/RAM/DISK)
-    vm = psutil.virtual_memory()
-    disk = shutil.disk_usage(".")
+    # SYSTEM BLOCK (CPU/RAM/DISK) - letzter Sample des Hintergrund-Samplers
+    sample = system_sampler.current()
+    ram_total_mb = sample.get("ram_total_mb") or 0.0
+    ram_used_mb = sample.get("ram_used_mb") or 0.0
     
     system_info = {
-        "cpu_percent": psutil.cpu_percent(interval=0.2),
-        "cpu_count": psutil.cpu_count(),
-        "ram_percent": vm.percent,
-        "ram_total_gb": round(vm.total / (1024**3), 2),
-        "ram_used_gb": round(vm.used / (1024**3), 2),
-        "ram_free_gb": round(vm.available / (1024**3), 2),
-        "disk_percent": round((disk.used / disk.total) * 100, 1),
-        "disk_total_gb": round(disk.total / (1024**3), 2),
-        "disk_used_gb": round(disk.used / (1024**3), 2),
-        "disk_free_gb": round(disk.free / (1024**3), 2),
+        "cpu_percent": sample.get("cpu_percent"),
+        "cpu_count": os.cpu_count(),  # logische CPUs wie psutil.cpu_count()
+        "ram_percent": sample.get("ram_percent"),
+        "ram_total_gb": round(ram_total_mb / 1024, 2),
+        "ram_used_gb": round(ram_used_mb / 1024, 2),
+        "ram_free_gb": round((sample.get("ram_available_mb") or 0.0) / 1024, 2),
+        "disk_percent": sample.get("disk_percent"),
+        "disk_total_gb": sample.get("disk_total_gb"),
+        "disk_used_gb": sample.get("disk_used_gb"),
+        "disk_free_gb": sample.get("disk_free_gb"),
         "platform": platform.system(),
         "platform_release": platform.release(),
         "architecture": platform.machine()
@@ -16,11 +16,10 @@ import re
 import time
 from pathlib import Path
 
-import httpx
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter
 
-from app.database import get_session
+from app.db.executor import run_in_session
+from app.services.http_clients import http_clients
 from app.routes.settings_routes import get_setting
 
 logger = logging.getLogger("app")
@@ -108,32 +107,32 @@ async def _fetch_latest(channel: str) -> str | None:
 
     urls = _VERSION_SOURCES.get(channel, _VERSION_SOURCES["stable"])
     try:
-        async with httpx.AsyncClient(headers={"User-Agent": "FilamentHub-Version-Check"}) as client:
-            for url in urls:
-                try:
-                    resp = await client.get(url, timeout=8.0, follow_redirects=True)
-                    if resp.status_code != 200:
-                        continue
-
-                    version: str | None = None
-                    if "api.github.com/repos/" in url:
-                        data = resp.json()
-                        if "/contents/" in url:
-                            content = data.get("content")
-                            encoding = data.get("encoding")
-                            if content and encoding == "base64":
-                                version = base64.b64decode(content).decode("utf-8").strip()
-                    else:
-                        version = resp.text.strip()
-
-                    if version:
-                        normalized_version = _normalize_version_string(version)
-                        if normalized_version:
-                            _cache.update({"latest": normalized_version, "fetched_at": now, "channel": channel})
-                            return normalized_version
-                except Exception as exc:
-                    logger.debug("[Version] Quelle fehlgeschlagen (%s): %s", url, exc)
+        for url in urls:
+            try:
+                # geteilter GitHub-Client (Keep-Alive, Redirects, Retries mit Backoff)
+                resp = await http_clients.request("github", "GET", url)
+                if resp.status_code != 200:
                     continue
+
+                version: str | None = None
+                if "api.github.com/repos/" in url:
+                    data = resp.json()
+                    if "/contents/" in url:
+                        content = data.get("content")
+                        encoding = data.get("encoding")
+                        if content and encoding == "base64":
+                            version = base64.b64decode(content).decode("utf-8").strip()
+                else:
+                    version = resp.text.strip()
+
+                if version:
+                    normalized_version = _normalize_version_string(version)
+                    if normalized_version:
+                        _cache.update({"latest": normalized_version, "fetched_at": now, "channel": channel})
+                        return normalized_version
+            except Exception as exc:
+                logger.debug("[Version] Quelle fehlgeschlagen (%s): %s", url, exc)
+                continue
     except Exception as exc:
         logger.debug("[Version] GitHub-Check fehlgeschlagen: %s", exc)
     return None
@@ -145,9 +144,9 @@ def get_current_version():
 
 
 @router.get("/check")
-async def check_for_update(session: Session = Depends(get_session), channel: str | None = None):
+async def check_for_update(channel: str | None = None):
     if channel not in ("stable", "beta"):
-        channel = get_setting(session, "update_channel", "stable") or "stable"
+        channel = await run_in_session(get_setting, "update_channel", "stable") or "stable"
     current = _read_current_version()
     latest  = await _fetch_latest(channel)
 
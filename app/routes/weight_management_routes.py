@@ -15,9 +15,11 @@ from typing import Optional, List
 from datetime import datetime
 from sqlmodel import Session, select
 import asyncio
-import json
+import logging
 
 from app.database import get_session
+from app.db.executor import run_in_session
+from app.websocket.broadcaster import get_channel
 from app.models.spool import Spool
 from app.models.weight_history import WeightHistory, WeightHistoryRead
 from app.services.ams_weight_manager import (
@@ -26,12 +28,13 @@ from app.services.ams_weight_manager import (
 )
 
 router = APIRouter(prefix="/api/weight", tags=["weight-management"])
+logger = logging.getLogger("app")
 
 # ========================================
 # Global Pub/Sub für Weight Conflicts
 # ========================================
-# Each connected client gets its own queue
-connected_clients: set = set()
+# Each connected client gets its own bounded queue (see app/websocket/broadcaster.py)
+weight_conflict_channel = get_channel("weight_conflicts")
 
 # Smart Resolve: Track resolved conflicts to prevent re-triggering
 # Format: {spool_uuid: {"resolved_at": timestamp}}
@@ -45,14 +48,14 @@ def mark_conflict_resolved(spool_uuid: str, cloud_weight: float, db_weight: floa
     _resolved_conflicts[spool_uuid] = {
         "resolved_at": time.time()
     }
-    print(f"[WEIGHT SSE] Conflict marked as resolved for {spool_uuid} - cooldown {RESOLVE_COOLDOWN_SECONDS}s")
+    logger.info("[WEIGHT SSE] Conflict marked as resolved for %s - cooldown %ss", spool_uuid, RESOLVE_COOLDOWN_SECONDS)
 
 
 def clear_resolved_conflict(spool_uuid: str):
     """Clear resolved state for a spool"""
     if spool_uuid in _resolved_conflicts:
         del _resolved_conflicts[spool_uuid]
-        print(f"[WEIGHT SSE] Resolved state cleared for {spool_uuid}")
+        logger.debug("[WEIGHT SSE] Resolved state cleared for %s", spool_uuid)
 
 
 async def broadcast_weight_conflict(conflict_data: dict):
@@ -68,26 +71,22 @@ async def broadcast_weight_conflict(conflict_data: dict):
 
         if elapsed < RESOLVE_COOLDOWN_SECONDS:
             remaining = int(RESOLVE_COOLDOWN_SECONDS - elapsed)
-            print(f"[WEIGHT SSE] Skipping conflict for spool {conflict_data.get('spool_number')} - resolved {int(elapsed)}s ago, cooldown {remaining}s remaining")
+            logger.debug(
+                "[WEIGHT SSE] Skipping conflict for spool %s - resolved %ss ago, cooldown %ss remaining",
+                conflict_data.get('spool_number'), int(elapsed), remaining,
+            )
             return
         else:
             # Cooldown expired - clear and allow new conflict
             clear_resolved_conflict(spool_uuid)
 
-    print(f"[WEIGHT SSE] Broadcasting to {len(connected_clients)} clients: {conflict_data.get('spool_number')}")
-
-    # Send to all connected clients
-    disconnected = set()
-    for client_queue in connected_clients:
-        try:
-            client_queue.put_nowait(conflict_data)
-        except Exception as e:
-            print(f"[WEIGHT SSE] Failed to send to client: {e}")
-            disconnected.add(client_queue)
+    logger.debug(
+        "[WEIGHT SSE] Broadcasting to %s clients: %s",
+        weight_conflict_channel.client_count, conflict_data.get('spool_number'),
+    )
 
-    # Clean up disconnected clients
-    for q in disconnected:
-        connected_clients.discard(q)
+    # Send to all connected clients (serialized once)
+    weight_conflict_channel.publish_threadsafe(conflict_data)
 
 
 # ========================================
@@ -154,15 +153,16 @@ async def api_resolve_weight_conflict(
 
 
 @router.get("/spools/{spool_uuid}/history", response_model=List[WeightHistoryRead])
-async def get_spool_history(
-    spool_uuid: str,
-    session: Session = Depends(get_session)
-):
+async def get_spool_history(spool_uuid: str):
     """
     Gets weight history for a spool (UUID-based!)
 
     Important: UUID, not number!
     """
+    return await run_in_session(_load_spool_history, spool_uuid)
+
+
+def _load_spool_history(session: Session, spool_uuid: str) -> List[WeightHistoryRead]:
     stmt = select(WeightHistory).where(
         WeightHistory.spool_uuid == spool_uuid
     ).order_by(
@@ -190,15 +190,16 @@ async def get_spool_history(
 
 
 @router.get("/spools/number/{spool_number}/archived", response_model=List[ArchivedSpoolResponse])
-async def get_archived_spools_for_number(
-    spool_number: int,
-    session: Session = Depends(get_session)
-):
+async def get_archived_spools_for_number(spool_number: int):
     """
     Gets all archived spools for a specific number
 
     For archive function in history view
     """
+    return await run_in_session(_load_archived_spools, spool_number)
+
+
+def _load_archived_spools(session: Session, spool_number: int) -> List[ArchivedSpoolResponse]:
     stmt = select(Spool).where(
         Spool.last_number == spool_number,
         Spool.is_active == False
@@ -264,38 +265,38 @@ async def weight_conflicts_stream():
     Frontend connects to this endpoint to receive conflict alerts
     """
     # Create a queue for this specific client
-    client_queue = asyncio.Queue()
-    connected_clients.add(client_queue)
-    print(f"[WEIGHT SSE] Client connected. Total clients: {len(connected_clients)}")
+    client = weight_conflict_channel.subscribe(label="weight_sse")
+    logger.debug("[WEIGHT SSE] Client connected. Total clients: %s", weight_conflict_channel.client_count)
 
     async def event_generator():
         from app.main import is_app_shutting_down
         try:
             while not is_app_shutting_down():
                 try:
-                    # Wait for next conflict event for THIS client
-                    conflict_data = await asyncio.wait_for(
-                        client_queue.get(),
-                        timeout=30.0  # Heartbeat every 30s
-                    )
+                    # Wait for next conflict event for THIS client (already JSON-serialized)
+                    conflict_json = await client.get(timeout=30.0)  # Heartbeat every 30s
+
+                    if conflict_json is None:
+                        if client.closed:
+                            break
+                        # Send heartbeat to keep connection alive
+                        yield f": heartbeat\n\n"
+                        continue
 
                     # Send event to client
-                    yield f"data: {json.dumps(conflict_data)}\n\n"
+                    yield f"data: {conflict_json}\n\n"
 
-                except asyncio.TimeoutError:
-                    # Send heartbeat to keep connection alive
-                    yield f": heartbeat\n\n"
                 except asyncio.CancelledError:
                     # Client disconnected or server shutdown
                     break
                 except Exception as e:
-                    print(f"[WEIGHT SSE] Error: {e}")
+                    logger.warning("[WEIGHT SSE] Error: %s", e)
                     yield f"data: {{\"error\": \"stream_error\"}}\n\n"
                     await asyncio.sleep(1)
         finally:
             # Clean up when client disconnects
-            connected_clients.discard(client_queue)
-            print(f"[WEIGHT SSE] Client disconnected. Total clients: {len(connected_clients)}")
+            weight_conflict_channel.unsubscribe(client)
+            logger.debug("[WEIGHT SSE] Client disconnected. Total clients: %s", weight_conflict_channel.client_count)
 
     return StreamingResponse(
         event_generator(),
@@ -1,10 +1,33 @@
 import logging
-from typing import Any, Dict, List, Optional, Mapping
+from typing import Any, Dict, List, Optional, Mapping, Tuple
 
 from app.services.ams_parser import AMSUnit, Tray, parse_ams, is_ams_lite_firmware, parse_vt_tray
 
 logger = logging.getLogger("services")
 
+# Memo-Caches pro Geraet, gueltig solange sich die Live-State-Version nicht aendert.
+# key: device_id, value: (cache_key, result)
+_device_cache: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+_real_ams_cache: Dict[str, Tuple[Tuple[Any, ...], bool]] = {}
+
+
+def _entry_version(device_id: Any, entry: Any) -> Optional[int]:
+    """Live-state version of `entry` if it is the current entry for `device_id`.
+
+    Returns None for entries that are not (or no longer) in the live-state store,
+    e.g. ad-hoc dicts built by callers; those are never cached.
+    """
+    from app.services import live_state as live_state_module
+
+    if device_id is None or live_state_module.get_live_state(device_id) is not entry:
+        return None
+    return live_state_module.get_live_state_version(device_id)
+
+
+def clear_normalization_cache() -> None:
+    _device_cache.clear()
+    _real_ams_cache.clear()
+
 
 def _safe_get(d: Optional[Dict[str, Any]], k: str, default: Any = None) -> Any:
     if not isinstance(d, dict):
@@ -242,6 +265,22 @@ def _normalize_ams_unit(ams_unit: AMSUnit, printer_serial: str, printer_name: st
 
 
 def normalize_device(device_entry: Dict[str, Any], printer_name: Optional[str] = None, printer_model: Optional[str] = None, printer_id: Optional[str] = None) -> Dict[str, Any]:
+    """Normalize one live-state entry; memoized per device and live-state version."""
+    device_id = _safe_get(device_entry, "device")
+    version = _entry_version(device_id, device_entry)
+    if version is None:
+        return _normalize_device_uncached(device_entry, printer_name, printer_model, printer_id)
+
+    cache_key = (version, printer_name, printer_model, printer_id)
+    cached = _device_cache.get(device_id)
+    if cached is None or cached[0] != cache_key:
+        cached = (cache_key, _normalize_device_uncached(device_entry, printer_name, printer_model, printer_id))
+        _device_cache[device_id] = cached
+    # Flache Kopie: Aufrufer ersetzen gelegentlich Top-Level-Keys (z.B. "ams_units")
+    return dict(cached[1])
+
+
+def _normalize_device_uncached(device_entry: Dict[str, Any], printer_name: Optional[str] = None, printer_model: Optional[str] = None, printer_id: Optional[str] = None) -> Dict[str, Any]:
     device_serial = str(_safe_get(device_entry, "device") or "unknown")
     ts = _safe_get(device_entry, "ts")
     payload = _safe_get(device_entry, "payload", {}) or {}
@@ -352,11 +391,17 @@ def normalize_live_state(
 def normalize_all_live_state(
     printer_name_by_serial: Optional[Dict[str, str]] = None,
     printer_model_by_serial: Optional[Dict[str, str]] = None,
+    printer_id_by_serial: Optional[Dict[str, str]] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     from app.services import live_state as live_state_module
 
     live = live_state_module.get_all_live_state()
-    return normalize_live_state(live, printer_name_by_serial=printer_name_by_serial, printer_model_by_serial=printer_model_by_serial)
+    return normalize_live_state(
+        live,
+        printer_name_by_serial=printer_name_by_serial,
+        printer_model_by_serial=printer_model_by_serial,
+        printer_id_by_serial=printer_id_by_serial,
+    )
 
 
 def has_real_ams_from_payload(payload: Any, printer_model: Optional[str] = None) -> bool:
@@ -393,6 +438,21 @@ def has_real_ams_from_payload(payload: Any, printer_model: Optional[str] = None)
     return False
 
 
+def entry_has_real_ams(device_id: str, entry: Any, printer_model: Optional[str] = None) -> bool:
+    """has_real_ams_from_payload() for a live-state entry, memoized per live-state version."""
+    payload = (entry.get("payload") if isinstance(entry, dict) else None) or {}
+    version = _entry_version(device_id, entry)
+    if version is None:
+        return has_real_ams_from_payload(payload, printer_model=printer_model)
+
+    cache_key = (version, printer_model)
+    cached = _real_ams_cache.get(device_id)
+    if cached is None or cached[0] != cache_key:
+        cached = (cache_key, has_real_ams_from_payload(payload, printer_model=printer_model))
+        _real_ams_cache[device_id] = cached
+    return cached[1]
+
+
 def has_ams_lite_from_payload(payload: Any, printer_model: Optional[str] = None) -> bool:
     """Check if a payload belongs to an active AMS Lite device."""
     if not isinstance(payload, dict):
@@ -447,8 +507,7 @@ def device_has_real_ams_from_live_state(device_id: str, printer_model: Optional[
             if "A1" in name_upper and "MINI" in name_upper:
                 printer_model = "A1MINI"
     
-    payload = state.get("payload") or {}
-    return has_real_ams_from_payload(payload, printer_model=printer_model)
+    return entry_has_real_ams(device_id, state, printer_model=printer_model)
 
 
 def global_has_real_ams() -> bool:
@@ -456,7 +515,7 @@ def global_has_real_ams() -> bool:
     from app.services import live_state as live_state_module
 
     all_state = live_state_module.get_all_live_state()
-    for _, entry in (all_state or {}).items():
+    for device_id, entry in (all_state or {}).items():
         # Fallback: Try to extract printer_model from printer_name
         printer_model = None
         printer_name = entry.get("printer_name", "")
@@ -465,7 +524,7 @@ def global_has_real_ams() -> bool:
             if "A1" in name_upper and "MINI" in name_upper:
                 printer_model = "A1MINI"
         
-        if has_real_ams_from_payload(entry.get("payload") or {}, printer_model=printer_model):
+        if entry_has_real_ams(device_id, entry, printer_model=printer_model):
             return True
     return False
 
@@ -12,7 +12,7 @@ Flow:
 3. Code eingeben → Access Token erhalten
 """
 
-import aiohttp
+import httpx
 import asyncio
 import logging
 import json
@@ -20,6 +20,8 @@ from typing import Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from app.services.http_clients import http_clients
+
 logger = logging.getLogger("bambu_auth")
 
 
@@ -126,33 +128,27 @@ class BambuAuthService:
         else:
             self.base_url = AuthRegion.GLOBAL.value
 
-        self._session: Optional[aiohttp.ClientSession] = None
         self._pending_email: Optional[str] = None
 
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Lazy init der aiohttp Session."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "User-Agent": "bambu_network_agent/01.09.05.01",
-                    "X-BBL-Client-Name": "OrcaSlicer",
-                    "X-BBL-Client-Type": "slicer",
-                    "X-BBL-Client-Version": "01.09.05.01",
-                    "X-BBL-Language": "en-US",
-                    "X-BBL-OS-Type": "windows",
-                    "X-BBL-OS-Version": "10.0",
-                    "X-BBL-Executable-info": "{}",
-                    "X-BBL-Agent-OS-Type": "windows",
-                }
-            )
-        return self._session
+    @staticmethod
+    def _headers() -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "User-Agent": "bambu_network_agent/01.09.05.01",
+            "X-BBL-Client-Name": "OrcaSlicer",
+            "X-BBL-Client-Type": "slicer",
+            "X-BBL-Client-Version": "01.09.05.01",
+            "X-BBL-Language": "en-US",
+            "X-BBL-OS-Type": "windows",
+            "X-BBL-OS-Version": "10.0",
+            "X-BBL-Executable-info": "{}",
+            "X-BBL-Agent-OS-Type": "windows",
+        }
 
     async def close(self):
-        """Schließt die Session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Nichts zu schließen: die Verbindungen gehören dem geteilten Client (http_clients)."""
+        return None
 
     async def _request(
         self,
@@ -161,29 +157,28 @@ class BambuAuthService:
         data: Optional[Dict] = None,
     ) -> Dict[str, Any]:
         """Führt einen API-Request aus."""
-        session = await self._get_session()
         url = f"{self.base_url}{endpoint}"
 
         logger.debug(f"Auth Request: {method} {url}")
 
         try:
-            async with session.request(method, url, json=data) as response:
-                response_text = await response.text()
+            # Login/TFA sind nicht idempotent: keine automatischen Wiederholungen
+            response = await http_clients.request("bambu_cloud", method, url, json=data, headers=self._headers(), retries=0)
+        except httpx.HTTPError as e:
+            logger.error(f"Auth Network Error: {e}")
+            return {"error": str(e)}
 
-                try:
-                    result = json.loads(response_text)
-                except json.JSONDecodeError:
-                    logger.error(f"Auth: Invalid JSON response: {response_text[:200]}")
-                    return {"error": "Invalid response", "raw": response_text}
+        response_text = response.text
+        try:
+            result = json.loads(response_text)
+        except json.JSONDecodeError:
+            logger.error(f"Auth: Invalid JSON response: {response_text[:200]}")
+            return {"error": "Invalid response", "raw": response_text}
 
-                if response.status >= 400:
-                    logger.error(f"Auth Error {response.status}: {result}")
+        if response.status_code >= 400:
+            logger.error(f"Auth Error {response.status_code}: {result}")
 
-                return result
-
-        except aiohttp.ClientError as e:
-            logger.error(f"Auth Network Error: {e}")
-            return {"error": str(e)}
+        return result
 
     async def login_with_tfa(self, email: str, password: str, tfa_code: str) -> LoginResult:
         """
@@ -557,27 +552,23 @@ class BambuAuthService:
         Returns:
             (is_valid, user_info)
         """
-        session = await self._get_session()
-
-        # Temporär Auth Header setzen
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json",
-        }
+        # Slicer-Header wie bei allen anderen Auth-Requests, plus Bearer-Token
+        headers = {**self._headers(), "Authorization": f"Bearer {access_token}"}
 
         try:
-            async with session.get(
+            response = await http_clients.request(
+                "bambu_cloud",
+                "GET",
                 f"{self.base_url}/v1/user-service/my/profile",
                 headers=headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return True, data
-                elif response.status == 401:
-                    return False, None
-                else:
-                    logger.warning(f"Auth: Token validation returned {response.status}")
-                    return False, None
+            )
+            if response.status_code == 200:
+                return True, response.json()
+            elif response.status_code == 401:
+                return False, None
+            else:
+                logger.warning(f"Auth: Token validation returned {response.status_code}")
+                return False, None
 
         except Exception as e:
             logger.error(f"Auth: Token validation error: {e}")
@@ -124,10 +124,13 @@ async def perform_scheduled_sync():
 
             try:
                 # Sync durchführen
-                sync_result = await service.perform_full_sync(
-                    session=session,
+                # Inkrementell: nur Änderungen seit dem letzten Sync
+                sync_result = await service.perform_incremental_sync(
                     conflict_resolution_mode=config.conflict_resolution_mode
                 )
+                if sync_result.get("status") == "already_running":
+                    logger.info("Bambu Cloud Auto-Sync übersprungen: ein anderer Sync läuft noch")
+                    return
 
                 # Config aktualisieren
                 config.last_sync_at = datetime.now().isoformat()
@@ -155,10 +158,12 @@ async def perform_scheduled_sync():
                         # Retry mit neuem Token
                         service = BambuCloudService(access_token=new_token, region=config.region)
                         try:
-                            sync_result = await service.perform_full_sync(
-                                session=session,
+                            sync_result = await service.perform_incremental_sync(
                                 conflict_resolution_mode=config.conflict_resolution_mode
                             )
+                            if sync_result.get("status") == "already_running":
+                                logger.info("Bambu Cloud Auto-Sync nach Token-Refresh übersprungen: ein anderer Sync läuft noch")
+                                return
                             config.last_sync_at = datetime.now().isoformat()
                             config.last_sync_status = "success"
                             config.connection_status = "connected"
@@ -189,10 +194,7 @@ async def perform_scheduled_sync():
                 session.commit()
 
             finally:
-                if not service._session or service._session.closed:
-                    pass  # Bereits geschlossen (nach Refresh-Retry)
-                else:
-                    await service.close()
+                await service.close()  # no-op: Verbindungen gehören dem geteilten HTTP-Client
 
     except Exception as e:
         logger.error(f"Bambu Cloud Scheduler unerwarteter Fehler: {e}", exc_info=True)
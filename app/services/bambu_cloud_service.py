@@ -9,14 +9,16 @@ Features:
 - Sync zwischen Cloud und lokaler Datenbank
 - Konflikt-Erkennung und -Behandlung
 """
-import aiohttp
+import httpx
 import asyncio
 import logging
 import json
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Set
 from dataclasses import dataclass
 
+from app.services.http_clients import http_clients
+
 logger = logging.getLogger("bambu_cloud")
 
 
@@ -122,86 +124,118 @@ class BambuCloudService:
         self.refresh_token = refresh_token
         self.region = region
         self.base_url = BAMBU_API_REGIONS.get(region, BAMBU_API_REGIONS["eu"])
-        self._session: Optional[aiohttp.ClientSession] = None
-
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Gibt eine aiohttp Session zurück (lazy init)."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self.access_token}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    # Gleiche Headers wie Auth-Service (OrcaSlicer/BambuStudio)
-                    "User-Agent": "bambu_network_agent/01.09.05.01",
-                    "X-BBL-Client-Name": "OrcaSlicer",
-                    "X-BBL-Client-Type": "slicer",
-                    "X-BBL-Client-Version": "01.09.05.01",
-                    "X-BBL-Language": "en-US",
-                    "X-BBL-OS-Type": "windows",
-                    "X-BBL-OS-Version": "10.0",
-                    "X-BBL-Executable-info": "{}",
-                    "X-BBL-Agent-OS-Type": "windows",
-                }
-            )
-        return self._session
+        # Conditional GETs: Cache-Key -> {"etag", "last_modified", "body"}; wird vom
+        # inkrementellen Sync (bambu_cloud_sync) gesetzt und persistiert
+        self.http_cache: Dict[str, Dict[str, Any]] = {}
+        self.not_modified: Set[str] = set()
+        self.request_count = 0
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            # Gleiche Headers wie Auth-Service (OrcaSlicer/BambuStudio)
+            "User-Agent": "bambu_network_agent/01.09.05.01",
+            "X-BBL-Client-Name": "OrcaSlicer",
+            "X-BBL-Client-Type": "slicer",
+            "X-BBL-Client-Version": "01.09.05.01",
+            "X-BBL-Language": "en-US",
+            "X-BBL-OS-Type": "windows",
+            "X-BBL-OS-Version": "10.0",
+            "X-BBL-Executable-info": "{}",
+            "X-BBL-Agent-OS-Type": "windows",
+        }
 
     async def close(self):
-        """Schließt die Session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Nichts zu schließen: die Verbindungen gehören dem geteilten Client (http_clients)."""
+        return None
+
+    @staticmethod
+    def cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+        if not params:
+            return endpoint
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
 
     async def _request(
         self,
         method: str,
         endpoint: str,
         data: Optional[Dict] = None,
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        conditional: bool = False
     ) -> Dict[str, Any]:
-        """Führt einen API-Request aus."""
-        session = await self._get_session()
-        url = f"{self.base_url}{endpoint}"
+        """Führt einen API-Request aus.
 
+        conditional=True (nur GET): sendet If-None-Match/If-Modified-Since aus `http_cache`;
+        bei 304 wird der gecachte Body zurückgegeben und der Key in `not_modified` vermerkt.
+        """
+        url = f"{self.base_url}{endpoint}"
+        key = self.cache_key(endpoint, params)
+        cached = self.http_cache.get(key) if conditional else None
+        headers = self._headers()
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        self.request_count += 1
         try:
-            async with session.request(
+            response = await http_clients.request(
+                "bambu_cloud",
                 method,
                 url,
                 json=data,
-                params=params
-            ) as response:
-                response_text = await response.text()
+                params=params,
+                headers=headers
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Bambu Cloud: Netzwerkfehler - {e}")
+            raise BambuCloudNetworkError(f"Netzwerkfehler: {e}")
 
-                if response.status == 401:
-                    logger.error("Bambu Cloud: Unauthorized - Token ungültig")
-                    raise BambuCloudAuthError("Token ungültig oder abgelaufen")
+        if response.status_code == 304 and cached:
+            self.not_modified.add(key)
+            return cached.get("body") or {}
 
-                if response.status == 403:
-                    logger.error("Bambu Cloud: Forbidden")
-                    raise BambuCloudAuthError("Zugriff verweigert")
+        response_text = response.text
 
-                if response.status >= 400:
-                    logger.error(f"Bambu Cloud API Error: {response.status} - {response_text}")
-                    raise BambuCloudAPIError(f"API Error: {response.status}")
+        if response.status_code == 401:
+            logger.error("Bambu Cloud: Unauthorized - Token ungültig")
+            raise BambuCloudAuthError("Token ungültig oder abgelaufen")
 
-                try:
-                    return json.loads(response_text)
-                except json.JSONDecodeError:
-                    logger.warning(f"Bambu Cloud: Konnte Response nicht parsen: {response_text[:200]}")
-                    return {"raw": response_text}
+        if response.status_code == 403:
+            logger.error("Bambu Cloud: Forbidden")
+            raise BambuCloudAuthError("Zugriff verweigert")
 
-        except aiohttp.ClientError as e:
-            logger.error(f"Bambu Cloud: Netzwerkfehler - {e}")
-            raise BambuCloudNetworkError(f"Netzwerkfehler: {e}")
+        if response.status_code >= 400:
+            logger.error(f"Bambu Cloud API Error: {response.status_code} - {response_text}")
+            raise BambuCloudAPIError(f"API Error: {response.status_code}")
+
+        try:
+            body = json.loads(response_text)
+        except json.JSONDecodeError:
+            logger.warning(f"Bambu Cloud: Konnte Response nicht parsen: {response_text[:200]}")
+            return {"raw": response_text}
+
+        if conditional:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.http_cache[key] = {"etag": etag, "last_modified": last_modified, "body": body}
+            else:
+                self.http_cache.pop(key, None)
+        return body
 
     # ============================================================
     # USER & DEVICES
     # ============================================================
 
-    async def get_user_info(self) -> Dict[str, Any]:
+    async def get_user_info(self, conditional: bool = False) -> Dict[str, Any]:
         """Gibt Benutzerinformationen zurück (inkl. UID für MQTT)."""
         try:
             # Versuche zuerst den neuen Endpunkt
-            result = await self._request("GET", BAMBU_API_ENDPOINTS["user_info"])
+            result = await self._request("GET", BAMBU_API_ENDPOINTS["user_info"], conditional=conditional)
             logger.info(f"Bambu Cloud: User Info abgerufen (preference endpoint)")
             return result
         except BambuCloudAPIError:
@@ -214,10 +248,10 @@ class BambuCloudService:
                 logger.error(f"Bambu Cloud: User Info fehlgeschlagen: {e}")
                 raise
 
-    async def get_devices(self) -> List[BambuCloudDevice]:
+    async def get_devices(self, conditional: bool = False) -> List[BambuCloudDevice]:
         """Gibt alle registrierten Geräte zurück."""
         try:
-            result = await self._request("GET", BAMBU_API_ENDPOINTS["devices"])
+            result = await self._request("GET", BAMBU_API_ENDPOINTS["devices"], conditional=conditional)
             # Debug: Zeige was die API zurückgibt
             logger.info(f"Bambu Cloud devices response: {result}")
             print(f"[CLOUD DEBUG] devices response keys: {result.keys() if isinstance(result, dict) else type(result)}")
@@ -246,10 +280,10 @@ class BambuCloudService:
         logger.info(f"Bambu Cloud: {len(devices)} Geräte gefunden")
         return devices
 
-    async def test_connection(self) -> bool:
+    async def test_connection(self, conditional: bool = False) -> bool:
         """Testet die Verbindung zur Bambu Cloud."""
         try:
-            await self.get_user_info()
+            await self.get_user_info(conditional=conditional)
             return True
         except Exception as e:
             logger.warning(f"Bambu Cloud: Connection test failed - {e}")
@@ -276,81 +310,8 @@ class BambuCloudService:
         Returns:
             Liste von BambuCloudTask Objekten mit Filament-Verbrauch
         """
-        tasks = []
-
         try:
-            # Build URL with parameters
-            params = {"limit": limit}
-            if device_id:
-                params["deviceId"] = device_id
-            if after:
-                params["after"] = after
-
-            result = await self._request(
-                "GET",
-                BAMBU_API_ENDPOINTS["my_tasks"],
-                params=params
-            )
-
-            # Debug: Log response structure
-            logger.info(f"Bambu Cloud Tasks response keys: {result.keys() if isinstance(result, dict) else type(result)}")
-            print(f"[CLOUD DEBUG] Tasks response type: {type(result)}, preview: {str(result)[:500]}")
-
-            # Parse tasks - API kann verschiedene Formate zurückgeben:
-            # 1. Liste direkt: [task1, task2, ...]
-            # 2. Dict mit "tasks": {"tasks": [...], "total": N}
-            # 3. Dict mit "hits": {"hits": [...], "total": N}
-            if isinstance(result, list):
-                # API gibt direkt eine Liste zurück
-                task_list = result
-                total = len(result)
-            elif isinstance(result, dict):
-                # Format: {"total": 32, "hits": [task1, task2, ...]}
-                task_list = result.get("tasks") or result.get("hits") or []
-
-                # total ist direkt im result, nicht in hits
-                total = result.get("total", 0)
-
-                # Falls task_list noch ein Dict ist (verschachtelte Struktur)
-                if isinstance(task_list, dict):
-                    total = task_list.get("total", {}).get("value", 0) if isinstance(task_list.get("total"), dict) else task_list.get("total", 0)
-                    task_list = task_list.get("hits", [])
-            else:
-                logger.warning(f"Bambu Cloud: Unerwartetes Tasks-Format: {type(result)}")
-                task_list = []
-                total = 0
-
-            logger.info(f"Bambu Cloud: {len(task_list)} Tasks gefunden (total: {total})")
-
-            for task in task_list:
-                # Status mapping
-                status_raw = task.get("status", "unknown")
-                if isinstance(status_raw, int):
-                    # Numerischer Status: 2 = finished, etc.
-                    status_map = {0: "pending", 1: "running", 2: "finished", 3: "failed", 4: "cancelled"}
-                    status = status_map.get(status_raw, "unknown")
-                else:
-                    status = str(status_raw).lower()
-
-                tasks.append(BambuCloudTask(
-                    id=str(task.get("id", "")),
-                    title=task.get("title", task.get("designTitle", "Untitled")),
-                    device_id=task.get("deviceId", ""),
-                    device_name=task.get("deviceName", ""),
-                    status=status,
-                    weight=float(task.get("weight", 0) or 0),
-                    length=float(task.get("length", 0) or 0),
-                    cost_time=int(task.get("costTime", 0) or 0),
-                    start_time=task.get("startTime"),
-                    end_time=task.get("endTime"),
-                    cover_url=task.get("cover"),
-                    thumbnail_url=task.get("thumbnail"),
-                    plate_index=int(task.get("plateIndex", 1) or 1),
-                    ams_mapping=task.get("amsDetailMapping", []),
-                ))
-
-            return tasks
-
+            return await self._fetch_tasks(device_id=device_id, limit=limit, after=after)
         except BambuCloudAuthError as e:
             logger.warning(f"Bambu Cloud: Tasks Endpunkt nicht verfügbar (401): {e}")
             print(f"[CLOUD DEBUG] Tasks Auth Error: {e}")
@@ -366,22 +327,176 @@ class BambuCloudService:
             traceback.print_exc()
             return []
 
+    async def _fetch_tasks(
+        self,
+        device_id: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[str] = None
+    ) -> List[BambuCloudTask]:
+        """Wie get_tasks(), aber Fehler (Auth/API/Netzwerk) werden nicht abgefangen."""
+        tasks = []
+
+        # Build URL with parameters
+        params = {"limit": limit}
+        if device_id:
+            params["deviceId"] = device_id
+        if after:
+            params["after"] = after
+
+        result = await self._request(
+            "GET",
+            BAMBU_API_ENDPOINTS["my_tasks"],
+            params=params
+        )
+
+        # Debug: Log response structure
+        logger.info(f"Bambu Cloud Tasks response keys: {result.keys() if isinstance(result, dict) else type(result)}")
+        print(f"[CLOUD DEBUG] Tasks response type: {type(result)}, preview: {str(result)[:500]}")
+
+        # Parse tasks - API kann verschiedene Formate zurückgeben:
+        # 1. Liste direkt: [task1, task2, ...]
+        # 2. Dict mit "tasks": {"tasks": [...], "total": N}
+        # 3. Dict mit "hits": {"hits": [...], "total": N}
+        if isinstance(result, list):
+            # API gibt direkt eine Liste zurück
+            task_list = result
+            total = len(result)
+        elif isinstance(result, dict):
+            # Format: {"total": 32, "hits": [task1, task2, ...]}
+            task_list = result.get("tasks") or result.get("hits") or []
+
+            # total ist direkt im result, nicht in hits
+            total = result.get("total", 0)
+
+            # Falls task_list noch ein Dict ist (verschachtelte Struktur)
+            if isinstance(task_list, dict):
+                total = task_list.get("total", {}).get("value", 0) if isinstance(task_list.get("total"), dict) else task_list.get("total", 0)
+                task_list = task_list.get("hits", [])
+        else:
+            logger.warning(f"Bambu Cloud: Unerwartetes Tasks-Format: {type(result)}")
+            task_list = []
+            total = 0
+
+        logger.info(f"Bambu Cloud: {len(task_list)} Tasks gefunden (total: {total})")
+
+        for task in task_list:
+            # Status mapping
+            status_raw = task.get("status", "unknown")
+            if isinstance(status_raw, int):
+                # Numerischer Status: 2 = finished, etc.
+                status_map = {0: "pending", 1: "running", 2: "finished", 3: "failed", 4: "cancelled"}
+                status = status_map.get(status_raw, "unknown")
+            else:
+                status = str(status_raw).lower()
+
+            tasks.append(BambuCloudTask(
+                id=str(task.get("id", "")),
+                title=task.get("title", task.get("designTitle", "Untitled")),
+                device_id=task.get("deviceId", ""),
+                device_name=task.get("deviceName", ""),
+                status=status,
+                weight=float(task.get("weight", 0) or 0),
+                length=float(task.get("length", 0) or 0),
+                cost_time=int(task.get("costTime", 0) or 0),
+                start_time=task.get("startTime"),
+                end_time=task.get("endTime"),
+                cover_url=task.get("cover"),
+                thumbnail_url=task.get("thumbnail"),
+                plate_index=int(task.get("plateIndex", 1) or 1),
+                ams_mapping=task.get("amsDetailMapping", []),
+            ))
+
+        return tasks
+
+    async def get_tasks_since(
+        self,
+        cursor: Optional[str] = None,
+        open_task_ids: Optional[Set[str]] = None,
+        page_size: int = 20,
+        max_pages: int = 10,
+        first_page_size: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Ruft nur Tasks ab, die seit `cursor` (neueste bekannte Task-ID) hinzugekommen sind.
+
+        my/tasks liefert die neuesten Tasks zuerst und blättert mit `after`. Es wird
+        geblättert, bis der Cursor erreicht ist und alle noch offenen Tasks (laufend/wartend
+        beim letzten Sync) wieder gesehen wurden - oder max_pages erreicht ist.
+        Ohne Cursor (erster Sync) wird nur die erste Seite geholt; mit Cursor ist die erste
+        Seite klein (first_page_size), da zwischen zwei Syncs meist nur wenige Tasks entstehen.
+
+        Schlägt eine Seite fehl, ist das Ergebnis unvollständig (complete=False, "error"
+        gesetzt); ohne erreichten Cursor bleibt dieser stehen, damit der nächste Sync die
+        Lücke erneut abruft.
+
+        Returns:
+            {"tasks": [...], "pages": n, "cursor": neueste Task-ID, "complete": bool, "error": str|None}
+        """
+        pending_open = set(open_task_ids or ())
+        tasks: List[BambuCloudTask] = []
+        pages = 0
+        after: Optional[str] = None
+        reached_cursor = cursor is None
+        error: Optional[str] = None
+
+        while pages < max_pages:
+            limit = first_page_size if (pages == 0 and cursor is not None) else page_size
+            try:
+                page = await self._fetch_tasks(limit=limit, after=after)
+            except Exception as e:
+                # Fehler ist kein Listenende: offene Tasks und Cursor nicht verwerfen
+                logger.warning(f"Bambu Cloud: Tasks-Seite {pages + 1} nicht abrufbar: {e}")
+                error = str(e) or type(e).__name__
+                break
+            pages += 1
+            for task in page:
+                if cursor is not None and _task_id_at_or_before(task.id, cursor):
+                    reached_cursor = True
+                pending_open.discard(task.id)
+                tasks.append(task)
+            if not page or len(page) < limit:
+                reached_cursor = True
+                pending_open.clear()
+                break
+            if cursor is None or (reached_cursor and not pending_open):
+                break
+            after = page[-1].id
+
+        advance = tasks and (error is None or reached_cursor)
+        return {
+            "tasks": tasks,
+            "pages": pages,
+            "cursor": tasks[0].id if advance else cursor,
+            "complete": error is None and reached_cursor and not pending_open,
+            "error": error,
+        }
+
     # ============================================================
     # SPOOL / FILAMENT DATA
     # ============================================================
 
-    async def get_cloud_spools(self, device_id: Optional[str] = None) -> List[BambuCloudSpool]:
+    async def get_cloud_spools(
+        self,
+        device_id: Optional[str] = None,
+        devices: Optional[List[BambuCloudDevice]] = None,
+        conditional: bool = False
+    ) -> List[BambuCloudSpool]:
         """
         Ruft Spulen-Daten aus der Cloud ab.
 
         Die Bambu Cloud speichert Filament-Informationen in den Geräte-Daten.
         Wir verwenden den devices Endpunkt als primäre Quelle.
+
+        Args:
+            devices: Bereits abgerufene Geräte (spart den zweiten devices-Request)
+            conditional: device_versions als Conditional GET abrufen
         """
         spools = []
 
         try:
             # Zuerst Geräte abrufen (dieser Endpunkt funktioniert immer)
-            devices = await self.get_devices()
+            if devices is None:
+                devices = await self.get_devices()
             logger.info(f"Bambu Cloud: {len(devices)} Geräte gefunden")
 
             # Wenn keine Geräte, direkt zurück
@@ -397,7 +512,7 @@ class BambuCloudService:
 
             # Optional: Versuche device_versions (kann fehlschlagen)
             try:
-                result = await self._request("GET", BAMBU_API_ENDPOINTS["device_versions"])
+                result = await self._request("GET", BAMBU_API_ENDPOINTS["device_versions"], conditional=conditional)
                 logger.debug(f"Bambu Cloud device_versions: {result.keys() if isinstance(result, dict) else 'no dict'}")
 
                 # Parse AMS-Daten wenn vorhanden
@@ -609,132 +724,42 @@ class BambuCloudService:
 
     async def perform_full_sync(
         self,
-        session,  # SQLModel Session
-        conflict_resolution_mode: str = "ask"
+        session=None,  # nur noch aus Kompatibilität; der Sync nutzt den DB-Pool
+        conflict_resolution_mode: str = "ask",
+        incremental: bool = False
     ) -> Dict[str, Any]:
         """
-        Führt einen vollständigen Sync durch:
+        Führt einen Sync durch (siehe app.services.bambu_cloud_sync):
         1. Testet Verbindung
-        2. Ruft Cloud-Spulen ab (wenn verfügbar)
+        2. Ruft Drucker und Cloud-Spulen ab (wenn verfügbar)
         3. Vergleicht mit lokalen Spulen
         4. Erstellt Konflikte falls nötig
+        5. Ruft neue/geänderte Tasks ab
 
         Args:
-            session: SQLModel Session für DB-Zugriff
             conflict_resolution_mode: 'ask', 'prefer_local', 'prefer_cloud'
+            incremental: nur Änderungen seit dem letzten Sync (Cursor, Fingerprints, Conditional GETs)
 
         Returns:
             Sync-Report mit Statistiken
         """
-        from app.models.spool import Spool
-        from app.models.cloud_conflict import CloudConflict
-        from sqlmodel import select
+        from app.services.bambu_cloud_sync import run_cloud_sync
 
-        # 0. Teste erst die Verbindung
-        is_connected = await self.test_connection()
-        if not is_connected:
-            raise BambuCloudAuthError("Verbindung zur Bambu Cloud fehlgeschlagen")
+        return await run_cloud_sync(self, incremental=incremental)
 
-        # 0.5 Drucker abrufen
-        devices = await self.get_devices()
-        logger.info(f"Bambu Cloud Sync: {len(devices)} Drucker gefunden")
+    async def perform_incremental_sync(self, conflict_resolution_mode: str = "ask") -> Dict[str, Any]:
+        """Inkrementeller Sync (Standard für Auto-Sync)."""
+        return await self.perform_full_sync(conflict_resolution_mode=conflict_resolution_mode, incremental=True)
 
-        # 1. Cloud-Spulen abrufen (kann leer sein wenn Token eingeschränkt)
-        cloud_spools = await self.get_cloud_spools()
-        
-        # 2. Lokale Spulen abrufen
-        local_spools_query = select(Spool)
-        local_spools_list = session.exec(local_spools_query).all()
-        
-        # 3. Lokale Spulen in Dict-Format konvertieren
-        local_spools_dict = []
-        for spool in local_spools_list:
-            # Berechne remain_percent aus Gewicht
-            remain_percent = 0
-            if spool.weight_full and spool.weight_full > 0:
-                current = spool.weight_current or (spool.weight_full - spool.weight_empty)
-                remain_percent = max(0, min(100, (current / spool.weight_full) * 100))
-            
-            local_spools_dict.append({
-                "id": spool.id,
-                "spool_number": spool.spool_number,
-                "name": spool.name,
-                "tray_uuid": spool.cloud_tray_uuid,
-                "remain_percent": remain_percent,
-                "weight_current": spool.weight_current,
-                "weight_full": spool.weight_full,
-                "color": spool.color or spool.tray_color,
-                "material": spool.name or spool.tray_type or "Unknown",
-            })
-        
-        # 4. Sync durchführen
-        sync_result = await self.sync_spools_with_local(
-            local_spools_dict,
-            weight_tolerance_percent=5.0
-        )
-        
-        # 5. Konflikte in DB speichern
-        conflicts_created = 0
-        for conflict_data in sync_result.get("conflicts", []):
-            cloud_spool = conflict_data.get("cloud_spool", {})
-            local_spool = conflict_data.get("local_spool", {})
-            
-            # Finde lokale Spool-ID
-            spool_id = local_spool.get("id")
-            
-            # Erstelle CloudConflict
-            conflict = CloudConflict(
-                spool_id=spool_id,
-                conflict_type="weight",
-                severity="medium",
-                local_value=str(local_spool.get("remain_percent", 0)),
-                cloud_value=str(cloud_spool.get("remain", 0)),
-                difference_percent=conflict_data.get("difference_percent", 0),
-                status="pending",
-                detected_at=datetime.now().isoformat(),
-                description=f"Gewichtsabweichung: Lokal {local_spool.get('remain_percent', 0)}% vs Cloud {cloud_spool.get('remain', 0)}%"
-            )
-            session.add(conflict)
-            conflicts_created += 1
-        
-        if conflicts_created > 0:
-            session.commit()
-            logger.info(f"Bambu Cloud Sync: {conflicts_created} Konflikte erstellt")
-        
-        # Info-Nachricht wenn keine Cloud-Spulen
-        message = None
-        if len(cloud_spools) == 0:
-            message = "Verbunden, aber Token hat keine Berechtigung für Spulen-Daten. AMS-Daten werden über MQTT synchronisiert."
-            logger.info(f"Bambu Cloud Sync: {message}")
-
-        # Drucker-Daten für Response konvertieren
-        devices_data = [
-            {
-                "dev_id": d.dev_id,
-                "name": d.name,
-                "online": d.online,
-                "print_status": d.print_status,
-                "model": d.dev_product_name,
-                "model_code": d.dev_model_name,
-                "access_code": d.dev_access_code,
-            }
-            for d in devices
-        ]
 
-        return {
-            "status": "completed",
-            "synced_at": datetime.now().isoformat(),
-            "devices": devices_data,
-            "devices_count": len(devices),
-            "cloud_spools_count": len(cloud_spools),
-            "local_spools_count": len(local_spools_list),
-            "matched": len(sync_result.get("matched", [])),
-            "conflicts": len(sync_result.get("conflicts", [])),
-            "conflicts_created": conflicts_created,
-            "cloud_only": len(sync_result.get("cloud_only", [])),
-            "local_only": len(sync_result.get("local_only", [])),
-            "message": message,
-        }
+def _task_id_at_or_before(task_id: str, cursor: str) -> bool:
+    """Task-IDs sind numerisch aufsteigend; gelöschte Cursor-Tasks werden so trotzdem erkannt."""
+    if task_id == cursor:
+        return True
+    try:
+        return int(task_id) <= int(cursor)
+    except (TypeError, ValueError):
+        return False
 
 
 # ============================================================
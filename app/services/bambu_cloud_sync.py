@@ -0,0 +1,428 @@
+"""
+Bambu Cloud Sync (inkrementell)
+===============================
+Gemeinsamer Ablauf für Auto-Sync (Scheduler) und manuellen Sync.
+
+Inkrementeller Modus:
+- Conditional GETs (ETag/Last-Modified) für user_info, devices und device_versions
+- Tasks nur seit dem letzten Cursor (neueste bekannte Task-ID), offene Tasks werden nachverfolgt;
+  neue/geänderte Tasks landen im lokalen Spiegel ``cloud_tasks`` (app.services.cloud_task_cache)
+- Pro Spule Fingerprint von Cloud- und Lokalwerten; unveränderte Paare werden nicht erneut
+  verglichen und erzeugen keine neuen Konflikte
+- Konflikte werden gesammelt und mit einem Commit geschrieben; für Spulen mit bereits offenem
+  Konflikt desselben Typs wird kein weiterer angelegt
+
+Voller Modus (`incremental=False`): verwirft Cursor/Fingerprints/HTTP-Cache und vergleicht alles;
+ETags und Fingerprints werden dabei neu aufgebaut, der nächste inkrementelle Sync profitiert sofort.
+
+Der Zustand liegt neben der Datenbank in bambu_cloud_sync_state.json; der letzte Report
+(Phasen-Zeiten, Mengen) wird unter /api/bambu-cloud/sync/status ausgegeben.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlmodel import Session, select
+
+from app.db.executor import run_in_session
+from app.models.cloud_conflict import CloudConflict
+from app.models.spool import Spool
+from app.services import cloud_task_cache
+from app.services.bambu_cloud_service import (
+    BAMBU_API_ENDPOINTS,
+    BambuCloudAuthError,
+    BambuCloudService,
+    BambuCloudTask,
+)
+
+logger = logging.getLogger("bambu_cloud")
+
+STATE_VERSION = 1
+MAX_TASK_FINGERPRINTS = 500
+OPEN_TASK_STATUSES = ("pending", "running", "unknown")
+WEIGHT_TOLERANCE_PERCENT = 5.0
+
+
+def _fingerprint(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _task_fingerprint(task: BambuCloudTask) -> str:
+    return _fingerprint([task.status, task.weight, task.length, task.cost_time, task.end_time, task.ams_mapping])
+
+
+class CloudSyncState:
+    """Persistenter Sync-Zustand (Cursor, Fingerprints, HTTP-Cache) und letzter Report."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.task_cursor: Optional[str] = None
+        self.open_tasks: List[str] = []
+        self.task_fingerprints: Dict[str, str] = {}
+        self.spools: Dict[str, Dict[str, str]] = {}  # tray_uuid -> {"cloud", "local", "outcome"}
+        self.http_cache: Dict[str, Dict[str, Any]] = {}
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Gehalten, solange run_cloud_sync läuft
+        self.sync_lock = threading.Lock()
+
+    @property
+    def is_syncing(self) -> bool:
+        return self.sync_lock.locked()
+
+    def _resolve_path(self) -> Path:
+        if self.path is None:
+            from app.database import DB_PATH
+
+            self.path = Path(DB_PATH).resolve().parent / "bambu_cloud_sync_state.json"
+        return self.path
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        path = self._resolve_path()
+        if not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            logger.warning("Bambu Cloud: Sync-Zustand %s nicht lesbar - starte ohne", path, exc_info=True)
+            return
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return
+        self.task_cursor = data.get("task_cursor")
+        self.open_tasks = list(data.get("open_tasks") or [])
+        self.task_fingerprints = dict(data.get("task_fingerprints") or {})
+        self.spools = dict(data.get("spools") or {})
+        self.http_cache = dict(data.get("http_cache") or {})
+        self.last_report = data.get("last_report")
+
+    def save(self) -> None:
+        path = self._resolve_path()
+        with self._lock:
+            data = {
+                "version": STATE_VERSION,
+                "task_cursor": self.task_cursor,
+                "open_tasks": self.open_tasks,
+                "task_fingerprints": self.task_fingerprints,
+                "spools": self.spools,
+                "http_cache": self.http_cache,
+                "last_report": self.last_report,
+            }
+            tmp_path = None
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    mode="w", dir=str(path.parent), delete=False, encoding="utf-8", suffix=".tmp"
+                ) as tf:
+                    tmp_path = tf.name
+                    json.dump(data, tf, separators=(",", ":"))
+                os.replace(tmp_path, str(path))
+            except Exception:
+                logger.exception("Bambu Cloud: Sync-Zustand konnte nicht gespeichert werden (%s)", path)
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+    def reset(self) -> None:
+        self.task_cursor = None
+        self.open_tasks = []
+        self.task_fingerprints = {}
+        self.spools = {}
+        self.http_cache = {}
+
+
+class _Phases:
+    def __init__(self) -> None:
+        self.ms: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms[name] = round(self.ms.get(name, 0.0) + (time.perf_counter() - started) * 1000.0, 2)
+
+
+def _local_spool_rows(session: Session) -> List[Dict[str, Any]]:
+    rows = []
+    for spool in session.exec(select(Spool)).all():
+        # Berechne remain_percent aus Gewicht
+        remain_percent = 0
+        if spool.weight_full and spool.weight_full > 0:
+            current = spool.weight_current or (spool.weight_full - spool.weight_empty)
+            remain_percent = max(0, min(100, (current / spool.weight_full) * 100))
+        rows.append({
+            "id": spool.id,
+            "spool_number": spool.spool_number,
+            "name": spool.name,
+            "tray_uuid": spool.cloud_tray_uuid,
+            "remain_percent": remain_percent,
+            "weight_current": spool.weight_current,
+            "weight_full": spool.weight_full,
+            "color": spool.color or spool.tray_color,
+            "material": spool.name or spool.tray_type or "Unknown",
+        })
+    return rows
+
+
+def _write_conflicts(session: Session, conflicts: List[Dict[str, Any]], sync_session_id: str) -> Dict[str, int]:
+    """Konflikte in einem Commit anlegen; offene Konflikte gleicher Spule/Typ nicht duplizieren."""
+    if not conflicts:
+        return {"created": 0, "skipped_existing": 0}
+    spool_ids = {c["local_spool"].get("id") for c in conflicts if c["local_spool"].get("id")}
+    existing = set()
+    if spool_ids:
+        existing = {
+            (spool_id, conflict_type)
+            for spool_id, conflict_type in session.exec(
+                select(CloudConflict.spool_id, CloudConflict.conflict_type).where(
+                    CloudConflict.status == "pending",
+                    CloudConflict.spool_id.in_(spool_ids),
+                )
+            ).all()
+        }
+    now = datetime.now().isoformat()
+    new_rows = []
+    for conflict_data in conflicts:
+        cloud_spool = conflict_data["cloud_spool"]
+        local_spool = conflict_data["local_spool"]
+        spool_id = local_spool.get("id")
+        if (spool_id, "weight") in existing:
+            continue
+        existing.add((spool_id, "weight"))
+        new_rows.append(CloudConflict(
+            spool_id=spool_id,
+            conflict_type="weight",
+            severity="medium",
+            local_value=str(local_spool.get("remain_percent", 0)),
+            cloud_value=str(cloud_spool.get("remain", 0)),
+            difference_percent=conflict_data.get("difference_percent", 0),
+            status="pending",
+            detected_at=now,
+            sync_session_id=sync_session_id,
+            description=f"Gewichtsabweichung: Lokal {local_spool.get('remain_percent', 0)}% vs Cloud {cloud_spool.get('remain', 0)}%"
+        ))
+    if new_rows:
+        session.add_all(new_rows)
+        session.commit()
+    return {"created": len(new_rows), "skipped_existing": len(conflicts) - len(new_rows)}
+
+
+async def run_cloud_sync(
+    service: BambuCloudService,
+    incremental: bool = True,
+    state: Optional["CloudSyncState"] = None,
+    weight_tolerance_percent: float = WEIGHT_TOLERANCE_PERCENT,
+) -> Dict[str, Any]:
+    """
+    Führt einen Sync durch und gibt den Report zurück (kompatibel zu perform_full_sync).
+
+    Phasen: connect, devices, spools, local, diff, conflicts, tasks, mirror, persist.
+    DB-Zugriffe laufen mit eigener Session im DB-Pool (app.db.executor).
+    """
+    state = state or cloud_sync_state
+    # Scheduler und manueller Sync teilen sich Zustand und Konflikte: nie zwei Läufe gleichzeitig.
+    # threading.Lock statt asyncio.Lock, weil Syncs auch aus einem eigenen Event-Loop kommen
+    # (job_tracking_service -> asyncio.run(trigger_immediate_sync())).
+    if not state.sync_lock.acquire(blocking=False):
+        logger.info("Bambu Cloud Sync läuft bereits, neuer Lauf wird übersprungen")
+        return {"status": "already_running", "message": "Sync läuft bereits"}
+
+    phases = _Phases()
+    sync_session_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    started = time.perf_counter()
+    try:
+        state.load()
+        if not incremental:
+            state.reset()
+        service.http_cache = state.http_cache
+
+        # 0. Verbindung testen
+        with phases("connect"):
+            is_connected = await service.test_connection(conditional=True)
+        if not is_connected:
+            raise BambuCloudAuthError("Verbindung zur Bambu Cloud fehlgeschlagen")
+
+        # 1. Drucker (einmal; get_cloud_spools bekommt die Liste)
+        with phases("devices"):
+            devices = await service.get_devices(conditional=True)
+        logger.info(f"Bambu Cloud Sync: {len(devices)} Drucker gefunden")
+
+        # 2. Cloud-Spulen (kann leer sein wenn Token eingeschränkt)
+        with phases("spools"):
+            cloud_spools = await service.get_cloud_spools(devices=devices, conditional=True)
+        spools_not_modified = service.cache_key(BAMBU_API_ENDPOINTS["device_versions"]) in service.not_modified
+
+        # 3. Lokale Spulen
+        with phases("local"):
+            local_rows = await run_in_session(_local_spool_rows)
+
+        # 4. Vergleich mit Fingerprint-Kurzschluss
+        counts = {"matched": 0, "conflicts": 0, "cloud_only": 0, "local_only": 0, "unchanged": 0, "compared": 0}
+        new_conflicts: List[Dict[str, Any]] = []
+        with phases("diff"):
+            local_by_uuid = {row["tray_uuid"]: row for row in local_rows if row.get("tray_uuid")}
+            seen = set()
+            spool_state: Dict[str, Dict[str, str]] = {}
+            for cloud_spool in cloud_spools:
+                uuid = cloud_spool.tray_uuid
+                seen.add(uuid)
+                local_spool = local_by_uuid.get(uuid)
+                cloud_fp = _fingerprint(cloud_spool.__dict__)
+                local_fp = _fingerprint([local_spool.get("id"), round(local_spool.get("remain_percent") or 0, 1)]) if local_spool else ""
+                previous = state.spools.get(uuid)
+                if previous and previous.get("cloud") == cloud_fp and previous.get("local") == local_fp:
+                    outcome = previous.get("outcome", "matched")
+                    counts["unchanged"] += 1
+                else:
+                    counts["compared"] += 1
+                    if not local_spool:
+                        outcome = "cloud_only"
+                    else:
+                        cloud_remain = cloud_spool.remain or 0
+                        local_remain = local_spool.get("remain_percent", 0) or 0
+                        if abs(cloud_remain - local_remain) > weight_tolerance_percent:
+                            outcome = "conflicts"
+                            new_conflicts.append({
+                                "cloud_spool": cloud_spool.__dict__,
+                                "local_spool": local_spool,
+                                "difference_percent": abs(cloud_remain - local_remain),
+                            })
+                        else:
+                            outcome = "matched"
+                counts[outcome] += 1
+                spool_state[uuid] = {"cloud": cloud_fp, "local": local_fp, "outcome": outcome}
+            counts["local_only"] = sum(1 for uuid in local_by_uuid if uuid not in seen)
+
+        # 5. Konflikte gesammelt schreiben
+        with phases("conflicts"):
+            written = await run_in_session(_write_conflicts, new_conflicts, sync_session_id)
+        # Fingerprints erst nach erfolgreichem Schreiben übernehmen
+        state.spools = spool_state
+        if written["created"]:
+            logger.info(f"Bambu Cloud Sync: {written['created']} Konflikte erstellt")
+
+        # 6. Tasks seit Cursor
+        with phases("tasks"):
+            task_result = await service.get_tasks_since(
+                cursor=state.task_cursor if incremental else None,
+                open_task_ids=set(state.open_tasks) if incremental else None,
+            )
+        changed_tasks: List[BambuCloudTask] = []
+        new_task_count = 0
+        for task in task_result["tasks"]:
+            fp = _task_fingerprint(task)
+            previous_fp = state.task_fingerprints.get(task.id)
+            if previous_fp == fp:
+                continue
+            if previous_fp is None:
+                new_task_count += 1
+            state.task_fingerprints[task.id] = fp
+            changed_tasks.append(task)
+        if len(state.task_fingerprints) > MAX_TASK_FINGERPRINTS:
+            keep = sorted(state.task_fingerprints, key=lambda tid: (len(tid), tid))[-MAX_TASK_FINGERPRINTS:]
+            state.task_fingerprints = {tid: state.task_fingerprints[tid] for tid in keep}
+        fetched_open = {task.id for task in task_result["tasks"] if task.status in OPEN_TASK_STATUSES}
+        if task_result["complete"]:
+            state.open_tasks = sorted(fetched_open)
+        else:
+            state.open_tasks = sorted(fetched_open | set(state.open_tasks))
+        state.task_cursor = task_result["cursor"]
+
+        # 7. Abgerufene Tasks in den lokalen Spiegel (cloud_tasks); unveränderte überspringt
+        #    upsert_tasks selbst - so wird auch ein frisch angelegter Spiegel gefüllt
+        with phases("mirror"):
+            try:
+                mirrored = await run_in_session(cloud_task_cache.upsert_tasks, task_result["tasks"])
+            except Exception as exc:
+                logger.warning(f"Bambu Cloud Sync: Task-Spiegel nicht aktualisiert: {exc}")
+                mirrored = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        message = None
+        if len(cloud_spools) == 0:
+            message = "Verbunden, aber Token hat keine Berechtigung für Spulen-Daten. AMS-Daten werden über MQTT synchronisiert."
+            logger.info(f"Bambu Cloud Sync: {message}")
+
+        report = {
+            "mode": "incremental" if incremental else "full",
+            "synced_at": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000.0, 2),
+            "phases": phases.ms,
+            "requests": service.request_count,
+            "not_modified": sorted(service.not_modified),
+            "spools_not_modified": spools_not_modified,
+            "tasks_error": task_result["error"],
+            "counts": {
+                "devices": len(devices),
+                "cloud_spools": len(cloud_spools),
+                "local_spools": len(local_rows),
+                "spools_compared": counts["compared"],
+                "spools_unchanged": counts["unchanged"],
+                "conflicts_detected": len(new_conflicts),
+                "conflicts_created": written["created"],
+                "conflicts_skipped_existing": written["skipped_existing"],
+                "tasks_fetched": len(task_result["tasks"]),
+                "tasks_new": new_task_count,
+                "tasks_changed": len(changed_tasks) - new_task_count,
+                "task_pages": task_result["pages"],
+                "open_tasks": len(state.open_tasks),
+                "tasks_mirrored": mirrored["inserted"] + mirrored["updated"],
+            },
+        }
+        with phases("persist"):
+            state.last_report = report
+            await asyncio.to_thread(state.save)
+        report["phases"] = dict(phases.ms)
+
+        # Drucker-Daten für Response konvertieren
+        devices_data = [
+            {
+                "dev_id": d.dev_id,
+                "name": d.name,
+                "online": d.online,
+                "print_status": d.print_status,
+                "model": d.dev_product_name,
+                "model_code": d.dev_model_name,
+                "access_code": d.dev_access_code,
+            }
+            for d in devices
+        ]
+
+        return {
+            "status": "completed",
+            "synced_at": report["synced_at"],
+            "devices": devices_data,
+            "devices_count": len(devices),
+            "cloud_spools_count": len(cloud_spools),
+            "local_spools_count": len(local_rows),
+            "matched": counts["matched"],
+            "conflicts": counts["conflicts"],
+            "conflicts_created": written["created"],
+            "cloud_only": counts["cloud_only"],
+            "local_only": counts["local_only"],
+            "changed_tasks": changed_tasks,
+            "message": message,
+            "report": report,
+        }
+    finally:
+        state.sync_lock.release()
+
+
+cloud_sync_state = CloudSyncState()
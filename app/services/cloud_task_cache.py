@@ -0,0 +1,263 @@
+"""
+Cloud Task Cache
+================
+Lokaler Spiegel der Bambu Cloud Tasks in der Tabelle ``cloud_tasks``.
+
+- Befüllt vom Cloud-Sync (nur neue/geänderte Tasks, siehe bambu_cloud_sync.run_cloud_sync)
+  und von jedem Cloud-Abruf bei einem Fehltreffer (``fetch_and_store``).
+- Abfragen nach Task-ID, Drucker-Serial + Startzeit-Fenster und normalisiertem Titel laufen
+  über Indizes; Ergebnisse sind ``BambuCloudTask``-Objekte, damit Matching-Code unverändert
+  bleibt.
+
+Alle Funktionen mit ``session`` sind blockierend - aus async Code über
+``app.db.executor.run_in_session`` aufrufen.
+"""
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.cloud_task import CloudTask
+from app.services.bambu_cloud_service import BambuCloudService, BambuCloudTask
+
+logger = logging.getLogger("bambu_cloud")
+
+# Status, bei denen sich Verbrauch/Ende noch ändern
+OPEN_STATUSES = ("pending", "running", "unknown")
+
+_EXTENSIONS = re.compile(r"\.(gcode\.3mf|3mf|gcode|bgcode|stl|step)$")
+_PLATE_SUFFIX = re.compile(r"[_\s-]*plate[_\s-]*\d+$")
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """'Benchy_PLA (v2).gcode.3mf' / 'benchy pla v2 - Plate 1' -> 'benchy pla v2'"""
+    if not title:
+        return ""
+    value = title.strip().lower()
+    value = _EXTENSIONS.sub("", value)
+    value = _PLATE_SUFFIX.sub("", value)
+    return _NON_ALNUM.sub(" ", value).strip()
+
+
+def parse_cloud_time(value: Any) -> Optional[datetime]:
+    """Cloud-Zeit ('2026-01-30T16:06:49Z') als UTC-Zeit mit tzinfo; naive Werte gelten als UTC.
+
+    Immer timezone-aware, da neuere SQLModel-Versionen naive datetimes beim Schreiben ablehnen.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _fingerprint(task: BambuCloudTask) -> str:
+    return json.dumps(
+        [task.status, task.weight, task.length, task.cost_time, task.end_time, task.ams_mapping, task.title],
+        sort_keys=True, default=str,
+    )
+
+
+def _to_task(row: CloudTask) -> BambuCloudTask:
+    try:
+        ams_mapping = json.loads(row.ams_mapping_json) if row.ams_mapping_json else []
+    except ValueError:
+        ams_mapping = []
+    return BambuCloudTask(
+        id=row.task_id,
+        title=row.title,
+        device_id=row.device_id,
+        device_name=row.device_name,
+        status=row.status,
+        weight=row.weight_g or 0.0,
+        length=row.length_mm or 0.0,
+        cost_time=row.cost_time_seconds or 0,
+        start_time=row.start_time,
+        end_time=row.end_time,
+        cover_url=row.cover_url,
+        thumbnail_url=row.thumbnail_url,
+        plate_index=row.plate_index or 1,
+        ams_mapping=ams_mapping,
+    )
+
+
+class _CacheStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+
+
+stats = _CacheStats()
+
+
+# ----------------------------------------------------------------------
+# Schreiben
+# ----------------------------------------------------------------------
+def upsert_tasks(session: Session, tasks: Iterable[BambuCloudTask]) -> Dict[str, int]:
+    """Neue Tasks einfügen, geänderte aktualisieren; ein Commit für alle."""
+    by_id = {str(task.id): task for task in tasks if task.id}
+    result = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not by_id:
+        return result
+
+    existing = {
+        row.task_id: row
+        for row in session.exec(select(CloudTask).where(CloudTask.task_id.in_(list(by_id))))
+    }
+    now = datetime.now(timezone.utc)
+    for task_id, task in by_id.items():
+        fingerprint = _fingerprint(task)
+        row = existing.get(task_id)
+        if row is not None and row.fingerprint == fingerprint:
+            result["unchanged"] += 1
+            continue
+        if row is None:
+            row = CloudTask(task_id=task_id, first_seen_at=now)
+            result["inserted"] += 1
+        else:
+            result["updated"] += 1
+        row.title = task.title or ""
+        row.title_normalized = normalize_title(task.title)
+        row.device_id = task.device_id or ""
+        row.device_name = task.device_name
+        row.status = task.status or "unknown"
+        row.weight_g = float(task.weight or 0)
+        row.length_mm = float(task.length or 0)
+        row.cost_time_seconds = int(task.cost_time or 0)
+        row.plate_index = int(task.plate_index or 1)
+        row.ams_mapping_json = json.dumps(task.ams_mapping) if task.ams_mapping else None
+        row.start_time = task.start_time
+        row.end_time = task.end_time
+        row.start_at = parse_cloud_time(task.start_time)
+        row.end_at = parse_cloud_time(task.end_time)
+        row.cover_url = task.cover_url
+        row.thumbnail_url = task.thumbnail_url
+        row.fingerprint = fingerprint
+        row.updated_at = now
+        session.add(row)
+
+    if result["inserted"] or result["updated"]:
+        session.commit()
+    stats.count("upserted", result["inserted"] + result["updated"])
+    return result
+
+
+# ----------------------------------------------------------------------
+# Lesen
+# ----------------------------------------------------------------------
+def get_task(session: Session, task_id: str) -> Optional[BambuCloudTask]:
+    row = session.get(CloudTask, str(task_id))
+    return _to_task(row) if row else None
+
+
+def list_tasks(session: Session, device_id: Optional[str] = None, limit: int = 20) -> List[BambuCloudTask]:
+    """Neueste zuerst (wie my/tasks)."""
+    query = select(CloudTask)
+    if device_id:
+        query = query.where(CloudTask.device_id == device_id)
+    query = query.order_by(CloudTask.start_at.desc(), CloudTask.task_id.desc()).limit(limit)
+    return [_to_task(row) for row in session.exec(query)]
+
+
+def find_candidates(
+    session: Session,
+    task_id: Optional[str] = None,
+    device_ids: Iterable[str] = (),
+    around: Optional[datetime] = None,
+    window: timedelta = timedelta(hours=24),
+    title: Optional[str] = None,
+    finished_only: bool = False,
+    limit: int = 50,
+) -> List[BambuCloudTask]:
+    """
+    Kandidaten für das Job-Matching aus dem Spiegel.
+
+    Reihenfolge: exakte Task-ID; sonst Tasks der Drucker (device_ids) im Zeitfenster um
+    ``around`` (Index device_id+start_at) bzw. - ohne Drucker - Tasks mit gleichem
+    normalisierten Titel. Die eigentliche Bewertung macht weiterhin der Aufrufer.
+    """
+    if task_id:
+        row = session.get(CloudTask, str(task_id))
+        if row is not None and not (finished_only and row.status in OPEN_STATUSES):
+            return [_to_task(row)]
+
+    devices = [device for device in device_ids if device]
+    query = select(CloudTask)
+    if devices:
+        query = query.where(CloudTask.device_id.in_(devices))
+    elif title:
+        query = query.where(CloudTask.title_normalized == normalize_title(title))
+    else:
+        return []
+    around_utc = parse_cloud_time(around) if around else None
+    if around_utc is not None:
+        # bei around=Job-Ende muss das Fenster die Druckdauer abdecken
+        query = query.where(CloudTask.start_at >= around_utc - window, CloudTask.start_at <= around_utc + window)
+    if finished_only:
+        query = query.where(CloudTask.status.not_in(OPEN_STATUSES))
+    query = query.order_by(CloudTask.start_at.desc()).limit(limit)
+    return [_to_task(row) for row in session.exec(query)]
+
+
+def summary(session: Session) -> Dict[str, Any]:
+    count, newest, oldest, updated = session.exec(
+        select(func.count(), func.max(CloudTask.start_at), func.min(CloudTask.start_at), func.max(CloudTask.updated_at))
+        .select_from(CloudTask)
+    ).one()
+    open_count = session.exec(
+        select(func.count()).select_from(CloudTask).where(CloudTask.status.in_(OPEN_STATUSES))
+    ).one()
+    return {
+        "tasks": count,
+        "open_tasks": open_count,
+        "newest_start": newest.isoformat() if newest else None,
+        "oldest_start": oldest.isoformat() if oldest else None,
+        "last_update": updated.isoformat() if updated else None,
+        "stats": stats.snapshot(),
+    }
+
+
+# ----------------------------------------------------------------------
+# Cloud-Fallback
+# ----------------------------------------------------------------------
+async def fetch_and_store(
+    service: BambuCloudService,
+    device_id: Optional[str] = None,
+    limit: int = 50,
+) -> List[BambuCloudTask]:
+    """Tasks aus der Cloud holen (Fehltreffer im Spiegel) und in den Spiegel übernehmen."""
+    from app.db.executor import run_in_session
+
+    stats.count("cloud_fetches")
+    tasks = await service.get_tasks(device_id=device_id, limit=limit)
+    if tasks:
+        try:
+            await run_in_session(upsert_tasks, tasks)
+        except Exception as exc:
+            logger.warning(f"Cloud-Task-Spiegel: Speichern fehlgeschlagen: {exc}")
+    return tasks
@@ -0,0 +1,407 @@
+"""Zentrale, langlebige HTTP-Clients (httpx) fuer Bambu Cloud, Moonraker und Update-Checks.
+
+Statt pro Service/Sync/Poll-Zyklus einen eigenen Client (und damit neue TCP/TLS-Verbindungen)
+aufzubauen, holen sich Aufrufer den Client ihres Profils:
+
+    client = http_clients.get("moonraker")                   # httpx.AsyncClient (geteilt)
+    resp = await http_clients.request("bambu_cloud", "GET", url, params=...)   # mit Retries
+    resp = http_clients.get_sync("moonraker").get(url)       # httpx.Client fuer sync Code
+
+Pro Profil:
+- Connection-Pool mit Keep-Alive (httpx pflegt die Verbindungen pro Host/Origin)
+- HTTP/2, falls das Profil es erlaubt und `h2` installiert ist
+- einheitliche Timeouts; request()/request_sync() wiederholen idempotente Requests bei
+  Verbindungsfehlern, 429 und 502/503/504 mit exponentiellem Backoff (Retry-After beachtet)
+- DNS-Cache (TTL) im Netzwerk-Backend; TLS/SNI laufen weiter ueber den Hostnamen
+
+Statistik pro Host (stats(), /api/performance/http-clients): Requests, Fehler, Retries,
+neu geoeffnete Verbindungen, Reuse-Quote, aktuell offene Verbindungen, Latenz bis zu den
+Response-Headern (p50/p90/p99).
+
+Lebenszyklus: Clients entstehen lazy (async pro Event-Loop), aclose() im Lifespan-Shutdown.
+httpx/httpcore selbst werden erst mit dem ersten Client importiert (app.services.http_transport).
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import ipaddress
+import logging
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.monitoring.ingest_metrics import Histogram
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger("app")
+
+DNS_TTL_S = 300.0
+RETRY_STATUS = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+MAX_RETRY_AFTER_S = 10.0
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class ClientProfile:
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 60.0
+    retries: int = 2
+    backoff_s: float = 0.25
+    http2: bool = True
+    follow_redirects: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+PROFILES: Dict[str, ClientProfile] = {
+    # api.bambulab.com: Cloud-Sync, Tasks und Login teilen sich die Verbindungen
+    "bambu_cloud": ClientProfile(timeout=15.0, max_connections=10, max_keepalive=5, keepalive_expiry=120.0),
+    # Moonraker im LAN: kurze Timeouts, kein HTTP/2, pro Drucker eine Keep-Alive-Verbindung
+    "moonraker": ClientProfile(
+        timeout=3.0, connect_timeout=2.0, max_connections=50, max_keepalive=25,
+        keepalive_expiry=30.0, retries=1, backoff_s=0.2, http2=False,
+    ),
+    # GitHub (Update-Check)
+    "github": ClientProfile(
+        timeout=8.0, max_connections=4, max_keepalive=2, follow_redirects=True,
+        headers={"User-Agent": "FilamentHub-Version-Check"},
+    ),
+    "default": ClientProfile(),
+}
+
+
+# ----------------------------------------------------------------------
+# DNS-Cache
+# ----------------------------------------------------------------------
+class _DnsCache:
+    def __init__(self, ttl: float = DNS_TTL_S) -> None:
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_literal(host: str) -> bool:
+        if host == "localhost":
+            return True
+        try:
+            ipaddress.ip_address(host.strip("[]"))
+            return True
+        except ValueError:
+            return False
+
+    def cached(self, host: str, port: int) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Blockierend (getaddrinfo); async Aufrufer nutzen einen Worker-Thread."""
+        addresses: List[str] = []
+        for family, _type, _proto, _canon, sockaddr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+            address = sockaddr[0]
+            if address not in addresses:
+                addresses.append(address)
+        with self._lock:
+            self.misses += 1
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ----------------------------------------------------------------------
+# Statistik
+# ----------------------------------------------------------------------
+class _HostStats:
+    __slots__ = ("requests", "errors", "retries", "connections_opened", "latency", "last_status")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.connections_opened = 0
+        self.latency = Histogram()
+        self.last_status: Optional[int] = None
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.hosts: Dict[str, _HostStats] = {}
+        self.lock = threading.Lock()
+
+    def host(self, host: str) -> _HostStats:
+        stats = self.hosts.get(host)
+        if stats is None:
+            with self.lock:
+                stats = self.hosts.setdefault(host, _HostStats())
+        return stats
+
+    def connection_opened(self, host: str) -> None:
+        stats = self.host(host)
+        with self.lock:
+            stats.connections_opened += 1
+
+    def request_done(self, host: str, elapsed_ns: int, status: Optional[int]) -> None:
+        stats = self.host(host)
+        with self.lock:
+            stats.requests += 1
+            stats.latency.add(elapsed_ns)
+            if status is None or status >= 500:
+                stats.errors += 1
+            stats.last_status = status
+
+    def retried(self, host: str) -> None:
+        stats = self.host(host)
+        with self.lock:
+            stats.retries += 1
+
+
+def _open_connections(transport: Any, into: Dict[str, Dict[str, int]]) -> None:
+    try:
+        connections = list(transport._pool.connections)
+    except AttributeError:
+        return
+    for connection in connections:
+        try:
+            host = connection._origin.host.decode("ascii")
+            entry = into.setdefault(host, {"open": 0, "idle": 0})
+            if not connection.is_closed():
+                entry["open"] += 1
+                if connection.is_idle():
+                    entry["idle"] += 1
+        except Exception:
+            continue
+
+
+def _retry_delay(profile: ClientProfile, attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(MAX_RETRY_AFTER_S, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+    base = profile.backoff_s * (2 ** attempt)
+    return base + random.uniform(0, base / 2)
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+class HttpClientRegistry:
+    def __init__(self, profiles: Optional[Dict[str, ClientProfile]] = None) -> None:
+        self.profiles = dict(profiles or PROFILES)
+        self.dns = _DnsCache()
+        self.stats_ = _Stats()
+        self._async: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def profile(self, name: str) -> ClientProfile:
+        return self.profiles.get(name) or self.profiles["default"]
+
+    def _client_kwargs(self, profile: ClientProfile) -> Dict[str, Any]:
+        import httpx
+
+        return {
+            "timeout": httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+            "follow_redirects": profile.follow_redirects,
+            "headers": profile.headers or None,
+        }
+
+    def _transport_kwargs(self, profile: ClientProfile) -> Dict[str, Any]:
+        import httpx
+
+        return {
+            "http2": profile.http2 and HTTP2_AVAILABLE,
+            "limits": httpx.Limits(
+                max_connections=profile.max_connections,
+                max_keepalive_connections=profile.max_keepalive,
+                keepalive_expiry=profile.keepalive_expiry,
+            ),
+        }
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Geteilter AsyncClient des Profils fuer den laufenden Event-Loop."""
+        loop = asyncio.get_running_loop()
+        key = (name, id(loop))
+        entry = self._async.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+        profile = self.profile(name)
+        import httpx
+        from app.services.http_transport import _AsyncTransport
+
+        client = httpx.AsyncClient(
+            transport=_AsyncTransport(self.stats_, self.dns, **self._transport_kwargs(profile)),
+            **self._client_kwargs(profile),
+        )
+        with self._lock:
+            # Clients geschlossener Loops verwerfen
+            for stale_key, (stale_loop, _client) in list(self._async.items()):
+                if stale_loop.is_closed():
+                    del self._async[stale_key]
+            self._async[key] = (loop, client)
+            self.created += 1
+        return client
+
+    def get_sync(self, name: str = "default") -> httpx.Client:
+        """Geteilter (thread-sicherer) httpx.Client des Profils fuer synchronen Code."""
+        client = self._sync.get(name)
+        if client is not None and not client.is_closed:
+            return client
+        with self._lock:
+            client = self._sync.get(name)
+            if client is None or client.is_closed:
+                profile = self.profile(name)
+                import httpx
+                from app.services.http_transport import _SyncTransport
+
+                client = httpx.Client(
+                    transport=_SyncTransport(self.stats_, self.dns, **self._transport_kwargs(profile)),
+                    **self._client_kwargs(profile),
+                )
+                self._sync[name] = client
+                self.created += 1
+        return client
+
+    async def request(self, name: str, method: str, url: str, retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """Request mit Retries/Backoff (nur idempotente Methoden, ausser retries explizit gesetzt)."""
+        import httpx
+
+        profile = self.profile(name)
+        client = self.get(name)
+        if retries is None:
+            retries = profile.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            self.stats_.retried(httpx.URL(url).host or "?")
+            delay = _retry_delay(profile, attempt, response)
+            if response is not None:
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def request_sync(self, name: str, method: str, url: str, retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        import httpx
+
+        profile = self.profile(name)
+        client = self.get_sync(name)
+        if retries is None:
+            retries = profile.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                response = client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            self.stats_.retried(httpx.URL(url).host or "?")
+            delay = _retry_delay(profile, attempt, response)
+            if response is not None:
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        open_by_host: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            transports = [client._transport for _loop, client in self._async.values() if not client.is_closed]
+            transports += [client._transport for client in self._sync.values() if not client.is_closed]
+        for transport in transports:
+            _open_connections(transport, open_by_host)
+
+        hosts: Dict[str, Any] = {}
+        with self.stats_.lock:
+            items = list(self.stats_.hosts.items())
+            for host, stats in items:
+                reuse = 0.0
+                if stats.requests:
+                    reuse = max(0.0, 1.0 - stats.connections_opened / stats.requests)
+                connections = open_by_host.get(host, {"open": 0, "idle": 0})
+                hosts[host] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "connections_opened": stats.connections_opened,
+                    "reuse_ratio": round(reuse, 3),
+                    "open_connections": connections["open"],
+                    "idle_connections": connections["idle"],
+                    "last_status": stats.last_status,
+                    "latency": stats.latency.summary(),
+                }
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "clients": {"async": len(self._async), "sync": len(self._sync), "created": self.created},
+            "dns_cache": {"hits": self.dns.hits, "misses": self.dns.misses, "ttl_s": self.dns.ttl},
+            "profiles": {
+                name: {
+                    "timeout_s": p.timeout,
+                    "max_connections": p.max_connections,
+                    "max_keepalive": p.max_keepalive,
+                    "keepalive_expiry_s": p.keepalive_expiry,
+                    "retries": p.retries,
+                    "http2": p.http2 and HTTP2_AVAILABLE,
+                }
+                for name, p in self.profiles.items()
+            },
+            "hosts": hosts,
+        }
+
+    def reset_stats(self) -> None:
+        with self.stats_.lock:
+            self.stats_.hosts.clear()
+        self.dns.hits = self.dns.misses = 0
+
+    async def aclose(self) -> None:
+        """Alle Clients schliessen (Lifespan-Shutdown). Clients fremder Loops werden nur verworfen."""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            async_clients, self._async = list(self._async.values()), {}
+            sync_clients, self._sync = list(self._sync.values()), {}
+        for loop, client in async_clients:
+            if loop is current:
+                try:
+                    await client.aclose()
+                except Exception:
+                    logger.debug("Closing HTTP client failed", exc_info=True)
+        for client in sync_clients:
+            try:
+                client.close()
+            except Exception:
+                logger.debug("Closing HTTP client failed", exc_info=True)
+
+
+http_clients = HttpClientRegistry()
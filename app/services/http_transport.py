@@ -0,0 +1,144 @@
+"""httpx/httpcore-Teil der HTTP-Client-Registry (app.services.http_clients).
+
+Eigenes Modul, damit httpx/httpcore/anyio erst beim ersten Client geladen werden und nicht
+schon beim Import jeder Route, die ``http_clients`` referenziert.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+import anyio
+import httpcore
+import httpx
+
+if TYPE_CHECKING:
+    from app.services.http_clients import _DnsCache, _Stats
+
+logger = logging.getLogger("app")
+
+
+# ----------------------------------------------------------------------
+# Netzwerk-Backends mit DNS-Cache (httpcore)
+# ----------------------------------------------------------------------
+class _CachingAsyncBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, dns: _DnsCache, stats: _Stats) -> None:
+        self._backend = httpcore.AnyIOBackend()
+        self._dns = dns
+        self._stats = stats
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        self._stats.connection_opened(host)
+        if self._dns.is_literal(host):
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        addresses = self._dns.cached(host, port)
+        if addresses is None:
+            try:
+                addresses = await anyio.to_thread.run_sync(self._dns.resolve, host, port)
+            except OSError as exc:
+                raise httpcore.ConnectError(str(exc)) from exc
+        last_exc: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_exc = exc
+        # gecachte Adressen evtl. veraltet: beim naechsten Mal neu aufloesen
+        self._dns.forget(host, port)
+        raise last_exc or httpcore.ConnectError(f"no address for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options: Any = None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _CachingSyncBackend(httpcore.NetworkBackend):
+    def __init__(self, dns: _DnsCache, stats: _Stats) -> None:
+        self._backend = httpcore.SyncBackend()
+        self._dns = dns
+        self._stats = stats
+
+    def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.NetworkStream:
+        self._stats.connection_opened(host)
+        if self._dns.is_literal(host):
+            return self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        addresses = self._dns.cached(host, port)
+        if addresses is None:
+            try:
+                addresses = self._dns.resolve(host, port)
+            except OSError as exc:
+                raise httpcore.ConnectError(str(exc)) from exc
+        last_exc: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_exc = exc
+        self._dns.forget(host, port)
+        raise last_exc or httpcore.ConnectError(f"no address for {host}")
+
+    def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options: Any = None) -> httpcore.NetworkStream:
+        return self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    def sleep(self, seconds: float) -> None:
+        self._backend.sleep(seconds)
+
+
+# ----------------------------------------------------------------------
+# Transports: Latenz bis Response-Header pro Host
+# ----------------------------------------------------------------------
+class _AsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, stats: _Stats, dns: _DnsCache, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._stats = stats
+        try:
+            self._pool._network_backend = _CachingAsyncBackend(dns, stats)
+        except AttributeError:  # pragma: no cover - andere httpcore-Version
+            logger.debug("httpcore pool without _network_backend; DNS cache disabled")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter_ns()
+        status: Optional[int] = None
+        try:
+            response = await super().handle_async_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self._stats.request_done(request.url.host, time.perf_counter_ns() - started, status)
+
+
+class _SyncTransport(httpx.HTTPTransport):
+    def __init__(self, stats: _Stats, dns: _DnsCache, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._stats = stats
+        try:
+            self._pool._network_backend = _CachingSyncBackend(dns, stats)
+        except AttributeError:  # pragma: no cover
+            logger.debug("httpcore pool without _network_backend; DNS cache disabled")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter_ns()
+        status: Optional[int] = None
+        try:
+            response = super().handle_request(request)
+            status = response.status_code
+            return response
+        finally:
+            self._stats.request_done(request.url.host, time.perf_counter_ns() - started, status)
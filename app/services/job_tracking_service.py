@@ -795,6 +795,8 @@ class JobTrackingService:
         """
         from app.models.bambu_cloud_config import BambuCloudConfig
         from app.services.bambu_cloud_service import BambuCloudService
+        from app.db.executor import run_in_session
+        from app.services import cloud_task_cache
         from app.services.token_encryption import decrypt_token
         from app.models.job import JobSpoolUsage
         from app.models.weight_history import WeightHistory
@@ -834,13 +836,6 @@ class JobTrackingService:
             )
 
             try:
-                # Hole alle Tasks fÃ¼r diesen Drucker
-                tasks = await cloud_service.get_tasks(device_id=printer_cloud_serial, limit=50)
-
-                if not tasks:
-                    self.logger.warning("[CLOUD FALLBACK] No tasks found in cloud")
-                    return None
-
                 # Job aus DB laden fÃ¼r Validierung
                 job = session.get(Job, job_id)
                 if not job:
@@ -849,23 +844,51 @@ class JobTrackingService:
 
                 # === SICHERHEITS-VALIDIERUNG ===
                 # Finde den besten passenden Task mit Validierung
-                matching_task = None
-                best_confidence = 0.0
-                match_reason = ""
+                def _best_match(tasks):
+                    matching_task = None
+                    best_confidence = 0.0
+                    match_reason = ""
+
+                    for task in tasks:
+                        is_valid, reason, confidence = self._validate_cloud_task_match(
+                            job, task, printer_cloud_serial
+                        )
+
+                        if is_valid and confidence > best_confidence:
+                            matching_task = task
+                            best_confidence = confidence
+                            match_reason = reason
+
+                            # Bei perfektem Match (task_id + device + time) sofort abbrechen
+                            if confidence >= 0.9:
+                                break
+                    return matching_task, best_confidence, match_reason
+
+                # 1. Lokaler Task-Spiegel (cloud_tasks) - nur abgeschlossene Tasks,
+                #    bei laufenden ist der Verbrauch noch nicht final
+                #    (Abfrage im DB-Pool, nicht auf dem Event-Loop)
+                tasks = await run_in_session(
+                    cloud_task_cache.find_candidates,
+                    task_id=task_id,
+                    device_ids=[printer_cloud_serial or ""],
+                    around=job_finished_at,
+                    title=job_name,
+                    finished_only=True,
+                )
+                matching_task, best_confidence, match_reason = _best_match(tasks)
+                cloud_task_cache.stats.count("fallback_hits" if matching_task else "fallback_misses")
 
-                for task in tasks:
-                    is_valid, reason, confidence = self._validate_cloud_task_match(
-                        job, task, printer_cloud_serial
+                # 2. Fehltreffer: Tasks dieses Druckers aus der Cloud holen (landen im Spiegel)
+                if not matching_task:
+                    tasks = await cloud_task_cache.fetch_and_store(
+                        cloud_service, device_id=printer_cloud_serial, limit=50
                     )
 
-                    if is_valid and confidence > best_confidence:
-                        matching_task = task
-                        best_confidence = confidence
-                        match_reason = reason
+                    if not tasks:
+                        self.logger.warning("[CLOUD FALLBACK] No tasks found in cloud")
+                        return None
 
-                        # Bei perfektem Match (task_id + device + time) sofort abbrechen
-                        if confidence >= 0.9:
-                            break
+                    matching_task, best_confidence, match_reason = _best_match(tasks)
 
                 if not matching_task:
                     self.logger.warning(
@@ -1170,10 +1193,15 @@ class JobTrackingService:
         prev_gstate = self.last_gstate.get(cloud_serial)
         self.last_gstate[cloud_serial] = current_gstate
         # === DEBUG LOGGING: Zeige empfangene Payload und Statuswerte ===
-        self.logger.debug(f"[JOB TRACKING] MQTT-Payload fÃ¼r {cloud_serial}: {parsed_payload}")
-        debug_gstate = parsed_payload.get("print", {}).get("gcode_state") or parsed_payload.get("gcode_state")
-        debug_mc_percent = parsed_payload.get("print", {}).get("mc_percent")
-        self.logger.debug(f"[JOB TRACKING] gcode_state={debug_gstate}, mc_percent={debug_mc_percent}, printer_id={printer_id}")
+        # Lazy formatiert: die komplette Payload wird nur bei aktivem DEBUG in einen String gewandelt
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[JOB TRACKING] MQTT-Payload für %s: %s", cloud_serial, parsed_payload)
+            self.logger.debug(
+                "[JOB TRACKING] gcode_state=%s, mc_percent=%s, printer_id=%s",
+                parsed_payload.get("print", {}).get("gcode_state") or parsed_payload.get("gcode_state"),
+                parsed_payload.get("print", {}).get("mc_percent"),
+                printer_id,
+            )
 
         # Hat dieser Drucker einen aktiven Job?
         has_active_job = cloud_serial in self.active_jobs
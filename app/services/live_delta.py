@@ -0,0 +1,162 @@
+"""Versionierte Snapshots + Deltas der gemappten PrinterData pro Drucker.
+
+Grundlage fuer den opt-in Delta-Modus von /api/mqtt/ws (?mode=delta):
+Statt bei jeder MQTT-Nachricht das komplette `printer`-Dict (plus Rohpayload)
+zu senden, bekommen Clients einmal einen Snapshot und danach nur noch
+JSON-Patch-aehnliche Operationen (add/replace/remove) mit Versionsnummer.
+
+record_update() wird im paho-Thread aufgerufen, Subscriber werden per
+call_soon_threadsafe im Event-Loop benachrichtigt.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("services")
+
+_lock = threading.Lock()
+# serial -> {"version": int, "data": dict, "ops": list (Delta version-1 -> version), "ops_json": str|None}
+_snapshots: Dict[str, Dict[str, Any]] = {}
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_listeners: List[Callable[[str], None]] = []
+
+
+def _escape(key: Any) -> str:
+    # RFC 6901 JSON-Pointer-Escaping
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Berechnet Patch-Operationen von `old` nach `new`.
+
+    Dicts werden rekursiv verglichen, Listen und Skalare als Ganzes ersetzt.
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff_into(old, new, path, ops)
+    return ops
+
+
+def _diff_into(old: Any, new: Any, path: str, ops: List[Dict[str, Any]]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            elif old[key] != value:
+                if isinstance(old[key], dict) and isinstance(value, dict):
+                    _diff_into(old[key], value, child, ops)
+                else:
+                    ops.append({"op": "replace", "path": child, "value": value})
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    elif old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def merge_partial(base: Any, incoming: Any) -> Any:
+    """Arbeitet einen gemappten Teil-Report in den bisherigen Stand ein.
+
+    P1/A1-Drucker senden nur geaenderte Felder; der Mapper liefert fuer alles andere None
+    bzw. leere Listen/Dicts. Solche Werte ueberschreiben keinen bekannten Wert (wie
+    live_state._deep_merge fuer die Rohpayloads), Dicts werden rekursiv zusammengefuehrt.
+    """
+    if not isinstance(base, dict) or not isinstance(incoming, dict):
+        return incoming
+    merged = dict(base)
+    for key, value in incoming.items():
+        if value is None or value == [] or value == {}:
+            merged.setdefault(key, value)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_partial(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def record_update(serial: str, mapped: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Arbeitet einen (Teil-)Report in den Zustand eines Druckers ein.
+
+    Liefert die neue Version oder None ohne Aenderung.
+    """
+    if not serial or not isinstance(mapped, dict):
+        return None
+    with _lock:
+        current = _snapshots.get(serial)
+        if current is None:
+            entry = {"version": 1, "data": mapped, "ops": None, "ops_json": None}
+        else:
+            data = merge_partial(current["data"], mapped)
+            ops = diff(current["data"], data)
+            if not ops:
+                return None
+            entry = {"version": current["version"] + 1, "data": data, "ops": ops, "ops_json": None}
+        _snapshots[serial] = entry
+        version = entry["version"]
+    _notify_threadsafe(serial)
+    return version
+
+
+def get_snapshot(serial: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    entry = _snapshots.get(serial)
+    if entry is None:
+        return None
+    return entry["version"], entry["data"]
+
+
+def get_last_delta_json(serial: str, from_version: int) -> Optional[str]:
+    """Serialisierte Ops des letzten Schritts, falls er genau bei `from_version` beginnt.
+
+    Die Serialisierung wird pro Version einmal gecacht und von allen Clients geteilt.
+    """
+    entry = _snapshots.get(serial)
+    if entry is None or entry["ops"] is None or entry["version"] != from_version + 1:
+        return None
+    if entry["ops_json"] is None:
+        entry["ops_json"] = json.dumps(entry["ops"], default=str, ensure_ascii=False)
+    return entry["ops_json"]
+
+
+def known_printers() -> List[str]:
+    return list(_snapshots.keys())
+
+
+def add_listener(callback: Callable[[str], None]) -> None:
+    """Registriert einen Callback (laeuft im Event-Loop) fuer geaenderte Drucker."""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.get_running_loop()
+    _listeners.append(callback)
+
+
+def remove_listener(callback: Callable[[str], None]) -> None:
+    try:
+        _listeners.remove(callback)
+    except ValueError:
+        pass
+
+
+def attach_loop(loop: asyncio.AbstractEventLoop) -> None:
+    global _loop
+    _loop = loop
+
+
+def _dispatch(serial: str) -> None:
+    for callback in list(_listeners):
+        try:
+            callback(serial)
+        except Exception:
+            logger.exception("live_delta listener failed for %s", serial)
+
+
+def _notify_threadsafe(serial: str) -> None:
+    loop = _loop
+    if not _listeners or loop is None or loop.is_closed():
+        return
+    try:
+        loop.call_soon_threadsafe(_dispatch, serial)
+    except RuntimeError:
+        pass
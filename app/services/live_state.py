@@ -1,3 +1,4 @@
+import itertools
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
@@ -5,6 +6,12 @@ from typing import Any, Dict, Optional
 # key: device_id (cloud_serial), value: { device, ts, payload }
 live_state: Dict[str, Dict[str, Any]] = {}
 
+# Monoton steigende Versionsnummern pro Geraet (fuer Caches, z.B. AMS-Normalisierung).
+# next() auf itertools.count ist unter dem GIL atomar -> sicher aus dem paho-Thread.
+_version_counter = itertools.count(1)
+_versions: Dict[str, int] = {}
+_global_version: int = 0
+
 
 def _deep_merge(base: Any, incoming: Any) -> Any:
     if not isinstance(base, dict) or not isinstance(incoming, dict):
@@ -29,6 +36,10 @@ def set_live_state(device_id: str, payload: Any) -> None:
         "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         "payload": payload,
     }
+    global _global_version
+    version = next(_version_counter)
+    _versions[device_id] = version
+    _global_version = version
     # Debug-Log entfernt (verursacht I/O-Last bei jedem MQTT-Update)
 
 
@@ -38,3 +49,13 @@ def get_live_state(device_id: str) -> Optional[Dict[str, Any]]:
 
 def get_all_live_state() -> Dict[str, Dict[str, Any]]:
     return live_state
+
+
+def get_live_state_version(device_id: str) -> int:
+    """Version of the device entry; changes on every set_live_state() call (0 = unknown)."""
+    return _versions.get(device_id, 0)
+
+
+def get_live_state_global_version() -> int:
+    """Version of the whole store; changes whenever any device entry changes."""
+    return _global_version
@@ -1,12 +1,22 @@
 import os
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 
 MODULE_WHITELIST = {"app", "bambu", "klipper", "mqtt", "scanner", "admin"}
 LOG_ROOT = Path("logs")
 MAX_LIMIT = 1000
 
+# Rueckwaerts-Lesen vom Dateiende in Bloecken; nie die ganze Datei in den Speicher
+BLOCK_SIZE = 64 * 1024
+# Sparse-Index: ein Eintrag (Byte-Offset, Zeitstempel) pro ~256 KB
+INDEX_STRIDE = 256 * 1024
+MAX_ROTATED_FILES = 20
+
+_TS_LEN = 19  # "YYYY-MM-DD HH:MM:SS"
+
 
 class LogAccessError(Exception):
     pass
@@ -37,6 +47,218 @@ def _line_matches(line: str, level: Optional[str], search: Optional[str]) -> boo
     return True
 
 
+def parse_line_timestamp(line: str) -> Optional[datetime]:
+    """Zeitstempel am Zeilenanfang (Format des LOG_FORMAT: 'YYYY-MM-DD HH:MM:SS,mmm')."""
+    if len(line) < _TS_LEN or line[4:5] != "-" or line[10:11] not in (" ", "T"):
+        return None
+    try:
+        return datetime.strptime(line[:_TS_LEN].replace("T", " "), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Rotierte Dateien (RotatingFileHandler: x.log, x.log.1, x.log.2, ...)
+# ----------------------------------------------------------------------
+def log_file_chain(path: Path, max_files: int = MAX_ROTATED_FILES) -> List[Path]:
+    """Existierende Dateien der Rotationskette, neueste zuerst."""
+    path = Path(path)
+    chain: List[Path] = []
+    if path.is_file():
+        chain.append(path)
+    for i in range(1, max_files + 1):
+        rotated = path.with_name(f"{path.name}.{i}")
+        if not rotated.is_file():
+            break
+        chain.append(rotated)
+    return chain
+
+
+# ----------------------------------------------------------------------
+# Rueckwaerts lesen
+# ----------------------------------------------------------------------
+def iter_lines_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Zeilen einer Datei vom Ende zum Anfang, blockweise per seek gelesen."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        remainder = b""
+        at_eof = True
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + remainder
+            lines = chunk.split(b"\n")
+            # erstes Element kann eine angeschnittene Zeile sein -> mit naechstem Block zusammensetzen
+            remainder = lines.pop(0)
+            if at_eof and lines:
+                at_eof = False
+                # abschliessender Zeilenumbruch erzeugt keine leere Zeile
+                if lines[-1] == b"":
+                    lines.pop()
+            for raw in reversed(lines):
+                yield raw.decode("utf-8", errors="replace").rstrip("\r")
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def iter_chain_reverse(path: Path) -> Iterator[str]:
+    """Neueste Zeile zuerst, ueber alle rotierten Dateien hinweg."""
+    for file_path in log_file_chain(path):
+        yield from iter_lines_reverse(file_path)
+
+
+def tail_lines(
+    path: Path,
+    limit: int,
+    predicate: Optional[Callable[[str], bool]] = None,
+    rotated: bool = True,
+) -> List[str]:
+    """Die letzten `limit` (passenden) Zeilen in chronologischer Reihenfolge.
+
+    rotated=False liest nur die aktive Datei, ohne x.log.1, x.log.2, ...
+    """
+    result: List[str] = []
+    if limit <= 0:
+        return result
+    lines = iter_chain_reverse(path) if rotated else iter_lines_reverse(path)
+    for line in lines:
+        if not line:
+            continue
+        if predicate is not None and not predicate(line):
+            continue
+        result.append(line)
+        if len(result) >= limit:
+            break
+    result.reverse()
+    return result
+
+
+# ----------------------------------------------------------------------
+# Sparse-Index (Byte-Offset -> Zeitstempel) fuer Zeitbereichs-Spruenge
+# ----------------------------------------------------------------------
+class _SparseIndex:
+    """Checkpoints (offset, timestamp) alle ~INDEX_STRIDE Bytes.
+
+    Schluessel ist (st_dev, st_ino): bleibt beim Umbenennen durch die Rotation
+    gueltig. Waechst die aktive Datei, wird der Index ab dem letzten Stand erweitert.
+    """
+
+    def __init__(self) -> None:
+        self.points: List[Tuple[int, datetime]] = []
+        self.indexed_size = 0
+
+    def extend(self, path: Path, size: int) -> None:
+        if size <= self.indexed_size:
+            return
+        next_mark = self.points[-1][0] + INDEX_STRIDE if self.points else 0
+        with open(path, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for raw in f:
+                if offset >= next_mark:
+                    ts = parse_line_timestamp(raw[:32].decode("utf-8", errors="replace"))
+                    if ts is not None:
+                        self.points.append((offset, ts))
+                        next_mark = offset + INDEX_STRIDE
+                offset += len(raw)
+                if offset >= size:
+                    break
+        self.indexed_size = offset
+
+    def seek_offset(self, since: datetime) -> int:
+        """Groesster Checkpoint-Offset, dessen Zeitstempel vor `since` liegt."""
+        best = 0
+        for offset, ts in self.points:
+            if ts < since:
+                best = offset
+            else:
+                break
+        return best
+
+    def first_ts(self) -> Optional[datetime]:
+        return self.points[0][1] if self.points else None
+
+
+_index_lock = threading.Lock()
+_indexes: Dict[Tuple[int, int], _SparseIndex] = {}
+
+
+def get_index(path: Path) -> Optional[_SparseIndex]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_dev, st.st_ino)
+    with _index_lock:
+        index = _indexes.get(key)
+        if index is None or st.st_size < index.indexed_size:
+            # neu oder abgeschnitten (z.B. geloescht/neu angelegt)
+            index = _SparseIndex()
+            _indexes[key] = index
+        index.extend(path, st.st_size)
+        return index
+
+
+def iter_lines_forward(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Zeilen vorwaerts; mit `since` Sprung per Sparse-Index, mit `until` frueher Abbruch."""
+    start = 0
+    if since is not None:
+        index = get_index(path)
+        if index is not None:
+            start = index.seek_offset(since)
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        f.seek(start)
+        # Zeilen ohne Zeitstempel (Tracebacks) gehoeren zur vorherigen Zeile
+        in_range = since is None
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if since is not None or until is not None:
+                ts = parse_line_timestamp(line)
+                if ts is not None:
+                    if until is not None and ts > until:
+                        return
+                    in_range = since is None or ts >= since
+                if not in_range:
+                    continue
+            yield line
+
+
+def iter_chain_forward(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Aelteste Zeile zuerst, ueber alle rotierten Dateien; Dateien ausserhalb des Bereichs werden uebersprungen."""
+    chain = list(reversed(log_file_chain(path)))
+    for i, file_path in enumerate(chain):
+        if since is not None and i + 1 < len(chain):
+            # Naechste (neuere) Datei beginnt vor `since` -> diese Datei liegt komplett davor
+            newer = get_index(chain[i + 1])
+            newer_first = newer.first_ts() if newer else None
+            if newer_first is not None and newer_first <= since:
+                continue
+        if until is not None:
+            index = get_index(file_path)
+            first = index.first_ts() if index else None
+            if first is not None and first > until:
+                return
+        yield from iter_lines_forward(file_path, since=since, until=until)
+
+
 def read_logs(
     module: str,
     limit: int = 200,
@@ -44,7 +266,20 @@ def read_logs(
     level: Optional[str] = None,
     search: Optional[str] = None,
     allow_admin: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    tail: bool = False,
+    rotated: bool = False,
 ) -> Dict[str, object]:
+    """Log-Zeilen eines Moduls, gestreamt statt komplett in den Speicher geladen.
+
+    Standard: aktive Datei ab Anfang, Treffer ab `offset`; `count` ist die Gesamtzahl
+    der Treffer, `has_more` zeigt Treffer nach der Seite an.
+    rotated=True: zusaetzlich die rotierten Dateien (aelteste zuerst).
+    since/until: Zeitbereich, per Sparse-Index angesprungen, nach `until` wird abgebrochen.
+    tail=True: die letzten `limit` Treffer (rueckwaerts ab Dateiende gelesen); `count`
+    ist dann die Anzahl gelieferter Zeilen, die Gesamtzahl wird nicht ermittelt.
+    """
     if limit > MAX_LIMIT:
         limit = MAX_LIMIT
     if offset < 0:
@@ -52,23 +287,33 @@ def read_logs(
     if module == "admin" and not allow_admin:
         raise LogAccessError("Admin logs require elevated access")
     path = resolve_log_path(module)
-    if not path.exists():
-        return {"module": module, "items": [], "count": 0}
+    if not (log_file_chain(path) if rotated else path.is_file()):
+        return {"module": module, "items": [], "count": 0, "has_more": False}
+
+    def predicate(line: str) -> bool:
+        return _line_matches(line, level, search)
 
-    matched: List[str] = []
     try:
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.rstrip("\n")
-                if not _line_matches(line, level, search):
-                    continue
-                matched.append(line)
+        if tail and since is None and until is None:
+            items = tail_lines(path, offset + limit, predicate, rotated=rotated)
+            items = items[: max(0, len(items) - offset)]
+            return {"module": module, "items": items, "count": len(items), "has_more": False}
+
+        if rotated:
+            lines = iter_chain_forward(path, since=since, until=until)
+        else:
+            lines = iter_lines_forward(path, since=since, until=until)
+        items: List[str] = []
+        total = 0
+        for line in lines:
+            if not predicate(line):
+                continue
+            if offset <= total < offset + limit:
+                items.append(line)
+            total += 1
+        return {"module": module, "items": items, "count": total, "has_more": total > offset + limit}
     except FileNotFoundError:
-        return {"module": module, "items": [], "count": 0}
+        return {"module": module, "items": [], "count": 0, "has_more": False}
     except Exception:
         # Fail safe: do not raise to API level
-        return {"module": module, "items": [], "count": 0}
-
-    total = len(matched)
-    sliced = matched[offset : offset + limit] if offset < total else []
-    return {"module": module, "items": sliced, "count": total}
+        return {"module": module, "items": [], "count": 0, "has_more": False}
@@ -0,0 +1,250 @@
+"""Geteilter Log-Tail-Service fuer WebSocket-Log-Streams.
+
+Pro Log-Datei laeuft genau ein Watcher, egal wie viele Log-Viewer offen sind.
+Neue Zeilen werden ueber den Broadcaster (app/websocket/broadcaster.py) an alle
+Abonnenten verteilt; jeder Client hat seine eigene begrenzte Queue und optional
+einen serverseitigen Filter (Mindest-Level, Suchtext).
+
+Aenderungen werden per watchfiles (inotify unter Linux) erkannt, falls installiert,
+sonst per os.stat-Polling. Rotation (RotatingFileHandler benennt x.log -> x.log.1
+um) und Truncation werden erkannt: der Rest der alten Datei wird noch gelesen,
+danach wird die neue Datei von vorne verfolgt.
+"""
+import asyncio
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.websocket.broadcaster import BroadcastClient, get_channel
+
+try:
+    from watchfiles import awatch  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    awatch = None
+
+logger = logging.getLogger("app")
+
+POLL_INTERVAL = 0.5
+# Sicherheitsnetz fuer den Watcher-Modus: auch ohne Event regelmaessig pruefen
+WATCH_TIMEOUT_MS = 5000
+MAX_READ_BYTES = 1024 * 1024
+DEFAULT_CLIENT_QUEUE = 500
+
+_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+_LEVEL_RE = re.compile(r"\[(DEBUG|INFO|WARNING|ERROR|CRITICAL)\]")
+
+
+def make_line_filter(level: Optional[str] = None, search: Optional[str] = None) -> Optional[Callable[[str], bool]]:
+    """Filter fuer Log-Zeilen: Mindest-Level und/oder Suchtext (case-insensitive).
+
+    Zeilen ohne Level (Traceback-Fortsetzungen) folgen der Entscheidung der vorherigen Zeile.
+    """
+    min_level = _LEVELS.get((level or "").upper())
+    needle = (search or "").lower() or None
+    if min_level is None and needle is None:
+        return None
+    state = {"last": True}
+
+    def accept(line: str) -> bool:
+        if min_level is not None:
+            match = _LEVEL_RE.search(line, 0, 80)
+            if match:
+                state["last"] = _LEVELS[match.group(1)] >= min_level
+            if not state["last"]:
+                return False
+        if needle is not None and needle not in line.lower():
+            return False
+        return True
+
+    return accept
+
+
+class _FileTailer:
+    """Verfolgt eine Datei und veroeffentlicht neue Zeilen im zugehoerigen Channel."""
+
+    def __init__(self, path: Path, channel: Any) -> None:
+        self.path = path
+        self.channel = channel
+        self.backend = "watchfiles" if awatch is not None else "polling"
+        self.lines = 0
+        self.rotations = 0
+        self._fh = None
+        self._ident: Optional[Tuple[int, int]] = None
+        self._pos = 0
+        self._partial = b""
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # --- Datei-Zugriff (laeuft in einem Worker-Thread) ---
+    def _open(self, at_end: bool) -> None:
+        try:
+            fh = open(self.path, "rb")
+        except OSError:
+            self._fh = None
+            self._ident = None
+            return
+        st = os.fstat(fh.fileno())
+        self._fh = fh
+        self._ident = (st.st_dev, st.st_ino)
+        self._pos = st.st_size if at_end else 0
+        self._partial = b""
+        fh.seek(self._pos)
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+        self._fh = None
+
+    def _drain(self, out: List[str]) -> None:
+        if self._fh is None:
+            return
+        while True:
+            data = self._fh.read(MAX_READ_BYTES)
+            if not data:
+                return
+            self._pos += len(data)
+            parts = (self._partial + data).split(b"\n")
+            self._partial = parts.pop()
+            for raw in parts:
+                text = raw.decode("utf-8", errors="replace").rstrip("\r")
+                if text:
+                    out.append(text)
+
+    def _collect(self) -> List[str]:
+        out: List[str] = []
+        if self._fh is None:
+            # Datei existierte noch nicht -> ab Anfang lesen, sobald sie da ist
+            self._open(at_end=False)
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            st = None
+        if st is not None and self._fh is not None and (st.st_dev, st.st_ino) == self._ident and st.st_size == self._pos:
+            return out
+        self._drain(out)
+        if st is None:
+            return out
+        if (st.st_dev, st.st_ino) != self._ident or st.st_size < self._pos:
+            # Rotation oder Truncation: alte Datei ist ausgelesen, neue von vorne verfolgen
+            if self._partial:
+                out.append(self._partial.decode("utf-8", errors="replace"))
+            self._close()
+            self.rotations += 1
+            self._open(at_end=False)
+            self._drain(out)
+        return out
+
+    # --- Event-Loop ---
+    async def _poll_once(self) -> None:
+        lines = await asyncio.to_thread(self._collect)
+        for line in lines:
+            self.channel.publish(line)
+        self.lines += len(lines)
+
+    async def _run(self) -> None:
+        try:
+            if awatch is not None:
+                name = self.path.name
+                try:
+                    async for _changes in awatch(
+                        self.path.parent,
+                        watch_filter=lambda _change, changed: os.path.basename(changed).startswith(name),
+                        debounce=50,
+                        step=50,
+                        stop_event=self._stop,
+                        rust_timeout=WATCH_TIMEOUT_MS,
+                        yield_on_timeout=True,
+                        recursive=False,
+                    ):
+                        await self._poll_once()
+                    return
+                except Exception:
+                    logger.warning("[LOGTAIL] watchfiles fuer %s nicht nutzbar, wechsle auf Polling", self.path, exc_info=True)
+                    self.backend = "polling"
+            while not self._stop.is_set():
+                await self._poll_once()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("[LOGTAIL] Tailer fuer %s beendet", self.path)
+        finally:
+            self._close()
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._open, True)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "backend": self.backend,
+            "running": self.running,
+            "clients": self.channel.client_count,
+            "lines": self.lines,
+            "rotations": self.rotations,
+        }
+
+
+class LogTailService:
+    """Registry der Tailer; startet beim ersten und stoppt nach dem letzten Abonnenten."""
+
+    def __init__(self) -> None:
+        self._tailers: Dict[str, _FileTailer] = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(
+        self,
+        path: str,
+        send: Callable[[str], Awaitable[Any]],
+        level: Optional[str] = None,
+        search: Optional[str] = None,
+        label: Optional[str] = None,
+        max_queue: int = DEFAULT_CLIENT_QUEUE,
+    ) -> BroadcastClient:
+        file_path = Path(path).resolve()
+        key = str(file_path)
+        channel = get_channel(f"logtail:{key}", max_queue=max_queue)
+        client = channel.subscribe(send, label=label, accept=make_line_filter(level, search))
+        async with self._lock:
+            tailer = self._tailers.get(key)
+            if tailer is None or not tailer.running:
+                tailer = _FileTailer(file_path, channel)
+                self._tailers[key] = tailer
+                await tailer.start()
+        return client
+
+    def unsubscribe(self, client: BroadcastClient) -> None:
+        channel = client.channel
+        channel.unsubscribe(client)
+        if channel.client_count == 0:
+            key = channel.name.split(":", 1)[1]
+            tailer = self._tailers.pop(key, None)
+            if tailer is not None:
+                tailer.stop()
+
+    def stop_all(self) -> None:
+        for tailer in list(self._tailers.values()):
+            tailer.stop()
+        self._tailers.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [tailer.stats() for tailer in self._tailers.values()]
+
+
+log_tail_service = LogTailService()
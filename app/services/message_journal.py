@@ -0,0 +1,279 @@
+"""Gemeinsames MQTT-Message-Journal (Ring-Buffer mit Indizes).
+
+Ersetzt die frueheren Listen-Puffer in mqtt_routes (`message_buffer`) und
+mqtt_runtime (`_messages_buffer`), die bei jeder Nachricht per pop(0) gekuerzt
+und bei Filter-Abfragen linear durchsucht wurden.
+
+- feste Kapazitaet (Anzahl) als Ring, Verdraengung in O(1)
+- optionale Obergrenze fuer die Gesamtgroesse der Payloads (Bytes)
+- Sekundaerindizes pro Topic und pro Drucker (Seriennummer aus device/<serial>/...)
+- Cursor-Abfragen: "alle Nachrichten nach seq N"
+
+Konfiguration in config.yaml:
+    mqtt_logging:
+      journal:
+        max_messages: 1000
+        max_size_mb: 0      # 0 = nur Anzahl begrenzen
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from pathlib import Path
+from threading import Lock
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+import yaml
+
+logger = logging.getLogger("mqtt")
+
+DEFAULT_MAX_MESSAGES = 1000
+
+
+def printer_from_topic(topic: Optional[str]) -> Optional[str]:
+    """Seriennummer aus Bambu-Topics (device/<serial>/report|request)."""
+    if not topic:
+        return None
+    parts = topic.split("/")
+    if len(parts) >= 3 and parts[0] == "device" and parts[1]:
+        return parts[1]
+    return None
+
+
+class MessageJournal:
+    """Thread-sicherer Ring-Buffer fuer MQTT-Nachrichten.
+
+    Eintraege sind Dicts mit seq, topic, printer, payload, timestamp, qos, source.
+    """
+
+    def __init__(self, max_messages: int = DEFAULT_MAX_MESSAGES, max_bytes: int = 0) -> None:
+        self.max_messages = max(1, int(max_messages))
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = Lock()
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * self.max_messages
+        self._next_seq = 1
+        self._first_seq = 1
+        self._total_bytes = 0
+        self._count = 0
+        self._by_topic: Dict[str, Deque[int]] = {}
+        self._by_printer: Dict[str, Deque[int]] = {}
+        self.appended = 0
+        self.evicted = 0
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def append(
+        self,
+        topic: str,
+        payload: str,
+        timestamp: str,
+        qos: int = 0,
+        source: str = "mqtt",
+        printer: Optional[str] = None,
+    ) -> int:
+        """Haengt eine Nachricht an und liefert ihre Sequenznummer."""
+        payload = payload if isinstance(payload, str) else str(payload or "")
+        printer = printer or printer_from_topic(topic)
+        size = len(payload) + len(topic or "")
+        with self._lock:
+            seq = self._next_seq
+            # Ring voll -> aeltesten Eintrag (genau der Slot, den wir gleich belegen) verdraengen
+            if seq - self._first_seq >= self.max_messages:
+                self._evict_oldest()
+            entry = {
+                "seq": seq,
+                "topic": topic,
+                "printer": printer,
+                "payload": payload,
+                "timestamp": timestamp,
+                "qos": qos,
+                "source": source,
+                "size": size,
+            }
+            self._slots[seq % self.max_messages] = entry
+            self._next_seq = seq + 1
+            self._total_bytes += size
+            self._count += 1
+            self._by_topic.setdefault(topic, deque()).append(seq)
+            if printer:
+                self._by_printer.setdefault(printer, deque()).append(seq)
+            if self.max_bytes:
+                # Neueste Nachricht bleibt immer erhalten, auch wenn sie allein zu gross ist
+                while self._total_bytes > self.max_bytes and self._first_seq < seq:
+                    self._evict_oldest()
+            self.appended += 1
+            return seq
+
+    def _evict_oldest(self) -> None:
+        seq = self._first_seq
+        idx = seq % self.max_messages
+        entry = self._slots[idx]
+        self._slots[idx] = None
+        self._first_seq = seq + 1
+        if entry is None:
+            return
+        self.evicted += 1
+        self._count -= 1
+        self._total_bytes -= entry["size"]
+        self._drop_index(self._by_topic, entry["topic"], seq)
+        if entry["printer"]:
+            self._drop_index(self._by_printer, entry["printer"], seq)
+
+    @staticmethod
+    def _drop_index(index: Dict[str, Deque[int]], key: str, seq: int) -> None:
+        seqs = index.get(key)
+        if seqs and seqs[0] == seq:
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots = [None] * self.max_messages
+            self._first_seq = self._next_seq
+            self._total_bytes = 0
+            self._count = 0
+            self._by_topic.clear()
+            self._by_printer.clear()
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def _get(self, seq: int) -> Optional[Dict[str, Any]]:
+        if seq < self._first_seq or seq >= self._next_seq:
+            return None
+        entry = self._slots[seq % self.max_messages]
+        if entry is None or entry["seq"] != seq:
+            return None
+        return entry
+
+    @staticmethod
+    def _matches(entry: Dict[str, Any], topic_contains: Optional[str], source: Optional[str]) -> bool:
+        if topic_contains and topic_contains not in (entry["topic"] or ""):
+            return False
+        if source is not None and entry["source"] != source:
+            return False
+        return True
+
+    def _candidate_seqs(self, topic: Optional[str], printer: Optional[str]) -> Optional[Iterable[int]]:
+        """Neueste zuerst; None = gesamter Ring."""
+        if topic is not None and printer is not None:
+            # kleineren Index nehmen, anderen Filter beim Lesen pruefen
+            a = self._by_topic.get(topic, ())
+            b = self._by_printer.get(printer, ())
+            return reversed(a if len(a) <= len(b) else b)
+        if topic is not None:
+            return reversed(self._by_topic.get(topic, ()))
+        if printer is not None:
+            return reversed(self._by_printer.get(printer, ()))
+        return None
+
+    def query(
+        self,
+        limit: int = 100,
+        after_seq: Optional[int] = None,
+        topic: Optional[str] = None,
+        printer: Optional[str] = None,
+        topic_contains: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Nachrichten in chronologischer Reihenfolge (aelteste zuerst).
+
+        Ohne `after_seq` die neuesten `limit` Treffer, mit `after_seq` die ersten
+        `limit` Treffer nach diesem Cursor.
+        """
+        limit = max(0, int(limit))
+        if limit == 0:
+            return []
+        cursor = after_seq if after_seq is not None else 0
+        with self._lock:
+            candidates = self._candidate_seqs(topic, printer)
+            if candidates is None and after_seq is not None:
+                # Cursor ohne Index: direkt vorwaerts ab Cursor lesen
+                forward: List[Dict[str, Any]] = []
+                for seq in range(max(cursor + 1, self._first_seq), self._next_seq):
+                    entry = self._get(seq)
+                    if entry is None or not self._matches(entry, topic_contains, source):
+                        continue
+                    forward.append(dict(entry))
+                    if len(forward) >= limit:
+                        break
+                return forward
+            if candidates is None:
+                candidates = range(self._next_seq - 1, max(cursor, self._first_seq - 1), -1)
+            matches: List[Dict[str, Any]] = []
+            for seq in candidates:
+                if seq <= cursor:
+                    break
+                entry = self._get(seq)
+                if entry is None:
+                    continue
+                if topic is not None and entry["topic"] != topic:
+                    continue
+                if printer is not None and entry["printer"] != printer:
+                    continue
+                if not self._matches(entry, topic_contains, source):
+                    continue
+                matches.append(entry)
+                # Ohne Cursor reichen die neuesten `limit` Treffer
+                if after_seq is None and len(matches) >= limit:
+                    break
+        matches.reverse()
+        if after_seq is not None:
+            matches = matches[:limit]
+        return [dict(entry) for entry in matches]
+
+    def latest(self, **filters: Any) -> Optional[Dict[str, Any]]:
+        found = self.query(limit=1, **filters)
+        return found[0] if found else None
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self._count,
+                "max_messages": self.max_messages,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "first_seq": self._first_seq,
+                "last_seq": self._next_seq - 1,
+                "topics": len(self._by_topic),
+                "printers": len(self._by_printer),
+                "appended": self.appended,
+                "evicted": self.evicted,
+            }
+
+
+def _load_journal_config() -> Dict[str, Any]:
+    try:
+        config_path = Path(__file__).resolve().parents[2] / "config.yaml"
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return (config.get("mqtt_logging") or {}).get("journal") or {}
+    except Exception:
+        logger.debug("mqtt_logging.journal config not available; using defaults", exc_info=True)
+        return {}
+
+
+def _build_default_journal() -> MessageJournal:
+    cfg = _load_journal_config()
+    try:
+        max_messages = int(cfg.get("max_messages", DEFAULT_MAX_MESSAGES))
+    except (TypeError, ValueError):
+        max_messages = DEFAULT_MAX_MESSAGES
+    try:
+        max_bytes = int(float(cfg.get("max_size_mb", 0) or 0) * 1024 * 1024)
+    except (TypeError, ValueError):
+        max_bytes = 0
+    return MessageJournal(max_messages=max_messages, max_bytes=max_bytes)
+
+
+# Globales Journal fuer alle MQTT-Quellen (mqtt_routes, mqtt_runtime, Replay)
+journal = _build_default_journal()
@@ -0,0 +1,446 @@
+"""Strukturierte Aufzeichnung des rohen MQTT-Verkehrs (Capture) fuer Replay und Benchmarks.
+
+Im Gegensatz zu mqtt_messages.log / full_payloads.jsonl (formatierte Log-Zeilen,
+gekuerzte Payloads) wird hier jede Nachricht verlustfrei als JSON-Zeile gespeichert:
+
+    {"ts": 1718000000.123, "topic": "device/<serial>/report", "serial": "<serial>",
+     "qos": 0, "source": "mqtt", "payload": "<utf-8 text>"}
+
+Payloads, die kein gueltiges UTF-8 sind, landen base64-kodiert in "payload_b64".
+
+- Segment-Dateien (capture-YYYYmmddTHHMMSSZ-NNN.jsonl.gz, optional .zst / unkomprimiert)
+- Rollover nach Groesse (unkomprimiert) oder Alter des Segments
+- Retention nach Gesamtgroesse und Alter
+- Aufnahme im paho-Thread kostet nur einen put_nowait; Kodieren, Komprimieren und
+  Schreiben uebernimmt ein Hintergrund-Thread (volle Queue -> Nachricht verworfen, gezaehlt)
+
+Konfiguration in config.yaml:
+    mqtt_logging:
+      capture:
+        enabled: false
+        directory: "logs/mqtt/capture"
+        compression: "gzip"   # gzip | zstd | none
+        segment_max_mb: 16
+        segment_max_minutes: 60
+        retention_max_mb: 500
+        retention_days: 7
+
+Replay: app/services/mqtt_replay.py
+"""
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+import yaml
+
+from app.services.message_journal import printer_from_topic
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger("mqtt")
+
+DEFAULT_DIRECTORY = "logs/mqtt/capture"
+DEFAULT_QUEUE_SIZE = 20000
+SEGMENT_PREFIX = "capture-"
+_SUFFIXES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "none": ".jsonl"}
+
+_STOP = object()
+
+
+def encode_record(ts: float, topic: str, payload: Union[bytes, str], qos: int = 0, source: str = "mqtt") -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "ts": round(ts, 6),
+        "topic": topic,
+        "serial": printer_from_topic(topic),
+        "qos": qos,
+        "source": source,
+    }
+    if isinstance(payload, str):
+        record["payload"] = payload
+    else:
+        try:
+            record["payload"] = payload.decode("utf-8")
+        except UnicodeDecodeError:
+            record["payload_b64"] = base64.b64encode(payload).decode("ascii")
+    return record
+
+
+def record_payload_bytes(record: Dict[str, Any]) -> bytes:
+    """Originale Payload-Bytes eines Capture-Records."""
+    if "payload_b64" in record:
+        return base64.b64decode(record["payload_b64"])
+    return str(record.get("payload") or "").encode("utf-8")
+
+
+# ----------------------------------------------------------------------
+# Segment-Dateien lesen
+# ----------------------------------------------------------------------
+def is_segment(path: Path) -> bool:
+    return path.name.startswith(SEGMENT_PREFIX) and any(path.name.endswith(s) for s in _SUFFIXES.values())
+
+
+def list_segments(directory: Union[str, Path]) -> List[Path]:
+    """Segmente eines Capture-Verzeichnisses, aelteste zuerst (Name enthaelt den Startzeitpunkt)."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.is_file() and is_segment(p))
+
+
+_READ_CHUNK = 64 * 1024
+
+
+def _open_segment(path: Path) -> BinaryIO:
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard ist nicht installiert, .zst-Capture kann nicht gelesen werden")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+def _iter_gzip_chunks(path: Path) -> Iterator[bytes]:
+    """Dekomprimiert ein gzip-Segment stueckweise.
+
+    Anders als gzip.open liefert decompressobj bei einem abgeschnittenen Stream (laufendes
+    Segment, Absturz) alles bis zum letzten Sync-Flush statt EOFError, ohne den Puffer zu verlieren.
+    """
+    decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(_READ_CHUNK)
+            if not chunk:
+                return
+            try:
+                data = decomp.decompress(chunk)
+                # Mehrere gzip-Member hintereinander (z.B. angehaengte Dateien)
+                while decomp.eof and decomp.unused_data:
+                    rest = decomp.unused_data
+                    decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    data += decomp.decompress(rest)
+            except zlib.error:
+                logger.debug("Capture-Segment %s ist beschaedigt, Lesen abgebrochen", path)
+                return
+            if data:
+                yield data
+
+
+def _iter_chunks(path: Path) -> Iterator[bytes]:
+    if path.name.endswith(".gz"):
+        yield from _iter_gzip_chunks(path)
+        return
+    with _open_segment(path) as raw:
+        while True:
+            try:
+                chunk = raw.read(_READ_CHUNK)
+            except Exception:
+                # zstd: abgeschnittener Frame
+                logger.debug("Capture-Segment %s endet unvollstaendig", path)
+                return
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_segment(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Records einer Segment-Datei.
+
+    Ein abgeschnittenes Ende (laufendes Segment, Absturz) wird toleriert: alle vollstaendigen
+    Zeilen werden geliefert, nur eine unvollstaendige letzte Zeile faellt weg.
+    """
+    path = Path(path)
+    pending = b""
+    for chunk in _iter_chunks(path):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            record = _parse_line(line)
+            if record is not None:
+                yield record
+    # Letzte Zeile ohne Newline: nur verwenden, wenn sie vollstaendiges JSON ist
+    record = _parse_line(pending)
+    if record is not None:
+        yield record
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def iter_capture(source: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Records aus einer Segment-Datei oder allen Segmenten eines Verzeichnisses (chronologisch)."""
+    source = Path(source)
+    if source.is_dir():
+        for segment in list_segments(source):
+            yield from iter_segment(segment)
+    else:
+        yield from iter_segment(source)
+
+
+# ----------------------------------------------------------------------
+# Aufzeichnung
+# ----------------------------------------------------------------------
+class MqttCapture:
+    """Schreibt MQTT-Nachrichten in rotierende, komprimierte Segment-Dateien."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.directory = Path(DEFAULT_DIRECTORY)
+        self.compression = "gzip"
+        self.segment_max_bytes = 16 * 1024 * 1024
+        self.segment_max_seconds = 3600.0
+        self.retention_max_bytes = 500 * 1024 * 1024
+        self.retention_seconds = 7 * 86400.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=DEFAULT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stream: Optional[Any] = None
+        self._file: Optional[BinaryIO] = None
+        self._segment_path: Optional[Path] = None
+        self._segment_started = 0.0
+        self._segment_bytes = 0
+        self._segment_compression = "gzip"
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_raw = 0
+        self.segments_written = 0
+        self.segments_deleted = 0
+
+    # --- Konfiguration ---
+    def configure(self, cfg: Optional[Dict[str, Any]]) -> None:
+        cfg = cfg or {}
+        self.directory = Path(cfg.get("directory") or DEFAULT_DIRECTORY)
+        compression = str(cfg.get("compression") or "gzip").lower()
+        if compression == "zstd" and zstandard is None:
+            logger.warning("[CAPTURE] zstandard nicht installiert, verwende gzip")
+            compression = "gzip"
+        self.compression = compression if compression in _SUFFIXES else "gzip"
+        try:
+            self.segment_max_bytes = max(1, int(float(cfg.get("segment_max_mb", 16)) * 1024 * 1024))
+            self.segment_max_seconds = max(10.0, float(cfg.get("segment_max_minutes", 60)) * 60.0)
+            self.retention_max_bytes = max(0, int(float(cfg.get("retention_max_mb", 500)) * 1024 * 1024))
+            self.retention_seconds = max(0.0, float(cfg.get("retention_days", 7)) * 86400.0)
+        except (TypeError, ValueError):
+            logger.warning("[CAPTURE] Ungueltige capture-Konfiguration, verwende Defaults", exc_info=True)
+
+    def start(self, cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._lock:
+            if cfg is not None:
+                self.configure(cfg)
+            if self._thread is None or not self._thread.is_alive():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="mqtt-capture", daemon=True)
+                self._thread.start()
+            self.enabled = True
+        logger.info("[CAPTURE] Aufzeichnung gestartet: %s (%s)", self.directory, self.compression)
+        return self.status()
+
+    def stop(self, timeout: float = 5.0) -> Dict[str, Any]:
+        with self._lock:
+            self.enabled = False
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+            logger.info("[CAPTURE] Aufzeichnung gestoppt")
+        return self.status()
+
+    # --- Hot-Path (paho-Thread) ---
+    def record(self, topic: str, payload: Union[bytes, str], qos: int = 0, source: str = "mqtt") -> None:
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((time.time(), topic, payload, qos, source))
+        except queue.Full:
+            self.dropped += 1
+
+    # --- Writer-Thread ---
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < 500:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                try:
+                    self._write(batch)
+                except Exception:
+                    logger.exception("[CAPTURE] Schreiben fehlgeschlagen, %d Nachrichten verworfen", len(batch))
+                    self.dropped += len(batch)
+                    self._close_segment()
+                if stop:
+                    return
+        finally:
+            self._close_segment()
+
+    def _write(self, batch: List[Any]) -> None:
+        now = time.time()
+        if self._stream is not None and (
+            self._segment_bytes >= self.segment_max_bytes
+            or now - self._segment_started >= self.segment_max_seconds
+            # Einstellungen zur Laufzeit geaendert -> neues Segment
+            or self._segment_compression != self.compression
+            or (self._segment_path is not None and self._segment_path.parent != self.directory)
+        ):
+            self._close_segment()
+            self._apply_retention()
+        if self._stream is None:
+            self._open_segment(now)
+        chunks = []
+        for ts, topic, payload, qos, source in batch:
+            chunks.append(json.dumps(encode_record(ts, topic, payload, qos, source), ensure_ascii=False).encode("utf-8"))
+        data = b"\n".join(chunks) + b"\n"
+        assert self._stream is not None
+        self._stream.write(data)
+        # Sync-Flush pro Batch: Segment bleibt auch waehrend der Aufnahme lesbar
+        if self._segment_compression == "gzip":
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self._segment_compression == "zstd":
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._stream.flush()
+        self._segment_bytes += len(data)
+        self.bytes_raw += len(data)
+        self.recorded += len(batch)
+
+    def _open_segment(self, now: float) -> None:
+        stamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Laufende Nummer pro Sekunde, damit die Namens-Sortierung chronologisch bleibt
+        counter = 0
+        while True:
+            path = self.directory / f"{SEGMENT_PREFIX}{stamp}-{counter:03d}{_SUFFIXES[self.compression]}"
+            if not path.exists():
+                break
+            counter += 1
+        self._file = open(path, "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+        self._segment_path = path
+        self._segment_compression = self.compression
+        self._segment_started = now
+        self._segment_bytes = 0
+        self.segments_written += 1
+
+    def _close_segment(self) -> None:
+        stream, file = self._stream, self._file
+        self._stream = None
+        self._file = None
+        self._segment_path = None
+        for handle in (stream, file):
+            if handle is None:
+                continue
+            try:
+                handle.close()
+            except Exception:
+                logger.exception("[CAPTURE] Segment konnte nicht geschlossen werden")
+
+    def _apply_retention(self) -> None:
+        segments = list_segments(self.directory)
+        now = time.time()
+        sizes = []
+        for path in segments:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            sizes.append((path, st.st_size, st.st_mtime))
+        total = sum(size for _, size, _ in sizes)
+        for path, size, mtime in sizes:
+            if path == self._segment_path:
+                continue
+            too_big = self.retention_max_bytes and total > self.retention_max_bytes
+            too_old = self.retention_seconds and now - mtime > self.retention_seconds
+            if not (too_big or too_old):
+                break
+            try:
+                path.unlink()
+                total -= size
+                self.segments_deleted += 1
+            except OSError:
+                logger.warning("[CAPTURE] Segment %s konnte nicht geloescht werden", path, exc_info=True)
+
+    def status(self) -> Dict[str, Any]:
+        segments = list_segments(self.directory)
+        total = 0
+        for path in segments:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return {
+            "enabled": self.enabled,
+            "directory": str(self.directory),
+            "compression": self.compression,
+            "current_segment": self._segment_path.name if self._segment_path else None,
+            "segments": len(segments),
+            "disk_bytes": total,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "bytes_raw": self.bytes_raw,
+            "queue_depth": self._queue.qsize(),
+            "segments_deleted": self.segments_deleted,
+            "segment_max_mb": round(self.segment_max_bytes / 1024 / 1024, 2),
+            "segment_max_minutes": round(self.segment_max_seconds / 60, 1),
+            "retention_max_mb": round(self.retention_max_bytes / 1024 / 1024, 2),
+            "retention_days": round(self.retention_seconds / 86400, 2),
+        }
+
+
+def load_capture_config() -> Dict[str, Any]:
+    try:
+        config_path = Path(__file__).resolve().parents[2] / "config.yaml"
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return (config.get("mqtt_logging") or {}).get("capture") or {}
+    except Exception:
+        logger.debug("mqtt_logging.capture config not available; using defaults", exc_info=True)
+        return {}
+
+
+def start_from_config() -> None:
+    """Beim App-Start: Aufzeichnung starten, falls in config.yaml aktiviert."""
+    cfg = load_capture_config()
+    mqtt_capture.configure(cfg)
+    if cfg.get("enabled", False) or os.environ.get("FILAMENTHUB_MQTT_CAPTURE", "").lower() in ("1", "true", "yes", "on"):
+        mqtt_capture.start()
+
+
+mqtt_capture = MqttCapture()
@@ -0,0 +1,201 @@
+"""Replay von MQTT-Captures (app/services/mqtt_capture.py) durch die Ingest-Pipeline.
+
+Geschwindigkeit:
+    speed=1    Originaltempo (Abstaende aus den Zeitstempeln)
+    speed=N    N-fach schneller
+    speed=0    so schnell wie moeglich
+
+Im Server: POST /api/debug/mqtt/replay (gleicher Pfad wie /api/debug/mqtt/inject).
+Offline gegen eine laufende Instanz:
+
+    python -m app.services.mqtt_replay logs/mqtt/capture --speed 10 --url http://127.0.0.1:8081
+    python -m app.services.mqtt_replay logs/mqtt/capture/capture-20240101T120000Z-000.jsonl.gz --speed max --serial 01S00A...
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+from app.services.mqtt_capture import iter_capture, record_payload_bytes
+
+logger = logging.getLogger("mqtt")
+
+# handler(topic, payload_dict) -> verarbeitet eine Nachricht (z.B. debug_routes._inject_message)
+ReplayHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+def parse_speed(value: Any) -> float:
+    """'max' / 0 -> 0.0 (keine Pausen), sonst Faktor > 0."""
+    if value is None:
+        return 1.0
+    if isinstance(value, str) and value.strip().lower() in ("max", "fast", "0"):
+        return 0.0
+    speed = float(value)
+    if speed < 0:
+        raise ValueError("speed must be >= 0")
+    return speed
+
+
+def filter_records(
+    records: Iterable[Dict[str, Any]],
+    serial: Optional[str] = None,
+    topic_contains: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    count = 0
+    for record in records:
+        if serial and record.get("serial") != serial:
+            continue
+        if topic_contains and topic_contains not in (record.get("topic") or ""):
+            continue
+        yield record
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+class ReplayStats:
+    def __init__(self, source: str, speed: float) -> None:
+        self.source = source
+        self.speed = speed
+        self.sent = 0
+        self.skipped = 0
+        self.errors = 0
+        self.max_lag_ms = 0.0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.running = True
+        self.cancelled = False
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        elapsed = max(1e-6, end - self.started_at)
+        return {
+            "source": self.source,
+            "speed": "max" if self.speed == 0 else self.speed,
+            "running": self.running,
+            "cancelled": self.cancelled,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "elapsed_s": round(elapsed, 3),
+            "messages_per_s": round(self.sent / elapsed, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
+
+async def replay(
+    records: Iterable[Dict[str, Any]],
+    handler: ReplayHandler,
+    speed: float = 1.0,
+    stats: Optional[ReplayStats] = None,
+    stop_event: Optional[asyncio.Event] = None,
+) -> ReplayStats:
+    """Spielt Records nacheinander ueber `handler` ab und haelt dabei das (skalierte) Timing ein.
+
+    Records werden in einem Worker-Thread gelesen/dekomprimiert, damit der Event-Loop frei bleibt.
+    Nachrichten ohne JSON-Objekt als Payload werden uebersprungen (inject erwartet ein Dict).
+    """
+    stats = stats or ReplayStats(source="<records>", speed=speed)
+    iterator = iter(records)
+    sentinel = object()
+    first_ts: Optional[float] = None
+    start_mono = time.monotonic()
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                stats.cancelled = True
+                break
+            record = await asyncio.to_thread(next, iterator, sentinel)
+            if record is sentinel:
+                break
+            try:
+                payload = json.loads(record_payload_bytes(record))
+            except ValueError:
+                payload = None
+            topic = record.get("topic") or ""
+            if not isinstance(payload, dict) or not topic:
+                stats.skipped += 1
+                continue
+            ts = float(record.get("ts") or 0.0)
+            if speed > 0:
+                if first_ts is None:
+                    first_ts = ts
+                    start_mono = time.monotonic()
+                due = start_mono + max(0.0, ts - first_ts) / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    stats.max_lag_ms = max(stats.max_lag_ms, -delay * 1000.0)
+            try:
+                await handler(topic, payload)
+                stats.sent += 1
+            except Exception as exc:
+                stats.errors += 1
+                stats.last_error = str(exc)
+                logger.debug("[REPLAY] Nachricht fehlgeschlagen topic=%s", topic, exc_info=True)
+    finally:
+        stats.running = False
+        stats.finished_at = time.time()
+    return stats
+
+
+def _http_handler(url: str) -> ReplayHandler:
+    import httpx
+
+    client = httpx.AsyncClient(base_url=url.rstrip("/"), timeout=30.0)
+
+    async def handler(topic: str, payload: Dict[str, Any]) -> Any:
+        response = await client.post("/api/debug/mqtt/inject", json={"topic": topic, "payload": payload})
+        response.raise_for_status()
+        return response.json()
+
+    handler.client = client  # type: ignore[attr-defined]
+    return handler
+
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MQTT-Capture an /api/debug/mqtt/inject abspielen")
+    parser.add_argument("source", help="Segment-Datei oder Capture-Verzeichnis")
+    parser.add_argument("--url", default="http://127.0.0.1:8081", help="Basis-URL der FilamentHub-Instanz")
+    parser.add_argument("--speed", default="1", help="1 = Originaltempo, N = N-fach, max = ohne Pausen")
+    parser.add_argument("--serial", default=None, help="nur Nachrichten dieses Druckers")
+    parser.add_argument("--topic", default=None, help="nur Topics, die diesen Text enthalten")
+    parser.add_argument("--limit", type=int, default=None, help="maximale Anzahl Nachrichten")
+    parser.add_argument("--dry-run", action="store_true", help="nur lesen und zaehlen, nichts senden")
+    args = parser.parse_args(argv)
+
+    if not Path(args.source).exists():
+        parser.error(f"{args.source} existiert nicht")
+    speed = parse_speed(args.speed)
+    records = filter_records(iter_capture(args.source), serial=args.serial, topic_contains=args.topic, limit=args.limit)
+
+    async def _noop(topic: str, payload: Dict[str, Any]) -> None:
+        return None
+
+    async def _run() -> ReplayStats:
+        handler = _noop if args.dry_run else _http_handler(args.url)
+        try:
+            return await replay(records, handler, speed=0.0 if args.dry_run else speed,
+                                stats=ReplayStats(args.source, speed))
+        finally:
+            client = getattr(handler, "client", None)
+            if client is not None:
+                await client.aclose()
+
+    stats = asyncio.run(_run())
+    print(json.dumps(stats.as_dict(), indent=2))
+    return 0 if stats.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
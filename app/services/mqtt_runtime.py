@@ -14,6 +14,8 @@ from pathlib import Path
 from app.services.printer_mqtt_client import PrinterMQTTClient
 from uuid import uuid4
 from services.printer_service import get_printer_service
+from app.services.message_journal import journal as _message_journal
+from app.services.mqtt_capture import mqtt_capture
 from app.models.printer import Printer
 
 
@@ -90,9 +92,7 @@ _transport_connected_since: Optional[datetime] = None
 _subscribed_topics_lock = Lock()
 _subscribed_topics: set[str] = set()
 
-# Live message buffer (last 50 messages for UI display) - global across all printers
-_messages_lock = Lock()
-_messages_buffer: list[Dict[str, Any]] = []
+# Live messages for UI display: shared journal (app/services/message_journal.py)
 _messages_max_size = 50
 
 # MQTT Logging Config (loaded once at import)
@@ -507,29 +507,24 @@ def apply_auto_connect(printer: Optional[Printer]) -> Dict[str, Any]:
 
 
 def _add_message(topic: str, payload: str, timestamp: datetime) -> None:
-    """Add message to ring buffer (FIFO, max 50)."""
+    """Add message to the shared message journal."""
     t = _normalize_topic(topic)
     if not t:
         return
-    
-    msg_entry = {
-        "topic": t,
-        "payload": payload[:200] if payload else "",  # Truncate long payloads
-        "timestamp": _iso_utc(timestamp),
-    }
-    
-    with _messages_lock:
-        _messages_buffer.append(msg_entry)
-        # Keep only last 50 messages
-        if len(_messages_buffer) > _messages_max_size:
-            _messages_buffer.pop(0)
+    _message_journal.append(t, payload or "", _iso_utc(timestamp), source="runtime")
 
 
 def get_messages(limit: int = 50) -> list[Dict[str, Any]]:
     """Get last N messages (most recent first)."""
-    with _messages_lock:
-        # Return in reverse order (newest first)
-        return list(reversed(_messages_buffer[-limit:]))
+    entries = _message_journal.query(limit=min(limit, _messages_max_size), source="runtime")
+    return [
+        {
+            "topic": entry["topic"],
+            "payload": entry["payload"][:200] if entry["payload"] else "",  # Truncate long payloads
+            "timestamp": entry["timestamp"],
+        }
+        for entry in reversed(entries)
+    ]
 
 
 def _iso_utc(dt: datetime) -> str:
@@ -804,6 +799,7 @@ def connect(config: Dict[str, Any]) -> Dict[str, Any]:
 
                         # Get payload
                         payload = getattr(msg, "payload", b"")
+                        mqtt_capture.record(topic, payload, getattr(msg, "qos", 0), source="runtime")
                         if isinstance(payload, bytes):
                             try:
                                 payload = payload.decode("utf-8", errors="replace")
@@ -844,15 +840,16 @@ def connect(config: Dict[str, Any]) -> Dict[str, Any]:
                             if len(payload) > max_payload_chars:
                                 payload_short = payload[:max_payload_chars] + "...[truncated]"
 
-                            # Write to standard log (truncated)
+                            # Write to standard log (truncated); JSON nur bauen, wenn INFO aktiv ist
                             try:
                                 mqtt_logger = logging.getLogger("mqtt")
-                                log_entry = {
-                                    "ts": datetime.now(timezone.utc).isoformat(),
-                                    "topic": topic,
-                                    "payload": payload_short
-                                }
-                                mqtt_logger.info(json.dumps(log_entry, ensure_ascii=False))
+                                if mqtt_logger.isEnabledFor(logging.INFO):
+                                    log_entry = {
+                                        "ts": datetime.now(timezone.utc).isoformat(),
+                                        "topic": topic,
+                                        "payload": payload_short
+                                    }
+                                    mqtt_logger.info(json.dumps(log_entry, ensure_ascii=False))
                             except Exception:
                                 logging.getLogger("mqtt").exception("Failed to write MQTT truncated payload log entry")
                             # Write to full payload file if enabled
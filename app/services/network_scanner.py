@@ -0,0 +1,401 @@
+"""Asynchroner Netzwerk-Scanner fuer die Drucker-Suche (Bambu Lab, Klipper/Moonraker).
+
+- TCP-Probes ueber ``asyncio.open_connection`` direkt auf dem Event-Loop (keine Worker-Threads,
+  IP-Literale gehen ohne getaddrinfo durch)
+- pro Host werden alle Ports gleichzeitig geprueft (Fan-out), global begrenzt durch eine
+  Semaphore (gleichzeitig offene Sockets) und einen Rate-Limiter (Verbindungsversuche/s)
+- Ergebnisse pro (ip, port) werden kurz gecacht, damit Quick-Scan und detect/bambu bzw.
+  detect/klipper kurz hintereinander nicht dieselben Sweeps wiederholen
+- Reverse-DNS asynchron mit eigenem Cache (auch negative Antworten) und eigener Obergrenze,
+  damit ein /24 ohne PTR-Eintraege den Default-Threadpool nicht blockiert
+
+``scan()`` liefert die Hosts in der Reihenfolge, in der sie fertig werden - die SSE-Route
+(/api/scanner/scan/stream) reicht Funde damit sofort an den Client weiter.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("app")
+
+MAX_CONCURRENCY = 256          # gleichzeitig offene Probe-Sockets (ueber alle Scans)
+RATE_PER_SECOND = 2000.0       # Verbindungsversuche pro Sekunde
+RATE_BURST = 256
+PROBE_CACHE_TTL_S = 15.0
+DNS_TTL_S = 600.0
+DNS_NEGATIVE_TTL_S = 120.0
+DNS_TIMEOUT_S = 1.0
+DNS_WORKERS = 16
+DNS_MAX_ENTRIES = 4096
+
+BAMBU_PORTS = (990, 8883, 322, 6000)
+KLIPPER_PORT = 7125
+PRIORITY_PORTS = (6000, KLIPPER_PORT)
+# Typische Adressen fuer Drucker/Router im Heimnetz - werden beim Sweep zuerst geprueft
+COMMON_HOST_NUMBERS = (1, 2, 10, 20, 30, 40, 41, 42, 50, 100, 110, 120, 150, 200, 250, 254)
+
+
+@dataclass
+class HostResult:
+    ip: str
+    open_ports: Dict[int, float] = field(default_factory=dict)  # port -> Latenz in ms
+    type: Optional[str] = None
+    port: Optional[int] = None
+    hostname: Optional[str] = None
+
+    @property
+    def found(self) -> bool:
+        return self.type is not None
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        if self.port is None:
+            return None
+        return self.open_ports.get(self.port)
+
+
+def probe_ports_for(ports: Sequence[int]) -> List[int]:
+    """Port 80 allein ist meist ein Router - deshalb wird 7125 dann immer mitgeprueft."""
+    result = list(dict.fromkeys(ports))
+    if 80 in result and KLIPPER_PORT not in result:
+        result.append(KLIPPER_PORT)
+    return result
+
+
+def classify(open_ports: Dict[int, float], ports: Sequence[int]) -> Optional[Tuple[str, int]]:
+    """(typ, port) des ersten offenen Ports in Prioritaetsreihenfolge, sonst None."""
+    order = [p for p in PRIORITY_PORTS if p in ports] + [p for p in ports if p not in PRIORITY_PORTS]
+    for port in order:
+        if port not in open_ports:
+            continue
+        if port in BAMBU_PORTS:
+            return "bambu", port
+        if port == KLIPPER_PORT:
+            return "klipper", port
+        if port == 80:
+            if KLIPPER_PORT in open_ports:
+                return "klipper", KLIPPER_PORT
+            # Wahrscheinlich kein Drucker (Router/FritzBox)
+            continue
+        return "unknown", port
+    return None
+
+
+def local_ipv4() -> Optional[str]:
+    """Eigene LAN-Adresse (UDP-connect sendet keine Pakete)."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except Exception:
+        logger.debug("Local IPv4 detection failed", exc_info=True)
+        return None
+
+
+def local_subnet_hosts(local_ip: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """(haeufige Adressen + Nachbarn der eigenen IP, restliche Hosts) des lokalen /24."""
+    local_ip = local_ip or local_ipv4()
+    if not local_ip:
+        return [], []
+    network = ipaddress.ip_network(f"{local_ip}/24", strict=False)
+    base, own_str = local_ip.rsplit(".", 1)
+    own = int(own_str)
+    numbers = list(COMMON_HOST_NUMBERS) + [own + offset for offset in range(-5, 6) if offset]
+    common = [f"{base}.{n}" for n in dict.fromkeys(numbers) if 1 <= n <= 254 and n != own]
+    common_set = set(common)
+    rest = [str(h) for h in network.hosts() if str(h) != local_ip and str(h) not in common_set]
+    return common, rest
+
+
+class _RateLimiter:
+    """Gleichmaessige Verteilung der Verbindungsversuche (Leaky Bucket mit Burst); nur Event-Loop."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        interval = 1.0 / self.rate
+        slot = max(self._next, now - self.burst * interval)
+        self._next = slot + interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ReverseDNSCache:
+    """Async PTR-Lookups mit TTL-Cache und Deduplizierung.
+
+    getnameinfo blockiert - es laeuft in einem eigenen kleinen Executor, damit haengende
+    Resolver weder den Default-Threadpool belegen noch den Scan aufhalten: das Timeout zaehlt
+    ab Einreichen, nicht begonnene Lookups werden danach verworfen.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DNS_TTL_S,
+        negative_ttl: float = DNS_NEGATIVE_TTL_S,
+        timeout: float = DNS_TIMEOUT_S,
+        workers: int = DNS_WORKERS,
+        max_entries: int = DNS_MAX_ENTRIES,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.workers = workers
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+
+    def cached(self, ip: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return True, entry[1]
+        return False, None
+
+    def _store(self, ip: str, hostname: Optional[str]) -> None:
+        ttl = self.ttl if hostname else self.negative_ttl
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[ip] = (time.monotonic() + ttl, hostname)
+
+    def _bind(self) -> ThreadPoolExecutor:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight = {}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rdns")
+        return self._executor
+
+    async def _resolve(self, ip: str, executor: ThreadPoolExecutor) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            host, _port = await asyncio.wait_for(
+                loop.run_in_executor(executor, socket.getnameinfo, (ip, 0), socket.NI_NAMEREQD),
+                self.timeout,
+            )
+            return host if host and host != ip else None
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        except (OSError, UnicodeError):
+            return None
+
+    async def lookup(self, ip: str) -> Optional[str]:
+        hit, hostname = self.cached(ip)
+        if hit:
+            return hostname
+        executor = self._bind()
+        pending = self._inflight.get(ip)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(self._resolve(ip, executor))
+            self._inflight[ip] = pending
+            pending.add_done_callback(lambda future, ip=ip: self._finished(ip, future))
+        # shield: ein abgebrochener Scan beendet den Lookup nicht, das Ergebnis landet trotzdem im Cache
+        return await asyncio.shield(pending)
+
+    def _finished(self, ip: str, future: asyncio.Future) -> None:
+        if self._inflight.get(ip) is future:
+            self._inflight.pop(ip, None)
+        if not future.cancelled() and future.exception() is None:
+            self._store(ip, future.result())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "ttl_s": self.ttl,
+            "negative_ttl_s": self.negative_ttl,
+        }
+
+
+class NetworkScanner:
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        rate_per_second: float = RATE_PER_SECOND,
+        cache_ttl: float = PROBE_CACHE_TTL_S,
+        dns: Optional[ReverseDNSCache] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.cache_ttl = cache_ttl
+        self.dns = dns or ReverseDNSCache()
+        # Semaphore/Limiter gehoeren zu einem Event-Loop (TestClient startet je einen eigenen)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter: Optional[_RateLimiter] = None
+        self._cache: Dict[Tuple[str, int], Tuple[float, Optional[float]]] = {}
+        self.probes = 0
+        self.cache_hits = 0
+        self.open_found = 0
+        self.scans = 0
+        self.active_scans = 0
+        self.last_scan: Optional[Dict[str, Any]] = None
+
+    def _bind(self) -> Tuple[asyncio.Semaphore, _RateLimiter]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None or self._limiter is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._limiter = _RateLimiter(self.rate_per_second, RATE_BURST)
+        return self._semaphore, self._limiter
+
+    async def probe(self, ip: str, port: int, timeout: float, use_cache: bool = True) -> Optional[float]:
+        """TCP-Connect; Latenz in ms wenn offen, sonst None."""
+        key = (ip, port)
+        if use_cache and self.cache_ttl > 0:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.cache_hits += 1
+                return entry[1]
+
+        semaphore, limiter = self._bind()
+        await limiter.acquire()
+        latency: Optional[float] = None
+        async with semaphore:
+            self.probes += 1
+            started = time.perf_counter()
+            try:
+                _reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+            except (asyncio.TimeoutError, OSError):
+                pass
+            except Exception:
+                logger.debug("Probe failed for %s:%s", ip, port, exc_info=True)
+            else:
+                latency = round((time.perf_counter() - started) * 1000, 2)
+                self.open_found += 1
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+
+        if self.cache_ttl > 0:
+            if len(self._cache) > 8192:
+                now = time.monotonic()
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (time.monotonic() + self.cache_ttl, latency)
+        return latency
+
+    async def probe_host(self, ip: str, ports: Sequence[int], timeout: float, use_cache: bool = True) -> Dict[int, float]:
+        results = await asyncio.gather(*(self.probe(ip, port, timeout, use_cache) for port in ports))
+        return {port: latency for port, latency in zip(ports, results) if latency is not None}
+
+    async def scan_host(
+        self, ip: str, ports: Sequence[int], timeout: float, resolve: bool = True, use_cache: bool = True
+    ) -> HostResult:
+        probe_ports = probe_ports_for(ports)
+        result = HostResult(ip=ip, open_ports=await self.probe_host(ip, probe_ports, timeout, use_cache))
+        match = classify(result.open_ports, list(ports))
+        if match:
+            result.type, result.port = match
+            if resolve:
+                result.hostname = await self.dns.lookup(ip)
+        return result
+
+    async def scan(
+        self,
+        hosts: Iterable[str],
+        ports: Sequence[int],
+        timeout: float,
+        resolve: bool = True,
+        use_cache: bool = True,
+    ) -> AsyncIterator[HostResult]:
+        """Alle Hosts scannen; liefert jedes HostResult, sobald der Host fertig ist."""
+        hosts = list(hosts)
+        started = time.perf_counter()
+        self.scans += 1
+        self.active_scans += 1
+        found = 0
+        done = 0
+        tasks = [asyncio.ensure_future(self.scan_host(ip, ports, timeout, resolve, use_cache)) for ip in hosts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.debug("Host scan failed", exc_info=True)
+                    continue
+                done += 1
+                if result.found:
+                    found += 1
+                yield result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            self.active_scans -= 1
+            self.last_scan = {
+                "hosts": len(hosts),
+                "completed": done,
+                "ports": list(ports),
+                "found": found,
+                "timeout_s": timeout,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+    async def scan_all(self, hosts: Iterable[str], ports: Sequence[int], timeout: float, resolve: bool = True) -> List[HostResult]:
+        """Wie scan(), aber gesammelt: nur gefundene Drucker, in der Reihenfolge der Hosts."""
+        hosts = list(hosts)
+        order = {ip: index for index, ip in enumerate(hosts)}
+        found = [result async for result in self.scan(hosts, ports, timeout, resolve) if result.found]
+        found.sort(key=lambda result: order.get(result.ip, 0))
+        return found
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self.dns.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate_per_second,
+            "probe_cache_ttl_s": self.cache_ttl,
+            "probe_cache_entries": len(self._cache),
+            "probes": self.probes,
+            "cache_hits": self.cache_hits,
+            "open_found": self.open_found,
+            "scans": self.scans,
+            "active_scans": self.active_scans,
+            "last_scan": self.last_scan,
+            "reverse_dns": self.dns.status(),
+        }
+
+
+network_scanner = NetworkScanner()
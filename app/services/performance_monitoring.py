@@ -2,13 +2,14 @@
 Performance Monitoring Service
 Tracks API response times and system health metrics
 """
-import time
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 from collections import deque
 from dataclasses import dataclass, field
 
+from app.monitoring.request_metrics import request_metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,6 +72,9 @@ class PerformanceMonitor:
     - Monitor error rates
     - Generate health reports
     - Alert on performance degradation
+
+    Die Daten liegen im gemeinsamen Kern app.monitoring.request_metrics (Route-Templates,
+    Zeit-Ringe); diese Klasse bereitet sie fuer die Monitoring-API auf.
     """
 
     def __init__(self, max_history: int = 1000, alert_threshold_ms: float = 500):
@@ -81,83 +85,44 @@ class PerformanceMonitor:
             max_history: Maximum number of recent requests to keep
             alert_threshold_ms: Threshold for slow request alerts
         """
+        self.metrics = request_metrics
         self.max_history = max_history
         self.alert_threshold_ms = alert_threshold_ms
+        self.metrics.slow_ms = alert_threshold_ms
+        if self.metrics.recent.maxlen != max_history:
+            self.metrics.recent = deque(self.metrics.recent, maxlen=max_history)
 
-        # Recent request history (ring buffer)
-        self.recent_requests: deque = deque(maxlen=max_history)
+    @property
+    def total_requests(self) -> int:
+        return self.metrics.total
 
-        # Per-endpoint statistics
-        self.endpoint_stats: Dict[str, EndpointStats] = {}
+    @property
+    def total_errors(self) -> int:
+        return self.metrics.errors_4xx + self.metrics.errors_5xx
 
-        # Global counters
-        self.total_requests = 0
-        self.total_errors = 0
-        self.start_time = datetime.now()
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.metrics.started_at)
 
     def record_request(
         self,
         endpoint: str,
         method: str,
         duration_ms: float,
-        status_code: int
+        status_code: int,
+        path: Optional[str] = None,
     ):
         """
         Record a completed request
 
         Args:
-            endpoint: API endpoint path
+            endpoint: Route template (e.g. /api/jobs/{job_id})
             method: HTTP method (GET, POST, etc.)
             duration_ms: Request duration in milliseconds
             status_code: HTTP status code
+            path: Concrete request path (defaults to endpoint)
         """
-        now = datetime.now()
-
-        # Create metric
-        metric = RequestMetric(
-            endpoint=endpoint,
-            method=method,
-            duration_ms=duration_ms,
-            status_code=status_code,
-            timestamp=now
-        )
-
-        # Add to history
-        self.recent_requests.append(metric)
-
-        # Update global counters
-        self.total_requests += 1
-        if status_code >= 400:
-            self.total_errors += 1
-
-        # Update endpoint statistics
-        key = f"{method} {endpoint}"
-        if key not in self.endpoint_stats:
-            self.endpoint_stats[key] = EndpointStats(endpoint=key)
-
-        stats = self.endpoint_stats[key]
-        stats.request_count += 1
-        stats.total_duration_ms += duration_ms
-        stats.min_duration_ms = min(stats.min_duration_ms, duration_ms)
-        stats.max_duration_ms = max(stats.max_duration_ms, duration_ms)
-        stats.last_request = now
-
-        if status_code >= 400:
-            stats.error_count += 1
-
-        # Alert on slow requests
-        if duration_ms > self.alert_threshold_ms:
-            logger.warning(
-                f"[PERF-ALERT] Slow request: {method} {endpoint} "
-                f"took {duration_ms:.1f}ms (threshold: {self.alert_threshold_ms}ms)"
-            )
-
-        # Alert on errors
-        if status_code >= 500:
-            logger.error(
-                f"[PERF-ALERT] Server error: {method} {endpoint} "
-                f"returned {status_code}"
-            )
+        self.metrics.record(method, endpoint, path or endpoint, duration_ms, status_code)
 
     def get_endpoint_stats(self, top_n: Optional[int] = None) -> List[EndpointStats]:
         """
@@ -169,13 +134,35 @@ class PerformanceMonitor:
         Returns:
             List of endpoint statistics, sorted by average response time
         """
-        stats = list(self.endpoint_stats.values())
+        stats = [
+            EndpointStats(
+                endpoint=f"{item['method']} {item['route']}",
+                request_count=item["count"],
+                total_duration_ms=item["sum_ms"],
+                min_duration_ms=item["min_ms"],
+                max_duration_ms=item["max_ms"],
+                error_count=item["errors_4xx"] + item["errors_5xx"],
+                last_request=datetime.fromtimestamp(item["last_ts"]) if item["last_ts"] else None,
+            )
+            for item in self.metrics.route_stats()
+        ]
         stats.sort(key=lambda x: x.avg_duration_ms, reverse=True)
 
         if top_n:
             return stats[:top_n]
         return stats
 
+    @staticmethod
+    def _to_metric(item) -> RequestMetric:
+        ts, method, _route, path, duration_ms, status_code = item
+        return RequestMetric(
+            endpoint=path,
+            method=method,
+            duration_ms=duration_ms,
+            status_code=status_code,
+            timestamp=datetime.fromtimestamp(ts),
+        )
+
     def get_recent_requests(
         self,
         minutes: Optional[int] = None,
@@ -191,16 +178,8 @@ class PerformanceMonitor:
         Returns:
             List of recent request metrics
         """
-        requests = list(self.recent_requests)
-
-        if minutes:
-            cutoff = datetime.now() - timedelta(minutes=minutes)
-            requests = [r for r in requests if r.timestamp >= cutoff]
-
-        if limit:
-            requests = requests[-limit:]
-
-        return requests
+        items = self.metrics.recent_requests(seconds=minutes * 60 if minutes else None, limit=limit)
+        return [self._to_metric(item) for item in items]
 
     def get_slow_requests(self, threshold_ms: float = 1000) -> List[RequestMetric]:
         """
@@ -212,10 +191,7 @@ class PerformanceMonitor:
         Returns:
             List of slow requests
         """
-        return [
-            r for r in self.recent_requests
-            if r.duration_ms >= threshold_ms
-        ]
+        return [self._to_metric(item) for item in self.metrics.recent_requests(min_duration_ms=threshold_ms)]
 
     def get_health_report(self) -> Dict:
         """
@@ -227,15 +203,10 @@ class PerformanceMonitor:
         now = datetime.now()
         uptime = now - self.start_time
 
-        # Recent requests (last 5 minutes)
-        recent = self.get_recent_requests(minutes=5)
-
-        # Calculate recent metrics
-        recent_avg = 0.0
-        recent_errors = 0
-        if recent:
-            recent_avg = sum(r.duration_ms for r in recent) / len(recent)
-            recent_errors = sum(1 for r in recent if r.status_code >= 400)
+        # Recent requests (last 5 minutes, aus dem Minuten-Ring)
+        recent = self.metrics.window(300)
+        recent_avg = recent["avg_ms"]
+        recent_errors = recent["errors"]
 
         # Overall error rate
         error_rate = 0.0
@@ -272,7 +243,7 @@ class PerformanceMonitor:
                 "total_requests": self.total_requests,
                 "total_errors": self.total_errors,
                 "error_rate": round(error_rate, 4),
-                "recent_requests_5min": len(recent),
+                "recent_requests_5min": recent["count"],
                 "recent_avg_ms": round(recent_avg, 1),
                 "recent_errors_5min": recent_errors
             },
@@ -293,11 +264,8 @@ class PerformanceMonitor:
 
     def reset_stats(self):
         """Reset all statistics (useful for testing)"""
-        self.recent_requests.clear()
-        self.endpoint_stats.clear()
-        self.total_requests = 0
-        self.total_errors = 0
-        self.start_time = datetime.now()
+        self.metrics.reset()
+        self.metrics.recent = deque(maxlen=self.max_history)
         logger.info("[PERF] Statistics reset")
 
 
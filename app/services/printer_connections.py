@@ -0,0 +1,341 @@
+"""
+Printer Connection Manager
+==========================
+Verbindet Drucker mit ``auto_connect`` parallel statt nacheinander.
+
+``startup_connect_printer`` (TLS-Setup + blockierendes ``client.connect``) läuft in einem
+eigenen, begrenzten Thread-Pool; ein nicht erreichbarer Drucker hält weder den Server-Start
+noch die anderen Drucker auf. Der Lifespan startet den Manager nur - der HTTP-Server ist
+sofort bereit, die Verbindungen laufen im Hintergrund.
+
+Pro Drucker wird eine Phase geführt:
+
+    pending -> connecting -> handshake (TCP/TLS steht, warte auf MQTT CONNACK) -> connected
+                          -> backoff (nächster Versuch nach 10s, 20s, 40s ... max 300s)
+
+Kommt innerhalb von HANDSHAKE_TIMEOUT_S kein CONNACK (z.B. falscher Access-Code), zählt das
+als Fehlschlag; ein Drucker im Backoff wird also nicht alle paar Sekunden erneut verbunden.
+
+Ein Supervisor prüft regelmäßig, ob verbundene Drucker noch verbunden sind, und verbindet
+fällige Drucker erneut (ersetzt die frühere serielle 30s-Auto-Reconnect-Schleife).
+Zustand: ``connection_manager.readiness()`` bzw. ``GET /ready``.
+
+Konfiguration (Umgebung):
+    FILAMENTHUB_CONNECT_WORKERS       parallele Verbindungsversuche (Standard 4)
+    FILAMENTHUB_CONNECT_TIMEOUT_S     Timeout pro Versuch (Standard 20)
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session, select
+
+from app.db.executor import run_in_session
+from app.models.printer import Printer
+
+logger = logging.getLogger("mqtt")
+
+CONNECT_WORKERS = max(1, int(os.environ.get("FILAMENTHUB_CONNECT_WORKERS", "4") or 4))
+CONNECT_TIMEOUT_S = float(os.environ.get("FILAMENTHUB_CONNECT_TIMEOUT_S", "20") or 20)
+SUPERVISE_INTERVAL_S = 2.0
+REFRESH_INTERVAL_S = 30.0
+BACKOFF_BASE_S = 10.0
+BACKOFF_MAX_S = 300.0
+HANDSHAKE_TIMEOUT_S = 15.0
+
+SETTLED_PHASES = ("connected", "backoff", "disabled", "polling")  # handshake/connecting/pending = noch offen
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class PrinterConnectionState:
+    printer_id: str
+    name: str
+    ip_address: Optional[str] = None
+    printer_type: Optional[str] = None
+    phase: str = "pending"  # pending, connecting, handshake, connected, backoff, disabled, polling (Klipper)
+    attempts: int = 0
+    failures: int = 0  # aufeinanderfolgende Fehlschläge (Backoff)
+    last_error: Optional[str] = None
+    last_attempt_at: Optional[str] = None
+    connected_at: Optional[str] = None
+    last_duration_ms: Optional[float] = None
+    next_attempt_in_s: Optional[float] = None
+    _next_attempt: float = 0.0  # time.monotonic()
+    _handshake_since: float = 0.0
+
+    def public(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_next_attempt", None)
+        data.pop("_handshake_since", None)
+        if self.phase == "backoff":
+            data["next_attempt_in_s"] = round(max(0.0, self._next_attempt - time.monotonic()), 1)
+        return data
+
+
+def _load_auto_connect_printers(session: Session) -> List[Printer]:
+    printers = session.exec(select(Printer)).all()
+    return [printer for printer in printers if getattr(printer, "auto_connect", False)]
+
+
+def _is_connected(printer: Printer) -> bool:
+    """Wie die frühere Auto-Reconnect-Schleife: mqtt_clients, dann PrinterService."""
+    from app.routes.mqtt_routes import mqtt_clients
+    from services.printer_service import get_printer_service
+
+    connection_id = f"{printer.ip_address}:8883_{printer.id}"
+    client = mqtt_clients.get(connection_id)
+    if client is not None and client.is_connected():
+        return True
+    if printer.cloud_serial:
+        try:
+            status = get_printer_service().get_status(printer.cloud_serial)
+        except RuntimeError:
+            return False
+        return bool((status or {}).get("connected", False))
+    return False
+
+
+def _handshake_failure(printer: Printer) -> str:
+    """Grund für einen ausbleibenden CONNACK. Access-Code nur, wenn TCP/TLS steht bzw. der
+    Drucker die Anmeldung abgelehnt hat - sonst ist der Drucker schlicht nicht erreichbar."""
+    from app.routes.mqtt_routes import mqtt_clients
+
+    client = mqtt_clients.get(f"{printer.ip_address}:8883_{printer.id}")
+    userdata = client.user_data_get() if client is not None else None
+    rc = userdata.get("connack_rc") if isinstance(userdata, dict) else None
+    if rc not in (None, 0):
+        return f"MQTT-Anmeldung abgelehnt (CONNACK rc={rc}, Access-Code?)"
+    if client is not None and client.socket() is not None:
+        return f"kein MQTT CONNACK nach {HANDSHAKE_TIMEOUT_S:.0f}s trotz TCP/TLS-Verbindung (Access-Code?)"
+    return f"nicht erreichbar: Verbindung verloren, kein MQTT CONNACK nach {HANDSHAKE_TIMEOUT_S:.0f}s"
+
+
+def _connect_blocking(printer: Printer) -> bool:
+    """Läuft im Connect-Pool. Ein alter, nicht verbundener Client wird vorher beendet,
+    sonst liefe dessen Netzwerk-Thread neben dem neuen weiter."""
+    from app.routes.mqtt_routes import mqtt_clients, startup_connect_printer
+
+    connection_id = f"{printer.ip_address}:8883_{printer.id}"
+    stale = mqtt_clients.pop(connection_id, None)
+    if stale is not None:
+        try:
+            stale.loop_stop()
+            stale.disconnect()
+        except Exception:
+            logger.debug("Alter MQTT-Client %s liess sich nicht beenden", connection_id, exc_info=True)
+    return startup_connect_printer(printer)
+
+
+class PrinterConnectionManager:
+    def __init__(self) -> None:
+        self.states: Dict[str, PrinterConnectionState] = {}
+        self._printers: Dict[str, Printer] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.started_at: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def start(self) -> None:
+        """Lädt die auto_connect-Drucker und startet alle Verbindungen parallel (kehrt sofort zurück)."""
+        if self._supervisor is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=CONNECT_WORKERS, thread_name_prefix="printer-connect")
+        self.started_at = _now_iso()
+        await self.refresh_printers()
+        for printer_id in list(self._printers):
+            self._schedule(printer_id)
+        self._supervisor = asyncio.create_task(self._supervise(), name="printer-connection-supervisor")
+        logger.info(
+            "[CONNECT] %d Drucker mit auto_connect, bis zu %d parallel", len(self._printers), CONNECT_WORKERS
+        )
+
+    async def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+        tasks = [task for task in [self._supervisor, *self._inflight.values()] if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._supervisor = None
+        self._inflight.clear()
+        if self._executor is not None:
+            # laufende connect()-Aufrufe nicht abwarten (Timeout der Sockets erledigt den Rest)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Drucker
+    # ------------------------------------------------------------------
+    async def refresh_printers(self) -> None:
+        """Drucker neu aus der DB laden (neue auto_connect-Drucker, entfernte/deaktivierte)."""
+        try:
+            printers = await run_in_session(_load_auto_connect_printers)
+        except Exception as exc:
+            logger.warning(f"[CONNECT] Konnte Drucker nicht laden: {exc}")
+            return
+        current = {str(printer.id): printer for printer in printers}
+        for printer_id, state in self.states.items():
+            if printer_id not in current:
+                state.phase = "disabled"
+        for printer_id, printer in current.items():
+            self._printers[printer_id] = printer
+            state = self.states.get(printer_id)
+            if state is None or state.phase == "disabled":
+                state = self.states[printer_id] = PrinterConnectionState(
+                    printer_id=printer_id,
+                    name=printer.name,
+                    ip_address=printer.ip_address,
+                    printer_type=getattr(printer, "printer_type", None),
+                )
+                # Klipper-Drucker verwenden HTTP-Polling (klipper_polling_service) - kein MQTT
+                if state.printer_type == "klipper":
+                    state.phase = "polling"
+            else:
+                state.name, state.ip_address = printer.name, printer.ip_address
+        for printer_id in list(self._printers):
+            if printer_id not in current:
+                self._printers.pop(printer_id, None)
+
+    def _schedule(self, printer_id: str) -> None:
+        if printer_id in self._inflight:
+            return
+        printer = self._printers.get(printer_id)
+        state = self.states.get(printer_id)
+        if printer is None or state is None or state.phase in ("disabled", "polling"):
+            return
+        task = asyncio.create_task(self._connect(printer, state), name=f"printer-connect-{printer_id[:8]}")
+        self._inflight[printer_id] = task
+        task.add_done_callback(lambda _t, pid=printer_id: self._inflight.pop(pid, None))
+
+    async def _connect(self, printer: Printer, state: PrinterConnectionState) -> None:
+        from app.main import is_app_shutting_down
+
+        if is_app_shutting_down():
+            return
+        state.phase = "connecting"
+        state.attempts += 1
+        state.last_attempt_at = _now_iso()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            ok = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, _connect_blocking, printer), timeout=CONNECT_TIMEOUT_S
+            )
+            error = None if ok else "connect fehlgeschlagen (siehe mqtt.log)"
+        except asyncio.TimeoutError:
+            ok, error = False, f"Timeout nach {CONNECT_TIMEOUT_S:.0f}s"
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            ok, error = False, str(exc)
+        state.last_duration_ms = round((time.perf_counter() - started) * 1000.0, 1)
+
+        if ok:
+            # connect() kehrt nach TCP/TLS zurück; "connected" erst mit CONNACK (Supervisor)
+            state.phase = "handshake"
+            state._handshake_since = time.monotonic()
+            self._check_handshake(printer, state)
+        else:
+            self._backoff(state, error)
+            logger.info(
+                f"[CONNECT] [FAIL] {printer.name}: {error} - nächster Versuch in {state.next_attempt_in_s:.0f}s"
+            )
+
+    def _check_handshake(self, printer: Printer, state: PrinterConnectionState) -> None:
+        if _is_connected(printer):
+            state.phase = "connected"
+            state.failures = 0
+            state.last_error = None
+            state.connected_at = _now_iso()
+            logger.info(f"[CONNECT] [OK] {printer.name} verbunden ({state.last_duration_ms:.0f} ms)")
+        elif time.monotonic() - state._handshake_since > HANDSHAKE_TIMEOUT_S:
+            self._backoff(state, _handshake_failure(printer))
+            logger.info(f"[CONNECT] [FAIL] {printer.name}: {state.last_error}")
+
+    @staticmethod
+    def _backoff(state: PrinterConnectionState, error: Optional[str]) -> None:
+        state.failures += 1
+        delay = min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** (state.failures - 1)))
+        delay *= random.uniform(0.8, 1.2)  # Drucker nach Stromausfall nicht im Gleichschritt
+        state.phase = "backoff"
+        state.last_error = error
+        state.next_attempt_in_s = round(delay, 1)
+        state._next_attempt = time.monotonic() + delay
+
+    async def _supervise(self) -> None:
+        """Getrennte Drucker erkennen und fällige Drucker (Backoff abgelaufen) erneut verbinden."""
+        assert self._stopping is not None
+        last_refresh = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=SUPERVISE_INTERVAL_S)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if time.monotonic() - last_refresh >= REFRESH_INTERVAL_S:
+                    # neue/geänderte auto_connect-Drucker übernehmen
+                    last_refresh = time.monotonic()
+                    await self.refresh_printers()
+                now = time.monotonic()
+                for printer_id, state in self.states.items():
+                    if printer_id in self._inflight or state.phase in ("disabled", "polling", "connecting"):
+                        continue
+                    printer = self._printers.get(printer_id)
+                    if printer is None:
+                        continue
+                    if state.phase == "handshake":
+                        self._check_handshake(printer, state)
+                        continue
+                    if state.phase == "connected":
+                        if _is_connected(printer):
+                            continue
+                        logger.info(f"[CONNECT] {printer.name} getrennt - verbinde neu")
+                        state.phase = "pending"
+                    elif state.phase == "backoff":
+                        if _is_connected(printer):
+                            # Paho-Reconnect des alten Clients oder manuell über /api/mqtt/connect
+                            state.phase, state.failures, state.last_error = "connected", 0, None
+                            continue
+                        if state._next_attempt > now:
+                            continue
+                    self._schedule(printer_id)
+            except Exception:
+                logger.exception("[CONNECT] Supervisor-Fehler")
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+    def readiness(self) -> Dict[str, Any]:
+        states = [state.public() for state in self.states.values()]
+        phases: Dict[str, int] = {}
+        for state in states:
+            phases[state["phase"]] = phases.get(state["phase"], 0) + 1
+        return {
+            "status": "ready",
+            "server": "running",
+            "started_at": self.started_at,
+            "printers_settled": all(state["phase"] in SETTLED_PHASES for state in states),
+            "phases": phases,
+            "workers": CONNECT_WORKERS,
+            "printers": states,
+        }
+
+
+connection_manager = PrinterConnectionManager()
@@ -0,0 +1,570 @@
+"""Passive Drucker-Discovery: SSDP (Bambu Lab) und mDNS (Moonraker ``_moonraker._tcp``).
+
+Bambu-Drucker melden sich per SSDP-NOTIFY (UDP 1990/2021, Multicast 239.255.255.250 bzw.
+Broadcast) mit Seriennummer, Modellcode und Namen; Moonraker kuendigt sich per mDNS an
+(224.0.0.251:5353). Der Dienst hoert im Hintergrund auf beide und fuehrt ein Inventar mit TTL
+(IP, Seriennummer, Modell, zuletzt gesehen) - die Scanner-Endpunkte liefern daraus sofort,
+aktives TCP-Probing (app.services.network_scanner) ist nur noch der Fallback auf Anforderung.
+
+Zusaetzlich zum reinen Zuhoeren geht beim Start und danach alle ``query_interval_s`` je eine
+kleine Anfrage raus (SSDP M-SEARCH, mDNS PTR-Query), damit bereits laufende Drucker nicht erst
+bei ihrer naechsten Ankuendigung auftauchen.
+
+Konfiguration: ``discovery:`` in config.yaml; ``FILAMENTHUB_DISCOVERY=0`` schaltet den Dienst ab.
+Test-Harness mit gefaelschten Ankuendigungen ueber Loopback: benchmarks/discovery_announce.py
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from app.services.printer_auto_detector import PrinterAutoDetector
+
+logger = logging.getLogger("app")
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+SSDP_GROUP = "239.255.255.250"
+SSDP_PORTS = (1990, 2021)
+BAMBU_SEARCH_TARGET = "urn:bambulab-com:device:3dprinter:1"
+MDNS_GROUP = "224.0.0.251"
+MDNS_PORT = 5353
+MOONRAKER_SERVICE = "_moonraker._tcp.local"
+DEFAULT_TTL_S = 600.0
+QUERY_INTERVAL_S = 300.0
+MAX_DEVICES = 512
+
+BAMBU_MQTT_PORT = 8883
+MOONRAKER_PORT = 7125
+
+# DevModel.bambu.com -> Modellname (wie PrinterAutoDetector)
+BAMBU_MODEL_CODES = {
+    "BL-P001": "X1C",
+    "BL-P002": "X1",
+    "C13": "X1E",
+    "C11": "P1P",
+    "C12": "P1S",
+    "N1": "A1MINI",
+    "N2S": "A1",
+    "O1D": "H2D",
+}
+
+_DNS_PTR = 12
+_DNS_TXT = 16
+_DNS_A = 1
+_DNS_SRV = 33
+
+
+@dataclass
+class DiscoveredDevice:
+    kind: str  # bambu | klipper
+    ip: str
+    port: int
+    source: str  # ssdp | mdns | probe
+    serial: Optional[str] = None
+    model: Optional[str] = None
+    name: Optional[str] = None
+    details: Dict[str, str] = field(default_factory=dict)
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    expires_at: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.serial or self.name or self.ip}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "ip": self.ip,
+            "port": self.port,
+            "serial": self.serial,
+            "model": self.model,
+            "name": self.name,
+            "source": self.source,
+            "details": dict(self.details),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "expires_in_s": max(0, round(self.expires_at - time.time())),
+        }
+
+
+# -----------------------------
+# SSDP
+# -----------------------------
+def _ipv4_or_none(value: str) -> Optional[str]:
+    value = (value or "").strip()
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    value = value.split("/", 1)[0].split(":", 1)[0]
+    try:
+        return str(ipaddress.IPv4Address(value))
+    except ValueError:
+        return None
+
+
+def parse_ssdp(data: bytes, source_ip: str) -> Optional[Tuple[DiscoveredDevice, float]]:
+    """Bambu-NOTIFY bzw. Antwort auf M-SEARCH -> (Geraet, TTL); TTL 0 = ssdp:byebye."""
+    text = data.decode("utf-8", "replace")
+    lines = text.replace("\r\n", "\n").split("\n")
+    start = lines[0].strip().upper()
+    if not (start.startswith("NOTIFY") or start.startswith("HTTP/1.1 200")):
+        return None
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    target = headers.get("nt") or headers.get("st") or ""
+    if "bambulab" not in target.lower() and "devmodel.bambu.com" not in headers:
+        return None
+
+    ip = _ipv4_or_none(headers.get("location", "")) or source_ip
+    serial = headers.get("usn", "").split("::", 1)[0].replace("uuid:", "").strip() or None
+    model_code = headers.get("devmodel.bambu.com")
+    model = (
+        BAMBU_MODEL_CODES.get(model_code or "")
+        or PrinterAutoDetector.detect_model_from_serial(serial)
+        or model_code
+    )
+    ttl = DEFAULT_TTL_S
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "max-age":
+            try:
+                ttl = float(value)
+            except ValueError:
+                pass
+    if headers.get("nts", "").lower() == "ssdp:byebye":
+        ttl = 0.0
+
+    details = {}
+    for header, label in (
+        ("devversion.bambu.com", "firmware"),
+        ("devconnect.bambu.com", "connect"),
+        ("devbind.bambu.com", "bind"),
+        ("devseclink.bambu.com", "seclink"),
+    ):
+        if headers.get(header):
+            details[label] = headers[header]
+    device = DiscoveredDevice(
+        kind="bambu",
+        ip=ip,
+        port=BAMBU_MQTT_PORT,
+        source="ssdp",
+        serial=serial,
+        model=model,
+        name=headers.get("devname.bambu.com") or None,
+        details=details,
+    )
+    return device, ttl
+
+
+def build_ssdp_search() -> bytes:
+    return (
+        "M-SEARCH * HTTP/1.1\r\n"
+        f"HOST: {SSDP_GROUP}:{SSDP_PORTS[0]}\r\n"
+        'MAN: "ssdp:discover"\r\n'
+        "MX: 2\r\n"
+        f"ST: {BAMBU_SEARCH_TARGET}\r\n\r\n"
+    ).encode("ascii")
+
+
+# -----------------------------
+# mDNS (minimaler DNS-Parser: PTR/SRV/TXT/A)
+# -----------------------------
+@dataclass
+class _Record:
+    name: str
+    rtype: int
+    ttl: int
+    value: Any
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    labels: List[str] = []
+    end: Optional[int] = None
+    for _hop in range(64):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return ".".join(labels), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode("utf-8", "replace"))
+        offset += length
+    raise ValueError("DNS name compression loop")
+
+
+def _parse_txt(raw: bytes) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    offset = 0
+    while offset < len(raw):
+        length = raw[offset]
+        entry = raw[offset + 1:offset + 1 + length].decode("utf-8", "replace")
+        offset += 1 + length
+        if entry:
+            key, _, value = entry.partition("=")
+            values[key.lower()] = value
+    return values
+
+
+def parse_dns_records(data: bytes) -> List[_Record]:
+    """Alle PTR/SRV/TXT/A-Records einer mDNS-Antwort; Anfragen werden ignoriert."""
+    if len(data) < 12:
+        return []
+    _ident, flags, questions, answers, authority, additional = struct.unpack("!6H", data[:12])
+    if not flags & 0x8000:
+        return []
+    offset = 12
+    for _ in range(questions):
+        _name, offset = _read_name(data, offset)
+        offset += 4
+    records: List[_Record] = []
+    for _ in range(answers + authority + additional):
+        name, offset = _read_name(data, offset)
+        rtype, _rclass, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = offset
+        offset += rdlength
+        if rtype == _DNS_PTR:
+            value: Any = _read_name(data, rdata)[0]
+        elif rtype == _DNS_SRV:
+            _priority, _weight, port = struct.unpack("!HHH", data[rdata:rdata + 6])
+            value = (port, _read_name(data, rdata + 6)[0])
+        elif rtype == _DNS_A and rdlength == 4:
+            value = socket.inet_ntoa(data[rdata:rdata + 4])
+        elif rtype == _DNS_TXT:
+            value = _parse_txt(data[rdata:rdata + rdlength])
+        else:
+            continue
+        records.append(_Record(name, rtype, ttl, value))
+    return records
+
+
+def parse_mdns(data: bytes, source_ip: str, service: str = MOONRAKER_SERVICE) -> List[Tuple[DiscoveredDevice, float]]:
+    """Moonraker-Instanzen einer mDNS-Antwort -> [(Geraet, TTL)]; TTL 0 = Goodbye."""
+    records = parse_dns_records(data)
+    if not records:
+        return []
+    service = service.lower()
+    suffix = "." + service
+    instances: Dict[str, int] = {}
+    srv: Dict[str, _Record] = {}
+    txt: Dict[str, Dict[str, str]] = {}
+    addresses: Dict[str, str] = {}
+    for record in records:
+        lname = record.name.lower()
+        if record.rtype == _DNS_PTR and lname == service:
+            instances[record.value] = record.ttl
+        elif record.rtype == _DNS_SRV and lname.endswith(suffix):
+            srv[lname] = record
+            instances.setdefault(record.name, record.ttl)
+        elif record.rtype == _DNS_TXT and lname.endswith(suffix):
+            txt[lname] = record.value
+        elif record.rtype == _DNS_A:
+            addresses[lname] = record.value
+
+    devices: List[Tuple[DiscoveredDevice, float]] = []
+    for instance, ttl in instances.items():
+        lname = instance.lower()
+        srv_record = srv.get(lname)
+        port, target = srv_record.value if srv_record else (MOONRAKER_PORT, "")
+        ip = addresses.get(target.lower()) or source_ip
+        name = instance[: -len(suffix)] if lname.endswith(suffix) else instance
+        device = DiscoveredDevice(
+            kind="klipper",
+            ip=ip,
+            port=port,
+            source="mdns",
+            name=name,
+            details={k: v for k, v in txt.get(lname, {}).items() if v},
+        )
+        if target:
+            device.details.setdefault("host", target.rstrip("."))
+        devices.append((device, float(ttl)))
+    return devices
+
+
+def encode_dns_name(name: str) -> bytes:
+    out = b""
+    for label in name.strip(".").split("."):
+        raw = label.encode("utf-8")
+        out += bytes([len(raw)]) + raw
+    return out + b"\x00"
+
+
+def build_mdns_query(service: str = MOONRAKER_SERVICE) -> bytes:
+    return struct.pack("!6H", 0, 0, 1, 0, 0, 0) + encode_dns_name(service) + struct.pack("!HH", _DNS_PTR, 1)
+
+
+# -----------------------------
+# Inventar
+# -----------------------------
+class DiscoveryInventory:
+    def __init__(self, max_devices: int = MAX_DEVICES) -> None:
+        self.max_devices = max_devices
+        self._devices: Dict[str, DiscoveredDevice] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, device: DiscoveredDevice, ttl: float) -> Optional[DiscoveredDevice]:
+        now = time.time()
+        with self._lock:
+            if ttl <= 0:
+                self._devices.pop(device.key, None)
+                return None
+            same_ip = [d for d in self._devices.values() if d.kind == device.kind and d.ip == device.ip]
+            first_seen = min((d.first_seen for d in same_ip), default=now)
+            if device.source == "probe":
+                # Passive Meldungen (Seriennummer, Modell) haben Vorrang vor einem Probe-Treffer
+                passive = next((d for d in same_ip if d.source != "probe"), None)
+                if passive is not None:
+                    passive.last_seen = now
+                    passive.expires_at = max(passive.expires_at, now + ttl)
+                    return passive
+            else:
+                for stale in same_ip:
+                    if stale.source == "probe":
+                        self._devices.pop(stale.key, None)
+            existing = self._devices.get(device.key)
+            if existing is not None:
+                device.serial = device.serial or existing.serial
+                device.model = device.model or existing.model
+                device.name = device.name or existing.name
+                first_seen = min(first_seen, existing.first_seen)
+            elif len(self._devices) >= self.max_devices:
+                self._prune(now)
+                if len(self._devices) >= self.max_devices:
+                    oldest = min(self._devices.values(), key=lambda d: d.last_seen)
+                    self._devices.pop(oldest.key, None)
+            device.first_seen = first_seen
+            device.last_seen = now
+            device.expires_at = now + ttl
+            self._devices[device.key] = device
+            return device
+
+    def _prune(self, now: float) -> None:
+        expired = [key for key, device in self._devices.items() if device.expires_at <= now]
+        for key in expired:
+            self._devices.pop(key, None)
+
+    def devices(self, kind: Optional[str] = None) -> List[DiscoveredDevice]:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            result = [d for d in self._devices.values() if kind is None or d.kind == kind]
+        result.sort(key=lambda d: (d.kind, tuple(int(p) for p in d.ip.split(".")) if d.ip.count(".") == 3 else (0,)))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._devices.clear()
+
+    def __len__(self) -> int:
+        return len(self.devices())
+
+
+# -----------------------------
+# Listener
+# -----------------------------
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, service: "PrinterDiscovery", kind: str) -> None:
+        self.service = service
+        self.kind = kind
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.service.handle_datagram(self.kind, data, addr[0])
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug("Discovery socket error (%s): %s", self.kind, exc)
+
+
+def _multicast_socket(port: int, group: Optional[str], interface: str = "0.0.0.0") -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        except OSError:
+            pass
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sock.bind(("", port))
+    if group:
+        try:
+            membership = socket.inet_aton(group) + socket.inet_aton(interface)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        except OSError as exc:
+            # Ohne Multicast-Route (Container, Loopback) bleiben Unicast/Broadcast nutzbar
+            logger.debug("Multicast join %s:%s failed: %s", group, port, exc)
+    sock.setblocking(False)
+    return sock
+
+
+class PrinterDiscovery:
+    def __init__(
+        self,
+        ssdp_ports: Tuple[int, ...] = SSDP_PORTS,
+        mdns_port: Optional[int] = MDNS_PORT,
+        query_interval_s: float = QUERY_INTERVAL_S,
+        interface: str = "0.0.0.0",
+    ) -> None:
+        self.ssdp_ports = tuple(ssdp_ports)
+        self.mdns_port = mdns_port
+        self.query_interval_s = query_interval_s
+        self.interface = interface
+        self.inventory = DiscoveryInventory()
+        self._transports: List[Tuple[str, int, asyncio.DatagramTransport]] = []
+        self._query_task: Optional[asyncio.Task] = None
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.listen_errors: Dict[str, str] = {}
+        self.packets: Dict[str, int] = {"ssdp": 0, "mdns": 0}
+        self.announcements: Dict[str, int] = {"ssdp": 0, "mdns": 0}
+        self.parse_errors = 0
+        self.queries_sent = 0
+
+    def configure(self, cfg: Dict[str, Any]) -> None:
+        ports = cfg.get("ssdp_ports")
+        if isinstance(ports, list) and ports:
+            self.ssdp_ports = tuple(int(p) for p in ports)
+        if "mdns" in cfg and not cfg.get("mdns"):
+            self.mdns_port = None
+        if cfg.get("query_interval_s") is not None:
+            self.query_interval_s = float(cfg["query_interval_s"])
+        if cfg.get("interface"):
+            self.interface = str(cfg["interface"])
+
+    # -- Empfang --------------------------------------------------------
+    def handle_datagram(self, kind: str, data: bytes, source_ip: str) -> None:
+        self.packets[kind] = self.packets.get(kind, 0) + 1
+        try:
+            if kind == "ssdp":
+                parsed = parse_ssdp(data, source_ip)
+                found = [parsed] if parsed else []
+            else:
+                found = parse_mdns(data, source_ip)
+        except Exception:
+            self.parse_errors += 1
+            logger.debug("Discovery packet from %s not parseable (%s)", source_ip, kind, exc_info=True)
+            return
+        for device, ttl in found:
+            self.announcements[kind] = self.announcements.get(kind, 0) + 1
+            stored = self.inventory.upsert(device, ttl)
+            if stored is not None and stored.first_seen == stored.last_seen and stored.source == kind:
+                logger.info(
+                    "[DISCOVERY] %s gefunden: %s (%s, %s)",
+                    device.kind, device.ip, device.name or device.serial or "-", device.model or "-",
+                )
+
+    def record_probe(self, kind: str, ip: str, port: int, ttl: float = DEFAULT_TTL_S) -> None:
+        """Treffer des aktiven Scans ins Inventar uebernehmen (passive Daten haben Vorrang)."""
+        self.inventory.upsert(DiscoveredDevice(kind=kind, ip=ip, port=port, source="probe"), ttl)
+
+    # -- Lebenszyklus ---------------------------------------------------
+    async def start(self) -> None:
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        listeners: List[Tuple[str, int, Optional[str]]] = [("ssdp", port, SSDP_GROUP) for port in self.ssdp_ports]
+        if self.mdns_port:
+            listeners.append(("mdns", self.mdns_port, MDNS_GROUP))
+        for kind, port, group in listeners:
+            try:
+                sock = _multicast_socket(port, group, self.interface)
+                transport, _protocol = await loop.create_datagram_endpoint(lambda kind=kind: _Protocol(self, kind), sock=sock)
+                self._transports.append((kind, port, transport))
+            except OSError as exc:
+                self.listen_errors[f"{kind}:{port}"] = str(exc)
+                logger.warning("[DISCOVERY] UDP %s (%s) nicht verfuegbar: %s", port, kind, exc)
+        self.running = bool(self._transports)
+        self.started_at = time.time()
+        if self.running and self.query_interval_s > 0:
+            self._query_task = asyncio.create_task(self._query_loop())
+
+    async def stop(self) -> None:
+        if self._query_task is not None:
+            self._query_task.cancel()
+            try:
+                await self._query_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._query_task = None
+        for _kind, _port, transport in self._transports:
+            try:
+                transport.close()
+            except Exception:
+                pass
+        self._transports = []
+        self.running = False
+
+    def send_queries(self) -> None:
+        """Einmalig M-SEARCH (SSDP) und PTR-Query (mDNS) ueber die Listener-Sockets senden."""
+        for kind, port, transport in self._transports:
+            try:
+                if kind == "ssdp" and port == self.ssdp_ports[0]:
+                    transport.sendto(build_ssdp_search(), (SSDP_GROUP, port))
+                    self.queries_sent += 1
+                elif kind == "mdns":
+                    transport.sendto(build_mdns_query(), (MDNS_GROUP, port))
+                    self.queries_sent += 1
+            except OSError as exc:
+                logger.debug("Discovery query (%s) failed: %s", kind, exc)
+
+    async def _query_loop(self) -> None:
+        while True:
+            self.send_queries()
+            await asyncio.sleep(self.query_interval_s)
+
+    def devices(self, kind: Optional[str] = None) -> List[DiscoveredDevice]:
+        return self.inventory.devices(kind)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "listeners": [{"kind": kind, "port": port} for kind, port, _t in self._transports],
+            "listen_errors": dict(self.listen_errors),
+            "query_interval_s": self.query_interval_s,
+            "queries_sent": self.queries_sent,
+            "packets": dict(self.packets),
+            "announcements": dict(self.announcements),
+            "parse_errors": self.parse_errors,
+            "devices": len(self.inventory),
+        }
+
+
+def load_discovery_config() -> Dict[str, Any]:
+    try:
+        with open(_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return config.get("discovery") or {}
+    except Exception:
+        logger.debug("discovery config not available; using defaults", exc_info=True)
+        return {}
+
+
+async def start_from_config() -> None:
+    """Beim App-Start (im Loop): Listener gemaess config.yaml starten."""
+    cfg = load_discovery_config()
+    env = os.environ.get("FILAMENTHUB_DISCOVERY", "").lower()
+    if env in ("0", "false", "no", "off") or (not cfg.get("enabled", True) and env not in ("1", "true", "yes", "on")):
+        return
+    printer_discovery.configure(cfg)
+    await printer_discovery.start()
+
+
+printer_discovery = PrinterDiscovery()
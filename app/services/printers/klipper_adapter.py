@@ -1,7 +1,8 @@
 import logging
-import requests
 from typing import Optional
 
+from app.services.http_clients import http_clients
+
 log = logging.getLogger(__name__)
 
 
@@ -32,7 +33,9 @@ class KlipperAdapter:
     def _get(self, path: str, params: dict | None = None) -> dict:
         url = f"{self.base_url}{path}"
         try:
-            r = requests.get(
+            r = http_clients.request_sync(
+                "moonraker",
+                "GET",
                 url,
                 headers=self._headers(),
                 params=params,
@@ -0,0 +1,182 @@
+"""Ausgehandelte Antwort-Kompression (brotli/gzip) fuer API-Antworten ab einer Mindestgroesse.
+
+Reine ASGI-Middleware (kein BaseHTTPMiddleware: kein zusaetzlicher Task pro Request):
+
+- nur HTTP; WebSockets laufen unveraendert durch
+- nur Antworten, die in einem Stueck kommen (JSON/HTML der Routen). Gestreamte Antworten -
+  SSE (text/event-stream), Datei-Downloads, StreamingResponse - werden nie gepuffert
+- nur komprimierbare Content-Types, ab ``MIN_SIZE`` Bytes, ohne bestehendes Content-Encoding
+  (Static-Assets bringen ihre vorkomprimierte Variante selbst mit, siehe static_assets)
+- brotli bevorzugt, falls installiert und vom Client akzeptiert, sonst gzip
+- grosse Bodies werden im Threadpool komprimiert, damit der Event-Loop frei bleibt
+
+Jede Antwort wird mit Roh- und uebertragener Groesse in app.monitoring.payload_metrics erfasst.
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+from typing import Any, Awaitable, Callable, Dict, MutableMapping, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.monitoring.payload_metrics import payload_metrics
+from app.monitoring.request_metrics import route_key_from_scope
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optionale Abhaengigkeit
+    brotli = None
+
+logger = logging.getLogger("app")
+
+MIN_SIZE = 1024
+OFFLOAD_SIZE = 256 * 1024  # ab hier im Threadpool komprimieren
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "application/javascript",
+    "text/javascript",
+    "image/svg+xml",
+    "application/xml",
+    "text/xml",
+)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    tokens: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 1.0
+        if name:
+            tokens[name] = quality
+    if brotli is not None and tokens.get("br", 0) > 0:
+        return "br"
+    if tokens.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers
+
+
+class CompressionMiddleware:
+    def __init__(self, app: Callable[..., Awaitable[None]], minimum_size: int = MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = None if "range" in request_headers else choose_encoding(request_headers.get("accept-encoding", ""))
+        start_message: Optional[Message] = None
+        passthrough = False
+        raw_size = 0
+        sent_size = 0
+        used_encoding: Optional[str] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough, raw_size, sent_size, used_encoding
+            if passthrough:
+                if message["type"] == "http.response.body":
+                    size = len(message.get("body", b""))
+                    raw_size += size
+                    sent_size += size
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = Headers(raw=start_message["headers"])
+            if message.get("more_body", False):
+                # gestreamt (SSE, Dateien): unveraendert weiterreichen
+                passthrough = True
+                await send(start_message)
+                raw_size += len(body)
+                sent_size += len(body)
+                await send(message)
+                return
+
+            raw_size = len(body)
+            existing = headers.get("content-encoding")
+            if (
+                encoding is None
+                or raw_size < self.minimum_size
+                or not _compressible(headers)
+                or start_message["status"] in (204, 206, 304)
+            ):
+                used_encoding = existing
+                sent_size = raw_size
+                await send(start_message)
+                await send(message)
+                return
+
+            try:
+                if raw_size >= OFFLOAD_SIZE:
+                    compressed = await run_in_threadpool(compress, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+            except Exception:
+                logger.debug("Response compression failed", exc_info=True)
+                compressed = body
+            if len(compressed) >= raw_size:
+                sent_size = raw_size
+                await send(start_message)
+                await send(message)
+                return
+
+            mutable = MutableHeaders(raw=start_message["headers"])
+            mutable["Content-Encoding"] = encoding
+            mutable["Content-Length"] = str(len(compressed))
+            mutable.add_vary_header("Accept-Encoding")
+            etag = mutable.get("etag")
+            if etag and not etag.startswith("W/"):
+                mutable["ETag"] = "W/" + etag
+            start_message["headers"] = mutable.raw
+            used_encoding = encoding
+            sent_size = len(compressed)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if start_message is not None or passthrough:
+                try:
+                    payload_metrics.record_transfer(route_key_from_scope(scope), raw_size, sent_size, used_encoding)
+                except Exception:
+                    logger.debug("Payload metrics failed", exc_info=True)
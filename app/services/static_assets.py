@@ -0,0 +1,363 @@
+"""Statische Assets mit Content-Hash im Dateinamen, Langzeit-Caching und vorkomprimierten Varianten.
+
+- Templates erzeugen ueber ``url_for('frontend_static', path='js/navbar.js')`` bzw.
+  ``asset('/static/logs.js')`` URLs mit Content-Hash: ``/frontend/js/navbar.3f9c2a1b7e.js``.
+- ``AssetStaticFiles`` liefert gehashte URLs mit ``Cache-Control: public, max-age=31536000,
+  immutable`` aus - der Browser fragt bis zur naechsten Aenderung nicht mehr nach. Aendert sich
+  die Datei, aendert sich der Hash und damit die URL.
+- Alte, ungehashte Pfade funktionieren weiter; sie werden mit ``no-cache`` ausgeliefert, also
+  per ETag/Last-Modified revalidiert (304 statt erneutem Download).
+- gzip/brotli: vorkomprimierte Dateien (``datei.js.gz`` / ``datei.js.br``, erzeugt mit
+  ``python -m app.services.static_assets --precompress``, z.B. im Docker-Build) werden bevorzugt;
+  sonst wird einmal pro Inhalt komprimiert und im Speicher gehalten. brotli nur, wenn das
+  Paket ``brotli`` installiert ist.
+
+Der Manifest-Eintrag einer Datei wird ueber mtime/Groesse validiert; im Entwicklungsbetrieb
+(reload) fuehrt eine geaenderte Datei also sofort zu einem neuen Hash.
+"""
+from __future__ import annotations
+
+import argparse
+import email.utils
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optionale Abhaengigkeit
+    brotli = None
+
+logger = logging.getLogger("app")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mount-Name -> (URL-Praefix, Verzeichnis); muss zu den app.mount()-Aufrufen in app.main passen
+MOUNTS: Dict[str, Tuple[str, str]] = {
+    "static": ("/static", os.path.join(BASE_DIR, "app", "static")),
+    "frontend_static": ("/frontend", os.path.join(BASE_DIR, "frontend", "static")),
+}
+
+HASH_LEN = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = (".js", ".mjs", ".css", ".svg", ".html", ".json", ".map", ".txt", ".xml")
+MIN_COMPRESS_BYTES = 1024
+MEMORY_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+_HASHED = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % HASH_LEN)
+
+
+@dataclass(frozen=True)
+class AssetEntry:
+    path: str  # absoluter Dateipfad
+    digest: str
+    size: int
+    mtime: float
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """'js/navbar.js' -> 'js/navbar.<digest>.js'; Dateien ohne Endung bleiben unveraendert."""
+    head, tail = os.path.split(path)
+    stem, ext = os.path.splitext(tail)
+    if not stem or not ext:
+        return path
+    name = f"{stem}.{digest}{ext}"
+    return f"{head}/{name}" if head else name
+
+
+def split_hashed(path: str) -> Tuple[str, Optional[str]]:
+    """'js/navbar.3f9c2a1b7e.js' -> ('js/navbar.js', '3f9c2a1b7e'); sonst (path, None)."""
+    match = _HASHED.match(path)
+    if not match:
+        return path, None
+    return f"{match.group('stem')}{match.group('ext')}", match.group("hash")
+
+
+class AssetManifest:
+    """Content-Hashes pro Datei (lazy, ueber mtime/Groesse invalidiert) + Speicher-Cache der Kompressate."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, AssetEntry] = {}
+        self._compressed: Dict[Tuple[str, str, str], bytes] = {}
+        self._compressed_bytes = 0
+        self.stats: Dict[str, int] = {"hashed": 0, "compressed": 0, "precompressed_hits": 0, "memory_hits": 0}
+
+    # --- Hashes ---
+    def entry(self, directory: str, path: str) -> Optional[AssetEntry]:
+        """Eintrag fuer ``path`` relativ zu ``directory`` (None, wenn keine Datei oder ausserhalb)."""
+        root = os.path.realpath(directory)
+        full = os.path.realpath(os.path.join(root, path.lstrip("/")))
+        if os.path.commonpath([root, full]) != root:
+            return None
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        if not os.path.isfile(full):
+            return None
+        cached = self._entries.get(full)
+        if cached is not None and cached.mtime == st.st_mtime and cached.size == st.st_size:
+            return cached
+        digest = hashlib.sha256()
+        with open(full, "rb") as handle:
+            for chunk in iter(lambda: handle.read(65536), b""):
+                digest.update(chunk)
+        entry = AssetEntry(full, digest.hexdigest()[:HASH_LEN], st.st_size, st.st_mtime)
+        with self._lock:
+            self._entries[full] = entry
+            self.stats["hashed"] += 1
+        return entry
+
+    def url_path(self, mount: str, path: str) -> str:
+        """Pfad innerhalb des Mounts mit Hash; unbekannte Dateien bleiben unveraendert."""
+        spec = MOUNTS.get(mount)
+        if spec is None:
+            return path
+        clean = path.split("?", 1)[0]
+        try:
+            entry = self.entry(spec[1], clean)
+        except OSError:
+            entry = None
+        return hashed_name(clean.lstrip("/"), entry.digest) if entry else path
+
+    def url(self, url: str) -> str:
+        """'/static/logs.js' -> '/static/logs.<hash>.js' (fuer Templates mit festen Pfaden)."""
+        for mount, (prefix, _directory) in MOUNTS.items():
+            if url.startswith(prefix + "/"):
+                return prefix + "/" + self.url_path(mount, url[len(prefix) + 1:])
+        return url
+
+    def warm(self) -> int:
+        """Alle Dateien einmal hashen (Startup), damit der erste Seitenaufruf nichts lesen muss."""
+        count = 0
+        for _mount, (_prefix, directory) in MOUNTS.items():
+            for dirpath, _dirs, files in os.walk(directory):
+                for name in files:
+                    if name.endswith((".gz", ".br")):
+                        continue
+                    if self.entry(directory, os.path.relpath(os.path.join(dirpath, name), directory)):
+                        count += 1
+        return count
+
+    # --- Kompression ---
+    def compressed(self, entry: AssetEntry, encoding: str) -> Optional[bytes]:
+        key = (entry.path, entry.digest, encoding)
+        data = self._compressed.get(key)
+        if data is not None:
+            self.stats["memory_hits"] += 1
+            return data
+        with open(entry.path, "rb") as handle:
+            raw = handle.read()
+        if encoding == "br":
+            if brotli is None:
+                return None
+            data = brotli.compress(raw, quality=11)
+        else:
+            data = gzip.compress(raw, compresslevel=9, mtime=0)
+        if len(data) >= len(raw):
+            return None
+        with self._lock:
+            if self._compressed_bytes + len(data) <= MEMORY_CACHE_MAX_BYTES:
+                self._compressed[key] = data
+                self._compressed_bytes += len(data)
+            self.stats["compressed"] += 1
+        return data
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._entries),
+            "memory_cache_bytes": self._compressed_bytes,
+            "brotli_available": brotli is not None,
+            "stats": dict(self.stats),
+        }
+
+
+asset_manifest = AssetManifest()
+
+
+def _accepted_encodings(headers: Headers) -> Tuple[str, ...]:
+    accept = headers.get("accept-encoding", "").lower()
+    tokens = {part.split(";", 1)[0].strip() for part in accept.split(",")}
+    result = []
+    if "br" in tokens and brotli is not None:
+        result.append("br")
+    if "gzip" in tokens:
+        result.append("gzip")
+    return tuple(result)
+
+
+def _not_modified(headers: Headers, etag: str, mtime: float) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles mit Hash-URLs (immutable), Revalidierung fuer Altpfade und gzip/brotli."""
+
+    def __init__(self, *, directory: str, **kwargs: Any) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.asset_directory = directory
+
+    async def get_response(self, path: str, scope: Any) -> Response:
+        headers = Headers(scope=scope)
+        logical, requested_hash = split_hashed(path)
+        entry = await run_in_threadpool(asset_manifest.entry, self.asset_directory, logical if requested_hash else path)
+        if entry is None and requested_hash:
+            # Datei heisst zufaellig wie ein Hash-Name: normal ausliefern
+            logical, requested_hash = path, None
+            entry = await run_in_threadpool(asset_manifest.entry, self.asset_directory, path)
+        if entry is None or scope.get("method") not in ("GET", "HEAD"):
+            response = await super().get_response(path, scope)
+            response.headers["Cache-Control"] = REVALIDATE
+            return response
+
+        # veralteter Hash (Datei inzwischen geaendert): aktuellen Inhalt liefern, aber nicht festschreiben
+        cache_control = IMMUTABLE if requested_hash == entry.digest else REVALIDATE
+        media_type = mimetypes.guess_type(logical)[0] or "application/octet-stream"
+        base_headers = {
+            "Cache-Control": cache_control,
+            "Last-Modified": email.utils.formatdate(entry.mtime, usegmt=True),
+        }
+
+        encoding: Optional[str] = None
+        body: Optional[bytes] = None
+        variant_path: Optional[str] = None
+        if (
+            "range" not in headers
+            and entry.size >= MIN_COMPRESS_BYTES
+            and logical.lower().endswith(COMPRESSIBLE)
+        ):
+            base_headers["Vary"] = "Accept-Encoding"
+            for candidate in _accepted_encodings(headers):
+                suffix = ".br" if candidate == "br" else ".gz"
+                on_disk = entry.path + suffix
+                if await run_in_threadpool(_fresh_variant, on_disk, entry):
+                    encoding, variant_path = candidate, on_disk
+                    asset_manifest.stats["precompressed_hits"] += 1
+                    break
+                body = await run_in_threadpool(asset_manifest.compressed, entry, candidate)
+                if body is not None:
+                    encoding = candidate
+                    break
+
+        etag = f'"{entry.digest}-{encoding}"' if encoding else f'"{entry.digest}"'
+        base_headers["ETag"] = etag
+        if _not_modified(headers, etag, entry.mtime):
+            return Response(status_code=304, headers=base_headers)
+
+        if encoding is None:
+            response = await super().get_response(logical, scope)
+            if response.status_code == 200:
+                response.headers.update(base_headers)
+            return response
+
+        base_headers["Content-Encoding"] = encoding
+        if variant_path is not None:
+            with open(variant_path, "rb") as handle:
+                body = handle.read()
+        assert body is not None
+        if scope.get("method") == "HEAD":
+            base_headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=base_headers, media_type=media_type)
+        return Response(content=body, headers=base_headers, media_type=media_type)
+
+
+def _fresh_variant(path: str, entry: AssetEntry) -> bool:
+    """Vorkomprimierte Datei nur verwenden, wenn sie nicht aelter als das Original ist."""
+    try:
+        return os.stat(path).st_mtime >= entry.mtime
+    except OSError:
+        return False
+
+
+def configure_templates(templates: Any) -> Any:
+    """Jinja2Templates: url_for() fuer Static-Mounts liefert Hash-URLs, asset() fuer feste Pfade."""
+    from jinja2 import pass_context
+
+    @pass_context
+    def url_for(context: Dict[str, Any], name: str, /, **path_params: Any) -> Any:
+        request = context["request"]
+        if name in MOUNTS and "path" in path_params:
+            path_params["path"] = asset_manifest.url_path(name, str(path_params["path"]))
+        return request.url_for(name, **path_params)
+
+    templates.env.globals["url_for"] = url_for
+    templates.env.globals["asset"] = asset_manifest.url
+    return templates
+
+
+def precompress(verbose: bool = False) -> Dict[str, int]:
+    """Build-Schritt: .gz (und .br, falls brotli installiert) neben alle komprimierbaren Dateien legen."""
+    result = {"files": 0, "gzip": 0, "br": 0, "skipped": 0}
+    for _mount, (_prefix, directory) in MOUNTS.items():
+        for dirpath, _dirs, files in os.walk(directory):
+            for name in files:
+                if not name.lower().endswith(COMPRESSIBLE):
+                    continue
+                full = os.path.join(dirpath, name)
+                with open(full, "rb") as handle:
+                    raw = handle.read()
+                result["files"] += 1
+                if len(raw) < MIN_COMPRESS_BYTES:
+                    result["skipped"] += 1
+                    continue
+                variants = [("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+                if brotli is not None:
+                    variants.append(("br", ".br", lambda data: brotli.compress(data, quality=11)))
+                for key, suffix, compress in variants:
+                    data = compress(raw)
+                    if len(data) >= len(raw):
+                        continue
+                    with open(full + suffix, "wb") as handle:
+                        handle.write(data)
+                    result[key] += 1
+                    if verbose:
+                        print(f"{len(raw):>9} -> {len(data):>9}  {full}{suffix}")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Statische Assets: vorkomprimieren / Manifest anzeigen")
+    parser.add_argument("--precompress", action="store_true", help=".gz/.br neben die Assets schreiben (Build)")
+    parser.add_argument("--manifest", action="store_true", help="Hash-Namen aller Assets ausgeben")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.precompress:
+        print(precompress(verbose=args.verbose))
+    if args.manifest:
+        for mount, (prefix, directory) in MOUNTS.items():
+            for dirpath, _dirs, files in os.walk(directory):
+                for name in sorted(files):
+                    if name.endswith((".gz", ".br")):
+                        continue
+                    rel = os.path.relpath(os.path.join(dirpath, name), directory).replace(os.sep, "/")
+                    print(f"{prefix}/{rel} -> {prefix}/{asset_manifest.url_path(mount, rel)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import itertools
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+# Change counters per DB table for in-memory caches (AMS overview etc.).
+# Tables touched by an ORM flush are collected per session and bumped only when the
+# transaction commits, so a concurrent reader never caches uncommitted rows under the
+# new version; a rollback discards them.
+# Raw SQL writes (SQL editor, backup restore) must call invalidate_all().
+_counter = itertools.count(1)
+_versions: Dict[str, int] = {}
+_generation: int = 0
+
+
+def bump(*tables: str) -> None:
+    """Mark the given tables as changed."""
+    for table in tables:
+        _versions[table] = next(_counter)
+
+
+def invalidate_all() -> None:
+    """Mark every table as changed (e.g. after raw SQL or a DB restore)."""
+    global _generation
+    _generation = next(_counter)
+
+
+def get_version(*tables: str) -> Tuple[int, ...]:
+    """Cache key component for the given tables; changes whenever one of them changes."""
+    return (_generation,) + tuple(_versions.get(table, 0) for table in tables)
+
+
+_PENDING_KEY = "table_versions_pending"
+
+
+def _after_flush(session: Any, flush_context: Any) -> None:
+    touched = session.info.setdefault(_PENDING_KEY, set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            touched.add(table)
+
+
+def _after_commit(session: Any) -> None:
+    touched = session.info.pop(_PENDING_KEY, None)
+    if touched:
+        bump(*touched)
+
+
+def _after_rollback(session: Any) -> None:
+    # Rollback of a SAVEPOINT: flushes of the outer transaction may still commit
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _after_soft_rollback(session: Any, previous_transaction: Any) -> None:
+    if getattr(previous_transaction, "nested", False):
+        return
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(OrmSession, "after_flush", _after_flush)
+event.listen(OrmSession, "after_commit", _after_commit)
+event.listen(OrmSession, "after_rollback", _after_rollback)
+event.listen(OrmSession, "after_soft_rollback", _after_soft_rollback)
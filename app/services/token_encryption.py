@@ -5,14 +5,17 @@ Sichere Verschluesselung von API Tokens fuer die Bambu Cloud Integration.
 
 Verwendet Fernet (symmetric encryption) aus der cryptography library.
 Der Encryption Key wird aus einer Umgebungsvariable oder einer generierten
-Key-Datei geladen.
+Key-Datei geladen. cryptography wird erst beim ersten Ver-/Entschluesseln importiert.
 """
+from __future__ import annotations
+
 import os
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from cryptography.fernet import Fernet, InvalidToken
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
 
 logger = logging.getLogger("token_encryption")
 
@@ -57,6 +60,8 @@ class TokenEncryptionService:
                 logger.warning(f"Konnte Key-Datei nicht lesen: {e}")
 
         logger.info("Generiere neuen Encryption Key...")
+        from cryptography.fernet import Fernet
+
         key = Fernet.generate_key()
 
         try:
@@ -75,6 +80,8 @@ class TokenEncryptionService:
     def _get_fernet(self) -> Fernet:
         """Gibt die Fernet-Instanz zurueck (lazy init)."""
         if self._fernet is None:
+            from cryptography.fernet import Fernet
+
             self._key = self._get_or_create_key()
             self._fernet = Fernet(self._key)
         return self._fernet
@@ -93,6 +100,8 @@ class TokenEncryptionService:
         if not encrypted_text:
             return ""
 
+        from cryptography.fernet import InvalidToken
+
         try:
             fernet = self._get_fernet()
             decrypted = fernet.decrypt(encrypted_text.encode("utf-8"))
@@ -118,6 +127,8 @@ class TokenEncryptionService:
         Tokens neu verschluesselt werden!
         """
         if new_key is None:
+            from cryptography.fernet import Fernet
+
             new_key = Fernet.generate_key()
 
         try:
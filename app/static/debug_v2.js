@@ -699,6 +699,15 @@ function showPerfError() {
   setText('perfDiskSub', '-');
   setText('perfUptimeValue', '-');
   setText('perfUptimeSub', '-');
+  setText('perfLogValue', '-');
+  setText('perfLogSub', '-');
+  setBadgeState($('#perfLogBadge'), 'idle');
+  setText('perfIngestValue', '-');
+  setText('perfIngestSub', '-');
+  setBadgeState($('perfIngestBadge'), 'idle');
+  setText('perfLoopValue', '-');
+  setText('perfLoopSub', '-');
+  setBadgeState($('perfLoopBadge'), 'idle');
   setBadgeState($('#perfCpuBadge'), 'idle');
   setBadgeState($('#perfRamBadge'), 'idle');
   setBadgeState($('#perfDiskBadge'), 'idle');
@@ -737,6 +746,39 @@ function setScannerStatus(cardEl, state, text, detailText) {
   if (result) result.textContent = detailText || '--';
 }
 
+function renderLoopOffenders(listId, items, emptyText) {
+  const list = $(listId);
+  if (!list) return;
+  list.textContent = '';
+  if (!items || !items.length) {
+    const li = document.createElement('li');
+    li.style.color = 'var(--text-dim)';
+    li.textContent = emptyText;
+    list.appendChild(li);
+    return;
+  }
+  items.forEach((item) => {
+    const li = document.createElement('li');
+    li.style.marginBottom = '4px';
+    li.textContent = `${item.file}:${item.line} ${item.function} — ${item.count}x, total ${item.total_ms} ms, max ${item.max_ms} ms`;
+    li.title = (item.detail ? item.detail + '\n' : '') + (item.stack || []).join('\n');
+    list.appendChild(li);
+  });
+}
+
+async function loadLoopOffenders() {
+  try {
+    const res = await fetch('/api/debug/performance/loop?limit=10');
+    if (!res.ok) return;
+    const report = await res.json();
+    renderLoopOffenders('perfLoopStalls', report.stall_offenders, 'Keine Blockaden über dem Schwellwert');
+    renderLoopOffenders('perfLoopDb', report.db_on_loop,
+      report.db_debug ? 'Kein SQL auf dem Event-Loop' : 'DB-Debug-Modus aus (performance.loop_watchdog.db_on_loop_debug)');
+  } catch (err) {
+    // ignore
+  }
+}
+
 async function loadPerformanceLite() {
   const loading = $('perfLoading');
   const err = $('perfError');
@@ -786,6 +828,43 @@ async function loadPerformanceLite() {
     setText('perfUptimeValue', uptimeText);
     setText('perfUptimeSub', uptimeText === '-' ? '-' : 'backend uptime');
     setBadgeState($('#perfUptimeBadge'), uptimeText === '-' ? 'idle' : 'ok');
+
+    const log = data.logging || {};
+    if (log.running) {
+      setText('perfLogValue', `${Number(log.records_per_s || 0).toFixed(1)} rec/s`);
+      setText('perfLogSub', `Queue ${log.queue_depth}/${log.queue_size} · dropped ${log.dropped} · written ${log.written}`);
+      setBadgeState($('#perfLogBadge'), log.dropped > 0 ? 'warn' : 'ok');
+    } else {
+      setText('perfLogValue', '-');
+      setText('perfLogSub', 'log writer not running');
+      setBadgeState($('#perfLogBadge'), 'idle');
+    }
+
+    const ingest = data.ingest || {};
+    const local = ingest.local || ingest.cloud;
+    if (local && local.messages) {
+      setText('perfIngestValue', `p50 ${Number(local.p50_ms || 0).toFixed(2)} ms · p99 ${Number(local.p99_ms || 0).toFixed(2)} ms`);
+      const share = local.slowest_share != null ? ` (${Math.round(local.slowest_share * 100)}%)` : '';
+      setText('perfIngestSub', `${ingest.messages} msgs · slowest: ${local.slowest_stage || '-'}${share}`);
+      setBadgeState($('perfIngestBadge'), (local.p99_ms || 0) > 100 ? 'warn' : 'ok');
+    } else {
+      setText('perfIngestValue', '-');
+      setText('perfIngestSub', 'no MQTT messages yet');
+      setBadgeState($('perfIngestBadge'), 'idle');
+    }
+
+    const loop = data.loop || {};
+    if (loop.running) {
+      const p99 = Number(loop.lag_p99_ms || 0);
+      setText('perfLoopValue', `lag p99 ${p99.toFixed(1)} ms`);
+      setText('perfLoopSub', `max ${Number(loop.lag_max_ms || 0).toFixed(0)} ms · ${loop.stalls} stalls${loop.worst ? ' · ' + loop.worst : ''}`);
+      setBadgeState($('perfLoopBadge'), loop.stalls > 0 || p99 > loop.threshold_ms ? 'warn' : 'ok');
+      loadLoopOffenders();
+    } else {
+      setText('perfLoopValue', '-');
+      setText('perfLoopSub', 'watchdog not running');
+      setBadgeState($('perfLoopBadge'), 'idle');
+    }
   } catch (err) {
     showPerfError();
     console.warn('Performance data not available', err);
@@ -0,0 +1,260 @@
+"""Fan-out Broadcaster fuer WebSocket- und SSE-Clients.
+
+Jede Nachricht wird genau einmal serialisiert und dann in eine begrenzte
+Queue pro Client gelegt. WebSocket-Clients werden von einer eigenen
+Sender-Task pro Client bedient, SSE-Generatoren lesen ihre Queue selbst.
+Ein langsamer Browser-Tab blockiert dadurch keine anderen Clients mehr:
+ist seine Queue voll, werden die aeltesten Nachrichten verworfen bzw.
+Nachrichten mit gleichem Coalesce-Key zusammengefasst.
+
+publish() muss im Event-Loop-Thread aufgerufen werden, publish_threadsafe()
+darf aus beliebigen Threads (paho-Callbacks, Worker) aufgerufen werden.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger("app")
+
+DEFAULT_QUEUE_SIZE = 200
+
+_client_ids = itertools.count(1)
+
+
+def serialize(message: Any) -> str:
+    """Serialisiert eine Nachricht einmalig zu Text (Strings werden durchgereicht)."""
+    if isinstance(message, str):
+        return message
+    return json.dumps(message, default=str, ensure_ascii=False)
+
+
+class BroadcastClient:
+    """Ein Abonnent eines Channels mit eigener, begrenzter Queue."""
+
+    def __init__(
+        self,
+        channel: "BroadcastChannel",
+        label: Optional[str],
+        max_queue: int,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        self.id = next(_client_ids)
+        self.channel = channel
+        self.label = label
+        self.max_queue = max_queue
+        # Optionaler serverseitiger Filter: nur Nachrichten mit accept(text) == True landen in der Queue
+        self.accept = accept
+        self.filtered = 0
+        # Eintraege: [coalesce_key, text, enqueue_ts]
+        self._queue: Deque[List[Any]] = deque()
+        self._pending_by_key: Dict[Any, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def _enqueue(self, text: str, key: Any, ts: float) -> None:
+        if self.closed:
+            return
+        if key is not None:
+            pending = self._pending_by_key.get(key)
+            if pending is not None:
+                # Neuere Nachricht ersetzt die noch nicht gesendete (Position bleibt erhalten)
+                pending[1] = text
+                self.coalesced += 1
+                return
+        if len(self._queue) >= self.max_queue:
+            old = self._queue.popleft()
+            if old[0] is not None and self._pending_by_key.get(old[0]) is old:
+                del self._pending_by_key[old[0]]
+            self.dropped += 1
+        entry = [key, text, ts]
+        self._queue.append(entry)
+        if key is not None:
+            self._pending_by_key[key] = entry
+        self._wakeup.set()
+
+    def send(self, message: Any) -> None:
+        """Reiht eine Nachricht nur fuer diesen Client ein (z.B. "pong"; nur im Event-Loop-Thread).
+
+        Laeuft ueber dieselbe Queue wie die Broadcasts, damit nur die Sender-Task
+        auf den Socket schreibt.
+        """
+        self._enqueue(serialize(message), None, time.monotonic())
+
+    def _pop(self) -> str:
+        entry = self._queue.popleft()
+        if entry[0] is not None and self._pending_by_key.get(entry[0]) is entry:
+            del self._pending_by_key[entry[0]]
+        if not self._queue:
+            self._wakeup.clear()
+        lag_ms = (time.monotonic() - entry[2]) * 1000.0
+        self.last_lag_ms = lag_ms
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+        self.sent += 1
+        return entry[1]
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Naechste Nachricht; None bei Timeout oder wenn der Client geschlossen wurde."""
+        while not self._queue or self.closed:
+            if self.closed:
+                return None
+            try:
+                if timeout is None:
+                    await self._wakeup.wait()
+                else:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._pop()
+
+    async def _run_sender(self, send: Callable[[str], Awaitable[Any]]) -> None:
+        try:
+            while not self.closed:
+                text = await self.get()
+                if text is None:
+                    break
+                await send(text)
+        except asyncio.CancelledError:
+            pass
+        except Exception as exc:
+            logger.info("[BROADCAST] %s: Client %s getrennt (%s)", self.channel.name, self.id, exc)
+        finally:
+            self.channel.unsubscribe(self)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "filtered": self.filtered,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "connected_s": int(time.time() - self.connected_at),
+        }
+
+
+class BroadcastChannel:
+    """Benannter Kanal (z.B. "mqtt", "notifications") mit beliebig vielen Clients."""
+
+    def __init__(self, name: str, max_queue: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.name = name
+        self.max_queue = max_queue
+        self._clients: Dict[int, BroadcastClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(
+        self,
+        send: Optional[Callable[[str], Awaitable[Any]]] = None,
+        label: Optional[str] = None,
+        max_queue: Optional[int] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> BroadcastClient:
+        """Registriert einen Client (im Event-Loop aufrufen).
+
+        Mit `send` (z.B. websocket.send_text) startet eine Sender-Task pro Client;
+        ohne `send` liest der Aufrufer selbst via `client.get()` (SSE).
+        `accept` filtert Nachrichten vor dem Einreihen (z.B. Log-Level/Suchtext).
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        client = BroadcastClient(self, label, max_queue or self.max_queue, accept=accept)
+        self._clients[client.id] = client
+        if send is not None:
+            client._task = asyncio.create_task(client._run_sender(send))
+        return client
+
+    def unsubscribe(self, client: BroadcastClient) -> None:
+        client.closed = True
+        client._wakeup.set()
+        self._clients.pop(client.id, None)
+        task = client._task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    def publish(self, message: Any, key: Any = None) -> None:
+        """Verteilt eine Nachricht an alle Clients (nur im Event-Loop-Thread)."""
+        self._publish_text(serialize(message), key)
+
+    def publish_threadsafe(self, message: Any, key: Any = None) -> None:
+        """Wie publish(), aber aus beliebigen Threads; serialisiert im aufrufenden Thread."""
+        if not self._clients:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        text = serialize(message)
+        try:
+            loop.call_soon_threadsafe(self._publish_text, text, key)
+        except RuntimeError:
+            # Loop wird gerade beendet
+            pass
+
+    def _publish_text(self, text: str, key: Any) -> None:
+        self.published += 1
+        ts = time.monotonic()
+        for client in list(self._clients.values()):
+            if client.accept is not None:
+                try:
+                    if not client.accept(text):
+                        client.filtered += 1
+                        continue
+                except Exception:
+                    logger.exception("[BROADCAST] %s: Filter von Client %s fehlgeschlagen", self.name, client.id)
+            client._enqueue(text, key, ts)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "clients": self.client_count,
+            "published": self.published,
+            "per_client": [client.stats() for client in self._clients.values()],
+        }
+
+
+_channels: Dict[str, BroadcastChannel] = {}
+_default_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_channel(name: str, max_queue: int = DEFAULT_QUEUE_SIZE) -> BroadcastChannel:
+    channel = _channels.get(name)
+    if channel is None:
+        channel = BroadcastChannel(name, max_queue=max_queue)
+        if _default_loop is not None:
+            channel.attach_loop(_default_loop)
+        _channels[name] = channel
+    return channel
+
+
+def attach_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Bindet alle (auch spaeter erzeugten) Channels an den Haupt-Event-Loop."""
+    global _default_loop
+    _default_loop = loop
+    for channel in _channels.values():
+        channel.attach_loop(loop)
+
+
+def get_broadcast_stats() -> Dict[str, Any]:
+    return {name: channel.stats() for name, channel in _channels.items()}
@@ -0,0 +1,229 @@
+"""Delta-Modus fuer /api/mqtt/ws (?mode=delta).
+
+Protokoll (Server -> Client):
+    {"type": "snapshot", "printer": SERIAL, "version": N, "data": {...}}
+    {"type": "delta", "printer": SERIAL, "from": N-k, "version": N, "ops": [...]}
+    {"type": "raw", "topic": ..., "printer": SERIAL, "timestamp": ..., "payload": {...}}  (nur mit raw=1)
+
+Client -> Server:
+    {"type": "subscribe", "printers": [...], "topics": [...]}   (leere/fehlende Liste = alle)
+    {"type": "resync", "printer": SERIAL}                       (ohne printer = alle)
+    "ping"
+
+`topics` sind MQTT-Topics (Wildcards + und # erlaubt); sie filtern Raw-Nachrichten und die
+Snapshots/Deltas eines Druckers (dessen Topic device/<serial>/report).
+
+Pro Drucker und Client werden hoechstens `rate` Updates pro Sekunde gesendet;
+Zwischenstaende werden zusammengefasst (Delta vom zuletzt gesendeten Stand).
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import WebSocket
+from paho.mqtt.client import topic_matches_sub
+
+from app.services import live_delta
+from app.websocket.broadcaster import get_channel
+
+logger = logging.getLogger("mqtt")
+
+DEFAULT_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 10.0
+
+raw_channel = get_channel("mqtt_raw")
+
+
+def _split(value: Optional[Any]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        items: Iterable[Any] = value.split(",")
+    elif isinstance(value, (list, tuple, set)):
+        items = value
+    else:
+        return None
+    result = {str(item).strip() for item in items if str(item).strip()}
+    return result or None
+
+
+def parse_rate(value: Optional[str]) -> float:
+    try:
+        rate = float(value) if value is not None else DEFAULT_RATE
+    except (TypeError, ValueError):
+        rate = DEFAULT_RATE
+    return min(MAX_RATE, max(MIN_RATE, rate))
+
+
+class DeltaStreamSession:
+    """Zustand eines Delta-Clients: gesendete Versionen, Abos, Rate-Limit."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        printers: Optional[str] = None,
+        topics: Optional[str] = None,
+        rate: float = DEFAULT_RATE,
+        raw: bool = False,
+    ) -> None:
+        self.websocket = websocket
+        self.printers = _split(printers)
+        self.topics = _split(topics)
+        self.interval = 1.0 / rate
+        self.raw = raw
+        self._sent: Dict[str, Any] = {}  # serial -> (version, data)
+        self._last_sent_ts: Dict[str, float] = {}
+        self._dirty: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._tasks: list = []
+        self._raw_client = None
+        self.closed = False
+
+    # ------------------------------------------------------------------
+    def _wants_topic(self, topic: Optional[str]) -> bool:
+        if self.topics is None:
+            return True
+        if not topic:
+            return False
+        return any(topic == sub or topic_matches_sub(sub, topic) for sub in self.topics)
+
+    def _wants(self, serial: str) -> bool:
+        if self.printers is not None and serial not in self.printers:
+            return False
+        # Snapshots/Deltas eines Druckers stammen aus seinem Report-Topic
+        return self._wants_topic(f"device/{serial}/report")
+
+    def _on_change(self, serial: str) -> None:
+        if self.closed or not self._wants(serial):
+            return
+        self._dirty.add(serial)
+        self._wakeup.set()
+
+    async def _send(self, text: str) -> None:
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    async def _send_update(self, serial: str) -> None:
+        snap = live_delta.get_snapshot(serial)
+        if snap is None:
+            return
+        version, data = snap
+        sent = self._sent.get(serial)
+        if sent is not None and sent[0] == version:
+            return
+        if sent is None:
+            text = json.dumps(
+                {"type": "snapshot", "printer": serial, "version": version, "data": data},
+                default=str,
+                ensure_ascii=False,
+            )
+        else:
+            ops_json = live_delta.get_last_delta_json(serial, sent[0])
+            if ops_json is None:
+                ops_json = json.dumps(live_delta.diff(sent[1], data), default=str, ensure_ascii=False)
+            # Ops sind bereits serialisiert (geteilt zwischen Clients) -> nur Huelle zusammensetzen
+            text = '{"type": "delta", "printer": %s, "from": %d, "version": %d, "ops": %s}' % (
+                json.dumps(serial), sent[0], version, ops_json
+            )
+        self._sent[serial] = (version, data)
+        self._last_sent_ts[serial] = time.monotonic()
+        await self._send(text)
+
+    async def _flush_loop(self) -> None:
+        while not self.closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._dirty and not self.closed:
+                now = time.monotonic()
+                next_due = None
+                for serial in list(self._dirty):
+                    due = self._last_sent_ts.get(serial, 0.0) + self.interval
+                    if due <= now:
+                        self._dirty.discard(serial)
+                        await self._send_update(serial)
+                    elif next_due is None or due < next_due:
+                        next_due = due
+                if next_due is not None:
+                    await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+
+    async def _raw_loop(self) -> None:
+        client = self._raw_client
+        while not self.closed and client is not None:
+            text = await client.get()
+            if text is None:
+                break
+            if self.topics is not None or self.printers is not None:
+                try:
+                    item = json.loads(text)
+                except ValueError:
+                    continue
+                if not self._wants_topic(item.get("topic")):
+                    continue
+                if self.printers is not None and item.get("printer") not in self.printers:
+                    continue
+            await self._send(text)
+
+    # ------------------------------------------------------------------
+    def resync(self, serial: Optional[str] = None) -> None:
+        targets = [serial] if serial else list(self._sent.keys()) + live_delta.known_printers()
+        for target in targets:
+            if not target or not self._wants(target):
+                continue
+            self._sent.pop(target, None)
+            self._last_sent_ts.pop(target, None)
+            self._dirty.add(target)
+        self._wakeup.set()
+
+    def subscribe(self, printers: Any = None, topics: Any = None) -> None:
+        self.printers = _split(printers)
+        self.topics = _split(topics)
+        for serial in list(self._sent.keys()):
+            if not self._wants(serial):
+                self._sent.pop(serial, None)
+                self._dirty.discard(serial)
+        # Neu abonnierte Drucker bekommen einen Snapshot
+        for serial in live_delta.known_printers():
+            if self._wants(serial) and serial not in self._sent:
+                self._dirty.add(serial)
+        self._wakeup.set()
+
+    async def handle(self, text: str) -> None:
+        if text == "ping":
+            await self._send("pong")
+            return
+        try:
+            command = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(command, dict):
+            return
+        kind = command.get("type")
+        if kind == "subscribe":
+            self.subscribe(command.get("printers"), command.get("topics"))
+        elif kind == "resync":
+            self.resync(command.get("printer"))
+
+    def start(self) -> None:
+        live_delta.add_listener(self._on_change)
+        if self.raw:
+            self._raw_client = raw_channel.subscribe(label="mqtt_ws_raw")
+            self._tasks.append(asyncio.create_task(self._raw_loop()))
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        for serial in live_delta.known_printers():
+            if self._wants(serial):
+                self._dirty.add(serial)
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+        live_delta.remove_listener(self._on_change)
+        if self._raw_client is not None:
+            raw_channel.unsubscribe(self._raw_client)
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
@@ -1,28 +1,31 @@
-import os
-import asyncio
-from fastapi import WebSocket
-from datetime import datetime
+import logging
 
-LOG_ROOT = "logs"
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.services.log_reader import resolve_log_path
+from app.services.log_tail import log_tail_service
 
 
 async def stream_log(websocket: WebSocket, module: str):
+    """Neue Zeilen aus logs/<module>/<module>.log streamen (geteilter Tailer, kein Polling pro Client)."""
     await websocket.accept()
-    today = datetime.now().strftime("%Y-%m-%d")
-    file_path = os.path.join(LOG_ROOT, module, f"{today}.log")
-
-    if not os.path.exists(file_path):
-        await websocket.close()
+    try:
+        file_path = resolve_log_path(module)
+    except ValueError:
+        await websocket.close(code=1008)
         return
 
-    # Datei öffnen + ans Ende springen
-    with open(file_path, "r", encoding="utf-8") as f:
-        f.seek(0, os.SEEK_END)
-
+    client = await log_tail_service.subscribe(
+        str(file_path),
+        websocket.send_text,
+        level=websocket.query_params.get("level") or None,
+        search=websocket.query_params.get("search") or None,
+        label=f"log_stream:{module}",
+    )
+    try:
         while True:
-            line = f.readline()
-            if not line:
-                await asyncio.sleep(0.5)
-                continue
-
-            await websocket.send_text(line)
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        logging.getLogger("app").debug("Log stream disconnected for module=%s", module)
+    finally:
+        log_tail_service.unsubscribe(client)
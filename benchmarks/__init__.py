@@ -0,0 +1 @@
+"""Benchmark-Werkzeuge (keine Tests). Aufruf z.B.: python -m benchmarks.mqtt_ingest --help"""
@@ -0,0 +1,232 @@
+"""Synthetische Bambu-Lab-Report-Streams (device/<serial>/report) fuer Benchmarks.
+
+Erzeugt realistische push_status-Nachrichten fuer X1C, P1S und A1:
+
+- X1C sendet vollstaendige Reports, P1S/A1 ueberwiegend Teil-Updates
+  (nur geaenderte Felder) und gelegentlich einen vollen Report
+- 1-4 AMS-Einheiten mit je 4 Trays (A1: eine AMS lite), RFID/ohne RFID,
+  Restmenge sinkt auf dem aktiven Tray waehrend des Drucks
+- Job-Lebenszyklus IDLE -> PREPARE -> RUNNING (Layer/Prozent/Restzeit) -> FINISH -> IDLE
+  mit task_id/subtask_id/subtask_name wie bei echten Cloud-Jobs
+
+Deterministisch ueber `seed`, damit Laeufe zwischen Versionen vergleichbar sind.
+"""
+from __future__ import annotations
+
+import json
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MODEL_PROFILES: Dict[str, Dict[str, Any]] = {
+    "X1C": {"serial_prefix": "00M", "full_reports": True, "max_ams": 4, "chamber": True},
+    "P1S": {"serial_prefix": "01P", "full_reports": False, "max_ams": 4, "chamber": False},
+    "A1": {"serial_prefix": "039", "full_reports": False, "max_ams": 1, "chamber": False},
+}
+
+_MATERIALS = [
+    ("PLA", "Bambu PLA Basic", 190, 230),
+    ("PLA", "Bambu PLA Matte", 190, 230),
+    ("PETG", "Bambu PETG HF", 230, 260),
+    ("ABS", "Bambu ABS", 240, 270),
+    ("TPU", "Generic TPU", 200, 240),
+]
+_COLORS = ["FFFFFFFF", "000000FF", "F72323FF", "0A2989FF", "00AE42FF", "FEC600FF", "8E9089FF"]
+
+
+def _hex(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("0123456789ABCDEF") for _ in range(length))
+
+
+class PrinterStream:
+    """Zustandsbehafteter Report-Generator fuer einen Drucker."""
+
+    def __init__(self, index: int, model: str, ams_units: int, rng: random.Random) -> None:
+        profile = MODEL_PROFILES[model]
+        self.model = model
+        self.profile = profile
+        self.rng = rng
+        self.serial = f"{profile['serial_prefix']}{index:012d}"
+        self.topic = f"device/{self.serial}/report"
+        self.ams_units = max(0, min(ams_units, profile["max_ams"]))
+        self.sequence_id = 0
+        self.state = "IDLE"
+        self.phase_left = rng.randint(3, 10)
+        self.layer = 0
+        self.total_layers = 0
+        self.task_id = 0
+        self.job_name = ""
+        self.remaining_min = 0
+        self.tray_now = 255
+        self.nozzle = 25.0
+        self.bed = 25.0
+        self.trays = self._build_trays()
+        self.messages = 0
+
+    # --- AMS ---
+    def _build_trays(self) -> List[List[Dict[str, Any]]]:
+        units = []
+        for unit in range(self.ams_units):
+            trays = []
+            for slot in range(4):
+                if self.rng.random() < 0.1:
+                    trays.append({"id": str(slot)})  # leerer Slot
+                    continue
+                material, brand, tmin, tmax = self.rng.choice(_MATERIALS)
+                rfid = self.rng.random() < 0.7
+                trays.append({
+                    "id": str(slot),
+                    "tray_id_name": f"A{unit:02d}-{slot}" if rfid else "",
+                    "tray_type": material,
+                    "tray_sub_brands": brand if rfid else "",
+                    "tray_color": self.rng.choice(_COLORS),
+                    "tray_weight": "1000",
+                    "tray_diameter": "1.75",
+                    "nozzle_temp_min": str(tmin),
+                    "nozzle_temp_max": str(tmax),
+                    "remain": self.rng.randint(5, 100) if rfid else -1,
+                    "tag_uid": _hex(self.rng, 16) if rfid else "0000000000000000",
+                    "tray_uuid": _hex(self.rng, 32) if rfid else "00000000000000000000000000000000",
+                    "k": 0.02,
+                    "n": 1,
+                })
+            units.append(trays)
+        return units
+
+    def _ams_block(self) -> Dict[str, Any]:
+        return {
+            "ams": [
+                {
+                    "id": str(unit),
+                    "humidity": str(self.rng.randint(1, 5)),
+                    "temp": f"{self.rng.uniform(22.0, 30.0):.1f}",
+                    "tray": trays,
+                }
+                for unit, trays in enumerate(self.trays)
+            ],
+            "ams_exist_bits": format((1 << self.ams_units) - 1, "x") if self.ams_units else "0",
+            "tray_exist_bits": "f" * self.ams_units if self.ams_units else "0",
+            "tray_now": str(self.tray_now),
+            "tray_pre": str(self.tray_now),
+            "tray_tar": str(self.tray_now),
+            "version": self.messages,
+        }
+
+    # --- Job-Lebenszyklus ---
+    def _advance(self) -> bool:
+        """Naechster Schritt; True wenn sich der Job-Zustand geaendert hat."""
+        self.phase_left -= 1
+        changed = False
+        if self.state == "IDLE" and self.phase_left <= 0:
+            self.state = "PREPARE"
+            self.phase_left = self.rng.randint(2, 6)
+            self.task_id = self.rng.randint(10**8, 10**9)
+            self.job_name = f"bench_part_{self.task_id % 1000}"
+            self.total_layers = self.rng.randint(40, 160)
+            self.layer = 0
+            self.remaining_min = self.total_layers // 2
+            if self.ams_units:
+                self.tray_now = self.rng.randrange(self.ams_units * 4)
+            changed = True
+        elif self.state == "PREPARE" and self.phase_left <= 0:
+            self.state = "RUNNING"
+            self.phase_left = self.total_layers
+            changed = True
+        elif self.state == "RUNNING":
+            self.layer = min(self.total_layers, self.layer + 1)
+            self.remaining_min = max(0, self.remaining_min - self.rng.choice((0, 0, 1)))
+            if self.tray_now != 255 and self.ams_units:
+                tray = self.trays[self.tray_now // 4][self.tray_now % 4]
+                if isinstance(tray.get("remain"), int) and tray["remain"] > 0 and self.rng.random() < 0.05:
+                    tray["remain"] -= 1
+            if self.phase_left <= 0:
+                self.state = "FINISH"
+                self.phase_left = self.rng.randint(2, 4)
+                changed = True
+        elif self.state == "FINISH" and self.phase_left <= 0:
+            self.state = "IDLE"
+            self.phase_left = self.rng.randint(5, 20)
+            self.tray_now = 255
+            changed = True
+        target_nozzle = 220.0 if self.state in ("PREPARE", "RUNNING") else 25.0
+        target_bed = 60.0 if self.state in ("PREPARE", "RUNNING") else 25.0
+        self.nozzle += (target_nozzle - self.nozzle) * 0.3 + self.rng.uniform(-0.5, 0.5)
+        self.bed += (target_bed - self.bed) * 0.2 + self.rng.uniform(-0.3, 0.3)
+        return changed
+
+    def _status_fields(self) -> Dict[str, Any]:
+        percent = int(self.layer * 100 / self.total_layers) if self.total_layers else 0
+        return {
+            "gcode_state": self.state,
+            "mc_percent": percent if self.state != "IDLE" else 0,
+            "mc_remaining_time": self.remaining_min,
+            "layer_num": self.layer,
+            "total_layer_num": self.total_layers,
+            "nozzle_temper": round(self.nozzle, 1),
+            "nozzle_target_temper": 220 if self.state in ("PREPARE", "RUNNING") else 0,
+            "bed_temper": round(self.bed, 1),
+            "bed_target_temper": 60 if self.state in ("PREPARE", "RUNNING") else 0,
+            "spd_lvl": 2,
+            "wifi_signal": f"-{self.rng.randint(40, 70)}dBm",
+        }
+
+    def _full_report(self) -> Dict[str, Any]:
+        report = {
+            "command": "push_status",
+            "msg": 0,
+            **self._status_fields(),
+            "gcode_file": f"/data/Metadata/{self.job_name}.gcode" if self.job_name else "",
+            "subtask_name": self.job_name,
+            "task_id": str(self.task_id) if self.task_id else "0",
+            "subtask_id": str(self.task_id + 1) if self.task_id else "0",
+            "print_type": "cloud" if self.task_id else "idle",
+            "mc_print_stage": "2" if self.state == "RUNNING" else "1",
+            "print_error": 0,
+            "lights_report": [{"node": "chamber_light", "mode": "on"}],
+            "hms": [],
+            "upgrade_state": {"sequence_id": 0, "status": "IDLE"},
+        }
+        if self.profile["chamber"]:
+            report["chamber_temper"] = round(self.rng.uniform(28.0, 40.0), 1)
+        if self.ams_units:
+            report["ams"] = self._ams_block()
+        return report
+
+    def next_payload(self) -> Dict[str, Any]:
+        changed = self._advance()
+        self.messages += 1
+        self.sequence_id += 1
+        if self.profile["full_reports"] or changed or self.messages % 20 == 1:
+            report = self._full_report()
+        else:
+            report = {"command": "push_status", "msg": 1, **self._status_fields()}
+            # Teil-Updates enthalten AMS nur ab und zu (z.B. bei Restmengen-Aenderung)
+            if self.ams_units and self.messages % 5 == 0:
+                report["ams"] = self._ams_block()
+        report["sequence_id"] = str(self.sequence_id)
+        return {"print": report}
+
+
+def build_fleet(printers: int, models: List[str], ams_range: Tuple[int, int], seed: int = 1) -> List[PrinterStream]:
+    rng = random.Random(seed)
+    fleet = []
+    for index in range(printers):
+        model = models[index % len(models)]
+        fleet.append(PrinterStream(index + 1, model, rng.randint(*ams_range), random.Random(rng.random())))
+    return fleet
+
+
+def iter_messages(fleet: List[PrinterStream], per_printer: int) -> Iterator[Tuple[str, bytes]]:
+    """Round-robin ueber alle Drucker: (topic, payload_bytes)."""
+    for _ in range(per_printer):
+        for stream in fleet:
+            yield stream.topic, json.dumps(stream.next_payload(), separators=(",", ":")).encode("utf-8")
+
+
+def parse_range(value: Optional[str], default: Tuple[int, int]) -> Tuple[int, int]:
+    """'2' -> (2, 2), '1-4' -> (1, 4)."""
+    if not value:
+        return default
+    if "-" in value:
+        low, high = value.split("-", 1)
+        return int(low), int(high)
+    return int(value), int(value)
@@ -0,0 +1,230 @@
+"""Gefaelschte SSDP- (Bambu) und mDNS-Ankuendigungen (Moonraker) fuer die Printer-Discovery.
+
+Zwei Betriebsarten:
+
+- ``--self-test`` (Standard): startet app.services.printer_discovery.PrinterDiscovery auf freien
+  Loopback-Ports, sendet ``--bambu`` bzw. ``--klipper`` Ankuendigungen an 127.0.0.1 und prueft
+  das Inventar (IP, Seriennummer, Modell, Port), danach ssdp:byebye/mDNS-Goodbye -> Eintrag weg.
+  Exit-Code 1 bei Abweichungen.
+- ``--target HOST``: sendet die Ankuendigungen per Unicast an eine laufende Instanz (Ports aus
+  config.yaml: 1990/2021, 5353); mit ``--verify-url`` wird anschliessend
+  ``/api/scanner/discovered`` abgefragt und geprueft.
+
+Beispiele:
+    python -m benchmarks.discovery_announce
+    python -m benchmarks.discovery_announce --bambu 20 --klipper 5 --json
+    python -m benchmarks.discovery_announce --target 127.0.0.1 --verify-url http://127.0.0.1:8081
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+from app.services.printer_discovery import (
+    BAMBU_SEARCH_TARGET,
+    MOONRAKER_SERVICE,
+    SSDP_GROUP,
+    PrinterDiscovery,
+    encode_dns_name,
+)
+
+MODEL_CODES = ("BL-P001", "C12", "N2S", "C11", "N1")
+EXPECTED_MODELS = {"BL-P001": "X1C", "C12": "P1S", "N2S": "A1", "C11": "P1P", "N1": "A1MINI"}
+
+
+def fake_bambu(index: int) -> Dict[str, Any]:
+    code = MODEL_CODES[index % len(MODEL_CODES)]
+    return {
+        "ip": f"10.77.0.{10 + index}",
+        "serial": f"00M09A{index:09d}",
+        "model_code": code,
+        "model": EXPECTED_MODELS[code],
+        "name": f"Fake Bambu {index}",
+    }
+
+
+def fake_moonraker(index: int) -> Dict[str, Any]:
+    return {
+        "ip": f"10.77.1.{10 + index}",
+        "instance": f"Fake Voron {index}",
+        "host": f"voron{index}.local",
+        "port": 7125 + (index % 2),
+    }
+
+
+def build_bambu_notify(device: Dict[str, Any], ttl: int = 1800, byebye: bool = False) -> bytes:
+    lines = [
+        "NOTIFY * HTTP/1.1",
+        f"HOST: {SSDP_GROUP}:1990",
+        "Server: UPnP/1.0",
+        f"Location: {device['ip']}",
+        f"NT: {BAMBU_SEARCH_TARGET}",
+        f"NTS: {'ssdp:byebye' if byebye else 'ssdp:alive'}",
+        f"USN: {device['serial']}",
+        f"Cache-Control: max-age={ttl}",
+        f"DevModel.bambu.com: {device['model_code']}",
+        f"DevName.bambu.com: {device['name']}",
+        "DevConnect.bambu.com: lan",
+        "DevBind.bambu.com: free",
+        "Devseclink.bambu.com: secure",
+        "DevVersion.bambu.com: 01.08.00.00",
+    ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+
+def _record(name: str, rtype: int, ttl: int, rdata: bytes, cache_flush: bool = False) -> bytes:
+    rclass = 0x8001 if cache_flush else 0x0001
+    return encode_dns_name(name) + struct.pack("!HHIH", rtype, rclass, ttl, len(rdata)) + rdata
+
+
+def build_moonraker_response(device: Dict[str, Any], ttl: int = 120) -> bytes:
+    instance = f"{device['instance']}.{MOONRAKER_SERVICE}"
+    txt = b"".join(bytes([len(e)]) + e for e in (b"version=v0.9.3", f"hostname={device['host']}".encode()))
+    records = [
+        _record(MOONRAKER_SERVICE, 12, ttl, encode_dns_name(instance)),
+        _record(instance, 33, ttl, struct.pack("!HHH", 0, 0, device["port"]) + encode_dns_name(device["host"]), True),
+        _record(instance, 16, ttl, txt, True),
+        _record(device["host"], 1, ttl, socket.inet_aton(device["ip"]), True),
+    ]
+    header = struct.pack("!6H", 0, 0x8400, 0, 1, 0, len(records) - 1)
+    return header + b"".join(records)
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def send_all(host: str, ssdp_port: int, mdns_port: int, bambu: List[Dict], klipper: List[Dict], goodbye: bool = False) -> int:
+    sent = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for device in bambu:
+            sock.sendto(build_bambu_notify(device, byebye=goodbye), (host, ssdp_port))
+            sent += 1
+        for device in klipper:
+            sock.sendto(build_moonraker_response(device, ttl=0 if goodbye else 120), (host, mdns_port))
+            sent += 1
+    return sent
+
+
+def check_inventory(devices: List[Dict[str, Any]], bambu: List[Dict], klipper: List[Dict]) -> List[str]:
+    problems: List[str] = []
+    by_serial = {d.get("serial"): d for d in devices if d.get("kind") == "bambu"}
+    for expected in bambu:
+        found = by_serial.get(expected["serial"])
+        if not found:
+            problems.append(f"bambu {expected['serial']} fehlt")
+            continue
+        for key in ("ip", "model", "name"):
+            if found.get(key) != expected[key]:
+                problems.append(f"bambu {expected['serial']}: {key}={found.get(key)!r}, erwartet {expected[key]!r}")
+    by_name = {d.get("name"): d for d in devices if d.get("kind") == "klipper"}
+    for expected in klipper:
+        found = by_name.get(expected["instance"])
+        if not found:
+            problems.append(f"klipper {expected['instance']} fehlt")
+            continue
+        for key, value in (("ip", expected["ip"]), ("port", expected["port"])):
+            if found.get(key) != value:
+                problems.append(f"klipper {expected['instance']}: {key}={found.get(key)!r}, erwartet {value!r}")
+    return problems
+
+
+async def _wait_for(discovery: PrinterDiscovery, count: int, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if len(discovery.devices()) == count:
+            break
+        await asyncio.sleep(0.01)
+    return (time.perf_counter() - started) * 1000
+
+
+async def self_test(bambu: List[Dict], klipper: List[Dict], timeout: float) -> Dict[str, Any]:
+    ssdp_ports = (_free_udp_port(), _free_udp_port())
+    mdns_port = _free_udp_port()
+    discovery = PrinterDiscovery(ssdp_ports=ssdp_ports, mdns_port=mdns_port, query_interval_s=0)
+    await discovery.start()
+    try:
+        # Bambu abwechselnd auf beide SSDP-Ports (Drucker senden auf 1990 und 2021)
+        half = len(bambu) // 2
+        send_all("127.0.0.1", ssdp_ports[0], mdns_port, bambu[:half], klipper)
+        send_all("127.0.0.1", ssdp_ports[1], mdns_port, bambu[half:], [])
+        announce_ms = await _wait_for(discovery, len(bambu) + len(klipper), timeout)
+        devices = [d.to_dict() for d in discovery.devices()]
+        problems = check_inventory(devices, bambu, klipper)
+
+        send_all("127.0.0.1", ssdp_ports[0], mdns_port, bambu, klipper, goodbye=True)
+        goodbye_ms = await _wait_for(discovery, 0, timeout)
+        remaining = len(discovery.devices())
+        if remaining:
+            problems.append(f"{remaining} Eintraege nach Goodbye noch im Inventar")
+        return {
+            "mode": "self-test",
+            "ports": {"ssdp": list(ssdp_ports), "mdns": mdns_port},
+            "announced": len(bambu) + len(klipper),
+            "discovered": len(devices),
+            "announce_to_inventory_ms": round(announce_ms, 1),
+            "goodbye_ms": round(goodbye_ms, 1),
+            "status": discovery.status(),
+            "problems": problems,
+        }
+    finally:
+        await discovery.stop()
+
+
+def remote_test(args: argparse.Namespace, bambu: List[Dict], klipper: List[Dict]) -> Dict[str, Any]:
+    sent = send_all(args.target, args.ssdp_port, args.mdns_port, bambu, klipper)
+    report: Dict[str, Any] = {"mode": "target", "target": args.target, "sent": sent, "problems": []}
+    if args.verify_url:
+        time.sleep(0.5)
+        url = args.verify_url.rstrip("/") + "/api/scanner/discovered"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            devices = json.loads(response.read().decode("utf-8")).get("devices", [])
+        report["discovered"] = len(devices)
+        report["problems"] = check_inventory(devices, bambu, klipper)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--bambu", type=int, default=6, help="Anzahl gefaelschter Bambu-Drucker")
+    parser.add_argument("--klipper", type=int, default=3, help="Anzahl gefaelschter Moonraker-Instanzen")
+    parser.add_argument("--self-test", action="store_true", help="In-Process-Test auf freien Loopback-Ports (Standard)")
+    parser.add_argument("--target", help="Ankuendigungen per Unicast an diesen Host senden")
+    parser.add_argument("--ssdp-port", type=int, default=2021, help="SSDP-Zielport fuer --target")
+    parser.add_argument("--mdns-port", type=int, default=5353, help="mDNS-Zielport fuer --target")
+    parser.add_argument("--verify-url", help="Basis-URL der laufenden Instanz fuer die Pruefung (mit --target)")
+    parser.add_argument("--timeout", type=float, default=3.0, help="Wartezeit auf das Inventar (Sekunden)")
+    parser.add_argument("--json", action="store_true", help="Bericht als JSON ausgeben")
+    args = parser.parse_args()
+
+    bambu = [fake_bambu(i) for i in range(args.bambu)]
+    klipper = [fake_moonraker(i) for i in range(args.klipper)]
+    if args.target:
+        report = remote_test(args, bambu, klipper)
+    else:
+        report = asyncio.run(self_test(bambu, klipper, args.timeout))
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print(f"Modus: {report['mode']}")
+        for key in ("announced", "sent", "discovered", "announce_to_inventory_ms", "goodbye_ms"):
+            if key in report:
+                print(f"  {key}: {report[key]}")
+        for problem in report["problems"]:
+            print(f"  FEHLER: {problem}")
+        print("OK" if not report["problems"] else "FEHLGESCHLAGEN")
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
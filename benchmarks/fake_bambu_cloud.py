@@ -0,0 +1,198 @@
+"""Lokaler Fake der Bambu Cloud API fuer den (inkrementellen) Cloud-Sync.
+
+Bedient die Endpunkte, die app.services.bambu_cloud_sync nutzt:
+
+- user_info / devices / device_versions mit ETag + Last-Modified (304 bei If-None-Match)
+- my/tasks: neueste zuerst, Blaettern ueber `after=<task_id>`
+
+Mit --run wird gegen eine frische SQLite-Datei im Temp-Verzeichnis ein voller Sync und danach
+mehrere inkrementelle Syncs ausgefuehrt; zwischen den Laeufen aendert der Fake gezielt Daten
+(neue Tasks, laufender Task wird fertig, eine Spule verliert Gewicht). Ausgegeben werden pro
+Lauf Requests, 304-Antworten, Phasen-Zeiten und Mengen.
+
+Beispiele:
+    python -m benchmarks.fake_bambu_cloud --run --spools 64 --tasks 300
+    python -m benchmarks.fake_bambu_cloud --port 8765          # nur Server
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import sys
+import tempfile
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+from app.services.bambu_cloud_service import BAMBU_API_ENDPOINTS
+
+
+class FakeBambuCloud:
+    def __init__(self, spools: int = 16, tasks: int = 50, devices: int = 2) -> None:
+        self.devices = [
+            {"dev_id": f"FAKE{i:04d}", "name": f"Fake X1C {i}", "online": True, "print_status": "IDLE",
+             "dev_model_name": "BL-P001", "dev_product_name": "X1 Carbon"}
+            for i in range(devices)
+        ]
+        self.spools = [
+            {"tray_uuid": f"{i:032X}", "tray_id": str(i % 4), "tray_type": "PLA", "tray_sub_brands": "PLA Basic",
+             "tray_color": "FF0000FF", "nozzle_temp_min": 190, "nozzle_temp_max": 230, "remain": 80, "k": 0.02}
+            for i in range(spools)
+        ]
+        self.tasks: List[Dict[str, Any]] = []
+        for _ in range(tasks):
+            self.add_task(status=2)
+        self.versions: Dict[str, int] = {"user": 1, "devices": 1, "spools": 1}
+        self.requests = 0
+        self.not_modified = 0
+
+    # --- Daten aendern ---
+    def add_task(self, status: int = 2) -> Dict[str, Any]:
+        task_id = 100000 + len(self.tasks)
+        task = {"id": task_id, "title": f"Job {task_id}", "deviceId": self.devices[0]["dev_id"] if self.devices else "",
+                "status": status, "weight": 12.5, "length": 4100, "costTime": 3600, "plateIndex": 1,
+                "startTime": "2026-01-01T10:00:00Z", "endTime": None if status == 1 else "2026-01-01T11:00:00Z"}
+        self.tasks.append(task)
+        return task
+
+    def finish_task(self, task_id: int) -> None:
+        for task in self.tasks:
+            if task["id"] == task_id:
+                task["status"] = 2
+                task["endTime"] = "2026-01-01T12:00:00Z"
+
+    def consume(self, index: int, remain: int) -> None:
+        self.spools[index]["remain"] = remain
+        self.versions["spools"] += 1
+
+    # --- HTTP ---
+    def _conditional(self, request: web.Request, name: str, body: Any) -> web.Response:
+        self.requests += 1
+        etag = '"' + hashlib.sha1(f"{name}:{self.versions[name]}".encode()).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        headers = {"ETag": etag, "Last-Modified": formatdate(usegmt=True)}
+        return web.json_response(body, headers=headers)
+
+    async def user_info(self, request: web.Request) -> web.Response:
+        return self._conditional(request, "user", {"uid": 4711, "name": "fake"})
+
+    async def devices_handler(self, request: web.Request) -> web.Response:
+        return self._conditional(request, "devices", {"devices": self.devices})
+
+    async def device_versions(self, request: web.Request) -> web.Response:
+        return self._conditional(request, "spools", {"devices": [{"dev_id": self.devices[0]["dev_id"], "ams": [{"tray": self.spools}]}]})
+
+    async def my_tasks(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        limit = int(request.query.get("limit", 20))
+        after = request.query.get("after")
+        ordered = sorted(self.tasks, key=lambda task: task["id"], reverse=True)
+        if after:
+            ordered = [task for task in ordered if task["id"] < int(after)]
+        return web.json_response({"total": len(self.tasks), "hits": ordered[:limit]})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(BAMBU_API_ENDPOINTS["user_info"], self.user_info)
+        app.router.add_get(BAMBU_API_ENDPOINTS["devices"], self.devices_handler)
+        app.router.add_get(BAMBU_API_ENDPOINTS["device_versions"], self.device_versions)
+        app.router.add_get(BAMBU_API_ENDPOINTS["my_tasks"], self.my_tasks)
+        return app
+
+
+async def _serve(cloud: FakeBambuCloud, port: int) -> web.AppRunner:
+    runner = web.AppRunner(cloud.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def _seed_local_spools(cloud: FakeBambuCloud) -> None:
+    from sqlmodel import Session
+
+    from app.database import engine
+    from app.models.material import Material
+    from app.models.spool import Spool
+
+    with Session(engine) as session:
+        material = Material(name="PLA Basic", brand="Bambu Lab")
+        session.add(material)
+        session.flush()
+        for index, spool in enumerate(cloud.spools):
+            session.add(Spool(
+                material_id=material.id,
+                cloud_tray_uuid=spool["tray_uuid"],
+                weight_full=1000,
+                weight_empty=0,
+                weight_current=800 if index % 8 else 500,  # jede 8. Spule weicht ab -> Konflikt
+            ))
+        session.commit()
+
+
+async def run_scenario(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.services.bambu_cloud_service import BambuCloudService
+    from app.services.bambu_cloud_sync import run_cloud_sync
+
+    cloud = FakeBambuCloud(spools=args.spools, tasks=args.tasks)
+    runner = await _serve(cloud, args.port)
+    _seed_local_spools(cloud)
+    running = cloud.add_task(status=1)
+    reports = []
+
+    async def sync(label: str, incremental: bool) -> None:
+        service = BambuCloudService(access_token="fake")
+        service.base_url = f"http://127.0.0.1:{args.port}"
+        cloud.requests = cloud.not_modified = 0
+        try:
+            result = await run_cloud_sync(service, incremental=incremental)
+        finally:
+            await service.close()
+        report = result["report"]
+        reports.append({"run": label, "server_requests": cloud.requests, "server_304": cloud.not_modified,
+                        "duration_ms": report["duration_ms"], "phases": report["phases"], "counts": report["counts"]})
+
+    try:
+        await sync("full", incremental=False)
+        await sync("incremental (nichts geaendert)", incremental=True)
+        for _ in range(3):
+            cloud.add_task()
+        cloud.finish_task(running["id"])
+        cloud.consume(1, 20)
+        await sync("incremental (3 neue Tasks, 1 Task fertig, 1 Spule geaendert)", incremental=True)
+        await sync("incremental (nichts geaendert)", incremental=True)
+    finally:
+        await runner.cleanup()
+    return reports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spools", type=int, default=16)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--run", action="store_true", help="Szenario voll/inkrementell gegen den Fake ausfuehren")
+    args = parser.parse_args()
+
+    if not args.run:
+        web.run_app(FakeBambuCloud(spools=args.spools, tasks=args.tasks).app(), host="127.0.0.1", port=args.port)
+        return 0
+
+    from benchmarks.mqtt_ingest import prepare_environment
+
+    with tempfile.TemporaryDirectory(prefix="fh-cloud-sync-") as tmp:
+        prepare_environment(Path(tmp), log_to_files=False)
+        with contextlib.redirect_stdout(sys.stderr):
+            reports = asyncio.run(run_scenario(args))
+    print(json.dumps(reports, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
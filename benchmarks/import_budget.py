@@ -0,0 +1,148 @@
+"""Importzeit-Budget fuer app.main (python -X importtime).
+
+Startet ``python -X importtime -c "import app.main"`` in einem frischen Prozess (mehrere
+Laeufe, der schnellste zaehlt), wertet die Ausgabe aus und meldet die kumulative Importzeit
+von app.main, die teuersten Module (eigene Zeit) und ob schwere optionale Abhaengigkeiten
+geladen wurden.
+
+Exit-Code 1, wenn das Budget ueberschritten ist oder ein Modul aus ``--forbid`` importiert
+wurde. Mit ``--minimal`` werden alle optionalen Features abgeschaltet
+(FILAMENTHUB_DISABLE_FEATURES, siehe app/routes/registry.py) und geprueft, dass deren
+Abhaengigkeiten (cryptography, apscheduler, bcrypt, httpx, ...) nicht mehr geladen werden.
+Beide Pruefungen laufen auch als pytest-Test (tests/test_import_budget.py).
+
+Beispiele:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 1500 --runs 5
+    python -m benchmarks.import_budget --minimal
+    python -m benchmarks.import_budget --disable debug --disable coverage --top 40
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.mqtt_ingest import REPO_ROOT
+
+DEFAULT_BUDGET_MS = 2500.0
+# Module, die nur optionale Features brauchen und bei --minimal nicht geladen werden duerfen
+MINIMAL_FORBIDDEN = (
+    "cryptography",
+    "apscheduler",
+    "bcrypt",
+    "httpx",
+    "aiohttp",
+    "paramiko",
+    "app.routes.debug_routes",
+    "app.routes.service_routes",
+    "app.routes.admin_coverage_routes",
+    "app.routes.bambu_cloud_routes",
+    "app.routes.mmu_routes",
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """'import time: self [us] | cumulative | name' -> {name: {self_us, cumulative_us}}"""
+    modules: Dict[str, Dict[str, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            own, cumulative = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # Kopfzeile
+        modules[parts[2].strip()] = {"self_us": own, "cumulative_us": cumulative}
+    return modules
+
+
+def measure(disabled: List[str]) -> Dict[str, Dict[str, int]]:
+    env = dict(os.environ)
+    env.setdefault("ADMIN_PASSWORD_HASH", "import-budget")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    if disabled:
+        env["FILAMENTHUB_DISABLE_FEATURES"] = ",".join(disabled)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=str(REPO_ROOT), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app.main fehlgeschlagen:\n{proc.stderr[-4000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def run(runs: int, disabled: List[str], forbid: List[str], top: int) -> Dict[str, Any]:
+    best: Optional[Dict[str, Dict[str, int]]] = None
+    totals: List[float] = []
+    for _ in range(max(1, runs)):
+        modules = measure(disabled)
+        total = modules.get("app.main", {}).get("cumulative_us", 0) / 1000.0
+        totals.append(round(total, 1))
+        if best is None or total < best["app.main"]["cumulative_us"] / 1000.0:
+            best = modules
+    assert best is not None
+    ranked = sorted(best.items(), key=lambda item: item[1]["self_us"], reverse=True)[:top]
+    return {
+        "app_main_ms": min(totals),
+        "runs_ms": totals,
+        "modules": len(best),
+        "disabled_features": disabled,
+        "forbidden_loaded": [name for name in forbid if name in best],
+        "slowest": [
+            {"module": name, "self_ms": round(v["self_us"] / 1000.0, 1), "cumulative_ms": round(v["cumulative_us"] / 1000.0, 1)}
+            for name, v in ranked
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Budget fuer import app.main (kumulativ)")
+    parser.add_argument("--runs", type=int, default=3, help="Anzahl Laeufe (der schnellste zaehlt)")
+    parser.add_argument("--disable", action="append", default=[], help="Feature abschalten (mehrfach moeglich)")
+    parser.add_argument("--minimal", action="store_true", help="alle optionalen Features aus + Verbotsliste pruefen")
+    parser.add_argument("--forbid", action="append", default=[], help="Modul darf nicht importiert werden")
+    parser.add_argument("--top", type=int, default=20, help="Anzahl der teuersten Module im Report")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON auf stdout")
+    args = parser.parse_args()
+
+    disabled = list(args.disable)
+    forbid = list(args.forbid)
+    if args.minimal:
+        from app.routes.registry import FEATURES
+
+        disabled = list(FEATURES)
+        forbid += [name for name in MINIMAL_FORBIDDEN if name not in forbid]
+
+    report = run(args.runs, disabled, forbid, args.top)
+    report["budget_ms"] = args.budget_ms
+    over_budget = report["app_main_ms"] > args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        features = ", ".join(disabled) if disabled else "keine"
+        print(f"import app.main: {report['app_main_ms']:.1f} ms (Laeufe: {report['runs_ms']}, Budget {args.budget_ms:.0f} ms)")
+        print(f"Module: {report['modules']}  abgeschaltete Features: {features}")
+        print()
+        print(f"{'eigene ms':>10} {'kumulativ':>10}  Modul")
+        for item in report["slowest"]:
+            print(f"{item['self_ms']:>10.1f} {item['cumulative_ms']:>10.1f}  {item['module']}")
+        print()
+        if over_budget:
+            print(f"BUDGET UEBERSCHRITTEN: {report['app_main_ms']:.1f} ms > {args.budget_ms:.0f} ms")
+        for name in report["forbidden_loaded"]:
+            print(f"VERBOTENER IMPORT: {name}")
+        if not over_budget and not report["forbidden_loaded"]:
+            print("OK")
+    return 1 if over_budget or report["forbidden_loaded"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
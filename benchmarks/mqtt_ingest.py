@@ -0,0 +1,512 @@
+"""End-to-End-Benchmark fuer den MQTT-Ingest-Pfad.
+
+Treibt synthetische Bambu-Reports (benchmarks/bambu_stream.py) ohne Broker durch
+
+- `local`: app.routes.mqtt_routes.on_message (LAN-MQTT, inkl. AMS-Sync, Job-Tracking,
+  Journal, Delta-Snapshots, WebSocket-Broadcast an einen Dummy-Client)
+- `cloud`: services.cloud_mqtt_client.CloudMQTTClient._on_message
+
+Eine Fake-paho-Client-Instanz liefert die Nachrichten im aufrufenden Thread aus, wie es
+paho im Netzwerk-Thread tut. Die Datenbank ist eine frische SQLite-Datei im Temp-Verzeichnis
+(Alembic-Migrationen wie beim Start), Logs gehen in ein Temp-Verzeichnis.
+
+Gemessen pro Pfad:
+    messages/s, Latenz pro Nachricht (p50/p90/p99), Latenz pro Stufe
+    (parse, map, ams_sync, job_tracking, journal, delta, broadcast, service),
+    SQL-Statements pro Nachricht, RSS-Wachstum
+
+Stufen sind disjunkt: ruft eine Stufe eine andere auf (z.B. parse -> map), zaehlt die Zeit
+zur aeusseren. Was keiner Stufe zugeordnet ist (DB-Lookup des Druckers, Logging, ...) steht
+unter "other".
+
+Beispiele:
+    python -m benchmarks.mqtt_ingest --printers 10 --messages 300 --output bench.json
+    python -m benchmarks.mqtt_ingest --printers 50 --models X1C,P1S,A1 --ams 1-4 --paths local
+    python -m benchmarks.mqtt_ingest --compare bench_v1.6.5.json --output bench_new.json
+    python -m benchmarks.mqtt_ingest --paths local --ingest-trace 1   # Kosten des Ingest-Trace
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.monitoring.ingest_metrics import ingest_metrics
+from benchmarks.bambu_stream import MODEL_PROFILES, build_fleet, iter_messages, parse_range
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STAGES = ("parse", "map", "ams_sync", "job_tracking", "journal", "delta", "broadcast", "service")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(values_ns: List[int]) -> Dict[str, Any]:
+    values = sorted(v / 1e6 for v in values_ns)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 4),
+        "p50_ms": round(percentile(values, 50), 4),
+        "p90_ms": round(percentile(values, 90), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4),
+        "total_ms": round(sum(values), 2),
+    }
+
+
+# ----------------------------------------------------------------------
+# Messwerkzeuge
+# ----------------------------------------------------------------------
+class StageTimer:
+    """Zeitmessung pro Stufe ueber Wrapper; verschachtelte Stufen zaehlen zur aeusseren."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[int]] = {name: [] for name in STAGES}
+        self._local = threading.local()
+        self._patches: List[Any] = []
+
+    def wrap(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        timer = self
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if getattr(timer._local, "active", False):
+                return fn(*args, **kwargs)
+            timer._local.active = True
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.samples[stage].append(time.perf_counter_ns() - start)
+                timer._local.active = False
+
+        wrapper.__wrapped__ = fn  # type: ignore[attr-defined]
+        return wrapper
+
+    def patch(self, owner: Any, attr: str, stage: str) -> None:
+        original = getattr(owner, attr)
+        # Methoden auf Klassen als Funktion patchen (self wird normal uebergeben)
+        setattr(owner, attr, self.wrap(stage, original))
+        self._patches.append((owner, attr, original))
+
+    def restore(self) -> None:
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches.clear()
+
+    def reset(self) -> None:
+        for values in self.samples.values():
+            values.clear()
+
+
+class SqlCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> None:
+        self.count += 1
+
+
+class ErrorCounter(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.ERROR)
+        self.count = 0
+        self.first: Optional[str] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+        if self.first is None:
+            self.first = f"{record.name}: {record.getMessage()[:200]}"
+
+
+def rss_bytes() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class FakeMessage:
+    """Minimaler Ersatz fuer paho.mqtt.client.MQTTMessage."""
+
+    __slots__ = ("topic", "payload", "qos", "retain", "mid")
+
+    def __init__(self, topic: str, payload: bytes, qos: int = 0) -> None:
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = False
+        self.mid = 0
+
+
+class FakePahoClient:
+    """In-Process-Stand-in fuer paho: ruft on_message synchron auf, wie der paho-Netzwerk-Thread."""
+
+    def __init__(self, on_message: Callable[[Any, Any, Any], None], userdata: Any = None) -> None:
+        self.on_message = on_message
+        self.userdata = userdata
+        self.delivered = 0
+
+    def deliver(self, topic: str, payload: bytes, qos: int = 0) -> None:
+        self.on_message(self, self.userdata, FakeMessage(topic, payload, qos))
+        self.delivered += 1
+
+
+class BroadcastSink:
+    """Event-Loop in eigenem Thread mit einem WebSocket-aehnlichen Abonnenten auf dem mqtt-Channel."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.received = 0
+        self._clients: List[Any] = []
+        self._thread = threading.Thread(target=self.loop.run_forever, name="bench-loop", daemon=True)
+
+    def start(self, channel_names: List[str]) -> None:
+        from app.websocket.broadcaster import attach_event_loop, get_channel
+
+        self._thread.start()
+        attach_event_loop(self.loop)
+
+        async def _send(text: str) -> None:
+            self.received += 1
+
+        async def _subscribe() -> None:
+            for name in channel_names:
+                self._clients.append(get_channel(name).subscribe(_send, label="bench"))
+
+        asyncio.run_coroutine_threadsafe(_subscribe(), self.loop).result(5)
+
+    def drain(self, timeout: float = 5.0) -> None:
+        # Einmal durch den Loop, damit ausstehende Sends verarbeitet sind
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            fut = asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), self.loop)
+            fut.result(timeout)
+            if not self.loop._ready:  # type: ignore[attr-defined]
+                return
+
+    def stop(self) -> None:
+        async def _unsubscribe() -> None:
+            for client in self._clients:
+                client.channel.unsubscribe(client)
+            await asyncio.sleep(0)
+
+        asyncio.run_coroutine_threadsafe(_unsubscribe(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+
+# ----------------------------------------------------------------------
+# Umgebung
+# ----------------------------------------------------------------------
+def prepare_environment(workdir: Path, log_to_files: bool) -> None:
+    """Frische DB + Logging in `workdir`. Muss vor dem ersten Import von app.database laufen."""
+    if "app.database" in sys.modules:
+        raise RuntimeError("app.database wurde bereits importiert; Benchmark bitte als eigenen Prozess starten")
+    os.environ["FILAMENTHUB_DB_PATH"] = str(workdir / "bench.db")
+    # init_db/Startup-Code schreibt auf stdout; stdout bleibt fuer das JSON-Ergebnis frei
+    with contextlib.redirect_stdout(sys.stderr):
+        from app.logging_setup import configure_logging
+
+        configure_logging({"enabled": log_to_files, "level": "INFO", "paths": {"logs": str(workdir / "logs")}})
+        from app.database import init_db
+
+        init_db()
+
+
+def seed_printers(fleet: List[Any]) -> Dict[str, str]:
+    from sqlmodel import Session
+
+    from app.database import engine
+    from app.models.printer import Printer
+
+    ids: Dict[str, str] = {}
+    with Session(engine) as session:
+        for stream in fleet:
+            printer = Printer(
+                name=f"Bench {stream.model} {stream.serial[-4:]}",
+                printer_type="bambu",
+                model=stream.model,
+                cloud_serial=stream.serial,
+                ip_address="127.0.0.1",
+            )
+            session.add(printer)
+            session.flush()
+            ids[stream.serial] = printer.id
+        session.commit()
+    return ids
+
+
+def instrument(timer: StageTimer, path: str) -> None:
+    from app.routes import mqtt_routes
+    from app.services import live_delta
+    from app.services.job_tracking_service import job_tracking_service
+    from app.services.universal_mapper import UniversalMapper
+
+    timer.patch(UniversalMapper, "map", "map")
+    timer.patch(job_tracking_service, "process_message", "job_tracking")
+    if path == "local":
+        timer.patch(mqtt_routes, "process_mqtt_payload", "parse")
+        timer.patch(mqtt_routes, "sync_ams_slots", "ams_sync")
+        timer.patch(mqtt_routes.message_journal, "append", "journal")
+        timer.patch(live_delta, "record_update", "delta")
+        timer.patch(mqtt_routes.mqtt_channel, "publish_threadsafe", "broadcast")
+        timer.patch(mqtt_routes.raw_channel, "publish_threadsafe", "broadcast")
+    else:
+        from services.printer_service import get_printer_service
+
+        service = get_printer_service()
+        for attr in ("set_connected", "mark_seen", "update_printer"):
+            timer.patch(service, attr, "service")
+
+
+def build_driver(path: str, fleet: List[Any]) -> FakePahoClient:
+    if path == "local":
+        from app.routes import mqtt_routes
+
+        return FakePahoClient(mqtt_routes.on_message, userdata={"connection_id": "bench"})
+
+    from services.cloud_mqtt_client import CloudMQTTClient
+    from services.printer_service import get_printer_service
+
+    cloud = CloudMQTTClient(user_id="bench", access_token="bench", region="eu", printer_service=get_printer_service())
+    for stream in fleet:
+        cloud.add_device(stream.serial, model=stream.model)
+    return FakePahoClient(cloud._on_message)
+
+
+def run_path(path: str, args: argparse.Namespace, sink: BroadcastSink) -> Dict[str, Any]:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    fleet = build_fleet(args.printers, args.models, args.ams, seed=args.seed)
+    seed_printers(fleet)
+    client = build_driver(path, fleet)
+    timer = StageTimer()
+    instrument(timer, path)
+    sql = SqlCounter()
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+    event.listen(Engine, "before_cursor_execute", sql)
+    try:
+        messages = list(iter_messages(fleet, args.warmup + args.messages))
+        warmup, measured = messages[: args.warmup * len(fleet)], messages[args.warmup * len(fleet):]
+        for topic, payload in warmup:
+            client.deliver(topic, payload)
+        sink.drain()
+        timer.reset()
+        ingest_metrics.reset()
+        sql.count = 0
+        errors.count = 0
+        received_before = sink.received
+        payload_bytes = sum(len(p) for _, p in measured)
+
+        gc.collect()
+        rss_start = rss_bytes()
+        totals: List[int] = []
+        wall_start = time.perf_counter()
+        for topic, payload in measured:
+            start = time.perf_counter_ns()
+            client.deliver(topic, payload)
+            totals.append(time.perf_counter_ns() - start)
+        wall = time.perf_counter() - wall_start
+        sink.drain()
+        gc.collect()
+        rss_end = rss_bytes()
+    finally:
+        event.remove(Engine, "before_cursor_execute", sql)
+        logging.getLogger().removeHandler(errors)
+        timer.restore()
+
+    count = len(measured)
+    total_ns = sum(totals)
+    stages = {}
+    accounted = 0
+    for name, values in timer.samples.items():
+        if not values:
+            continue
+        stage = summarize(values)
+        stage["share"] = round(sum(values) / total_ns, 4) if total_ns else 0.0
+        stages[name] = stage
+        accounted += sum(values)
+    stages["other"] = {
+        "total_ms": round((total_ns - accounted) / 1e6, 2),
+        "share": round((total_ns - accounted) / total_ns, 4) if total_ns else 0.0,
+    }
+    return {
+        "messages": count,
+        "payload_bytes": payload_bytes,
+        "duration_s": round(wall, 4),
+        "messages_per_s": round(count / wall, 1) if wall else 0.0,
+        "latency": summarize(totals),
+        "stages": stages,
+        "sql": {"statements": sql.count, "per_message": round(sql.count / count, 2) if count else 0.0},
+        "rss": {
+            "start_mb": round(rss_start / 1048576, 2),
+            "end_mb": round(rss_end / 1048576, 2),
+            "growth_mb": round((rss_end - rss_start) / 1048576, 3),
+            "growth_kb_per_1k_messages": round((rss_end - rss_start) / 1024 / count * 1000, 2) if count else 0.0,
+        },
+        # eingebaute Stufen-Histogramme (app.monitoring.ingest_metrics) zum Gegenpruefen
+        "ingest_metrics": ingest_metrics.snapshot(per_printer=False)["sources"],
+        "broadcast_received": sink.received - received_before,
+        "errors_logged": errors.count,
+        "first_error": errors.first,
+    }
+
+
+# ----------------------------------------------------------------------
+# Ergebnis / Vergleich
+# ----------------------------------------------------------------------
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=5
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _version() -> Optional[str]:
+    try:
+        return (REPO_ROOT / "VERSION").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressionen gegenueber einem frueheren Ergebnis (gleiche Parameter vorausgesetzt)."""
+    regressions = []
+    for path, result in current.get("results", {}).items():
+        old = baseline.get("results", {}).get(path)
+        if not old:
+            continue
+        checks = [
+            ("messages_per_s", old["messages_per_s"], result["messages_per_s"], False),
+            ("latency.p99_ms", old["latency"].get("p99_ms", 0), result["latency"].get("p99_ms", 0), True),
+            ("sql.per_message", old["sql"]["per_message"], result["sql"]["per_message"], True),
+        ]
+        for name, before, after, higher_is_worse in checks:
+            if not before:
+                continue
+            change = (after - before) / before
+            line = f"{path:6s} {name:16s} {before:>12} -> {after:>12} ({change:+.1%})"
+            print(line, file=sys.stderr)
+            if (change > threshold) if higher_is_worse else (change < -threshold):
+                regressions.append(line)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="MQTT-Ingest-Benchmark (ohne Broker)")
+    parser.add_argument("--printers", type=int, default=5, help="Anzahl Drucker (1-50)")
+    parser.add_argument("--messages", type=int, default=200, help="gemessene Nachrichten pro Drucker")
+    parser.add_argument("--warmup", type=int, default=20, help="Aufwaerm-Nachrichten pro Drucker")
+    parser.add_argument("--models", default="X1C,P1S,A1", help=f"Modelle, reihum ({', '.join(MODEL_PROFILES)})")
+    parser.add_argument("--ams", default="1-4", help="AMS-Einheiten pro Drucker, z.B. 2 oder 1-4")
+    parser.add_argument("--paths", default="local,cloud", help="local, cloud oder beide")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-file-logging", action="store_true", help="Datei-Logging abschalten")
+    parser.add_argument("--ingest-trace", type=int, default=0, help="Ingest-Trace fuer jede N-te Nachricht (0 = aus)")
+    parser.add_argument("--output", default=None, help="Ergebnis-JSON in Datei schreiben (sonst stdout)")
+    parser.add_argument("--compare", default=None, help="frueheres Ergebnis-JSON zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regressions-Schwelle (Anteil, Standard 10%%)")
+    args = parser.parse_args(argv)
+
+    args.printers = max(1, min(args.printers, 50))
+    args.models = [m.strip().upper() for m in args.models.split(",") if m.strip()]
+    unknown = [m for m in args.models if m not in MODEL_PROFILES]
+    if unknown:
+        parser.error(f"unbekannte Modelle: {', '.join(unknown)}")
+    args.ams = parse_range(args.ams, (1, 4))
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    if any(p not in ("local", "cloud") for p in paths):
+        parser.error("--paths erlaubt local und cloud")
+
+    with tempfile.TemporaryDirectory(prefix="fh-bench-") as tmp:
+        workdir = Path(tmp)
+        prepare_environment(workdir, log_to_files=not args.no_file_logging)
+        if args.ingest_trace > 0:
+            from app.logging.hot_path import ingest_trace
+
+            ingest_trace.configure(enabled=True, sample_every=args.ingest_trace, clear_printers=True)
+        with contextlib.redirect_stdout(sys.stderr):
+            from services.printer_service import initialize_printer_service
+
+            initialize_printer_service()
+            sink = BroadcastSink()
+            sink.start(["mqtt", "mqtt_raw"])
+            results = {}
+            try:
+                for path in paths:
+                    results[path] = run_path(path, args, sink)
+            finally:
+                sink.stop()
+                from app.logging_setup import shutdown_logging
+
+                shutdown_logging()
+
+    report = {
+        "benchmark": "mqtt_ingest",
+        "version": _version(),
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "printers": args.printers,
+            "messages_per_printer": args.messages,
+            "warmup_per_printer": args.warmup,
+            "models": args.models,
+            "ams": list(args.ams),
+            "paths": paths,
+            "seed": args.seed,
+            "file_logging": not args.no_file_logging,
+            "ingest_trace": args.ingest_trace,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if baseline.get("params") != report["params"]:
+            print("Hinweis: Parameter weichen vom Vergleichslauf ab", file=sys.stderr)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} Regression(en) ueber {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print("  " + line, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -333,7 +333,75 @@ function renderFoundPrinterCard(printer) {
 
 
 
-async function scanForPrinters() {
+function scanForPrinters() {
+
+    // Streaming-Scan (SSE): gefundene Drucker erscheinen sofort, nicht erst nach dem ganzen /24
+
+    if (typeof EventSource === 'undefined') return quickScanForPrinters();
+
+    const btn = document.getElementById('scanPrintersBtn');
+
+    if (btn) btn.disabled = true;
+
+    const container = document.getElementById('foundPrintersGrid');
+
+    container.innerHTML = '<div class="loader">Scan läuft...</div>';
+
+    foundPrinters = [];
+
+    const source = new EventSource('/api/scanner/scan/stream');
+
+    const finish = () => {
+
+        source.close();
+
+        if (!foundPrinters.length) container.innerHTML = '<div class="empty-state">Keine Drucker gefunden</div>';
+
+        if (btn) btn.disabled = false;
+
+    };
+
+    source.addEventListener('printer', (event) => {
+
+        try {
+
+            foundPrinters.push(JSON.parse(event.data));
+
+            renderFoundPrinters();
+
+        } catch (error) {
+
+            console.warn('Scan-Event konnte nicht gelesen werden', error);
+
+        }
+
+    });
+
+    source.addEventListener('done', finish);
+
+    source.addEventListener('error', (event) => {
+
+        // Server-Fehler-Event oder abgebrochene Verbindung
+
+        if (!event.data && !foundPrinters.length) {
+
+            source.close();
+
+            if (btn) btn.disabled = false;
+
+            return quickScanForPrinters();
+
+        }
+
+        finish();
+
+    });
+
+}
+
+
+
+async function quickScanForPrinters() {
 
     const btn = document.getElementById('scanPrintersBtn');
 
@@ -389,6 +457,10 @@ function addFoundPrinter(printer) {
 
     document.getElementById('printerPort').value = printer.port || '';
 
+    // Seriennummer kommt aus der SSDP-Ankuendigung (Bambu), beim TCP-Scan fehlt sie
+
+    if (printer.serial) document.getElementById('printerSerial').value = printer.serial;
+
     document.getElementById('printerModal').classList.add('active');
 
 }
@@ -7,6 +7,14 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='repla
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 sys.dont_write_bytecode = True
+
+# --profile-startup: Importzeiten und Startphasen messen; Report nach dem Start auf stdout
+# und in logs/startup_profile.json (siehe app/monitoring/startup_profile.py)
+if "--profile-startup" in sys.argv:
+    os.environ["FILAMENTHUB_PROFILE_STARTUP"] = "1"
+    from app.monitoring.startup_profile import startup_profile
+    startup_profile.install_import_profiler()
+
 import uvicorn
 import logging
 import yaml
@@ -83,6 +91,7 @@ app_logger.info("Aktive Log-Module: %s", log_config.get("modules", {}))
 
 # Development reload is CLI-only to keep Windows start stable:
 # uvicorn app.main:app --reload --port 8085
+# Kaltstart profilieren: python run.py --profile-startup
 def start():
     host, port = get_server_bind(config)
     app_logger.info(f"Starting FilamentHub on {host}:{port}")
@@ -26,6 +26,7 @@ from datetime import datetime, timezone
 import paho.mqtt.client as mqtt
 
 from app.services.universal_mapper import UniversalMapper
+from app.monitoring.ingest_metrics import ingest_metrics
 from services.printer_service import PrinterService
 
 logger = logging.getLogger("cloud_mqtt")
@@ -302,7 +303,14 @@ class CloudMQTTClient:
 
     def _on_message(self, client, userdata, msg) -> None:
         """Callback für eingehende MQTT Nachrichten."""
+        parts = (msg.topic or "").split("/")
+        serial = parts[1] if len(parts) >= 2 and parts[0] == "device" else None
+        with ingest_metrics.message(serial, source="cloud"):
+            self._handle_message(msg)
+
+    def _handle_message(self, msg) -> None:
         topic = msg.topic
+        t_stage = ingest_metrics.clock()
 
         try:
             payload = json.loads(msg.payload.decode("utf-8"))
@@ -321,6 +329,7 @@ class CloudMQTTClient:
             return
 
         serial = parts[1]
+        t_stage = ingest_metrics.lap("parse", t_stage)
 
         if self.debug:
             logger.debug(f"CloudMQTT: Message von {serial}, {len(msg.payload)} bytes")
@@ -336,6 +345,7 @@ class CloudMQTTClient:
         if mapper:
             try:
                 mapped_data = mapper.map(payload)
+                t_stage = ingest_metrics.lap("map", t_stage)
 
                 # Modell aktualisieren falls erkannt
                 if mapped_data.model:
@@ -355,6 +365,7 @@ class CloudMQTTClient:
                         self.printer_service.update_printer(serial, mapped_data)
                     except Exception as e:
                         logger.error(f"CloudMQTT: PrinterService Update fehlgeschlagen: {e}")
+                t_stage = ingest_metrics.lap("service", t_stage)
 
                 # Job Tracking Service aufrufen (für task_id, subtask_name, etc.)
                 try:
@@ -392,6 +403,7 @@ class CloudMQTTClient:
 
                 except Exception as e:
                     logger.error(f"CloudMQTT: JobTracking fehlgeschlagen für {serial}: {e}")
+                t_stage = ingest_metrics.lap("job_tracking", t_stage)
 
             except Exception as e:
                 logger.error(f"CloudMQTT: Mapping fehlgeschlagen für {serial}: {e}")
@@ -402,6 +414,7 @@ class CloudMQTTClient:
                 self.on_message_callback(serial, payload)
             except Exception as e:
                 logger.error(f"CloudMQTT: Callback Fehler: {e}")
+            ingest_metrics.lap("callback", t_stage)
 
     def send_command(self, serial: str, command: Dict[str, Any]) -> bool:
         """
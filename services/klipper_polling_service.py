@@ -19,6 +19,7 @@ from sqlmodel import Session, select
 
 from app.database import engine
 from app.models.printer import Printer
+from app.services.http_clients import http_clients
 from app.services.live_state import set_live_state
 from services.spoolman_service import build_active_spool_hint, fetch_active_spoolman_id
 
@@ -285,39 +286,40 @@ async def run_klipper_poller(printer_service=None) -> None:
     # Bereits registrierte Keys tracken → Neuregistrierung nur für neue Drucker
     _registered_keys: set = {f"klipper_{p.id}" for p in printers}
 
-    async with httpx.AsyncClient() as client:
-        while not _stop_event.is_set():
-            # Drucker-Liste bei jedem Zyklus neu laden (falls Drucker hinzugefügt wurden)
-            with Session(_engine) as session:
-                printers = session.exec(
-                    select(Printer).where(Printer.printer_type == "klipper")
-                ).all()
-
-            # Neu hinzugefügte Drucker dynamisch im PrinterService registrieren
-            for printer in printers:
-                key = f"klipper_{printer.id}"
-                if key not in _registered_keys:
-                    logger.info("[Klipper Poller] Neuer Drucker erkannt: %s → key=%s", printer.name, key)
-                    if printer_service:
-                        printer_service.register_printer(
-                            key,
-                            name=printer.name,
-                            model="klipper",
-                            printer_id=str(printer.id),
-                            source="klipper_poller",
-                        )
-                    _registered_keys.add(key)
-
-            for printer in printers:
-                if _stop_event.is_set():
-                    break
-                await _poll_single(printer, client, printer_service)
-
-            # Warte auf nächsten Poll-Zyklus (oder Stop-Signal)
-            try:
-                await asyncio.wait_for(_stop_event.wait(), timeout=_POLL_INTERVAL)
-            except asyncio.TimeoutError:
-                pass  # Normales Timeout → nächster Zyklus
+    # Geteilter Moonraker-Client: Keep-Alive-Verbindungen bleiben ueber die Zyklen offen
+    client = http_clients.get("moonraker")
+    while not _stop_event.is_set():
+        # Drucker-Liste bei jedem Zyklus neu laden (falls Drucker hinzugefügt wurden)
+        with Session(_engine) as session:
+            printers = session.exec(
+                select(Printer).where(Printer.printer_type == "klipper")
+            ).all()
+
+        # Neu hinzugefügte Drucker dynamisch im PrinterService registrieren
+        for printer in printers:
+            key = f"klipper_{printer.id}"
+            if key not in _registered_keys:
+                logger.info("[Klipper Poller] Neuer Drucker erkannt: %s → key=%s", printer.name, key)
+                if printer_service:
+                    printer_service.register_printer(
+                        key,
+                        name=printer.name,
+                        model="klipper",
+                        printer_id=str(printer.id),
+                        source="klipper_poller",
+                    )
+                _registered_keys.add(key)
+
+        for printer in printers:
+            if _stop_event.is_set():
+                break
+            await _poll_single(printer, client, printer_service)
+
+        # Warte auf nächsten Poll-Zyklus (oder Stop-Signal)
+        try:
+            await asyncio.wait_for(_stop_event.wait(), timeout=_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass  # Normales Timeout → nächster Zyklus
 
 
 def stop_klipper_poller() -> None:
@@ -1,5 +1,6 @@
 import logging
-import requests
+
+from app.services.http_clients import http_clients
 
 klipper_logger = logging.getLogger("services")
 
@@ -29,7 +30,7 @@ class KlipperService:
             klipper_logger.info(f"Abfrage: {url}")
 
             # Platzhalter – Moonraker API später echte Daten
-            response = requests.get(url, timeout=3)
+            response = http_clients.request_sync("moonraker", "GET", url, timeout=3)
 
             if response.status_code != 200:
                 klipper_logger.warning(f"Klipper Error: {response.status_code}")
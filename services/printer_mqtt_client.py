@@ -5,6 +5,7 @@ from datetime import datetime
 
 import paho.mqtt.client as mqtt
 
+from app.logging.hot_path import ingest_trace
 from app.services.universal_mapper import UniversalMapper
 from services.printer_service import PrinterService
 
@@ -160,7 +161,8 @@ class PrinterMQTTClient:
         except Exception:
             serial = None
 
-        print(f"[MQTT] MESSAGE topic={topic} cloud_serial={serial} size={len(payload_bytes)}")
+        if ingest_trace.sample(serial):
+            ingest_trace.log("runtime message topic=%s cloud_serial=%s size=%s", topic, serial, len(payload_bytes))
 
         # Mark as connected on first receipt
         try:
@@ -186,8 +188,7 @@ class PrinterMQTTClient:
             # Use cloud_serial as logical key for printer updates
             if serial:
                 self.printer_service.update_printer(serial, mapped)
-            else:
-                print(f"[MQTT] MESSAGE without cloud_serial; ignored")
+            # Nachrichten ohne cloud_serial werden ignoriert (kein Log pro Nachricht)
         except Exception as e:
             print(f"[MQTT] Mapping/Update Fehler: {e}")
         # Note: Runtime state is now managed by mqtt_routes.py multi-client infrastructure
@@ -1,8 +1,12 @@
+import logging
 from typing import Dict, Optional, Any, cast, Union
 from datetime import datetime, timezone
 
 from app.services.printer_data import PrinterData
 
+# Wird pro MQTT-Nachricht aufgerufen -> nur gated Debug-Logs, kein print()
+logger = logging.getLogger("services")
+
 
 class PrinterService:
     """Zentraler In-Memory-Speicher für Druckerdaten (PrinterData).
@@ -33,11 +37,11 @@ class PrinterService:
 
     def update_printer(self, key: str, data: PrinterData) -> None:
         if not key:
-            print(f"[PrinterService] update_printer called without cloud_serial; skipping update")
+            logger.debug("[PrinterService] update_printer called without cloud_serial; skipping update")
             return
         if key not in self.printers:
             # Do not auto-register by client_id anymore
-            print(f"[PrinterService] Unbekannter cloud_serial '{key}', update ignored (no auto-register)")
+            logger.debug("[PrinterService] Unbekannter cloud_serial '%s', update ignored (no auto-register)", key)
             return
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         self.printers[key]["data"] = data
@@ -48,7 +52,7 @@ class PrinterService:
         if not key:
             return
         if key not in self.printers:
-            print(f"[PrinterService] mark_seen called for unknown cloud_serial '{key}', ignored")
+            logger.debug("[PrinterService] mark_seen called for unknown cloud_serial '%s', ignored", key)
             return
         ts = last_seen or datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         self.printers[key]["last_seen"] = ts
@@ -72,7 +76,7 @@ class PrinterService:
             return
         if key not in self.printers:
             # do not auto-register here
-            print(f"[PrinterService] set_connected called for unknown cloud_serial '{key}', ignored")
+            logger.debug("[PrinterService] set_connected called for unknown cloud_serial '%s', ignored", key)
             return
         self.printers[key]["connected"] = bool(connected)
         if last_seen:
@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests laufen aus dem Repo-Root (``pytest`` oder ``python -m pytest``); app/ und benchmarks/ importierbar machen
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture(scope="session")
+def app_env(tmp_path_factory):
+    """Frische SQLite-DB im Temp-Verzeichnis; muss vor dem ersten Import von app.database laufen."""
+    from benchmarks.mqtt_ingest import prepare_environment
+
+    workdir = tmp_path_factory.mktemp("filamenthub")
+    prepare_environment(workdir, log_to_files=False)
+    os.environ.setdefault("ADMIN_PASSWORD_HASH", "test")
+    return workdir
@@ -0,0 +1,59 @@
+"""Regressionstest: auf den DB-Pool umgestellte Routen fuehren kein SQL auf dem Event-Loop aus.
+
+Nutzt den DB-Hook des Loop-Watchdogs (performance.loop_watchdog.db_on_loop_debug): jedes
+Statement im Loop-Thread landet in ``loop_watchdog.db_on_loop``. Statements aus dem DB-Pool
+(app.db.executor) oder aus Starlettes Threadpool (sync Routen) zaehlen nicht.
+"""
+import os
+
+import pytest
+
+# Routen, die auf den DB-Pool umgestellt wurden
+CONVERTED_PATHS = (
+    "/api/live-state/",
+    "/api/live-state/UNKNOWN-SERIAL",
+    "/api/ams/",
+    "/api/ams/regular",
+    "/api/ams/lite",
+    "/api/ams/overview",
+    "/api/mqtt/topics/suggest",
+    "/api/weight/spools/00000000-0000-0000-0000-000000000000/history",
+    "/api/weight/spools/number/1/archived",
+    "/api/config/current",
+)
+
+
+@pytest.fixture(scope="module")
+def client(app_env):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.monitoring.loop_watchdog import loop_watchdog
+
+    # Lifespan startet den Watchdog im Loop-Thread des TestClients; relative Log-Pfade
+    # (logs/...) landen im Temp-Verzeichnis statt im Repository
+    cwd = os.getcwd()
+    os.chdir(app_env)
+    try:
+        with TestClient(app, raise_server_exceptions=False) as test_client:
+            assert loop_watchdog.running
+            loop_watchdog.set_db_debug(True)
+            yield test_client
+            loop_watchdog.set_db_debug(False)
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize("path", CONVERTED_PATHS)
+def test_route_runs_no_sql_on_event_loop(client, path):
+    from app.monitoring.loop_watchdog import loop_watchdog
+
+    loop_watchdog.db_on_loop.clear()
+    response = client.get(path)
+    assert response.status_code < 500, response.text
+
+    offenders = loop_watchdog.db_on_loop.top(10)
+    assert not offenders, "SQL auf dem Event-Loop in {}:\n{}".format(
+        path,
+        "\n".join(f"  {o['file']}:{o['line']} ({o['function']}) x{o['count']}: {o['detail']}" for o in offenders),
+    )
@@ -0,0 +1,30 @@
+"""Importzeit-Budget fuer app.main und Lazy-Imports abgeschalteter Features.
+
+Gemessen wird in frischen Prozessen (``python -X importtime -c "import app.main"``);
+Auswertung und Verbotsliste kommen aus benchmarks/import_budget.py.
+"""
+from benchmarks.import_budget import DEFAULT_BUDGET_MS, MINIMAL_FORBIDDEN, run
+
+
+def _slowest(report):
+    return "\n".join(
+        f"  {item['self_ms']:>8.1f} ms  {item['module']}" for item in report["slowest"]
+    )
+
+
+def test_import_app_main_within_budget():
+    # schnellster von drei Laeufen, wie python -m benchmarks.import_budget
+    report = run(runs=3, disabled=[], forbid=[], top=15)
+    assert report["app_main_ms"] <= DEFAULT_BUDGET_MS, (
+        f"import app.main: {report['app_main_ms']} ms > {DEFAULT_BUDGET_MS:.0f} ms, "
+        f"teuerste Module:\n{_slowest(report)}"
+    )
+
+
+def test_disabled_features_keep_optional_dependencies_unloaded():
+    from app.routes.registry import FEATURES
+
+    report = run(runs=1, disabled=list(FEATURES), forbid=list(MINIMAL_FORBIDDEN), top=15)
+    assert report["forbidden_loaded"] == [], (
+        f"Trotz FILAMENTHUB_DISABLE_FEATURES={','.join(FEATURES)} geladen: {report['forbidden_loaded']}"
+    )
@@ -0,0 +1,70 @@
+"""Delta-Modus (/api/mqtt/ws?mode=delta): Teil-Reports und Topic-Filter."""
+import json
+
+from app.services import live_delta
+
+FULL_REPORT = {
+    "print": {
+        "command": "push_status",
+        "gcode_state": "RUNNING",
+        "mc_percent": 10,
+        "bed_temper": 55.0,
+        "nozzle_temper": 210.0,
+        "layer_num": 3,
+        "total_layer_num": 100,
+        "subtask_name": "Benchy",
+    }
+}
+# P1S/A1 senden zwischen den Voll-Reports nur geaenderte Felder
+PARTIAL_PROGRESS = {"print": {"command": "push_status", "mc_percent": 11}}
+PARTIAL_BED = {"print": {"command": "push_status", "bed_temper": 60.0}}
+
+
+def _map(payload):
+    from app.services.universal_mapper import UniversalMapper
+
+    return UniversalMapper("P1S").map(payload).to_dict()
+
+
+def _get(data, path):
+    for key in path.split("/"):
+        data = data[key]
+    return data
+
+
+def test_partial_pushes_keep_untouched_fields(app_env):
+    serial = "DELTA-PARTIAL-TEST"
+    live_delta.record_update(serial, _map(FULL_REPORT))
+    _version, full = live_delta.get_snapshot(serial)
+    assert full["state"] is not None
+    assert _get(full, "job/subtask_name") == "Benchy"
+
+    for payload in (PARTIAL_PROGRESS, PARTIAL_BED):
+        version = live_delta.record_update(serial, _map(payload))
+        assert version is not None
+        ops = json.loads(live_delta.get_last_delta_json(serial, version - 1))
+        assert ops
+        assert all(op["op"] != "remove" and op.get("value") is not None for op in ops), ops
+
+    _version, data = live_delta.get_snapshot(serial)
+    assert data["progress"] == 11
+    assert _get(data, "temperature/bed") == 60.0
+    for path in ("state", "temperature/nozzle", "layer/current", "layer/total", "job/subtask_name"):
+        assert _get(data, path) == _get(full, path), path
+
+
+def test_topic_filter_applies_to_delta_frames():
+    from app.websocket.delta_stream import DeltaStreamSession
+
+    session = DeltaStreamSession(websocket=None, topics="device/AAA/report")
+    assert session._wants("AAA")
+    assert not session._wants("BBB")
+
+    session.subscribe(topics=["device/+/report"])
+    assert session._wants("BBB")
+
+    session.subscribe(topics=["device/AAA/request"])
+    assert not session._wants("AAA")
+
+    session.subscribe()
+    assert session._wants("BBB")
@@ -0,0 +1,69 @@
+"""Lesen von Capture-Segmenten, die noch geschrieben werden oder abgeschnitten sind."""
+import gzip
+import time
+import zlib
+
+from app.services.mqtt_capture import MqttCapture, iter_segment, list_segments
+
+TOPIC = "device/00M09A000000001/report"
+
+
+def _payload(i: int) -> str:
+    return '{"print": {"command": "push_status", "sequence_id": "%d", "mc_percent": %d}}' % (i, i % 100)
+
+
+def test_segment_still_being_written_yields_every_record(tmp_path):
+    capture = MqttCapture()
+    capture.start({"directory": str(tmp_path), "compression": "gzip"})
+    try:
+        for i in range(3000):
+            capture.record(TOPIC, _payload(i).encode("utf-8"))
+        deadline = time.monotonic() + 10
+        while capture.recorded < 3000 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert capture.recorded == 3000
+
+        # Segment ist noch offen: kein gzip-Trailer, nur Sync-Flushes
+        segments = list_segments(tmp_path)
+        assert len(segments) == 1
+        records = list(iter_segment(segments[0]))
+    finally:
+        capture.stop()
+
+    assert len(records) == 3000
+    assert [r["payload"] for r in records] == [_payload(i) for i in range(3000)]
+
+
+def test_truncated_gzip_segment_keeps_complete_lines(tmp_path):
+    path = tmp_path / "capture-20240101T000000Z-000.jsonl.gz"
+    flush_offsets = []
+    with open(path, "wb") as fh:
+        stream = gzip.GzipFile(fileobj=fh, mode="wb")
+        for batch in range(10):
+            lines = ['{"ts": %d, "topic": "%s", "payload": "x"}' % (batch * 100 + i, TOPIC) for i in range(100)]
+            stream.write(("\n".join(lines) + "\n").encode("utf-8"))
+            stream.flush(zlib.Z_SYNC_FLUSH)
+            flush_offsets.append(fh.tell())
+        # halbe Zeile hinterher, wie bei einem Absturz mitten im Schreiben
+        stream.write(b'{"ts": 1000, "topic": "')
+        stream.flush(zlib.Z_SYNC_FLUSH)
+        data = fh.tell()
+    assert data > flush_offsets[-1]
+
+    # Abschneiden zwischen 7. und 8. Flush -> mindestens 700 Records, alle in Reihenfolge
+    cut = (flush_offsets[6] + flush_offsets[7]) // 2
+    truncated = tmp_path / "capture-20240101T000000Z-001.jsonl.gz"
+    truncated.write_bytes(path.read_bytes()[:cut])
+    ts = [r["ts"] for r in iter_segment(truncated)]
+    assert len(ts) >= 700
+    assert ts == list(range(len(ts)))
+
+    # Ohne Trailer, mit halber letzter Zeile: alle 1000 vollstaendigen Zeilen
+    ts = [r["ts"] for r in iter_segment(path)]
+    assert ts == list(range(1000))
+
+
+def test_plain_segment_drops_only_partial_last_line(tmp_path):
+    path = tmp_path / "capture-20240101T000000Z-000.jsonl"
+    path.write_bytes(b'{"ts": 1}\n{"ts": 2}\n{"ts": 3}\n{"ts": 4, "top')
+    assert [r["ts"] for r in iter_segment(path)] == [1, 2, 3]
@@ -0,0 +1,56 @@
+"""Tabellen-Versionen fuer In-Memory-Caches: erst beim Commit erhoehen, bei Rollback verwerfen."""
+from typing import Optional
+
+from sqlmodel import Field, Session, SQLModel, create_engine
+
+from app.services import table_versions
+
+
+class VersionedThing(SQLModel, table=True):
+    __tablename__ = "versioned_thing"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = ""
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[VersionedThing.__table__])
+    return engine
+
+
+def test_version_changes_on_commit_not_on_flush():
+    engine = _engine()
+    before = table_versions.get_version("versioned_thing")
+    with Session(engine) as session:
+        session.add(VersionedThing(name="a"))
+        session.flush()
+        # geflusht, aber nicht committed: Cache-Key unveraendert
+        assert table_versions.get_version("versioned_thing") == before
+        session.commit()
+    assert table_versions.get_version("versioned_thing") != before
+
+
+def test_rollback_discards_pending_tables():
+    engine = _engine()
+    before = table_versions.get_version("versioned_thing")
+    with Session(engine) as session:
+        session.add(VersionedThing(name="b"))
+        session.flush()
+        session.rollback()
+        session.commit()
+    assert table_versions.get_version("versioned_thing") == before
+
+
+def test_savepoint_rollback_keeps_outer_changes():
+    engine = _engine()
+    before = table_versions.get_version("versioned_thing")
+    with Session(engine) as session:
+        session.add(VersionedThing(name="outer"))
+        session.flush()
+        savepoint = session.begin_nested()
+        session.add(VersionedThing(name="inner"))
+        session.flush()
+        savepoint.rollback()
+        session.commit()
+    assert table_versions.get_version("versioned_thing") != before